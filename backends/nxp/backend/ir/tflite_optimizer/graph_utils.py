@@ -3,6 +3,8 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
+import operator
+
 import executorch.backends.nxp.backend.ir.converter.builder.model_builder as model_builder
 from executorch.backends.nxp.backend.ir import logger
 from executorch.backends.nxp.backend.ir.lib.tflite.BuiltinOperator import (
@@ -40,6 +42,243 @@ def create_tensor_to_operator_dictionaries(
     return input_tensor_to_operators, output_tensor_to_operator
 
 
+OperatorSignature = tuple[
+    int, tuple[tflite_model.Tensor, ...], tuple[tflite_model.Tensor, ...]
+]
+
+
+def _operator_signature(op: tflite_model.Operator) -> OperatorSignature:
+    return op.opcode_index, tuple(op.tmp_inputs), tuple(op.tmp_outputs)
+
+
+class OperatorIndex:
+    """Index of the operators of the TFLite model by their type, and of the operators which consume and produce each
+     tensor. The `input_to_ops` and `output_to_op` dictionaries are identical to the ones returned by
+     `create_tensor_to_operator_dictionaries()`.
+
+    Optimizations modify the operators of the model directly. Calling `update()` finds the operators which were added,
+     removed, or whose type or tensors changed since the last call, and only updates the index for them and their
+     tensors. The operators around these changes are recorded in `touched_operators`, so that optimizations only have
+     to examine this part of the model again.
+    """
+
+    input_to_ops: InputTensorToOpsMap
+    output_to_op: OutputTensorToOpMap
+
+    # Log of the operators which were changed, or which use the same tensors as changed operators. It only grows, so
+    #  users can remember its length to later find out which operators were touched in the meantime.
+    touched_operators: list[tflite_model.Operator]
+
+    # Operators the optimizations should examine. `None` means the whole model.
+    dirty_operators: set[tflite_model.Operator] | None
+
+    def __init__(self, builder: "model_builder.ModelBuilder"):
+        self._builder = builder
+
+        self._operators: list[tflite_model.Operator] = []
+        self._signatures: dict[tflite_model.Operator, OperatorSignature] = {}
+        self._positions: dict[tflite_model.Operator, int] = {}
+        self._ops_for_opcode_index: dict[int, set[tflite_model.Operator]] = {}
+        self._consumers: dict[tflite_model.Tensor, list[tflite_model.Operator]] = {}
+        self._producers: dict[tflite_model.Tensor, list[tflite_model.Operator]] = {}
+        self._indexed_names: dict[tflite_model.Tensor, str] = {}
+
+        self.input_to_ops = {}
+        self.output_to_op = {}
+        self.touched_operators = []
+        self.dirty_operators = None
+
+        self.update()
+
+    def update(self, modified_ops: set[tflite_model.Operator] | None = None) -> bool:
+        """Update the index to reflect the current state of the model.
+
+        :param modified_ops: If the caller knows that only these operators could have been modified, only these
+                              operators are checked for changes, provided that the model still contains the same
+                              operators in the same order. Otherwise, all operators of the model are checked.
+        :return: True, if the operators of the model changed since the last update. Otherwise, False.
+        """
+        changed_ops, removed_ops = self._find_changes(modified_ops)
+        if len(changed_ops) == 0 and len(removed_ops) == 0:
+            return False
+
+        affected_tensors = self._remove_entries(changed_ops + removed_ops)
+        touched_ops = set(changed_ops + removed_ops)
+        touched_ops.update(self._neighbours_through(affected_tensors))
+
+        affected_tensors.update(self._add_entries(changed_ops))
+        touched_ops.update(self._neighbours_through(affected_tensors))
+
+        self._update_name_based_dictionaries(affected_tensors)
+
+        self.touched_operators.extend(touched_ops)
+        return True
+
+    def _find_changes(
+        self, modified_ops: set[tflite_model.Operator] | None
+    ) -> tuple[list[tflite_model.Operator], list[tflite_model.Operator]]:
+        """Get the operators which are new or whose type or tensors changed, and the operators which were removed
+        from the model.
+        """
+        ops = self._builder.get_operators().vector
+        if modified_ops is not None and self._has_same_operators(ops):
+            # No operators were added, removed or moved, so only the `modified_ops` have to be checked.
+            ops = [op for op in modified_ops if op in self._positions]
+            removed_ops = []
+
+        else:
+            self._operators = list(ops)
+            self._positions = {op: position for position, op in enumerate(ops)}
+            removed_ops = [op for op in self._signatures if op not in self._positions]
+
+        changed_ops = [
+            op for op in ops if self._signatures.get(op) != _operator_signature(op)
+        ]
+        return changed_ops, removed_ops
+
+    def _has_same_operators(self, ops: list[tflite_model.Operator]) -> bool:
+        """Check if `ops` are the same operator objects, in the same order, as during the last full update. An
+        optimization may replace an operator with a new one, which keeps the number of operators the same.
+        """
+        return len(ops) == len(self._operators) and all(
+            map(operator.is_, ops, self._operators)
+        )
+
+    def _remove_entries(
+        self, ops: list[tflite_model.Operator]
+    ) -> set[tflite_model.Tensor]:
+        """Remove the outdated entries of `ops` from the index, and return the tensors they used."""
+        affected_tensors = set()
+        for op in ops:
+            if (signature := self._signatures.pop(op, None)) is None:
+                continue  # New operator.
+
+            opcode_index, inputs, outputs = signature
+            self._ops_for_opcode_index[opcode_index].discard(op)
+            for tensor in inputs:
+                self._consumers[tensor] = [
+                    c for c in self._consumers[tensor] if c != op
+                ]
+            for tensor in outputs:
+                self._producers[tensor] = [
+                    p for p in self._producers[tensor] if p != op
+                ]
+            affected_tensors.update(inputs + outputs)
+
+        return affected_tensors
+
+    def _add_entries(
+        self, ops: list[tflite_model.Operator]
+    ) -> set[tflite_model.Tensor]:
+        """Add the current entries of `ops` to the index, and return the tensors they use."""
+        affected_tensors = set()
+        for op in ops:
+            signature = _operator_signature(op)
+            self._signatures[op] = signature
+
+            opcode_index, inputs, outputs = signature
+            self._ops_for_opcode_index.setdefault(opcode_index, set()).add(op)
+            for tensor in inputs:
+                self._consumers.setdefault(tensor, []).append(op)
+            for tensor in outputs:
+                self._producers.setdefault(tensor, []).append(op)
+            affected_tensors.update(inputs + outputs)
+
+        return affected_tensors
+
+    def _update_name_based_dictionaries(
+        self, affected_tensors: set[tflite_model.Tensor]
+    ):
+        """Re-create the entries of the `affected_tensors` in `input_to_ops` and `output_to_op`."""
+        # Tensors may have also been renamed, so first remove all the outdated entries.
+        for tensor in affected_tensors:
+            if (name := self._indexed_names.pop(tensor, None)) is not None:
+                self.input_to_ops.pop(name, None)
+                self.output_to_op.pop(name, None)
+
+        for tensor in affected_tensors:
+            consumers = self._consumers.get(tensor, [])
+            consumers.sort(key=self._positions.__getitem__)
+            producers = self._producers.get(tensor, [])
+            producers.sort(key=self._positions.__getitem__)
+
+            if len(consumers) == 0 and len(producers) == 0:
+                self._consumers.pop(tensor, None)
+                self._producers.pop(tensor, None)
+                continue
+
+            self._indexed_names[tensor] = tensor.name
+            if len(consumers) != 0:
+                self.input_to_ops[tensor.name] = list(consumers)
+            if len(producers) != 0:
+                # Same as `create_tensor_to_operator_dictionaries()`, the last producer takes precedence.
+                self.output_to_op[tensor.name] = producers[-1]
+
+    def _neighbours_through(
+        self, tensors: set[tflite_model.Tensor]
+    ) -> set[tflite_model.Operator]:
+        """Get the operators which currently consume or produce any of the `tensors`."""
+        neighbours = set()
+        for tensor in tensors:
+            neighbours.update(self._consumers.get(tensor, []))
+            neighbours.update(self._producers.get(tensor, []))
+
+        return neighbours
+
+    def position_of(self, op: tflite_model.Operator) -> int | None:
+        """Get the index of `op` in the operators of the model, or `None` if it's not in the model anymore."""
+        return self._positions.get(op, None)
+
+    def operators_near(
+        self, ops: set[tflite_model.Operator] | None, distance: int
+    ) -> set[tflite_model.Operator] | None:
+        """Get the operators of the model, which are connected to any of the `ops` by a path of at most `distance`
+        operators, in any direction. If `ops` is `None`, return `None` as well, which represents the whole model.
+        """
+        if ops is None:
+            return None
+
+        near_ops = {op for op in ops if op in self._positions}
+        frontier = near_ops
+        for _ in range(distance):
+            tensors = set()
+            for op in frontier:
+                tensors.update(op.tmp_inputs)
+                tensors.update(op.tmp_outputs)
+
+            frontier = self._neighbours_through(tensors) - near_ops
+            if len(frontier) == 0:
+                break
+
+            near_ops |= frontier
+
+        return near_ops
+
+    def operators_with_opcode_indices(
+        self,
+        opcode_indices: set[int] | None,
+        among: set[tflite_model.Operator] | None = None,
+    ) -> list[tflite_model.Operator]:
+        """Get the operators with any of the `opcode_indices`, in the order in which they appear in the model.
+
+        :param opcode_indices: Opcode indices of the operators to return. `None` represents all operators.
+        :param among: If not `None`, only return operators from this set.
+        """
+        if opcode_indices is None:
+            ops = self._positions.keys() if among is None else among
+        else:
+            ops = set()
+            for opcode_index in opcode_indices:
+                ops.update(self._ops_for_opcode_index.get(opcode_index, set()))
+            if among is not None:
+                ops &= among
+
+        return sorted(
+            (op for op in ops if op in self._positions),
+            key=self._positions.__getitem__,
+        )
+
+
 # Extend this map with operators required for future optimizations.
 op_type_to_builtin_operator_map = {
     "Add": BuiltinOperator.ADD,
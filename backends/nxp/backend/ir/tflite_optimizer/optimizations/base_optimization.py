@@ -10,6 +10,7 @@ from executorch.backends.nxp.backend.ir.converter.builder import model_builder
 from executorch.backends.nxp.backend.ir.tflite_optimizer.graph_utils import (
     create_tensor_to_operator_dictionaries,
     InputTensorToOpsMap,
+    OperatorIndex,
     OutputTensorToOpMap,
 )
 
@@ -17,16 +18,28 @@ from executorch.backends.nxp.backend.ir.tflite_optimizer.graph_utils import (
 class BaseOptimization(ABC):
     _builder: "model_builder.ModelBuilder"
 
+    # If not `None`, the index is used by the `PatternMatcher` to only examine the operators near its
+    #  `dirty_operators`, instead of the whole model.
+    _operator_index: OperatorIndex | None
+
     def __init__(
-        self, builder: "model_builder.ModelBuilder", conversion_config: ConversionConfig
+        self,
+        builder: "model_builder.ModelBuilder",
+        conversion_config: ConversionConfig,
+        operator_index: OperatorIndex | None = None,
     ):
         self._builder = builder
         self._conversion_config = conversion_config
+        self._operator_index = operator_index
 
     def _create_tensor_to_operator_dictionaries(
         self,
     ) -> tuple[InputTensorToOpsMap, OutputTensorToOpMap]:
-        return create_tensor_to_operator_dictionaries(self._builder)
+        if self._operator_index is None:
+            return create_tensor_to_operator_dictionaries(self._builder)
+
+        self._operator_index.update()
+        return self._operator_index.input_to_ops, self._operator_index.output_to_op
 
     @abstractmethod
     def __call__(self) -> bool:
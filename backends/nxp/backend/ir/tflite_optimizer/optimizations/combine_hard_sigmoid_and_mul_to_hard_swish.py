@@ -94,6 +94,7 @@ class CombineHardSigmoidAndMulIntoHardSwish(BaseOptimization):
                 # `HardSwishConverter` and `HardSigmoidConverter` both only support float32.
                 TensorHasType("x", TensorType.FLOAT32),
             ],
+            operator_index=self._operator_index,
         )
 
         # The mapped operator (value) will be inserted into the model later, at the position of the `key` operator.
@@ -225,6 +226,7 @@ class CombineHardSigmoidAndMulIntoHardSwish(BaseOptimization):
                     TensorsHaveType(["x", "y"], TensorType.UINT8),
                 ),
             ],
+            operator_index=self._operator_index,
         )
 
         # The mapped operator (value) will be inserted into the model later, at the position of the `key` operator.
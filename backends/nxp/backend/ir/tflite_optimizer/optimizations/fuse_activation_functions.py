@@ -200,6 +200,7 @@ class FuseActivationFunctions(BaseOptimization):
                 Op(self.activation_functions, ["x1"], ["y"]),
             ],
             [TensorHasOneConsumer("x1")],
+            operator_index=self._operator_index,
         )
 
         to_remove = []
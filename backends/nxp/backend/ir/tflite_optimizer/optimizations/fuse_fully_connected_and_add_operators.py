@@ -60,6 +60,7 @@ class FuseFullyConnectedAndAddOperators(BaseOptimization):
                 TensorDimensionsMatch("w", 0, "b", -1),
                 RuleIf(TensorIsQuantized("x"), TensorHasType("b", TensorType.INT32)),
             ],
+            operator_index=self._operator_index,
         )
 
         to_remove = []
@@ -77,6 +77,7 @@ class FuseQuantizeIntoPrecedingOps(BaseOptimization):
                 TensorsHaveSameType(["x", "y"]),
                 TensorsArePerTensorQuantized(["x", "y"]),
             ],
+            operator_index=self._operator_index,
         )
 
         to_remove = []
@@ -58,6 +58,7 @@ class MoveActivationBeforeConcatenation(BaseOptimization):
                 #  messing with the quantization elsewhere.
                 TensorsHaveSameQuantization(["x", "y"]),
             ],
+            operator_index=self._operator_index,
         )
 
         to_remove = []
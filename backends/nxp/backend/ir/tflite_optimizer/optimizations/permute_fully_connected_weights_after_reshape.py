@@ -79,6 +79,7 @@ class PermuteFullyConnectedWeightsAfterReshape(BaseOptimization):
                 TensorHasRank("z", 2),
                 TensorsHaveData(["perm", "w"]),
             ],
+            operator_index=self._operator_index,
         )
 
         to_remove = []
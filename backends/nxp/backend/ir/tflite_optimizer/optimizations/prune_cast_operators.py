@@ -42,6 +42,7 @@ class FuseCastOperators(BaseOptimization):
                 MultipleSameOps(["Cast"], ["y", ...]),  # Only `Cast` ops can use `y`.
             ],
             [TensorIsNotModelOutput("y"), TensorIsNotQuantized("y")],
+            operator_index=self._operator_index,
         )
 
         to_remove = []
@@ -83,6 +84,7 @@ class RemoveCastOperatorsWithNoEffect(BaseOptimization):
                     #  with 2 different names, which is not possible.
                 ),
             ],
+            operator_index=self._operator_index,
         )
 
         to_remove = []
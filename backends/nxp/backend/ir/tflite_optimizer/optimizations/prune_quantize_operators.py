@@ -49,6 +49,7 @@ class FuseParallelQuantizeOperators(BaseOptimization):
                 #  result in a perfectly optimized pattern every time.
                 TensorIsNotModelOutput("y2"),
             ],
+            operator_index=self._operator_index,
         )
 
         to_remove = []
@@ -76,7 +77,7 @@ class FuseParallelQuantizeOperators(BaseOptimization):
         for op in to_remove:
             ops.remove(op)
 
-        return ops.len() != 0
+        return len(to_remove) != 0
 
 
 # noinspection PyMethodMayBeStatic
@@ -104,6 +105,7 @@ class PruneQuantizeOperators(BaseOptimization):
                 ),  # Nothing other than `Quantize` ops can use `y`.
             ],
             [TensorIsNotModelOutput("y")],
+            operator_index=self._operator_index,
         )
 
         to_remove = []
@@ -42,6 +42,7 @@ class FuseReshapeOperators(BaseOptimization):
                 ),  # Nothing other than `Reshape` ops can use `y`.
             ],
             [TensorIsNotModelOutput("y")],
+            operator_index=self._operator_index,
         )
 
         to_remove = []
@@ -82,6 +83,7 @@ class RemoveReshapeOperatorsWithNoEffect(BaseOptimization):
                     #  with 2 different names, which is not possible.
                 ),
             ],
+            operator_index=self._operator_index,
         )
 
         to_remove = []
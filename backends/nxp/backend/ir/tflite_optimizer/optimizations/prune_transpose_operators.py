@@ -50,6 +50,7 @@ class FuseTransposeOperators(BaseOptimization):
                 ),  # Nothing other than `Transpose` ops can use `y`.
             ],
             [TensorsHaveData(["perm1", "perm2"]), TensorIsNotModelOutput("y")],
+            operator_index=self._operator_index,
         )
 
         to_remove = []
@@ -114,6 +115,7 @@ class RemoveIdentityTransposeOperators(BaseOptimization):
                     #  outputs with 2 different names, which is not possible.
                 ),
             ],
+            operator_index=self._operator_index,
         )
 
         to_remove = []
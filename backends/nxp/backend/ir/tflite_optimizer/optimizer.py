@@ -11,6 +11,10 @@ from typing import Callable
 
 from executorch.backends.nxp.backend.ir import logger
 from executorch.backends.nxp.backend.ir.conversion_config import ConversionConfig
+from executorch.backends.nxp.backend.ir.tflite_generator import tflite_model
+from executorch.backends.nxp.backend.ir.tflite_optimizer.graph_utils import (
+    OperatorIndex,
+)
 from executorch.backends.nxp.backend.ir.tflite_optimizer.optimizations.combine_hard_sigmoid_and_mul_to_hard_swish import (
     CombineHardSigmoidAndMulIntoHardSwish,
 )
@@ -89,76 +93,79 @@ class Optimizer:
 
     A lot of these methods were implemented a while ago they are not very efficient. Some of them may also not cover
      all edge cases.
+
+    The optimizations share an `OperatorIndex` of the model. It records which operators the optimizations changed, so
+     after its first application to the whole model, an optimization is only applied to the operators near changes
+     made since its previous application.
     """
 
     # avoid circular dependency with importing the model_builder but allow typehints
     _builder: "model_builder.ModelBuilder"  # noqa F821
 
+    _operator_index: OperatorIndex
+
     # Dictionary which maps optimizations to methods which implement them
     optimization_map: dict[Optimization, Callable]
 
-    # As long as the model is being modified, optimizations will be applied again and again. This variable is the hard
-    #  limit to the number of times any single optimization is applied.
-    optimization_application_limit = 10  # Empirical value.
-
     def __init__(
         self,
         builder: "model_builder.ModelBuilder",  # noqa F821
         conversion_config: ConversionConfig,
     ):
         self._builder = builder
+        self._operator_index = OperatorIndex(builder)
 
         self.optimization_map = {
             Optimization.KEEP_ONE_EMPTY_BUFFER: KeepOneEmptyBuffer(
-                builder, conversion_config
+                builder, conversion_config, self._operator_index
             ),
             Optimization.FUSE_ACTIVATION_FUNCTIONS: FuseActivationFunctions(
-                builder, conversion_config
+                builder, conversion_config, self._operator_index
             ),
             Optimization.FUSE_FULLY_CONNECTED_AND_ADD: FuseFullyConnectedAndAddOperators(
-                builder, conversion_config
+                builder, conversion_config, self._operator_index
             ),
             Optimization.FUSE_RESHAPE_OPERATORS: FuseReshapeOperators(
-                builder, conversion_config
+                builder, conversion_config, self._operator_index
             ),
             Optimization.REMOVE_RESHAPE_OPERATORS_WITH_NO_EFFECT: RemoveReshapeOperatorsWithNoEffect(
-                builder, conversion_config
+                builder, conversion_config, self._operator_index
             ),
             Optimization.FUSE_TRANSPOSE_OPERATORS: FuseTransposeOperators(
-                builder, conversion_config
+                builder, conversion_config, self._operator_index
             ),
             Optimization.REMOVE_IDENTITY_TRANSPOSE_OPERATORS: RemoveIdentityTransposeOperators(
-                builder, conversion_config
+                builder, conversion_config, self._operator_index
             ),
             Optimization.PRUNE_QUANTIZE_OPERATORS: PruneQuantizeOperators(
-                builder, conversion_config
+                builder, conversion_config, self._operator_index
             ),
             Optimization.FUSE_PARALLEL_QUANTIZE_OPERATORS: FuseParallelQuantizeOperators(
-                builder, conversion_config
+                builder, conversion_config, self._operator_index
             ),
             Optimization.FUSE_QUANTIZE_INTO_PRECEDING_OPS: FuseQuantizeIntoPrecedingOps(
-                builder, conversion_config
+                builder, conversion_config, self._operator_index
             ),
             Optimization.REMOVE_UNUSED_TENSORS: RemoveUnusedTensorsAndBuffers(
-                builder, conversion_config
+                builder, conversion_config, self._operator_index
             ),
             Optimization.ELIMINATE_DEAD_BRANCHES: EliminateDeadBranches(
-                builder, conversion_config
+                builder, conversion_config, self._operator_index
             ),
             Optimization.PERMUTE_FULLY_CONNECTED_WEIGHTS_AFTER_RESHAPE: PermuteFullyConnectedWeightsAfterReshape(
-                builder, conversion_config
+                builder, conversion_config, self._operator_index
             ),
             Optimization.FUSE_CAST_OPERATORS: FuseCastOperators(
-                builder, conversion_config
+                builder, conversion_config, self._operator_index
             ),
             Optimization.REMOVE_CAST_OPERATORS_WITH_NO_EFFECT: RemoveCastOperatorsWithNoEffect(
-                builder, conversion_config
+                builder, conversion_config, self._operator_index
             ),
             Optimization.MOVE_ACTIVATION_BEFORE_CONCAT: MoveActivationBeforeConcatenation(
-                builder, conversion_config
+                builder, conversion_config, self._operator_index
             ),
             Optimization.COMBINE_HARD_SIGMOID_AND_MUL_INTO_HARD_SWISH: CombineHardSigmoidAndMulIntoHardSwish(
-                builder, conversion_config
+                builder, conversion_config, self._operator_index
             ),
         }
 
@@ -174,9 +181,47 @@ class Optimizer:
         At least one of 'optimization_whitelist' and 'optimization_blacklist' must be 'None'.
         If both are 'None', all optimizations are applied.
 
-        The optimizations will be applied multiple times in a loop, until the model is fully optimized.
+        The optimizations will be applied multiple times in a loop, until none of them can modify the model anymore,
+         or for at most one round per operator of the model, which logs a warning.
         """
 
+        optimizations = self._selected_optimizations(
+            optimization_whitelist, optimization_blacklist
+        )
+
+        # Maps the optimizations which still have to be applied to the operators they have to examine. `None`
+        #  represents the whole model.
+        pending: dict[Optimization, set[tflite_model.Operator] | None] = dict.fromkeys(
+            optimizations
+        )
+        self._operator_index.update()
+
+        # The optimizations normally reach the fixed point after a couple of rounds. This limit only guards against
+        #  optimizations which keep undoing each other.
+        round_limit = self._builder.get_operators().len() + 1
+        for _ in range(round_limit):
+            for optimization in optimizations:
+                if optimization in pending.keys():
+                    self._apply(optimization, optimizations, pending)
+
+            if len(pending) == 0:
+                # The model is now fully optimized.
+                break
+
+        else:
+            logger.w(
+                f"The optimizations {list(pending.keys())} didn't stop modifying the model after {round_limit} "
+                "rounds."
+            )
+
+        self._operator_index.dirty_operators = None
+
+    def _selected_optimizations(
+        self,
+        optimization_whitelist: list[Optimization] | None,
+        optimization_blacklist: list[Optimization] | None,
+    ) -> list[Optimization]:
+        """Get the optimizations to apply, based on the `optimization_whitelist` and `optimization_blacklist`."""
         if optimization_whitelist is not None and optimization_blacklist is not None:
             logger.e(
                 logger.Code.INVALID_OPTIMIZATION,
@@ -198,25 +243,54 @@ class Optimizer:
                         f"Optimization blacklist contains invalid optimization '{o}'."
                     )
 
-        # Execute the optimizations until the model is fully optimized.
-        for _i in range(self.optimization_application_limit):
-            run_again = False
+        for optimization in optimizations:
+            if optimization not in self.optimization_map.keys():
+                logger.e(
+                    logger.Code.INVALID_OPTIMIZATION,
+                    f"The converter doesn't recognise the '{optimization}' optimization.",
+                )
 
-            for optimization in optimizations:
-                if optimization not in self.optimization_map.keys():
-                    logger.e(
-                        logger.Code.INVALID_OPTIMIZATION,
-                        f"The converter doesn't recognise the '{optimization}' optimization.",
-                    )
+        return optimizations
 
-                # Call the optimization
-                made_changes = self.optimization_map[optimization]()
-                logger.internal_assert(
-                    type(made_changes) is bool,
-                    f"Optimization `{optimization}` didn't return bool.",
-                )
-                run_again |= made_changes
+    def _apply(
+        self,
+        optimization: Optimization,
+        optimizations: list[Optimization],
+        pending: dict[Optimization, set[tflite_model.Operator] | None],
+    ):
+        """Apply the `optimization` to the operators it has to examine, and update the `pending` operators of all
+        `optimizations` with the operators it touched.
+        """
+        # Call the optimization
+        self._operator_index.dirty_operators = pending[optimization]
+        touched_operators_count = len(self._operator_index.touched_operators)
+        made_changes = self.optimization_map[optimization]()
+        logger.internal_assert(
+            type(made_changes) is bool,
+            f"Optimization `{optimization}` didn't return bool.",
+        )
 
-            if not run_again:
-                # The model is now fully optimized.
-                break
+        self._operator_index.update()
+        touched_operators = set(
+            self._operator_index.touched_operators[touched_operators_count:]
+        )
+
+        # The optimization has examined its operators. It only has to be applied again to the operators touched just
+        #  now, which it may not have been able to optimize in one go.
+        if made_changes or len(touched_operators) != 0:
+            pending[optimization] = touched_operators
+        else:
+            pending.pop(optimization)
+
+        # Other optimizations also have to examine the touched operators.
+        if len(touched_operators) == 0:
+            return
+
+        for other_optimization in optimizations:
+            if other_optimization == optimization:
+                continue
+
+            if other_optimization not in pending.keys():
+                pending[other_optimization] = set(touched_operators)
+            elif pending[other_optimization] is not None:
+                pending[other_optimization] |= touched_operators
@@ -17,6 +17,7 @@ from executorch.backends.nxp.backend.ir.tflite_optimizer.graph_utils import (
     InputTensorToOpsMap,
     NameToTensorMap,
     operator_is_type,
+    OperatorIndex,
     OutputTensorToOpMap,
 )
 from executorch.backends.nxp.backend.ir.tflite_optimizer.operator_rules import OpRule
@@ -527,16 +528,19 @@ class PatternMatcher:
     builder: "model_builder.ModelBuilder"
     pattern: list[OperatorBlock]
     tensor_rules: list[TensorRule] | None
+    operator_index: OperatorIndex | None
 
     def __init__(
         self,
         builder: "model_builder.ModelBuilder",
         pattern: list[OperatorBlock],
         tensor_rules: list[TensorRule] | None = None,
+        operator_index: OperatorIndex | None = None,
     ):
         self.builder = builder
         self.pattern = pattern
         self.tensor_rules = tensor_rules
+        self.operator_index = operator_index
 
         self._validate_pattern()
 
@@ -558,6 +562,16 @@ class PatternMatcher:
 
         return True
 
+    def _create_tensor_to_operator_dictionaries(
+        self, modified_ops: set[tflite_model.Operator] | None = None
+    ) -> tuple[InputTensorToOpsMap, OutputTensorToOpMap]:
+        if self.operator_index is None:
+            return create_tensor_to_operator_dictionaries(self.builder)
+
+        # Only update the parts of the dictionaries, which were affected by changes to the model.
+        self.operator_index.update(modified_ops)
+        return self.operator_index.input_to_ops, self.operator_index.output_to_op
+
     def _get_opcode_indices_for(self, op_type: str) -> int | None:
         builtin_op = builtin_operator_for_op_type(op_type)
         return self.builder.op_code_type_index_map.get(builtin_op, None)
@@ -617,6 +631,31 @@ class PatternMatcher:
 
         return True
 
+    def _candidates_for_first_op(self) -> list[tflite_model.Operator]:
+        """Get the operators of the model, which the first `Op` of the pattern has to be matched with."""
+        if self.operator_index is None:
+            return self.builder.get_operators().vector
+
+        first_pattern_op = cast(Op, self.pattern[0])
+        opcode_indices = None
+        if first_pattern_op.ops is not None:
+            opcode_indices = set()
+            for op_type in first_pattern_op.ops:
+                opcode_indices.update(
+                    (self._get_opcode_indices_for(op_type) or {}).values()
+                )
+
+        # All blocks of a matched pattern are connected to a previous block, and the tensor and operator rules only
+        #  look at the operators directly connected to the matched ones. A pattern which wasn't matched before can
+        #  therefore only be matched now if its first operator is this close to a change in the model.
+        near_dirty_ops = self.operator_index.operators_near(
+            self.operator_index.dirty_operators, len(self.pattern)
+        )
+
+        return self.operator_index.operators_with_opcode_indices(
+            opcode_indices, near_dirty_ops
+        )
+
     def _extend_pattern_with_op(
         self,
         op: Op,
@@ -874,15 +913,17 @@ class PatternMatcher:
             OutputTensorToOpMap,
         ]
     ]:
-        """Iterate over the model and yield matched patterns of operators."""
+        """Iterate over the model and yield matched patterns of operators.
+
+        If the `PatternMatcher` has an `operator_index` with `dirty_operators`, only the patterns which could include
+         operators near the `dirty_operators` are matched.
+        """
 
         if not self._all_ops_are_in_the_model():
             # The model doesn't contain sufficient operators to satisfy the pattern.
             return
 
-        input_to_ops, output_to_op = create_tensor_to_operator_dictionaries(
-            self.builder
-        )
+        input_to_ops, output_to_op = self._create_tensor_to_operator_dictionaries()
 
         real_pattern: list[tflite_model.Operator] = (
             []
@@ -892,7 +933,14 @@ class PatternMatcher:
         # The first block of a pattern is always an `Op`.
         first_pattern_op = cast(Op, self.pattern[0])
 
-        for first_real_op in self.builder.get_operators():
+        for first_real_op in self._candidates_for_first_op():
+            if (
+                self.operator_index is not None
+                and self.operator_index.position_of(first_real_op) is None
+            ):
+                # The operator was removed from the model by a previous iteration.
+                continue
+
             if first_pattern_op.match(
                 first_real_op, tensor_map, input_to_ops, output_to_op, self.builder
             ) and self._tensor_rules_satisfied(tensor_map, input_to_ops, output_to_op):
@@ -910,11 +958,22 @@ class PatternMatcher:
                 real_pattern, tensor_map, input_to_ops, output_to_op, 1
             ):  # Start from index 1 in the pattern.
                 # Successfully matched full pattern.
+                modified_ops = None
+                if self.operator_index is not None:
+                    # The optimizations only modify the matched operators, and the operators which use their tensors.
+                    matched_ops = set()
+                    for block in real_pattern:
+                        if isinstance(block, list):
+                            matched_ops.update(block)
+                        else:
+                            matched_ops.add(block)
+                    modified_ops = self.operator_index.operators_near(matched_ops, 1)
+
                 yield real_pattern, tensor_map, input_to_ops, output_to_op
 
                 # The underlying TFLite model may have been changed. Re-compute the tensor to operator maps to be safe.
-                input_to_ops, output_to_op = create_tensor_to_operator_dictionaries(
-                    self.builder
+                input_to_ops, output_to_op = (
+                    self._create_tensor_to_operator_dictionaries(modified_ops)
                 )
 
             real_pattern = []
@@ -0,0 +1,248 @@
+# Copyright 2025 NXP
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import numpy as np
+
+from executorch.backends.nxp.backend.ir.conversion_config import ConversionConfig
+from executorch.backends.nxp.backend.ir.converter.builder.model_builder import (
+    ModelBuilder,
+)
+from executorch.backends.nxp.backend.ir.lib.tflite.BuiltinOperator import (
+    BuiltinOperator,
+)
+from executorch.backends.nxp.backend.ir.lib.tflite.TensorType import TensorType
+from executorch.backends.nxp.backend.ir.tflite_generator import tflite_model
+from executorch.backends.nxp.backend.ir.tflite_generator.builtin_options import (
+    conv_2d_options,
+    reshape_options,
+    transpose_options,
+)
+from executorch.backends.nxp.backend.ir.tflite_optimizer.graph_utils import (
+    create_tensor_to_operator_dictionaries,
+    OperatorIndex,
+)
+from executorch.backends.nxp.backend.ir.tflite_optimizer.optimizer import (
+    Optimization,
+    Optimizer,
+)
+from executorch.backends.nxp.backend.ir.tflite_optimizer.pattern_matcher import (
+    Op,
+    PatternMatcher,
+)
+
+SHAPE = [1, 4, 4, 8]
+
+
+def _create_builder() -> ModelBuilder:
+    builder = ModelBuilder(3, "test")
+    sub_graph = builder.get_sub_graph()
+    sub_graph.inputs = tflite_model.SubGraphInputs()
+    sub_graph.outputs = tflite_model.SubGraphOutputs()
+    return builder
+
+
+def _add_op(
+    builder: ModelBuilder, op_type: BuiltinOperator, inputs, outputs, options=None
+) -> tflite_model.Operator:
+    op = tflite_model.Operator(
+        builtin_options=options, opcode_index=builder.op_code_index_for_op_type(op_type)
+    )
+    op.tmp_inputs = inputs
+    op.tmp_outputs = outputs
+    builder.get_operators().append(op)
+    return op
+
+
+def _add_blocks(builder: ModelBuilder, x: tflite_model.Tensor, num_blocks: int):
+    """Add `num_blocks` times `Conv2D -> Reshape -> Transpose -> Reshape -> Transpose -> Relu`. The `Reshape` operators
+    have no effect and the `Transpose` operators cancel out, so all optimizations are needed to reduce each block to
+     `Conv2D` with a fused `Relu`.
+    """
+    for _ in range(num_blocks):
+        w = builder.create_tensor_for_data(np.ones([8, 1, 1, 8], np.float32), "w")
+        y = builder.create_empty_tensor("y", TensorType.FLOAT32, SHAPE)
+        _add_op(builder, BuiltinOperator.CONV_2D, [x, w], [y], conv_2d_options.Conv2D())
+        x = y
+
+        for _ in range(2):
+            y = builder.create_empty_tensor("y", TensorType.FLOAT32, SHAPE)
+            _add_op(
+                builder,
+                BuiltinOperator.RESHAPE,
+                [x],
+                [y],
+                reshape_options.Reshape(SHAPE),
+            )
+            perm = builder.create_tensor_for_data(
+                np.array([0, 2, 1, 3], np.int32), "perm"
+            )
+            z = builder.create_empty_tensor("z", TensorType.FLOAT32, SHAPE)
+            _add_op(
+                builder,
+                BuiltinOperator.TRANSPOSE,
+                [y, perm],
+                [z],
+                transpose_options.Transpose(),
+            )
+            x = z
+
+        y = builder.create_empty_tensor("y", TensorType.FLOAT32, SHAPE)
+        _add_op(builder, BuiltinOperator.RELU, [x], [y])
+        x = y
+
+    return x
+
+
+def _create_model(num_blocks: int) -> ModelBuilder:
+    builder = _create_builder()
+    x = builder.create_empty_tensor("x", TensorType.FLOAT32, SHAPE)
+    builder.get_sub_graph().inputs.tmp_inputs.append(x)
+    y = _add_blocks(builder, x, num_blocks)
+    builder.get_sub_graph().outputs.tmp_outputs.append(y)
+    return builder
+
+
+def _assert_index_is_up_to_date(builder: ModelBuilder, index: OperatorIndex):
+    input_to_ops, output_to_op = create_tensor_to_operator_dictionaries(builder)
+    assert index.input_to_ops == input_to_ops
+    assert index.output_to_op == output_to_op
+
+
+def test_operator_index__follows_changes_of_the_model():
+    builder = _create_model(2)
+    index = OperatorIndex(builder)
+    _assert_index_is_up_to_date(builder, index)
+    assert not index.update()
+
+    ops = builder.get_operators()
+    conv, reshape, transpose, next_reshape = [ops.get(i) for i in range(4)]
+
+    # Bypass the `Reshape`, remove it, and give its output name to its input, like the optimizations do.
+    x, y = reshape.tmp_inputs[0], reshape.tmp_outputs[0]
+    transpose.tmp_inputs[0] = x
+    ops.remove(reshape)
+    builder.swap_tensor_names(x, y)
+    touched_operators_count = len(index.touched_operators)
+    assert index.update()
+    _assert_index_is_up_to_date(builder, index)
+    # The changed operators, and the operators using the same tensors.
+    assert set(index.touched_operators[touched_operators_count:]) == {
+        conv,
+        reshape,
+        transpose,
+        next_reshape,
+    }
+    assert index.position_of(reshape) is None
+    assert index.position_of(transpose) == 1
+
+    # Add a new operator.
+    new_relu = _add_op(
+        builder,
+        BuiltinOperator.RELU,
+        [conv.tmp_outputs[0]],
+        [builder.create_empty_tensor("new", TensorType.FLOAT32, SHAPE)],
+    )
+    assert index.update()
+    _assert_index_is_up_to_date(builder, index)
+    relu_opcode_index = builder.op_code_index_for_op_type(BuiltinOperator.RELU)
+    assert index.operators_with_opcode_indices({relu_opcode_index}) == [
+        op for op in ops if op.opcode_index == relu_opcode_index
+    ]
+    assert index.operators_with_opcode_indices(
+        {relu_opcode_index}, {conv, new_relu}
+    ) == [new_relu]
+    assert index.operators_near({new_relu}, 1) == {new_relu, conv, transpose}
+
+
+def test_operator_index__detects_replaced_operator():
+    builder = _create_model(1)
+    index = OperatorIndex(builder)
+
+    # Replace the first `Reshape` with a new `Relu`, so the number of operators stays the same.
+    ops = builder.get_operators()
+    reshape = ops.get(1)
+    relu = tflite_model.Operator(
+        opcode_index=builder.op_code_index_for_op_type(BuiltinOperator.RELU)
+    )
+    relu.tmp_inputs = reshape.tmp_inputs
+    relu.tmp_outputs = reshape.tmp_outputs
+    ops.vector[1] = relu
+
+    assert index.update({reshape})
+    _assert_index_is_up_to_date(builder, index)
+    assert index.position_of(reshape) is None
+    assert index.position_of(relu) == 1
+    assert relu in index.touched_operators
+
+
+def test_pattern_matcher__only_matches_near_dirty_operators():
+    builder = _create_model(4)
+    index = OperatorIndex(builder)
+    pattern = [Op(["Transpose"], ["x", "perm"], ["y"])]
+
+    def _matched_transposes():
+        matcher = PatternMatcher(builder, pattern, operator_index=index)
+        return [transpose for [transpose], _, _, _ in matcher.match_patterns()]
+
+    all_transposes = _matched_transposes()
+    assert len(all_transposes) == 8
+
+    index.dirty_operators = set()
+    assert _matched_transposes() == []
+
+    # The operators of the first block are `Conv2D, Reshape, Transpose, Reshape, Transpose, Relu`.
+    ops = builder.get_operators()
+    index.dirty_operators = {ops.get(3)}
+    assert _matched_transposes() == all_transposes[:2]
+
+    index.dirty_operators = {ops.get(5)}
+    assert _matched_transposes() == all_transposes[1:2]
+
+
+def test_optimizer__reaches_fixed_point():
+    builder = _create_model(20)
+    Optimizer(builder, ConversionConfig()).optimize()
+
+    ops = builder.get_operators()
+    assert ops.len() == 20
+    assert all(
+        op.opcode_index == builder.op_code_index_for_op_type(BuiltinOperator.CONV_2D)
+        for op in ops
+    )
+
+    # Applying any optimization to the whole model again doesn't change it.
+    optimizer = Optimizer(builder, ConversionConfig())
+    for optimization in Optimization:
+        assert not optimizer.optimization_map[optimization]()
+
+
+def test_optimizer__optimizes_changed_model_like_a_new_model():
+    builder = _create_model(3)
+    Optimizer(builder, ConversionConfig()).optimize()
+
+    # Extend the optimized model and optimize it with an optimizer created before the change.
+    optimizer = Optimizer(builder, ConversionConfig())
+    outputs = builder.get_sub_graph().outputs.tmp_outputs
+    outputs[0] = _add_blocks(builder, outputs[0], 3)
+    optimizer.optimize()
+
+    reference_builder = _create_model(6)
+    Optimizer(reference_builder, ConversionConfig()).optimize()
+    assert builder.get_operators().len() == reference_builder.get_operators().len()
+
+
+def test_optimizer__stops_after_one_round_per_operator(capsys):
+    builder = _create_model(2)
+    optimizer = Optimizer(builder, ConversionConfig())
+
+    # An optimization which claims to change the model every time it is applied.
+    calls = []
+    optimizer.optimization_map[Optimization.FUSE_CAST_OPERATORS] = (
+        lambda: calls.append(1) or True
+    )
+    optimizer.optimize(optimization_whitelist=[Optimization.FUSE_CAST_OPERATORS])
+
+    assert len(calls) == builder.get_operators().len() + 1
+    assert "didn't stop modifying the model" in capsys.readouterr().out
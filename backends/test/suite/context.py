@@ -1,10 +1,25 @@
+import zlib
+
+import torch
+
+
 # Test run context management. This is used to determine the test context for reporting
 # purposes.
 class TestContext:
-    def __init__(self, test_name: str, flow_name: str, params: dict | None):
+    def __init__(
+        self,
+        test_name: str,
+        flow_name: str,
+        params: dict | None,
+        test_base_name: str | None = None,
+    ):
         self.test_name = test_name
         self.flow_name = flow_name
         self.params = params
+        # The name of the test without the flow and params, shared by all of its variants.
+        self.test_base_name = (
+            test_base_name if test_base_name is not None else test_name
+        )
 
     def __enter__(self):
         global _active_test_context
@@ -15,6 +30,10 @@ class TestContext:
         assert _active_test_context is None
         _active_test_context = self
 
+        # Seed the RNG with the name of the test, so that all of its variants build the
+        # same models and inputs, and can share exported programs.
+        torch.manual_seed(zlib.crc32(self.test_base_name.encode()))
+
     def __exit__(self, exc_type, exc_value, traceback):
         global _active_test_context
         _active_test_context = None
@@ -47,7 +47,7 @@ def _create_test(
             "dtype": dtype,
             "use_dynamic_shapes": use_dynamic_shapes,
         }
-        with TestContext(test_name, flow.name, params):
+        with TestContext(test_name, flow.name, params, test_func.__name__):
             test_func(self, flow, dtype, use_dynamic_shapes)
 
     dtype_name = str(dtype)[6:]  # strip "torch."
@@ -120,6 +120,7 @@ def run_model_test(
         context.test_name,
         context.params,
         dynamic_shapes=dynamic_shapes,
+        test_base_name=context.test_base_name,
     )
 
     log_test_summary(run_summary)
@@ -95,7 +95,7 @@ def _make_wrapped_test(
 ):
     def wrapped_test(self):
         with TestContext(test_name, flow.name, params):
-            test_kwargs = params or {}
+            test_kwargs = dict(params or {})
             test_kwargs["flow"] = flow
 
             test_func(self, **test_kwargs)
@@ -145,6 +145,7 @@ class OperatorTest(unittest.TestCase):
             flow,
             context.test_name,
             context.params,
+            test_base_name=context.test_base_name,
         )
 
         log_test_summary(run_summary)
@@ -1,5 +1,5 @@
 from collections import Counter
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import IntEnum
 
 
@@ -91,6 +91,9 @@ class TestCaseSummary:
     error: Exception | None
     """ The Python exception object, if any. """
 
+    stage_durations: dict[str, float] = field(default_factory=dict)
+    """ The wall time, in seconds, of each stage that ran, such as export or lower. """
+
 
 class TestSessionState:
     test_case_summaries: list[TestCaseSummary]
@@ -102,6 +105,7 @@ class TestSessionState:
 @dataclass
 class RunSummary:
     aggregated_results: dict[TestResult, int]
+    aggregated_stage_durations: dict[str, float]
     num_test_cases: int
     test_case_summaries: list[TestCaseSummary]
     total_failed: int
@@ -115,6 +119,14 @@ class RunSummary:
             sorted(Counter(s.result for s in session.test_case_summaries).items())
         )
 
+        # Total the wall time of each stage.
+        aggregated_stage_durations: dict[str, float] = {}
+        for s in session.test_case_summaries:
+            for stage, duration in s.stage_durations.items():
+                aggregated_stage_durations[stage] = (
+                    aggregated_stage_durations.get(stage, 0.0) + duration
+                )
+
         total_failed = 0
         total_passed = 0
         total_skipped = 0
@@ -129,6 +141,7 @@ class RunSummary:
 
         return cls(
             aggregated_results=aggregated_results,
+            aggregated_stage_durations=aggregated_stage_durations,
             num_test_cases=len(session.test_case_summaries),
             test_case_summaries=session.test_case_summaries,
             total_failed=total_failed,
@@ -1,9 +1,16 @@
 import argparse
 import importlib
+import multiprocessing
+import os
+import pickle
 import re
+import time
 import unittest
 
-from typing import Any
+from concurrent.futures import as_completed, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Any, Iterator
 
 import torch
 
@@ -13,10 +20,17 @@ from executorch.backends.test.suite.flow import TestFlow
 from executorch.backends.test.suite.reporting import (
     begin_test_session,
     complete_test_session,
+    log_test_summary,
     RunSummary,
     TestCaseSummary,
     TestResult,
 )
+from executorch.backends.test.suite.shared_export import (
+    begin_export_sharing,
+    end_export_sharing,
+    get_shared_export_stage,
+    share_exported_program,
+)
 
 
 # A list of all runnable test suites and the corresponding python package.
@@ -26,6 +40,15 @@ NAMED_SUITES = {
 }
 
 
+@contextmanager
+def _time_stage(stage_durations: dict[str, float], stage: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_durations[stage] = time.perf_counter() - start
+
+
 def run_test(  # noqa: C901
     model: torch.nn.Module,
     inputs: Any,
@@ -33,12 +56,21 @@ def run_test(  # noqa: C901
     test_name: str,
     params: dict | None,
     dynamic_shapes: Any | None = None,
+    test_base_name: str | None = None,
 ) -> TestCaseSummary:
     """
     Top-level test run function for a model, input set, and tester. Handles test execution
-    and reporting.
+    and reporting. test_base_name is the name of the test without the flow and params,
+    which scopes the sharing of exported programs. It defaults to test_name.
     """
 
+    if test_base_name is None:
+        test_base_name = test_name
+
+    # Failing stages return from within their timing block, so the summary shares this
+    # dict to pick up their duration.
+    stage_durations: dict[str, float] = {}
+
     # Helper method to construct the summary.
     def build_result(
         result: TestResult, error: Exception | None = None
@@ -49,13 +81,15 @@ def run_test(  # noqa: C901
             params=params,
             result=result,
             error=error,
+            stage_durations=stage_durations,
         )
 
     # Ensure the model can run in eager mode.
-    try:
-        model(*inputs)
-    except Exception as e:
-        return build_result(TestResult.EAGER_FAIL, e)
+    with _time_stage(stage_durations, "eager"):
+        try:
+            model(*inputs)
+        except Exception as e:
+            return build_result(TestResult.EAGER_FAIL, e)
 
     try:
         tester = flow.tester_factory(model, inputs)
@@ -63,25 +97,51 @@ def run_test(  # noqa: C901
         return build_result(TestResult.UNKNOWN_FAIL, e)
 
     if flow.quantize:
+        with _time_stage(stage_durations, "quantize"):
+            try:
+                tester.quantize(
+                    flow.quantize_stage_factory()
+                    if flow.quantize_stage_factory
+                    else None
+                )
+            except Exception as e:
+                return build_result(TestResult.QUANTIZE_FAIL, e)
+
+    # TODO Use Tester dynamic_shapes parameter once input generation can properly handle derived dims.
+    default_export_stage = tester._get_default_stage(
+        StageType.EXPORT, dynamic_shapes=dynamic_shapes
+    )
+    export_stage = get_shared_export_stage(
+        model,
+        inputs,
+        flow,
+        test_base_name,
+        params,
+        default_export_stage,
+        dynamic_shapes=dynamic_shapes,
+    )
+    with _time_stage(stage_durations, "export"):
         try:
-            tester.quantize(
-                flow.quantize_stage_factory() if flow.quantize_stage_factory else None
-            )
+            tester.export(export_stage)
         except Exception as e:
-            return build_result(TestResult.QUANTIZE_FAIL, e)
-
-    try:
-        # TODO Use Tester dynamic_shapes parameter once input generation can properly handle derived dims.
-        tester.export(
-            tester._get_default_stage(StageType.EXPORT, dynamic_shapes=dynamic_shapes),
+            return build_result(TestResult.EXPORT_FAIL, e)
+
+    if export_stage is default_export_stage:
+        share_exported_program(
+            model,
+            inputs,
+            flow,
+            test_base_name,
+            params,
+            export_stage,
+            dynamic_shapes=dynamic_shapes,
         )
-    except Exception as e:
-        return build_result(TestResult.EXPORT_FAIL, e)
 
-    try:
-        tester.to_edge_transform_and_lower()
-    except Exception as e:
-        return build_result(TestResult.LOWER_FAIL, e)
+    with _time_stage(stage_durations, "lower"):
+        try:
+            tester.to_edge_transform_and_lower()
+        except Exception as e:
+            return build_result(TestResult.LOWER_FAIL, e)
 
     is_delegated = any(
         n.target == torch._higher_order_ops.executorch_call_delegate
@@ -91,22 +151,24 @@ def run_test(  # noqa: C901
 
     # Only run the runtime portion if something was delegated.
     if is_delegated:
-        try:
-            tester.to_executorch().serialize()
-        except Exception as e:
-            # We could introduce a result value for this, but I'm not sure it's necessary.
-            # We can do this if we ever see to_executorch() or serialize() fail due a backend issue.
-            return build_result(TestResult.UNKNOWN_FAIL, e)
+        with _time_stage(stage_durations, "serialize"):
+            try:
+                tester.to_executorch().serialize()
+            except Exception as e:
+                # We could introduce a result value for this, but I'm not sure it's necessary.
+                # We can do this if we ever see to_executorch() or serialize() fail due a backend issue.
+                return build_result(TestResult.UNKNOWN_FAIL, e)
 
         # TODO We should consider refactoring the tester slightly to return more signal on
         # the cause of a failure in run_method_and_compare_outputs. We can look for
         # AssertionErrors to catch output mismatches, but this might catch more than that.
-        try:
-            tester.run_method_and_compare_outputs()
-        except AssertionError as e:
-            return build_result(TestResult.OUTPUT_MISMATCH_FAIL, e)
-        except Exception as e:
-            return build_result(TestResult.PTE_RUN_FAIL, e)
+        with _time_stage(stage_durations, "run"):
+            try:
+                tester.run_method_and_compare_outputs()
+            except AssertionError as e:
+                return build_result(TestResult.OUTPUT_MISMATCH_FAIL, e)
+            except Exception as e:
+                return build_result(TestResult.PTE_RUN_FAIL, e)
     else:
         return build_result(TestResult.SUCCESS_UNDELEGATED)
 
@@ -148,6 +210,11 @@ def print_summary(summary: RunSummary):
     )
 
     print()
+    print("[Stage Time]")
+    for stage, duration in summary.aggregated_stage_durations.items():
+        print(f"{duration:>8.1f}s {stage}")
+
+    print()
 
 
 def parse_args():
@@ -168,6 +235,13 @@ def parse_args():
     parser.add_argument(
         "-f", "--filter", nargs="?", help="A regular expression filter for test names."
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="The number of worker processes to run tests in.",
+    )
     return parser.parse_args()
 
 
@@ -178,6 +252,129 @@ def build_test_filter(args: argparse.Namespace) -> TestFilter:
     )
 
 
+def _iter_test_cases(suite: unittest.TestSuite) -> Iterator[unittest.TestCase]:
+    for child in suite:
+        if isinstance(child, unittest.TestSuite):
+            yield from _iter_test_cases(child)
+        else:
+            yield child
+
+
+def _group_test_ids(suite: unittest.TestSuite) -> list[list[str]]:
+    # Group the variants of each test, so that they run back to back in the same worker
+    # and can share exported programs.
+    groups: dict[str, list[str]] = {}
+    for test_case in _iter_test_cases(suite):
+        test_method = getattr(test_case, test_case._testMethodName)
+        test_name = getattr(test_method, "_name", test_case._testMethodName)
+        group = (
+            f"{type(test_case).__module__}.{type(test_case).__qualname__}.{test_name}"
+        )
+        groups.setdefault(group, []).append(test_case.id())
+    return list(groups.values())
+
+
+# The test cases of the worker process, by test id.
+_worker_test_cases: dict[str, unittest.TestCase] = {}
+
+
+def _init_worker(test_path: str, num_threads: int):
+    global _worker_test_cases
+
+    # Split the cores between the workers rather than having each use all of them.
+    torch.set_num_threads(num_threads)
+
+    # Discovering the tests imports the suite, torch, and the backends, so that it only
+    # happens once per worker.
+    test_root = importlib.import_module(test_path)
+    suite = discover_tests(test_root, TestFilter(backends=None, name_regex=None))
+    _worker_test_cases = {t.id(): t for t in _iter_test_cases(suite)}
+
+    begin_export_sharing()
+
+
+def _make_picklable(summary: TestCaseSummary) -> TestCaseSummary:
+    # Exceptions can reference objects that can't be sent back from the worker, such
+    # as graph nodes. Keep the message of those.
+    try:
+        pickle.dumps(summary.error)
+    except Exception:
+        summary.error = RuntimeError(f"{type(summary.error).__name__}: {summary.error}")
+    return summary
+
+
+def _run_test_group(
+    test_ids: list[str],
+) -> tuple[list[TestCaseSummary], list[tuple[str, str]]]:
+    result = unittest.TestResult()
+
+    begin_test_session()
+    try:
+        for test_id in test_ids:
+            _worker_test_cases[test_id].run(result)
+    finally:
+        session = complete_test_session()
+
+    errors = [
+        (test_case.id(), traceback)
+        for test_case, traceback in result.errors + result.failures
+    ]
+    return [_make_picklable(s) for s in session.test_case_summaries], errors
+
+
+def _crashed_test_summary(
+    test_case: unittest.TestCase, error: Exception
+) -> TestCaseSummary:
+    test_method = getattr(test_case, test_case._testMethodName)
+    return TestCaseSummary(
+        name=getattr(test_method, "_name", test_case._testMethodName),
+        flow=test_method._flow.name,
+        params=None,
+        result=TestResult.UNKNOWN_FAIL,
+        error=error,
+    )
+
+
+def _run_tests_in_workers(test_path: str, suite: unittest.TestSuite, jobs: int):
+    errors = []
+    test_cases = {t.id(): t for t in _iter_test_cases(suite)}
+
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(test_path, max(1, (os.cpu_count() or 1) // jobs)),
+    ) as executor:
+        futures = {
+            executor.submit(_run_test_group, test_ids): test_ids
+            for test_ids in _group_test_ids(suite)
+        }
+        # Report the results of each group as soon as it completes.
+        for future in as_completed(futures):
+            try:
+                summaries, group_errors = future.result()
+            except BrokenProcessPool as e:
+                # A worker died, for example from a crash in native code. This breaks the
+                # pool, so the groups that were still running or pending fail with it.
+                summaries = [
+                    _crashed_test_summary(test_cases[test_id], e)
+                    for test_id in futures[future]
+                ]
+                group_errors = [(test_id, repr(e)) for test_id in futures[future]]
+            for summary in summaries:
+                log_test_summary(summary)
+                params = f", {summary.params}" if summary.params else ""
+                print(
+                    f"{summary.name} ({summary.flow}{params}) ... {summary.result.display_name()}"
+                )
+            errors.extend(group_errors)
+
+    for test_id, traceback in sorted(errors):
+        print()
+        print(f"ERROR: {test_id}")
+        print(traceback)
+
+
 def runner_main():
     args = parse_args()
 
@@ -191,7 +388,14 @@ def runner_main():
     test_filter = build_test_filter(args)
 
     suite = discover_tests(test_root, test_filter)
-    unittest.TextTestRunner(verbosity=2).run(suite)
+    if args.jobs > 1:
+        _run_tests_in_workers(test_path, suite, args.jobs)
+    else:
+        begin_export_sharing()
+        try:
+            unittest.TextTestRunner(verbosity=2).run(suite)
+        finally:
+            end_export_sharing()
 
     summary = complete_test_session()
     print_summary(summary)
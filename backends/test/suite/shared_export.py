@@ -0,0 +1,181 @@
+import copy
+import hashlib
+import itertools
+
+from typing import Any
+
+import torch
+import torch.utils._pytree as pytree
+
+from executorch.backends.test.harness.stages import Export, Stage
+from executorch.backends.test.suite.flow import TestFlow
+from torch.export import ExportedProgram
+
+#
+# This file contains logic to share exported programs between flows. Export is the
+# same for every flow without quantization that uses the same export stage, so the
+# program exported for one flow can be reused by the others instead of tracing the
+# model again.
+#
+
+
+class SharedExport(Export):
+    """An export stage which reuses a program exported for another flow."""
+
+    def __init__(
+        self, exported_program: ExportedProgram, dynamic_shapes: Any | None = None
+    ):
+        super().__init__(dynamic_shapes)
+        self.shared_program = exported_program
+
+    def run(self, artifact: torch.nn.Module, inputs: Any) -> None:
+        # Lowering may modify the program, so each flow gets its own copy.
+        self.exported_program = copy.deepcopy(self.shared_program)
+
+
+class ExportSharingState:
+    test_name: str | None
+    exported_programs: dict[tuple, ExportedProgram]
+
+    def __init__(self):
+        self.test_name = None
+        self.exported_programs = {}
+
+
+_active_state: ExportSharingState | None = None
+
+
+def begin_export_sharing():
+    global _active_state
+
+    assert _active_state is None, "Export sharing is already active."
+    _active_state = ExportSharingState()
+
+
+def end_export_sharing():
+    global _active_state
+
+    assert _active_state is not None, "Export sharing is not active."
+    _active_state = None
+
+
+def _input_key(inputs: Any) -> tuple:
+    # Only the shapes and dtypes of tensors affect the exported program.
+    return tuple(
+        (tuple(i.shape), i.dtype) if isinstance(i, torch.Tensor) else repr(i)
+        for i in inputs
+    )
+
+
+def _update_with_value(h: "hashlib._Hash", value: Any):
+    leaves, spec = pytree.tree_flatten(value)
+    h.update(repr(spec).encode())
+    for leaf in leaves:
+        if isinstance(leaf, torch.Tensor):
+            h.update(repr((leaf.dtype, tuple(leaf.shape))).encode())
+            data = leaf.detach().cpu().contiguous().reshape(-1)
+            h.update(data.view(torch.uint8).numpy().tobytes())
+        else:
+            h.update(repr(leaf).encode())
+
+
+def _model_key(model: torch.nn.Module) -> str:
+    # Each variant of a test builds its own model. Models of the same types, with the
+    # same attributes, parameters and buffers, export to the same program. Attributes
+    # that don't have a stable repr, like functions, differ between models, so that
+    # such models are never shared.
+    h = hashlib.sha256()
+    for name, module in model.named_modules():
+        h.update(
+            repr((name, type(module).__module__, type(module).__qualname__)).encode()
+        )
+        for attr, value in sorted(vars(module).items()):
+            # The parameters, buffers and submodules are in underscored attributes.
+            if not attr.startswith("_"):
+                h.update(attr.encode())
+                _update_with_value(h, value)
+    for name, tensor in itertools.chain(
+        model.named_parameters(), model.named_buffers()
+    ):
+        h.update(name.encode())
+        _update_with_value(h, tensor)
+    return h.hexdigest()
+
+
+def _cache_key(
+    model: torch.nn.Module,
+    inputs: Any,
+    params: dict | None,
+    export_stage: Stage,
+    dynamic_shapes: Any | None,
+) -> tuple | None:
+    if type(export_stage) is SharedExport or not isinstance(export_stage, Export):
+        return None
+
+    try:
+        model_key = _model_key(model)
+    except Exception:
+        # Tensors which can't be read, like fake tensors, are never shared.
+        return None
+
+    # Export stages of different flows only differ in name if they don't override run.
+    return (
+        model_key,
+        _input_key(inputs),
+        repr(params),
+        type(export_stage).run,
+        repr(dynamic_shapes),
+    )
+
+
+def get_shared_export_stage(
+    model: torch.nn.Module,
+    inputs: Any,
+    flow: TestFlow,
+    test_name: str,
+    params: dict | None,
+    export_stage: Stage,
+    dynamic_shapes: Any | None = None,
+) -> Stage:
+    """
+    Returns a stage reusing the program exported for another flow in the same test case,
+    if there is one, or export_stage otherwise. test_name is the name of the test
+    without the flow, which is the same for all of its variants.
+    """
+    global _active_state
+
+    # Quantization changes the module before export, so it is never shared.
+    if _active_state is None or flow.quantize:
+        return export_stage
+
+    # Variants of a test run back to back, so only the programs of the current test
+    # are kept.
+    if _active_state.test_name != test_name:
+        _active_state.test_name = test_name
+        _active_state.exported_programs.clear()
+
+    key = _cache_key(model, inputs, params, export_stage, dynamic_shapes)
+    if key is None or key not in _active_state.exported_programs:
+        return export_stage
+
+    return SharedExport(_active_state.exported_programs[key], dynamic_shapes)
+
+
+def share_exported_program(
+    model: torch.nn.Module,
+    inputs: Any,
+    flow: TestFlow,
+    test_name: str,
+    params: dict | None,
+    export_stage: Stage,
+    dynamic_shapes: Any | None = None,
+):
+    """Makes the program exported by export_stage available to the other flows."""
+    global _active_state
+
+    if _active_state is None or flow.quantize or _active_state.test_name != test_name:
+        return
+
+    key = _cache_key(model, inputs, params, export_stage, dynamic_shapes)
+    if key is not None:
+        _active_state.exported_programs[key] = copy.deepcopy(export_stage.artifact)
@@ -0,0 +1,200 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-unsafe
+
+import functools
+import os
+import sys
+import tempfile
+import textwrap
+import unittest
+
+import torch
+from executorch.backends.test.harness import Tester
+from executorch.backends.test.harness.stages import StageType
+from executorch.backends.test.harness.stages.to_edge_transform_and_lower import (
+    ToEdgeTransformAndLower,
+)
+from executorch.backends.test.suite.discovery import discover_tests, TestFilter
+from executorch.backends.test.suite.flow import TestFlow
+from executorch.backends.test.suite.reporting import (
+    begin_test_session,
+    complete_test_session,
+    TestResult,
+)
+from executorch.backends.test.suite.runner import (
+    _group_test_ids,
+    _run_tests_in_workers,
+    run_test,
+)
+from executorch.exir.backend.partitioner import Partitioner, PartitionResult
+
+# A suite of tests which report their results like the operator tests do, without
+# lowering anything.
+_WORKER_SUITE = """
+import os
+import unittest
+
+from executorch.backends.test.suite.flow import TestFlow
+from executorch.backends.test.suite.reporting import (
+    log_test_summary,
+    TestCaseSummary,
+    TestResult,
+)
+
+FLOW = TestFlow("test_flow", backend="test_backend", tester_factory=None)
+
+
+def _log(name):
+    log_test_summary(
+        TestCaseSummary(
+            name=name,
+            flow=FLOW.name,
+            params=None,
+            result=TestResult.SUCCESS,
+            error=None,
+            stage_durations={"export": 1.0},
+        )
+    )
+
+
+class WorkerTest(unittest.TestCase):
+    def test_a(self):
+        _log("test_a")
+
+    def test_b(self):
+        _log("test_b")
+
+    def test_crash(self):
+        if os.environ.get("ET_TEST_SUITE_CRASH") == "1":
+            os._exit(1)
+        _log("test_crash")
+
+
+for name in ("test_a", "test_b", "test_crash"):
+    getattr(WorkerTest, name)._flow = FLOW
+    getattr(WorkerTest, name)._name = name
+"""
+
+
+class NoPartitioner(Partitioner):
+    def __init__(self):
+        super().__init__()
+
+    def partition(self, exported_program) -> PartitionResult:
+        return PartitionResult(
+            tagged_exported_program=exported_program, partition_tags={}
+        )
+
+
+def _tester(model, inputs) -> Tester:
+    stage_classes = Tester.default_stage_classes() | {
+        StageType.TO_EDGE_TRANSFORM_AND_LOWER: functools.partial(
+            ToEdgeTransformAndLower, NoPartitioner
+        ),
+    }
+    return Tester(model, inputs, stage_classes)
+
+
+def _flow(name: str) -> TestFlow:
+    return TestFlow(name, backend="test_backend", tester_factory=_tester)
+
+
+class TestRunner(unittest.TestCase):
+    def test_group_test_ids(self):
+        class GroupedTest(unittest.TestCase):
+            pass
+
+        # The variants of each test, as generated by the operator_test decorator.
+        for test_name in ("test_add", "test_sub"):
+            for flow_name in ("flow_a", "flow_b"):
+
+                def test(self):
+                    pass
+
+                test._name = test_name
+                test._flow = _flow(flow_name)
+                setattr(GroupedTest, f"{test_name}_{flow_name}", test)
+
+        suite = unittest.TestLoader().loadTestsFromTestCase(GroupedTest)
+        groups = _group_test_ids(unittest.TestSuite([suite]))
+        self.assertEqual(
+            [[test_id.rsplit(".", 1)[1] for test_id in group] for group in groups],
+            [
+                ["test_add_flow_a", "test_add_flow_b"],
+                ["test_sub_flow_a", "test_sub_flow_b"],
+            ],
+        )
+
+    def test_stage_durations(self):
+        summary = run_test(
+            torch.nn.ReLU(), (torch.randn(2, 2),), _flow("flow"), "test_relu", None
+        )
+        self.assertEqual(summary.result, TestResult.SUCCESS_UNDELEGATED)
+        self.assertEqual(set(summary.stage_durations), {"eager", "export", "lower"})
+        self.assertTrue(all(d >= 0 for d in summary.stage_durations.values()))
+
+        def fail(*args):
+            raise RuntimeError("Unsupported model")
+
+        summary = run_test(
+            torch.nn.ReLU(),
+            (torch.randn(2, 2),),
+            TestFlow("flow", backend="test_backend", tester_factory=fail),
+            "test_relu",
+            None,
+        )
+        self.assertEqual(summary.result, TestResult.UNKNOWN_FAIL)
+        self.assertEqual(set(summary.stage_durations), {"eager"})
+
+    def _run_worker_suite(self, jobs: int):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            package_dir = os.path.join(tmp_dir, "worker_suite")
+            os.makedirs(package_dir)
+            with open(os.path.join(package_dir, "__init__.py"), "w"):
+                pass
+            with open(os.path.join(package_dir, "test_worker_suite.py"), "w") as f:
+                f.write(textwrap.dedent(_WORKER_SUITE))
+
+            # The spawned workers import the suite from the path of this process.
+            sys.path.insert(0, tmp_dir)
+            try:
+                import worker_suite
+
+                suite = discover_tests(
+                    worker_suite, TestFilter(backends=None, name_regex=None)
+                )
+                begin_test_session()
+                try:
+                    _run_tests_in_workers("worker_suite", suite, jobs)
+                finally:
+                    summary = complete_test_session()
+            finally:
+                # Test discovery also imports the tests as top-level modules.
+                for path in (tmp_dir, package_dir):
+                    if path in sys.path:
+                        sys.path.remove(path)
+                for module in ("worker_suite", "test_worker_suite"):
+                    sys.modules.pop(module, None)
+        return {s.name: s for s in summary.test_case_summaries}
+
+    def test_run_tests_in_workers(self):
+        summaries = self._run_worker_suite(jobs=2)
+        self.assertEqual(set(summaries), {"test_a", "test_b", "test_crash"})
+        self.assertTrue(all(s.result.is_success() for s in summaries.values()))
+        self.assertEqual(
+            sum(s.stage_durations["export"] for s in summaries.values()), 3.0
+        )
+
+    def test_crashed_worker_fails_its_group(self):
+        os.environ["ET_TEST_SUITE_CRASH"] = "1"
+        try:
+            summaries = self._run_worker_suite(jobs=1)
+        finally:
+            del os.environ["ET_TEST_SUITE_CRASH"]
+        self.assertEqual(summaries["test_crash"].result, TestResult.UNKNOWN_FAIL)
+        self.assertEqual(summaries["test_crash"].flow, "test_flow")
@@ -0,0 +1,101 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-unsafe
+
+import unittest
+
+import torch
+from executorch.backends.test.harness.stages import Export, Stage
+from executorch.backends.test.suite.context import TestContext
+from executorch.backends.test.suite.flow import TestFlow
+from executorch.backends.test.suite.shared_export import (
+    begin_export_sharing,
+    end_export_sharing,
+    get_shared_export_stage,
+    share_exported_program,
+    SharedExport,
+)
+
+FLOW = TestFlow("test_flow", backend="test_backend", tester_factory=None)
+
+
+class Model(torch.nn.Module):
+    def __init__(self, scale: float = 1.0):
+        super().__init__()
+        self.linear = torch.nn.Linear(4, 4)
+        self.scale = scale
+
+    def forward(self, x):
+        return self.linear(x) * self.scale
+
+
+class TestSharedExport(unittest.TestCase):
+    def setUp(self):
+        begin_export_sharing()
+
+    def tearDown(self):
+        end_export_sharing()
+
+    def _build_model(self, test_name: str = "test_model", **kwargs) -> Model:
+        # Each variant of a test builds its own model within its context.
+        with TestContext(test_name, FLOW.name, None):
+            return Model(**kwargs)
+
+    def _export(
+        self, model: torch.nn.Module, test_name: str = "test_model", flow=FLOW
+    ) -> Stage:
+        inputs = (torch.randn(2, 4),)
+        export_stage = Export()
+        stage = get_shared_export_stage(
+            model, inputs, flow, test_name, None, export_stage
+        )
+        stage.run(model, inputs)
+        if stage is export_stage:
+            share_exported_program(model, inputs, flow, test_name, None, stage)
+        return stage
+
+    def test_variants_share_exported_program(self):
+        first = self._export(self._build_model())
+        second = self._export(self._build_model())
+
+        self.assertIsInstance(second, SharedExport)
+        self.assertEqual(
+            second.artifact.graph_module.code, first.artifact.graph_module.code
+        )
+        for name, value in first.artifact.state_dict.items():
+            self.assertTrue(torch.equal(second.artifact.state_dict[name], value))
+
+    def test_models_with_other_weights_are_not_shared(self):
+        self._export(self._build_model())
+        model = self._build_model()
+        with torch.no_grad():
+            model.linear.weight.add_(1)
+        self.assertNotIsInstance(self._export(model), SharedExport)
+
+    def test_models_with_other_attributes_are_not_shared(self):
+        self._export(self._build_model())
+        self.assertNotIsInstance(
+            self._export(self._build_model(scale=2.0)), SharedExport
+        )
+
+    def test_other_tests_are_not_shared(self):
+        self._export(self._build_model())
+        self.assertNotIsInstance(
+            self._export(self._build_model(), test_name="test_other"), SharedExport
+        )
+
+    def test_quantized_flows_are_not_shared(self):
+        quantized_flow = TestFlow(
+            "test_quantized_flow",
+            backend="test_backend",
+            tester_factory=None,
+            quantize=True,
+        )
+        self._export(self._build_model(), flow=quantized_flow)
+        self.assertNotIsInstance(
+            self._export(self._build_model(), flow=quantized_flow), SharedExport
+        )
@@ -4,9 +4,10 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
-import ctypes
+import copy
 import hashlib
 import logging
+from dataclasses import dataclass
 
 from typing import cast, Dict, List, Optional, Tuple
 
@@ -44,7 +45,9 @@ from executorch.backends.xnnpack.utils.xnnpack_constants import (
     UINT64_MAX,
     XNN_INVALID_VALUE_ID,
 )
+from executorch.exir._parallel import parallel_map
 from executorch.exir._serialize._named_data_store import NamedDataStore
+from executorch.exir.emit._emitter import _storage_to_memoryview
 from torch.export import ExportedProgram
 
 XNN_TYPE_MAP = {
@@ -70,6 +73,112 @@ class InputTypeToIndex:
         self.node_bias = node_bias
 
 
+@dataclass
+class _PendingConstant:
+    """
+    A constant tensor which is in the constant_data of an XNNGraph, but whose
+    bytes are not in the NamedDataStore yet. Unless serialize_as_is is set, the
+    tensor is quantized, permuted and packed according to the remaining fields,
+    see NodeVisitor.get_serialized_buffer_index().
+    """
+
+    name: str
+    const_val: torch.Tensor
+    constant_data: ConstantDataOffset
+    external_tag: Optional[str] = None
+    serialize_as_is: bool = False
+    convert_to_nhwc: bool = False
+    swap_in_out_for_weights: bool = False
+    quant_params: Optional[QuantParams] = None
+    force_fp32: bool = False
+    groups: int = 1
+
+
+class ConstantDataPacker:
+    """
+    Collects the constant tensors of an XNNGraph, and adds them to the
+    NamedDataStore together when flushed.
+
+    Quantizing, permuting and packing the constants, and hashing them to name
+    them, runs on up to max_workers threads, as it is mostly spent in torch ops
+    and hashlib, which release the GIL. The packed tensors are hashed in place,
+    and only copied once, into the bytes that are added to the data store, so
+    the data store never aliases the storage of the model's parameters. The
+    constants are added to the data store in the order they were collected in,
+    so the output is the same for any max_workers.
+    """
+
+    def __init__(self, named_data_store: NamedDataStore, max_workers: int = 1) -> None:
+        self._named_data_store = named_data_store
+        self._max_workers = max_workers
+        self._pending: List[_PendingConstant] = []
+
+    def add(self, pending: _PendingConstant) -> None:
+        self._pending.append(pending)
+
+    @staticmethod
+    def _pack(pending: _PendingConstant) -> Tuple[memoryview, str]:
+        if pending.serialize_as_is:
+            return ConstantDataPacker._hash(pending.name, pending.const_val)
+
+        const_val = pending.const_val.contiguous()
+        quant_params = pending.quant_params
+
+        # Quantize buffer if static data is indeed quantized
+        if quant_params is not None and not quant_params.is_dynamic:
+            const_val = quant_params.quantize_tensor(const_val).contiguous()
+        elif const_val.dtype != torch.float16 or pending.force_fp32:
+            # ensure that the const is fp32
+            const_val = const_val.to(dtype=torch.float32).contiguous()
+
+        if pending.swap_in_out_for_weights:
+            # Permute and reshape the tensor from (inc, oc/groups, height, width) to (oc, inc/groups, height, width)
+            # which should be used for depthwise/transpose convolution weights for XNNPACK
+            groups = pending.groups
+            shape = const_val.shape
+            const_val = const_val.reshape(
+                (groups, const_val.shape[0] // groups) + tuple(const_val.shape[1:])
+            )
+            const_val = const_val.permute((0, 2, 1) + tuple(range(3, const_val.dim())))
+            const_val = const_val.reshape(
+                (shape[1] * groups, shape[0] // groups) + tuple(shape[2:])
+            ).contiguous()
+
+        if pending.convert_to_nhwc:
+            const_val = const_val.to(memory_format=torch.channels_last)
+
+        if quant_params is not None and quant_params.is_qc4w:
+            const_val = NodeVisitor.convert_to_qc4w(const_val)
+
+        return ConstantDataPacker._hash(pending.name, const_val)
+
+    @staticmethod
+    def _hash(name: str, const_val: torch.Tensor) -> Tuple[memoryview, str]:
+        data = _storage_to_memoryview(const_val.untyped_storage())
+        check_or_raise(
+            len(data) > 0,
+            f"Serializing constant data node {name} but tensor value has no bytes",
+        )
+        return data, hashlib.sha256(data).hexdigest()
+
+    def flush(self) -> None:
+        """Packs the collected constants and adds them to the NamedDataStore."""
+        pending_constants, self._pending = self._pending, []
+        packed = parallel_map(self._pack, pending_constants, self._max_workers)
+        for pending, (data, named_key) in zip(pending_constants, packed):
+            pending.constant_data.size = len(data)
+            pending.constant_data.named_key = named_key
+            logging.info(
+                f"Adding constant data with name {pending.name}, key {named_key} and external_tag {pending.external_tag} to named_data_store"
+            )
+            self._named_data_store.add_named_data(
+                named_key,
+                bytes(data),
+                alignment=CONSTANT_TENSOR_ALIGNMENT,
+                external_tag=pending.external_tag,
+            )
+
+
 def get_tensor_value(xvalue: XValue) -> XNNTensorValue:
     val_union = xvalue.xvalue_union
     if isinstance(val_union, XNNTensorValue):
@@ -91,10 +200,14 @@ class NodeVisitor:
         exported_program: ExportedProgram,
         external_ids: Dict,
         named_data_store: NamedDataStore,
+        constant_packer: Optional[ConstantDataPacker] = None,
     ) -> None:
         self._external_ids = external_ids or {}
         self._exported_program = exported_program or None
         self._named_data_store = named_data_store
+        # Without a shared packer, constants are added to the data store as
+        # soon as they are defined.
+        self._constant_packer = constant_packer
 
     @property
     def external_ids(self) -> Dict:
@@ -285,20 +398,16 @@ class NodeVisitor:
             if quant_params.is_per_channel_group:
                 scale = scale.to(torch.bfloat16)
 
-            num_bytes = scale.untyped_storage().nbytes()
-            scale_array = ctypes.cast(
-                scale.untyped_storage().data_ptr(),
-                ctypes.POINTER(ctypes.c_char * num_bytes),
-            ).contents
-            scale_name = hashlib.sha256(bytes(scale_array)).hexdigest()
-            xnn_graph.constant_data.append(
-                ConstantDataOffset(
-                    offset=UINT64_MAX, size=num_bytes, named_key=scale_name
+            constant_data = ConstantDataOffset(offset=UINT64_MAX, size=0)
+            xnn_graph.constant_data.append(constant_data)
+            self._add_constant(
+                _PendingConstant(
+                    name=f"{quant_params.q_input}_scale",
+                    const_val=scale,
+                    constant_data=constant_data,
+                    serialize_as_is=True,
                 )
             )
-            self._named_data_store.add_named_data(
-                scale_name, bytes(scale_array), CONSTANT_TENSOR_ALIGNMENT
-            )
 
             if quant_params.is_per_channel_group:
                 return PerChannelGroupQuant(
@@ -495,7 +604,7 @@ class NodeVisitor:
         import torch.nn.functional as F
 
         # Assert we got a properly quantized tensor.
-        min, max = inp.min().item(), inp.max().item()
+        min, max = (v.item() for v in torch.aminmax(inp))
         assert (
             max <= 7 and min >= -8
         ), f"convert_to_qc4w: [min,max] out of [-8, 7] range, got [{min}, {max}]"
@@ -522,6 +631,14 @@ class NodeVisitor:
         inp = inp.contiguous().view(-1)
         return (inp[1::2] << 4 | inp[::2]).view(oc, int(ic / 2))
 
+    def _add_constant(self, pending: _PendingConstant) -> None:
+        if self._constant_packer is not None:
+            self._constant_packer.add(pending)
+            return
+        constant_packer = ConstantDataPacker(self._named_data_store, max_workers=1)
+        constant_packer.add(pending)
+        constant_packer.flush()
+
     def get_serialized_buffer_index(
         self,
         tensor: torch.fx.Node,
@@ -535,7 +652,9 @@ class NodeVisitor:
     ) -> int:
         """
         If tensor holds some constant data, serialize it and return the
-        index of its placement in the constant buffer
+        index of its placement in the constant buffer. With a constant packer,
+        the data is only packed and added to the named data store when the
+        packer is flushed.
 
         Args:
             tensor: EdgeIR Tensor that is being defined into xnn_graph
@@ -575,61 +694,24 @@ class NodeVisitor:
         buffer_idx = len(xnn_graph.constant_data)
         const_val = get_param_tensor(self.exported_program, get_attr_node)
         assert const_val is not None and isinstance(const_val, torch.Tensor)
-        const_val = const_val.contiguous()
-
-        # Quantize buffer if static data is indeed quantized
-        if quant_params is not None and not quant_params.is_dynamic:
-            const_val = quant_params.quantize_tensor(const_val).contiguous()
-        elif const_val.dtype != torch.float16 or force_fp32:
-            # ensure that the const is fp32
-            const_val = const_val.to(dtype=torch.float32).contiguous()
 
-        if swap_in_out_for_weights:
-            # Permute and reshape the tensor from (inc, oc/groups, height, width) to (oc, inc/groups, height, width)
-            # which should be used for depthwise/transpose convolution weights for XNNPACK
-            shape = const_val.shape
-            const_val = const_val.reshape(
-                (groups, const_val.shape[0] // groups) + tuple(const_val.shape[1:])
+        # The data is added to the constant data offset once it is packed
+        constant_data = ConstantDataOffset(offset=UINT64_MAX, size=0)
+        xnn_graph.constant_data.append(constant_data)
+        self._add_constant(
+            _PendingConstant(
+                name=tensor.name,
+                const_val=const_val,
+                constant_data=constant_data,
+                external_tag=tensor.meta.get("delegate_constant_tag", None),
+                convert_to_nhwc=convert_to_nhwc,
+                swap_in_out_for_weights=swap_in_out_for_weights,
+                # define_tensor() updates the axis of the quant params after
+                # this call, but the constant is quantized with the current one
+                quant_params=copy.copy(quant_params),
+                force_fp32=force_fp32,
+                groups=groups,
             )
-            const_val = const_val.permute((0, 2, 1) + tuple(range(3, const_val.dim())))
-            const_val = const_val.reshape(
-                (shape[1] * groups, shape[0] // groups) + tuple(shape[2:])
-            ).contiguous()
-
-        if convert_to_nhwc:
-            const_val = const_val.to(memory_format=torch.channels_last)
-
-        if quant_params is not None and quant_params.is_qc4w:
-            const_val = self.convert_to_qc4w(const_val)
-
-        size = const_val.untyped_storage().nbytes()
-        array_type = ctypes.c_char * size
-        array = ctypes.cast(
-            const_val.untyped_storage().data_ptr(),
-            ctypes.POINTER(array_type),
-        ).contents
-
-        check_or_raise(
-            size > 0,
-            f"Serializing constant data node {tensor} but tensor value has no bytes",
-        )
-        sha256_hash = hashlib.sha256(bytes(array))
-        named_key = sha256_hash.hexdigest()
-
-        size = const_val.untyped_storage().nbytes()
-        xnn_graph.constant_data.append(
-            ConstantDataOffset(offset=UINT64_MAX, size=size, named_key=named_key)
-        )
-
-        external_tag = tensor.meta.get("delegate_constant_tag", None)
-        logging.info(
-            f"Adding constant data with name {tensor.name}, key {named_key} and external_tag {external_tag} to named_data_store"
-        )
-        self._named_data_store.add_named_data(
-            named_key,
-            bytes(array),
-            alignment=CONSTANT_TENSOR_ALIGNMENT,
-            external_tag=external_tag,
         )
 
         return buffer_idx
@@ -4,6 +4,8 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
+import functools
+import itertools
 import json
 
 import logging
@@ -17,7 +19,12 @@ import pkg_resources
 from executorch.backends.xnnpack.serialization.xnnpack_graph_schema import XNNGraph
 from executorch.exir._serialize._dataclass import _DataclassEncoder
 
-from executorch.exir._serialize._flatbuffer import _flatc_compile
+from executorch.exir._serialize._flatbuffer import _flatc_compile, _serialize_with_flatc
+from executorch.exir._serialize._flatbuffer_builder import (
+    _dataclass_to_flatbuffer,
+    _FbsSchema,
+    _parse_schema,
+)
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.WARNING)
@@ -298,22 +305,21 @@ def pretty_print_xnngraph(xnnpack_graph_json: str, filename: Optional[str] = Non
 
 
 # TODO: Replace this with an actual delegate id
-_delegate_instance_id = 0
+# next() on an itertools.count is atomic, so partitions serialized on several
+# threads get distinct ids.
+_delegate_instance_ids = itertools.count()
 
 
-def convert_to_flatbuffer(xnnpack_graph: XNNGraph) -> bytes:
-    global _delegate_instance_id
-    sanity_check_xnngraph_dataclass(xnnpack_graph)
-    xnnpack_graph_json = json.dumps(xnnpack_graph, cls=_DataclassEncoder)
-
-    # Log the XNNGraph if debugging
-    if logger.getEffectiveLevel() == logging.DEBUG:
-        filename: str = f"./xnnpack_delegate_graph_{_delegate_instance_id}.json"
-        logger.debug(f"Writing XNNGraph to {filename}")
-        pretty_print_xnngraph(xnnpack_graph_json, filename)
+@functools.lru_cache(maxsize=1)
+def _load_parsed_schema() -> _FbsSchema:
+    """Returns the parsed XNNGraph schema."""
+    return _parse_schema(
+        {"schema.fbs": pkg_resources.resource_string(__name__, "schema.fbs")},
+        "schema.fbs",
+    )
 
-    _delegate_instance_id += 1
 
+def _json_to_flatbuffer(xnnpack_graph_json: str) -> bytes:
     with tempfile.TemporaryDirectory() as d:
         schema_path = os.path.join(d, "schema.fbs")
         with open(schema_path, "wb") as schema_file:
@@ -328,6 +334,30 @@ def convert_to_flatbuffer(xnnpack_graph: XNNGraph) -> bytes:
             return output_file.read()
 
 
+def convert_to_flatbuffer(xnnpack_graph: XNNGraph) -> bytes:
+    """
+    Serializes the XNNGraph in-process, without going through JSON and flatc,
+    so that it can be called for many partitions at once. The output is the
+    same as flatc's; set ET_EXIR_SERIALIZE_WITH_FLATC=1 to use flatc instead.
+    """
+    sanity_check_xnngraph_dataclass(xnnpack_graph)
+    delegate_instance_id = next(_delegate_instance_ids)
+    with_flatc = _serialize_with_flatc()
+    xnnpack_graph_json = None
+    if with_flatc or logger.getEffectiveLevel() == logging.DEBUG:
+        xnnpack_graph_json = json.dumps(xnnpack_graph, cls=_DataclassEncoder)
+
+    # Log the XNNGraph if debugging
+    if logger.getEffectiveLevel() == logging.DEBUG:
+        filename: str = f"./xnnpack_delegate_graph_{delegate_instance_id}.json"
+        logger.debug(f"Writing XNNGraph to {filename}")
+        pretty_print_xnngraph(xnnpack_graph_json, filename)
+
+    if with_flatc:
+        return _json_to_flatbuffer(xnnpack_graph_json)
+    return _dataclass_to_flatbuffer(xnnpack_graph, _load_parsed_schema())
+
+
 def serialize_xnnpack_binary(
     xnnpack_graph: XNNGraph, constant_data_bytes: bytearray
 ) -> bytes:
@@ -0,0 +1,134 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import hashlib
+import unittest
+from typing import List, Tuple
+
+import torch
+from executorch.backends.xnnpack.operators.node_visitor import (
+    _PendingConstant,
+    ConstantDataPacker,
+)
+from executorch.backends.xnnpack.serialization.xnnpack_graph_schema import (
+    ConstantDataOffset,
+)
+from executorch.backends.xnnpack.utils.xnnpack_constants import UINT64_MAX
+from executorch.backends.xnnpack.xnnpack_preprocess import _constant_packing_workers
+from executorch.exir._serialize._named_data_store import NamedDataStore
+from executorch.exir.backend.compile_spec_schema import CompileSpec
+
+
+class TestConstantDataPacker(unittest.TestCase):
+    def setUp(self) -> None:
+        torch.manual_seed(0)
+        self.conv_weight = torch.randn(8, 4, 3, 3)
+        self.transposed_conv_weight = torch.randn(4, 3, 3, 3)
+        self.linear_weight = torch.randn(16, 32, dtype=torch.float16)
+        self.scale = torch.rand(8).to(torch.bfloat16)
+
+    def _pack(
+        self, max_workers: int
+    ) -> Tuple[NamedDataStore, List[ConstantDataOffset]]:
+        named_data_store = NamedDataStore()
+        constant_packer = ConstantDataPacker(named_data_store, max_workers)
+        constant_data = [
+            ConstantDataOffset(offset=UINT64_MAX, size=0) for _ in range(4)
+        ]
+        constant_packer.add(
+            _PendingConstant(
+                "conv_weight",
+                self.conv_weight,
+                constant_data[0],
+                convert_to_nhwc=True,
+            )
+        )
+        constant_packer.add(
+            _PendingConstant(
+                "transposed_conv_weight",
+                self.transposed_conv_weight,
+                constant_data[1],
+                swap_in_out_for_weights=True,
+                groups=2,
+            )
+        )
+        constant_packer.add(
+            _PendingConstant("linear_weight", self.linear_weight, constant_data[2])
+        )
+        constant_packer.add(
+            _PendingConstant(
+                "scale", self.scale, constant_data[3], serialize_as_is=True
+            )
+        )
+        self.assertEqual(len(named_data_store.buffers), 0)
+        constant_packer.flush()
+        return named_data_store, constant_data
+
+    def test_flush(self) -> None:
+        expected_data = [
+            self.conv_weight.permute(0, 2, 3, 1).contiguous(),
+            self.transposed_conv_weight.reshape(2, 2, 3, 3, 3)
+            .permute(0, 2, 1, 3, 4)
+            .reshape(6, 2, 3, 3)
+            .contiguous(),
+            self.linear_weight,
+            self.scale,
+        ]
+        named_data_store, constant_data = self._pack(max_workers=1)
+
+        self.assertEqual(len(named_data_store.buffers), len(expected_data))
+        for expected, offset, buffer in zip(
+            expected_data, constant_data, named_data_store.buffers
+        ):
+            expected_bytes = bytes(
+                expected.contiguous().view(torch.uint8).reshape(-1).numpy()
+            )
+            self.assertIsInstance(buffer.buffer, bytes)
+            self.assertEqual(buffer.buffer, expected_bytes)
+            self.assertEqual(offset.size, len(expected_bytes))
+            self.assertEqual(
+                offset.named_key, hashlib.sha256(expected_bytes).hexdigest()
+            )
+
+    def test_flush_is_deterministic(self) -> None:
+        named_data_store, constant_data = self._pack(max_workers=1)
+        concurrent_named_data_store, concurrent_constant_data = self._pack(
+            max_workers=4
+        )
+        self.assertEqual(constant_data, concurrent_constant_data)
+        self.assertEqual(
+            named_data_store.pte_data, concurrent_named_data_store.pte_data
+        )
+        self.assertEqual(
+            [buffer.buffer for buffer in named_data_store.buffers],
+            [buffer.buffer for buffer in concurrent_named_data_store.buffers],
+        )
+
+    def test_data_store_does_not_alias_parameters(self) -> None:
+        named_data_store, _ = self._pack(max_workers=1)
+        expected_bytes = named_data_store.buffers[3].buffer
+        # The scale is serialized as is, so it is not copied by packing.
+        self.scale.fill_(1.0)
+        self.assertEqual(named_data_store.buffers[3].buffer, expected_bytes)
+
+    def test_constant_packing_workers(self) -> None:
+        self.assertEqual(
+            _constant_packing_workers(
+                [CompileSpec("constant_packing_workers", "3".encode())]
+            ),
+            3,
+        )
+        self.assertGreaterEqual(_constant_packing_workers([]), 1)
+
+    def test_empty_constant(self) -> None:
+        constant_packer = ConstantDataPacker(NamedDataStore())
+        constant_packer.add(
+            _PendingConstant(
+                "empty", torch.empty(0), ConstantDataOffset(offset=UINT64_MAX, size=0)
+            )
+        )
+        with self.assertRaisesRegex(RuntimeError, "has no bytes"):
+            constant_packer.flush()
@@ -4,18 +4,105 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
+import os
 import unittest
+from unittest.mock import patch
 
 from executorch.backends.xnnpack.serialization.xnnpack_graph_schema import (
     ConstantDataOffset,
+    OutputMinMax,
+    PerChannelQuant,
+    PerTensorQuant,
+    XNNAdd,
+    XNNDatatype,
+    XNNFullyConnected,
     XNNGraph,
+    XNNQuantizedTensorValue,
+    XNNStaticTranspose,
+    XNNTensorValue,
+    XNode,
+    XValue,
 )
 
 from executorch.backends.xnnpack.serialization.xnnpack_graph_serialize import (
     _HEADER_BYTEORDER,
+    convert_to_flatbuffer,
     serialize_xnnpack_binary,
     XNNHeader,
 )
+from executorch.exir._serialize._flatbuffer import _SERIALIZE_WITH_FLATC_ENV
+
+
+def get_test_graph() -> XNNGraph:
+    """Returns an XNNGraph with aliased unions, quant params and defaults."""
+    tensor_values = [
+        XNNTensorValue(
+            datatype=XNNDatatype.xnn_datatype_fp32,
+            num_dims=2,
+            dims=[4, 8],
+            constant_buffer_idx=0,
+            external_id=i,
+            flags=1 if i == 0 else 2,
+            id_out=i,
+        )
+        for i in range(3)
+    ]
+    weight = XNNTensorValue(
+        datatype=XNNDatatype.xnn_datatype_qcint8,
+        num_dims=2,
+        dims=[8, 8],
+        constant_buffer_idx=1,
+        external_id=0xFFFFFFFF,
+        flags=0,
+        id_out=3,
+    )
+    return XNNGraph(
+        version="0",
+        xnodes=[
+            XNode(
+                xnode_union=XNNFullyConnected(
+                    input1_id=0, filter_id=3, bias_id=0xFFFFFFFF, output_id=1, flags=0
+                ),
+                debug_handle=1,
+            ),
+            XNode(
+                xnode_union=XNNAdd(input1_id=1, input2_id=0, output_id=2, flags=0),
+                debug_handle=2,
+                output_min_max=OutputMinMax(output_min=0, output_max="+inf"),
+            ),
+            XNode(
+                xnode_union=XNNStaticTranspose(
+                    num_dims=2, perm=[1, 0], input_id=2, output_id=2, flags=0
+                ),
+                debug_handle=3,
+            ),
+        ],
+        xvalues=[XValue(xvalue_union=value) for value in tensor_values]
+        + [
+            XValue(
+                xvalue_union=XNNQuantizedTensorValue(
+                    tensor_value=weight,
+                    quant_params=PerChannelQuant(
+                        scale=[], channel_dim=0, scale_buffer_idx=2, num_scales=8
+                    ),
+                )
+            ),
+            XValue(
+                xvalue_union=XNNQuantizedTensorValue(
+                    tensor_value=tensor_values[0],
+                    quant_params=PerTensorQuant(scale=0.5, zero_point=-3),
+                )
+            ),
+        ],
+        num_externs=3,
+        input_ids=[0],
+        output_ids=[2],
+        constant_data=[
+            ConstantDataOffset(0, 0),
+            ConstantDataOffset(offset=2**64 - 1, size=64, named_key="weight"),
+            ConstantDataOffset(offset=2**64 - 1, size=16, named_key="scale"),
+        ],
+    )
 
 
 class TestSerialization(unittest.TestCase):
@@ -48,3 +135,9 @@ class TestSerialization(unittest.TestCase):
         self.assertEqual(
             serialized_binary[flatbuffer_offset:][XNNHeader.MAGIC_OFFSET], b"XN01"
         )
+
+    def test_convert_to_flatbuffer_matches_flatc(self):
+        xnn_graph = get_test_graph()
+        with patch.dict(os.environ, {_SERIALIZE_WITH_FLATC_ENV: "1"}):
+            expected = convert_to_flatbuffer(xnn_graph)
+        self.assertEqual(convert_to_flatbuffer(xnn_graph), expected)
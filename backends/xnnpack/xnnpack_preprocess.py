@@ -5,6 +5,7 @@
 # LICENSE file in the root directory of this source tree.
 
 import logging
+import os
 from dataclasses import dataclass
 from typing import Dict, final, List
 
@@ -12,7 +13,10 @@ import torch
 
 from executorch.backends.xnnpack._passes import XNNPACKPassManager
 from executorch.backends.xnnpack._passes.convert_to_linear import ConvertToLinearPass
-from executorch.backends.xnnpack.operators.node_visitor import get_node_visitors
+from executorch.backends.xnnpack.operators.node_visitor import (
+    ConstantDataPacker,
+    get_node_visitors,
+)
 
 from executorch.backends.xnnpack.serialization.xnnpack_graph_schema import (
     ConstantDataOffset,
@@ -94,6 +98,19 @@ def assert_default_dim_order(edge_graph_module: torch.fx.GraphModule) -> None:
                 )
 
 
+def _constant_packing_workers(compile_specs: List[CompileSpec]) -> int:
+    """
+    Returns the number of threads to pack the constants on, which can be set by
+    the "constant_packing_workers" compile spec.
+    """
+    for spec in compile_specs:
+        if spec.key == "constant_packing_workers":
+            return max(1, int(spec.value.decode()))
+    # XnnpackBackend does not set thread_safe_preprocess, so preprocess() never
+    # runs concurrently with itself, and the packer can use every core.
+    return os.cpu_count() or 1
+
+
 @final
 class XnnpackBackend(BackendDetails):
     @staticmethod
@@ -156,7 +173,12 @@ class XnnpackBackend(BackendDetails):
         )
 
         constant_data_bytes = bytearray()
-        node_visitors = get_node_visitors(ep, node_to_external_map, named_data_store)
+        constant_packer = ConstantDataPacker(
+            named_data_store, max_workers=_constant_packing_workers(compile_specs)
+        )
+        node_visitors = get_node_visitors(
+            ep, node_to_external_map, named_data_store, constant_packer
+        )
 
         for node in graph_module.graph.nodes:
             if node.op == "call_function":
@@ -180,6 +202,8 @@ class XnnpackBackend(BackendDetails):
                 continue
             else:
                 raise RuntimeError(f"{node.op} is not supported in XNNPACK")
+        # Pack all the constants of the graph at once
+        constant_packer.flush()
         return PreprocessResult(
             processed_bytes=serialize_xnnpack_binary(
                 xnnpack_graph, constant_data_bytes
@@ -15,17 +15,19 @@ from typing import Any, List
 import torch
 import yaml
 from executorch.codegen.tools.yaml_util import BlankLineDumper
-from executorch.exir._serialize import _deserialize_pte_binary
+from executorch.exir._serialize import _ProgramView
 from executorch.exir.schema import Operator
 
 
 def get_operators(model_file: str) -> List[Operator]:
     print("Processing model file: ", model_file)
-    with open(model_file, "rb") as f:
-        flatbuffer = f.read()
-    program = _deserialize_pte_binary(flatbuffer)
+    # Only the operator table is needed, so avoid deserializing the program.
+    program = _ProgramView.from_file(model_file)
     print(f"Program loaded from model file: {model_file}")
-    operators = program.execution_plan[0].operators
+    operators = [
+        Operator(name=op.name, overload=op.overload)
+        for op in program.execution_plan[0].operators
+    ]
     return operators
 
 
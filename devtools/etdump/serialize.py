@@ -6,16 +6,32 @@
 
 # pyre-strict
 
+import functools
 import json
 import os
+import struct
 import tempfile
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
 
 import pkg_resources
 from executorch.devtools.etdump.schema_flatcc import ETDumpFlatCC
 
 from executorch.exir._serialize._dataclass import _DataclassEncoder, _json_to_dataclass
 
-from executorch.exir._serialize._flatbuffer import _flatc_compile, _flatc_decompile
+from executorch.exir._serialize._flatbuffer import (
+    _flatc_compile,
+    _flatc_decompile,
+    _serialize_with_flatc,
+)
+from executorch.exir._serialize._flatbuffer_builder import _FbsSchema, _parse_schema
+from executorch.exir._serialize._flatbuffer_reader import (
+    _flatbuffer_root,
+    _flatbuffer_to_dataclass,
+    _FlatbufferTable,
+)
 
 # The prefix of schema files used for etdump
 ETDUMP_FLATCC_SCHEMA_NAME = "etdump_schema_flatcc"
@@ -80,6 +96,29 @@ def _convert_from_flatcc(etdump_flatbuffer: bytes, size_prefixed: bool = True) -
             return output_file.read()
 
 
+@functools.lru_cache(maxsize=1)
+def _load_parsed_etdump_schema() -> _FbsSchema:
+    """Returns the parsed ETDump FlatCC schema."""
+    return _parse_schema(
+        {
+            f"{schema_name}.fbs": pkg_resources.resource_string(
+                __name__, f"{schema_name}.fbs"
+            )
+            for schema_name in (ETDUMP_FLATCC_SCHEMA_NAME, SCALAR_TYPE_SCHEMA_NAME)
+        },
+        f"{ETDUMP_FLATCC_SCHEMA_NAME}.fbs",
+    )
+
+
+def _etdump_root(data: bytes, size_prefixed: bool) -> _FlatbufferTable:
+    """Returns a lazy view of the ETDump table in the etdump binary blob."""
+    buf = memoryview(data).cast("B")
+    if size_prefixed:
+        (size,) = struct.unpack_from("<I", buf, 0)
+        buf = buf[4 : 4 + size]
+    return _flatbuffer_root(buf, _load_parsed_etdump_schema())
+
+
 def serialize_to_etdump_flatcc(
     etdump: ETDumpFlatCC,
 ) -> bytes:
@@ -100,11 +139,118 @@ def deserialize_from_etdump_flatcc(
     """
     Given an etdump binary blob (constructed using the FlatCC schema) this function will deserialize
     it and return the FlatCC python object representation of etdump.
+
+    The blob is read in-process, without converting it to JSON with flatc first.
+    Set ET_EXIR_SERIALIZE_WITH_FLATC=1 to go through flatc instead.
     Args:
         data: Serialized etdump binary blob.
+        size_prefixed: Whether the blob starts with its size, as written by the runtime.
     Returns:
         Deserialized ETDump python object.
     """
-    return _deserialize_from_json_to_etdump_flatcc(
-        _convert_from_flatcc(data, size_prefixed)
+    if _serialize_with_flatc():
+        return _deserialize_from_json_to_etdump_flatcc(
+            _convert_from_flatcc(data, size_prefixed)
+        )
+    return _flatbuffer_to_dataclass(_etdump_root(data, size_prefixed), ETDumpFlatCC)
+
+
+@dataclass
+class ETDumpProfileEvents:
+    """
+    The profile events of an ETDump, read into columns.
+
+    Args:
+        run_name: Name of each run in ETDumpFlatCC.run_data.
+        run_bundled_input_index: Bundled input index of each run.
+        run_has_events: Whether each run has an events vector.
+        has_other_events: Whether any run has debug or allocation events, which are not read.
+        events: A dict of equally long arrays, with one element per profile event, ordered
+            by run and then by event:
+                run_index: Index of the run in ETDumpFlatCC.run_data.
+                name: Name of the event, or None.
+                chain_index: Index of the chain that the event belongs to.
+                instruction_id: Runtime instruction id of the event.
+                delegate_debug_id_int: Integer delegate debug identifier of the event.
+                delegate_debug_id_str: String delegate debug identifier of the event, or None.
+                delegate_debug_metadata: Delegate debug metadata of the event, or None.
+                start_time: Time at which the event started.
+                end_time: Time at which the event ended.
+    """
+
+    run_name: List[str]
+    run_bundled_input_index: List[Optional[int]]
+    run_has_events: List[bool]
+    has_other_events: bool
+    events: Dict[str, np.ndarray]
+
+
+def deserialize_profile_events_from_etdump_flatcc(
+    data: bytes, size_prefixed: bool = True
+) -> ETDumpProfileEvents:
+    """
+    Given an etdump binary blob (constructed using the FlatCC schema) this function will read
+    the profile events of all runs into columns, without creating an object per event.
+
+    Fields are set to the schema defaults when not populated, like in deserialize_from_etdump_flatcc().
+    Args:
+        data: Serialized etdump binary blob.
+        size_prefixed: Whether the blob starts with its size, as written by the runtime.
+    Returns:
+        The profile events and the runs they belong to.
+    """
+    columns: Dict[str, List[Any]] = {
+        field: []
+        for field in (
+            "run_index",
+            "name",
+            "chain_index",
+            "instruction_id",
+            "delegate_debug_id_int",
+            "delegate_debug_id_str",
+            "delegate_debug_metadata",
+            "start_time",
+            "end_time",
+        )
+    }
+    run_name = []
+    run_bundled_input_index = []
+    run_has_events = []
+    has_other_events = False
+
+    run_data = _etdump_root(data, size_prefixed).run_data or []
+    for i, run in enumerate(run_data):
+        run_name.append(run.name)
+        run_bundled_input_index.append(run.bundled_input_index)
+        run_has_events.append(run.events is not None)
+        for event in run.events or []:
+            if (profile_event := event.profile_event) is None:
+                has_other_events = True
+                continue
+            columns["run_index"].append(i)
+            for field, values in columns.items():
+                if field == "delegate_debug_metadata":
+                    # Copied out of the blob, as in the dataclass
+                    metadata = profile_event.delegate_debug_metadata
+                    values.append(bytes(metadata) if metadata is not None else None)
+                elif field != "run_index":
+                    values.append(getattr(profile_event, field))
+
+    dtypes = {
+        "run_index": np.int64,
+        "chain_index": np.int32,
+        "instruction_id": np.int32,
+        "delegate_debug_id_int": np.int32,
+        "start_time": np.uint64,
+        "end_time": np.uint64,
+    }
+    return ETDumpProfileEvents(
+        run_name=run_name,
+        run_bundled_input_index=run_bundled_input_index,
+        run_has_events=run_has_events,
+        has_other_events=has_other_events,
+        events={
+            field: np.array(values, dtype=dtypes.get(field, object))
+            for field, values in columns.items()
+        },
     )
@@ -8,17 +8,22 @@
 
 import difflib
 import json
+import os
+import struct
 import unittest
 from pprint import pformat
 from typing import List
+from unittest.mock import patch
 
 import executorch.devtools.etdump.schema_flatcc as flatcc
 
 from executorch.devtools.etdump.serialize import (
     deserialize_from_etdump_flatcc,
+    deserialize_profile_events_from_etdump_flatcc,
     serialize_to_etdump_flatcc,
 )
 from executorch.exir._serialize._dataclass import _DataclassEncoder
+from executorch.exir._serialize._flatbuffer import _SERIALIZE_WITH_FLATC_ENV
 
 
 def diff_jsons(a: str, b: str) -> List[str]:
@@ -140,3 +145,50 @@ class TestSerializeFlatCC(unittest.TestCase):
                 )
             ),
         )
+
+    def test_deserialize_matches_flatc(self) -> None:
+        etdump = get_sample_etdump_flatcc()
+        # Fields left to their defaults are not stored in the flatbuffer
+        etdump.run_data.append(
+            flatcc.RunData(
+                name="empty_block",
+                bundled_input_index=-1,
+                allocators=None,
+                events=None,
+            )
+        )
+        flatcc_from_py = serialize_to_etdump_flatcc(etdump)
+        size_prefixed = struct.pack("<I", len(flatcc_from_py)) + flatcc_from_py
+
+        deserialized_obj = deserialize_from_etdump_flatcc(size_prefixed)
+        with patch.dict(os.environ, {_SERIALIZE_WITH_FLATC_ENV: "1"}):
+            deserialized_with_flatc = deserialize_from_etdump_flatcc(size_prefixed)
+        self.assertEqual(deserialized_obj, deserialized_with_flatc)
+        self.assertEqual(deserialized_obj, etdump)
+
+    def test_deserialize_profile_events(self) -> None:
+        flatcc_from_py = serialize_to_etdump_flatcc(get_sample_etdump_flatcc())
+        profile_events = deserialize_profile_events_from_etdump_flatcc(
+            flatcc_from_py, size_prefixed=False
+        )
+
+        self.assertEqual(profile_events.run_name, ["test_block"])
+        self.assertEqual(profile_events.run_bundled_input_index, [-1])
+        self.assertEqual(profile_events.run_has_events, [True])
+        # The sample has allocation and debug events
+        self.assertTrue(profile_events.has_other_events)
+
+        columns = profile_events.events
+        self.assertEqual(columns["run_index"].tolist(), [0, 0])
+        self.assertEqual(
+            columns["name"].tolist(),
+            ["test_profile_event", "test_profile_event_delegated"],
+        )
+        self.assertEqual(columns["chain_index"].tolist(), [1, 1])
+        self.assertEqual(columns["instruction_id"].tolist(), [1, 1])
+        self.assertEqual(columns["delegate_debug_id_int"].tolist(), [-1, 13])
+        self.assertEqual(columns["delegate_debug_id_str"].tolist(), ["", ""])
+        self.assertEqual(columns["delegate_debug_metadata"].tolist(), [b"", b""])
+        self.assertEqual(
+            (columns["end_time"] - columns["start_time"]).tolist(), [1001, 1001]
+        )
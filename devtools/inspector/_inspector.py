@@ -39,11 +39,13 @@ from executorch.devtools.etdump.schema_flatcc import (
     ETDumpFlatCC,
     ProfileEvent,
 )
+from executorch.devtools.etdump.serialize import ETDumpProfileEvents
 from executorch.devtools.etrecord import ETRecord, parse_etrecord
 from executorch.devtools.inspector._inspector_utils import (
     calculate_time_scale_factor,
-    compare_intermediate_outputs,
+    compare_intermediate_outputs_batched,
     create_debug_handle_to_op_node_mapping,
+    DebugBuffer,
     DebugHandle,
     display_or_print_df,
     EDGE_DIALECT_GRAPH_KEY,
@@ -54,15 +56,21 @@ from executorch.devtools.inspector._inspector_utils import (
     find_populated_event,
     FORWARD,
     gen_etdump_object,
+    gen_etdump_profile_events,
     gen_graphs_from_etrecord,
     get_aot_debug_handle_to_op_name_mapping,
+    get_aot_intermediate_outputs_fingerprint,
     inflate_runtime_output,
     is_debug_output,
     is_inference_output_equal,
+    LazyProgramOutput,
+    load_aot_intermediate_outputs,
     map_runtime_aot_intermediate_outputs,
     merge_runtime_overlapping_debug_handles,
+    OutputBuffer,
     ProgramOutput,
     RESERVED_FRAMEWORK_EVENT_NAMES,
+    save_aot_intermediate_outputs,
     TimeScale,
     verify_debug_data_equivalence,
 )
@@ -280,29 +288,69 @@ class PerfData:
     def __init__(self, raw: List[float]):
         self.raw: List[float] = raw
 
+    @staticmethod
+    def _calculate_stats(raw: np.ndarray) -> np.ndarray:
+        """
+        Returns the p10, p50, p90, avg, min and max of each row of raw
+        """
+        # The percentiles are computed together, as each of them sorts the data
+        return np.column_stack(
+            [
+                *np.percentile(raw, [10, 50, 90], axis=1),
+                raw.mean(axis=1),
+                raw.min(axis=1),
+                raw.max(axis=1),
+            ]
+        )
+
+    @staticmethod
+    def _gen_from_rows(
+        raw: np.ndarray, raw_lists: Optional[List[List[float]]] = None
+    ) -> List["PerfData"]:
+        """
+        Returns a PerfData for each row of raw, with the stats of all rows
+        calculated at once. raw_lists optionally holds the rows as lists.
+        """
+        stats = PerfData._calculate_stats(raw)
+        if raw_lists is None:
+            raw_lists = raw.tolist()
+        perf_datas = []
+        for row, row_stats in zip(raw_lists, stats):
+            perf_data = PerfData(row)
+            # Fills in the cached_property
+            perf_data._stats = row_stats
+            perf_datas.append(perf_data)
+        return perf_datas
+
+    @cached_property
+    def _stats(self) -> np.ndarray:
+        return PerfData._calculate_stats(
+            np.asarray(self.raw, dtype=np.float64).reshape(1, -1)
+        )[0]
+
     @property
     def p10(self) -> float:
-        return np.percentile(self.raw, 10)
+        return self._stats[0]
 
     @property
     def p50(self) -> float:
-        return np.percentile(self.raw, 50)
+        return self._stats[1]
 
     @property
     def p90(self) -> float:
-        return np.percentile(self.raw, 90)
+        return self._stats[2]
 
     @property
     def avg(self) -> float:
-        return np.mean(self.raw)
+        return self._stats[3]
 
     @property
     def min(self) -> float:
-        return min(self.raw)
+        return self._stats[4]
 
     @property
     def max(self) -> float:
-        return max(self.raw)
+        return self._stats[5]
 
 
 @dataclass
@@ -325,7 +373,7 @@ class Event:
             Available parsed (if parser provided) as Event.delegate_debug_metadatas
             Available as Event.raw_delegate_debug_metadatas
 
-        debug_data: A list containing intermediate data collected.
+        debug_data: A sequence containing intermediate data collected. Tensors are read from the debug buffer when accessed.
 
         _instruction_id: Instruction Identifier for Symbolication
         _delegate_metadata_parser: Optional Parser for _delegate_debug_metadatas
@@ -342,7 +390,9 @@ class Event:
     delegate_backend_name: Optional[str] = None
     _delegate_debug_metadatas: List[str] = dataclasses.field(default_factory=list)
 
-    debug_data: ProgramOutput = dataclasses.field(default_factory=list)
+    debug_data: Union[ProgramOutput, LazyProgramOutput] = dataclasses.field(
+        default_factory=list
+    )
     _instruction_id: Optional[int] = None
 
     _delegate_metadata_parser: Optional[Callable[[List[str]], Dict[str, Any]]] = None
@@ -433,7 +483,7 @@ class Event:
         signature: EventSignature,
         events: List[InstructionEvent],
         scale_factor: float = 1.0,
-        output_buffer: Optional[bytes] = None,
+        output_buffer: Optional[OutputBuffer] = None,
         delegate_metadata_parser: Optional[
             Callable[[List[str]], Dict[str, Any]]
         ] = None,
@@ -475,6 +525,108 @@ class Event:
 
         return ret_event
 
+    @staticmethod
+    def _gen_from_profile_event_rows(
+        rows: np.ndarray,
+        profile_events: Dict[str, np.ndarray],
+        scale_factor: float = 1.0,
+        output_buffer: Optional[OutputBuffer] = None,
+        delegate_metadata_parser: Optional[
+            Callable[[List[str]], Dict[str, Any]]
+        ] = None,
+        delegate_time_scale_converter: Optional[
+            Callable[[Union[int, str], Union[int, float]], Union[int, float]]
+        ] = None,
+    ) -> List["Event"]:
+        """
+        Given the columns of ETDumpProfileEvents.events and the rows of the
+        profile events with each EventSignature (first axis) in each run (second
+        axis), return the Events that _gen_from_inference_events() generates
+        from the same profile events, with the perf_data of all of them
+        computed at once
+        """
+        truthy = np.vectorize(bool, otypes=[bool])
+        first_rows = rows[:, 0]
+        names = profile_events["name"][first_rows]
+        instruction_ids = profile_events["instruction_id"][first_rows]
+        delegate_ids = profile_events["delegate_debug_id_int"][first_rows]
+        delegate_id_strs = profile_events["delegate_debug_id_str"][first_rows]
+        # See _populate_event_signature_fields()
+        is_delegated_op = (delegate_ids != -1) | truthy(delegate_id_strs)
+
+        # Scale factor should only be applied to non-delegated ops, see
+        # _populate_profiling_related_fields()
+        start_times = profile_events["start_time"][rows]
+        end_times = profile_events["end_time"][rows]
+        data = np.empty(rows.shape, dtype=np.float64)
+        selections = [(~is_delegated_op, scale_factor)]
+        if delegate_time_scale_converter is None:
+            selections.append((is_delegated_op, 1.0))
+        for selected, divisor in selections:
+            data[selected] = (
+                Event._calculate_elapsed_times(
+                    start_times[selected].ravel(), end_times[selected].ravel()
+                ).reshape(-1, rows.shape[1])
+                / divisor
+            )
+
+        event_names = []
+        raw_lists = data.tolist()
+        for i in range(len(rows)):
+            if not is_delegated_op[i]:
+                event_names.append(names[i] or "")
+                continue
+
+            # Use the delegate identifier as the event name if delegated
+            name = str(
+                delegate_ids[i] if delegate_ids[i] != -1 else delegate_id_strs[i]
+            )
+            event_names.append(name)
+            if (convert_time_scale := delegate_time_scale_converter) is not None:
+                raw_lists[i] = [
+                    Event._calculate_elapsed_time(
+                        convert_time_scale(name, start_time),
+                        convert_time_scale(name, end_time),
+                    )
+                    for start_time, end_time in zip(
+                        start_times[i].tolist(), end_times[i].tolist()
+                    )
+                ]
+                data[i] = raw_lists[i]
+
+        delegate_debug_metadatas = profile_events["delegate_debug_metadata"][rows]
+        has_delegate_debug_metadata = truthy(delegate_debug_metadatas).any(axis=1)
+
+        events = []
+        for i, perf_data in enumerate(PerfData._gen_from_rows(data, raw_lists)):
+            delegate_debug_identifier = None
+            if delegate_ids[i] != -1:  # 0 is a valid value
+                delegate_debug_identifier = int(delegate_ids[i])
+            elif is_delegated_op[i]:
+                delegate_debug_identifier = delegate_id_strs[i]
+            events.append(
+                Event(
+                    name=event_names[i],
+                    perf_data=perf_data,
+                    delegate_debug_identifier=delegate_debug_identifier,
+                    is_delegated_op=bool(is_delegated_op[i]),
+                    _delegate_debug_metadatas=(
+                        [
+                            metadata if metadata else ""
+                            for metadata in delegate_debug_metadatas[i]
+                        ]
+                        if has_delegate_debug_metadata[i]
+                        else []
+                    ),
+                    debug_data=LazyProgramOutput([], output_buffer),
+                    _instruction_id=int(instruction_ids[i]),
+                    _delegate_metadata_parser=delegate_metadata_parser,
+                    _delegate_time_scale_converter=delegate_time_scale_converter,
+                    _start_time=start_times[i].tolist(),
+                )
+            )
+        return events
+
     @staticmethod
     def _calculate_elapsed_time(start_time, end_time):
         # We're assuming if there's a wraparound in the time values, then
@@ -494,6 +646,28 @@ class Event:
             elapsed_time = end_time - start_time
         return elapsed_time
 
+    @staticmethod
+    def _calculate_elapsed_times(
+        start_times: Sequence[int], end_times: Sequence[int]
+    ) -> np.ndarray:
+        """
+        Vectorized version of _calculate_elapsed_time, returning the elapsed
+        times as floats
+        """
+        start = np.asarray(start_times, dtype=np.uint64)
+        end = np.asarray(end_times, dtype=np.uint64)
+        wrapped = start > end
+        if wrapped.any():
+            max_uint32 = 2**32 - 1
+            overflowed = wrapped & ((start > max_uint32) | (end > max_uint32))
+            if overflowed.any():
+                i = int(np.argmax(overflowed))
+                # Raises the error for the first overflowed pair
+                Event._calculate_elapsed_time(int(start[i]), int(end[i]))
+        # Unsigned differences wrap around, so only the selected ones matter
+        elapsed = np.where(wrapped, (np.uint64(2**32 - 1) - start) + end, end - start)
+        return elapsed.astype(np.float64)
+
     @staticmethod
     def _populate_event_signature_fields(
         ret_event: "Event",
@@ -553,8 +727,8 @@ class Event:
         Event._populate_event_signature_fields(ret_event, profile_event_signature)
 
         # Fill out fields from profile event
-        data = []
         stime = []
+        etime = []
         delegate_debug_metadatas = []
         for event in events:
             if (profile_events := event.profile_events) is not None:
@@ -564,45 +738,38 @@ class Event:
                     )
 
                 profile_event = profile_events[0]
-
-                # Scale factor should only be applied to non-delegated ops
-                if (
-                    ret_event.is_delegated_op
-                    and (convert_time_scale := ret_event._delegate_time_scale_converter)
-                    is not None
-                ):
-                    scaled_time = Event._calculate_elapsed_time(
-                        convert_time_scale(ret_event.name, profile_event.start_time),
-                        convert_time_scale(ret_event.name, profile_event.end_time),
-                    )
-                # If it's not a delegated op then we can just use the raw time values
-                # and then scale them according to the scale factor that was passed in.
-                elif not ret_event.is_delegated_op:
-                    scaled_time = (
-                        float(
-                            Event._calculate_elapsed_time(
-                                profile_event.start_time, profile_event.end_time
-                            )
-                        )
-                        / scale_factor
-                    )
-                # If there was no scale factor passed in just take a difference of the
-                # end and start times.
-                else:
-                    scaled_time = float(
-                        Event._calculate_elapsed_time(
-                            profile_event.start_time, profile_event.end_time
-                        )
-                    )
-
-                data.append(scaled_time)
                 stime.append(profile_event.start_time)
+                etime.append(profile_event.end_time)
                 delegate_debug_metadatas.append(
                     profile_event.delegate_debug_metadata
                     if profile_event.delegate_debug_metadata
                     else ""
                 )
 
+        # Scale factor should only be applied to non-delegated ops
+        if (
+            ret_event.is_delegated_op
+            and (convert_time_scale := ret_event._delegate_time_scale_converter)
+            is not None
+        ):
+            data = [
+                Event._calculate_elapsed_time(
+                    convert_time_scale(ret_event.name, start_time),
+                    convert_time_scale(ret_event.name, end_time),
+                )
+                for start_time, end_time in zip(stime, etime)
+            ]
+        # If it's not a delegated op then we can just use the raw time values
+        # and then scale them according to the scale factor that was passed in.
+        elif not ret_event.is_delegated_op:
+            data = (
+                Event._calculate_elapsed_times(stime, etime) / scale_factor
+            ).tolist()
+        # If there was no scale factor passed in just take a difference of the
+        # end and start times.
+        else:
+            data = Event._calculate_elapsed_times(stime, etime).tolist()
+
         # Update fields
         if len(data) > 0:
             ret_event.perf_data = PerfData(data)
@@ -618,7 +785,7 @@ class Event:
         ret_event: "Event",
         debug_event_signature: Optional[DebugEventSignature],
         events: List[InstructionEvent],
-        output_buffer: Optional[bytes] = None,
+        output_buffer: Optional[OutputBuffer] = None,
     ) -> None:
         """
         Given a partially constructed Event, populate the fields related to
@@ -653,10 +820,8 @@ class Event:
                     intermediate data present in this ETDump and indicates potential issues
                     with the model/runtime."""
 
-        ret_event.debug_data = [
-            inflate_runtime_output(debug_value, output_buffer)
-            for debug_value in debug_data
-        ]
+        # Inflated on access, so that the tensors of all events are not held at once
+        ret_event.debug_data = LazyProgramOutput(debug_data, output_buffer)
 
     def _associate_with_op_graph_nodes(
         self,
@@ -737,7 +902,20 @@ class EventBlock:
 
         units = " (" + self.target_time_scale.value + ")" if include_units else ""
 
-        df = pd.concat([e.to_dataframe(units) for e in self.events], ignore_index=True)
+        # Build the columns of all events at once instead of concatenating one
+        # DataFrame per event, which is slow for large models. Columns with
+        # missing values are kept as objects, as concatenating would.
+        rows = [e.asdict(_units=units) for e in self.events]
+        columns = {}
+        for column in rows[0] if rows else []:
+            values = [
+                row[column][0] if isinstance(row[column], list) else row[column]
+                for row in rows
+            ]
+            columns[column] = pd.Series(
+                values, dtype=object if any(v is None for v in values) else None
+            )
+        df = pd.DataFrame(columns)
         df.insert(
             0,
             "event_block_name",
@@ -775,7 +953,7 @@ class EventBlock:
         etdump: ETDumpFlatCC,
         source_time_scale: TimeScale = TimeScale.NS,
         target_time_scale: TimeScale = TimeScale.MS,
-        output_buffer: Optional[bytes] = None,
+        output_buffer: Optional[OutputBuffer] = None,
         delegate_metadata_parser: Optional[
             Callable[[List[str]], Dict[str, Any]]
         ] = None,
@@ -896,9 +1074,123 @@ class EventBlock:
 
         return event_blocks
 
+    @staticmethod
+    def _gen_from_etdump_profile_events(
+        profile_events: ETDumpProfileEvents,
+        source_time_scale: TimeScale = TimeScale.NS,
+        target_time_scale: TimeScale = TimeScale.MS,
+        output_buffer: Optional[OutputBuffer] = None,
+        delegate_metadata_parser: Optional[
+            Callable[[List[str]], Dict[str, Any]]
+        ] = None,
+        delegate_time_scale_converter: Optional[
+            Callable[[Union[int, str], Union[int, float]], Union[int, float]]
+        ] = None,
+    ) -> List["EventBlock"]:
+        """
+        Given the profile events of an etdump without other events, generate the
+        same EventBlocks as _gen_from_etdump() does from the etdump
+
+        The events are grouped through their columns, instead of creating an
+        InstructionEvent and an EventSignature for each of them
+        """
+        columns = profile_events.events
+        events = pd.DataFrame(
+            {
+                "run_index": columns["run_index"],
+                "instruction_id": columns["instruction_id"],
+                "chain_index": columns["chain_index"],
+                "delegate_id": columns["delegate_debug_id_int"],
+                "delegate_id_str": columns["delegate_debug_id_str"],
+                # Same defaults as ProfileEventSignature._gen_from_event()
+                "name": pd.Series(columns["name"], dtype=object).fillna(""),
+                "signature_delegate_id_str": pd.Series(
+                    columns["delegate_debug_id_str"], dtype=object
+                ).fillna(""),
+            }
+        )
+
+        # Number the InstructionEvents and the EventSignatures by first
+        # appearance, which is the order of the OrderedDicts in _gen_from_etdump()
+        instruction_event = (
+            events.groupby(
+                [
+                    "run_index",
+                    "instruction_id",
+                    "chain_index",
+                    "delegate_id",
+                    "delegate_id_str",
+                ],
+                sort=False,
+                dropna=False,
+            )
+            .ngroup()
+            .to_numpy()
+        )
+        events["signature"] = events.groupby(
+            ["instruction_id", "name", "delegate_id", "signature_delegate_id_str"],
+            sort=False,
+            dropna=False,
+        ).ngroup()
+
+        # The EventSignatures of a run follow their InstructionEvents, and take
+        # the place of their first event and the values of their last one
+        events["row"] = np.arange(len(events))
+        order = np.argsort(instruction_event, kind="stable")
+        signature_rows = (
+            events.iloc[order]
+            .groupby(["run_index", "signature"], sort=False)["row"]
+            .last()
+        )
+        rows = signature_rows.to_numpy()
+        signatures = signature_rows.index.get_level_values("signature").to_numpy()
+        run_starts = np.searchsorted(
+            signature_rows.index.get_level_values("run_index").to_numpy(),
+            np.arange(len(profile_events.run_name) + 1),
+        )
+
+        # Group the runs by RunSignature
+        run_groups: Dict[
+            Tuple[str, Tuple[int, ...], Optional[int]], List[np.ndarray]
+        ] = {}
+        for i, has_events in enumerate(profile_events.run_has_events):
+            if not has_events:
+                continue
+            start, end = run_starts[i], run_starts[i + 1]
+            run_signature = (
+                profile_events.run_name[i],
+                tuple(signatures[start:end].tolist()),
+                profile_events.run_bundled_input_index[i],
+            )
+            run_groups.setdefault(run_signature, []).append(rows[start:end])
+
+        # Construct the EventBlocks
+        event_blocks = []
+        scale_factor = calculate_time_scale_factor(source_time_scale, target_time_scale)
+        for (name, _, bundled_input_index), run_rows in run_groups.items():
+            event_blocks.append(
+                EventBlock(
+                    name=name,
+                    events=Event._gen_from_profile_event_rows(
+                        np.stack(run_rows, axis=1),
+                        columns,
+                        scale_factor,
+                        output_buffer,
+                        delegate_metadata_parser,
+                        delegate_time_scale_converter,
+                    ),
+                    source_time_scale=source_time_scale,
+                    target_time_scale=target_time_scale,
+                    bundled_input_index=bundled_input_index,
+                    run_output=[],
+                )
+            )
+
+        return event_blocks
+
     @staticmethod
     def _collect_run_outputs(
-        events: List[flatcc.Event], output_buffer: Optional[bytes] = None
+        events: List[flatcc.Event], output_buffer: Optional[OutputBuffer] = None
     ) -> ProgramOutput:
         """
         Given a list of events, search the events for ProgramOutputs (aka lists of InferenceOutputs) marked
@@ -1015,6 +1307,7 @@ class Inspector:
             Callable[[Union[int, str], Union[int, float]], Union[int, float]]
         ] = None,
         enable_module_hierarchy: bool = False,
+        aot_intermediate_outputs_cache_dir: Optional[str] = None,
     ) -> None:
         r"""
         Initialize an `Inspector` instance with the underlying `EventBlock`\ s populated with data from the provided ETDump path or binary,
@@ -1032,6 +1325,8 @@ class Inspector:
             delegate_time_scale_converter: Optional function to convert the time scale of delegate profiling data. If not given, use the conversion ratio of
                     target_time_scale/source_time_scale.
             enable_module_hierarchy: Enable submodules in the operator graph. Defaults to False.
+            aot_intermediate_outputs_cache_dir: Optional directory in which the intermediate outputs of the ETRecord graph are saved
+                    by calculate_numeric_gap(), and loaded from when analyzing the same ETRecord again.
 
         Returns:
             None
@@ -1054,12 +1349,15 @@ class Inspector:
                 lambda event_name, input_time: input_time / scale_factor
             )
 
+        # The file of the ETRecord, if it was parsed by the Inspector
+        self._etrecord_path: Optional[str] = None
         if etrecord is None:
             self._etrecord = None
         elif isinstance(etrecord, ETRecord):
             self._etrecord = etrecord
         elif isinstance(etrecord, str):
             self._etrecord = parse_etrecord(etrecord_path=etrecord)
+            self._etrecord_path = etrecord
         else:
             raise TypeError("Unsupported ETRecord type")
 
@@ -1069,10 +1367,8 @@ class Inspector:
             )
 
         # Create EventBlocks from ETDump
-        etdump = gen_etdump_object(etdump_path=etdump_path, etdump_data=etdump_data)
         if debug_buffer_path is not None:
-            with open(debug_buffer_path, "rb") as f:
-                output_buffer = f.read()
+            output_buffer = DebugBuffer.from_file(debug_buffer_path)
         else:
             output_buffer = None
             warnings.warn(
@@ -1080,14 +1376,31 @@ class Inspector:
                 stacklevel=1,
             )
 
-        self.event_blocks = EventBlock._gen_from_etdump(
-            etdump=etdump,
-            source_time_scale=self._source_time_scale,
-            target_time_scale=self._target_time_scale,
-            output_buffer=output_buffer,
-            delegate_metadata_parser=delegate_metadata_parser,
-            delegate_time_scale_converter=delegate_time_scale_converter,
+        # Profiling-only ETDumps are read into columns; debug events need the
+        # deserialized objects
+        profile_events = gen_etdump_profile_events(
+            etdump_path=etdump_path, etdump_data=etdump_data
         )
+        if profile_events is not None:
+            self.event_blocks = EventBlock._gen_from_etdump_profile_events(
+                profile_events=profile_events,
+                source_time_scale=self._source_time_scale,
+                target_time_scale=self._target_time_scale,
+                output_buffer=output_buffer,
+                delegate_metadata_parser=delegate_metadata_parser,
+                delegate_time_scale_converter=delegate_time_scale_converter,
+            )
+        else:
+            self.event_blocks = EventBlock._gen_from_etdump(
+                etdump=gen_etdump_object(
+                    etdump_path=etdump_path, etdump_data=etdump_data
+                ),
+                source_time_scale=self._source_time_scale,
+                target_time_scale=self._target_time_scale,
+                output_buffer=output_buffer,
+                delegate_metadata_parser=delegate_metadata_parser,
+                delegate_time_scale_converter=delegate_time_scale_converter,
+            )
 
         # Connect ETRecord to EventBlocks
         self.op_graph_dict: Optional[Mapping[str, OperatorGraph]] = None
@@ -1096,6 +1409,11 @@ class Inspector:
         # Key str is method name; value is list of ProgramOutputs because of list of test cases
         self._reference_outputs: Dict[str, List[ProgramOutput]] = {}
         self._enable_module_hierarchy = enable_module_hierarchy
+        self._aot_intermediate_outputs_cache_dir = aot_intermediate_outputs_cache_dir
+        # The ETRecord and the intermediate outputs captured from it
+        self._aot_intermediate_outputs: Optional[
+            Tuple[ETRecord, Dict[DebugHandle, Any]]
+        ] = None
         self._consume_etrecord()
 
     def _consume_etrecord(self) -> None:
@@ -1171,10 +1489,32 @@ class Inspector:
         aot_debug_handle_to_op_name = get_aot_debug_handle_to_op_name_mapping(
             graph_module
         )
-        capturer = IntermediateOutputCapturer(graph_module)
-        aot_intermediate_outputs = capturer.run_and_capture(
-            self._etrecord._representative_inputs
-        )
+        if (
+            self._aot_intermediate_outputs is not None
+            and self._aot_intermediate_outputs[0] is self._etrecord
+        ):
+            return self._aot_intermediate_outputs[1], aot_debug_handle_to_op_name
+
+        # Running the graph is slow for large models: reuse the outputs saved by
+        # previous analyses of the same ETRecord
+        aot_intermediate_outputs = None
+        if (cache_dir := self._aot_intermediate_outputs_cache_dir) is not None:
+            fingerprint = get_aot_intermediate_outputs_fingerprint(
+                self._etrecord, self._etrecord_path
+            )
+            aot_intermediate_outputs = load_aot_intermediate_outputs(
+                cache_dir, fingerprint
+            )
+        if aot_intermediate_outputs is None:
+            capturer = IntermediateOutputCapturer(graph_module)
+            aot_intermediate_outputs = capturer.run_and_capture(
+                self._etrecord._representative_inputs
+            )
+            if cache_dir is not None:
+                save_aot_intermediate_outputs(
+                    cache_dir, fingerprint, aot_intermediate_outputs
+                )
+        self._aot_intermediate_outputs = (self._etrecord, aot_intermediate_outputs)
         return aot_intermediate_outputs, aot_debug_handle_to_op_name
 
     # TODO: Make it more extensible to further merge overlapping debug handles
@@ -1376,7 +1716,7 @@ class Inspector:
             else self._etrecord.graph_map.get(graph)
         )
 
-    def calculate_numeric_gap(self, distance: str = "MSE"):
+    def calculate_numeric_gap(self, distance: str = "MSE", max_workers: int = 1):
         """
         Compares logged intermediate outputs from the exported graph (in ETRecord)
         with runtime outputs (in ETDump) using a user-specific numerical comparator.
@@ -1384,8 +1724,12 @@ class Inspector:
         and then create the Inspector instance with the ETRecord and ETDump. The Inspector can then
         compare the intermediate outputs from the AOT and the runtime.
 
+        Intermediate outputs of the same shape are compared in batches. The AOT intermediate outputs
+        are captured once per Inspector, and saved to aot_intermediate_outputs_cache_dir if given.
+
         Args:
             distance: the metrics the inspector will use for gap calculation. Should be one of "MSE", "L1" and "SNR".
+            max_workers: Number of batches of intermediate outputs compared at once, on separate threads.
 
         Returns:
             pd.DataFrame: A DataFrame listing corresponding operator intermediate outputs from both stages and their computed numerical gaps.
@@ -1414,13 +1758,27 @@ class Inspector:
         else:
             raise ValueError(f"Unsupported distance metric {distance!r}")
 
+        pairs = [
+            (aot, runtime)
+            for aot, runtime in mapping.items()
+            if aot[1] is not None and runtime[1] is not None
+        ]
+        gaps = compare_intermediate_outputs_batched(
+            [
+                (aot_intermediate_output, runtime_intermediate_output)
+                for (_, aot_intermediate_output), (
+                    _,
+                    runtime_intermediate_output,
+                ) in pairs
+            ],
+            comparator,
+            max_workers,
+        )
         rows = []
-        for (aot_debug_handle, aot_intermediate_output), (
-            runtime_debug_handle,
-            runtime_intermediate_output,
-        ) in mapping.items():
-            if aot_intermediate_output is None or runtime_intermediate_output is None:
-                continue
+        for (
+            (aot_debug_handle, aot_intermediate_output),
+            (runtime_debug_handle, runtime_intermediate_output),
+        ), gap in zip(pairs, gaps):
             rows.append(
                 {
                     "aot_ops": find_op_names(
@@ -1431,9 +1789,7 @@ class Inspector:
                         runtime_debug_handle, runtime_debug_handle_to_op_names
                     ),
                     "runtime_intermediate_output": runtime_intermediate_output,
-                    "gap": compare_intermediate_outputs(
-                        aot_intermediate_output, runtime_intermediate_output, comparator
-                    ),
+                    "gap": gap,
                 }
             )
         return pd.DataFrame(rows)
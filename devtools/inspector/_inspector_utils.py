@@ -6,18 +6,37 @@
 
 # pyre-unsafe
 
+import hashlib
+import logging
 import math
+import mmap
+import os
 import sys
+import tempfile
+import warnings
+from collections import OrderedDict
 from collections.abc import Sequence
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict, IO, List, Mapping, Optional, Tuple, TypeAlias, Union
+from typing import (
+    Any,
+    Dict,
+    IO,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    TypeAlias,
+    Union,
+)
 
 import executorch.devtools.etdump.schema_flatcc as flatcc
 
 import pandas as pd
 
 import torch
+import torch.utils._pytree as pytree
 
 from executorch.devtools.debug_format.base_schema import OperatorNode
 
@@ -32,8 +51,13 @@ from executorch.devtools.etdump.schema_flatcc import (
     ValueType,
 )
 
-from executorch.devtools.etdump.serialize import deserialize_from_etdump_flatcc
+from executorch.devtools.etdump.serialize import (
+    deserialize_from_etdump_flatcc,
+    deserialize_profile_events_from_etdump_flatcc,
+    ETDumpProfileEvents,
+)
 from executorch.devtools.etrecord import ETRecord
+from executorch.exir._parallel import parallel_map
 
 from executorch.exir.debug_handle_utils import (
     DEBUG_HANDLE_KEY,
@@ -47,6 +71,8 @@ from tabulate import tabulate
 
 from torch.export import ExportedProgram
 
+log: logging.Logger = logging.getLogger(__name__)
+
 FORWARD = "forward"
 EDGE_DIALECT_GRAPH_KEY = "edge_dialect_graph_module"
 
@@ -157,9 +183,84 @@ def is_inference_output_equal(
         return False
 
 
+class DebugBuffer:
+    """
+    The debug buffer written by the runtime, which contains the tensors referenced by
+    the debug events of an ETDump.
+
+    The buffer is not copied as a whole; the tensors are copied out of it when they
+    are first accessed. The most recently accessed tensors are cached, up to
+    max_cached_tensors, and returned again by later accesses: clone them before
+    modifying them.
+    """
+
+    def __init__(
+        self,
+        data: Union[bytes, bytearray, memoryview, mmap.mmap],
+        max_cached_tensors: int = 1024,
+    ) -> None:
+        self.data = data
+        self.max_cached_tensors = max_cached_tensors
+        self._tensors: OrderedDict[
+            Tuple[int, ScalarType, Tuple[int, ...]], torch.Tensor
+        ] = OrderedDict()
+
+    @staticmethod
+    def from_file(path: str, max_cached_tensors: int = 1024) -> "DebugBuffer":
+        """
+        Memory-maps the debug buffer file at path, so that only the pages of the tensors
+        that are accessed are read.
+        """
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return DebugBuffer(b"", max_cached_tensors)
+            # The mapping stays valid after the file is closed.
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return DebugBuffer(data, max_cached_tensors)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def tensor(self, tensor: Tensor, dtype: torch.dtype) -> torch.Tensor:
+        """
+        Returns the data of the given ETDump Tensor, copied out of the buffer
+        """
+        key = (tensor.offset, tensor.scalar_type, tuple(tensor.sizes))
+        if (cached := self._tensors.get(key)) is not None:
+            self._tensors.move_to_end(key)
+            return cached
+        value = _copy_from_buffer(self.data, tensor, dtype)
+        if self.max_cached_tensors > 0:
+            self._tensors[key] = value
+            if len(self._tensors) > self.max_cached_tensors:
+                self._tensors.popitem(last=False)
+        return value
+
+
+def _copy_from_buffer(
+    buffer: Union[bytes, bytearray, memoryview, mmap.mmap],
+    tensor: Tensor,
+    dtype: torch.dtype,
+) -> torch.Tensor:
+    with warnings.catch_warnings():
+        # The buffer may be read-only; the view into it is only used to copy the data
+        warnings.simplefilter("ignore", UserWarning)
+        value = torch.frombuffer(
+            buffer,
+            dtype=dtype,
+            count=math.prod(tensor.sizes),
+            offset=tensor.offset,
+        )
+    # Copied, so that the caller owns the tensor and cannot change the buffer
+    return value.view(tensor.sizes).clone()
+
+
+OutputBuffer: TypeAlias = Union[bytes, DebugBuffer]
+
+
 # Given a ETDump Tensor object and offset, extract into a torch.Tensor
 def _parse_tensor_value(
-    tensor: Optional[Tensor], output_buffer: Optional[bytes]
+    tensor: Optional[Tensor], output_buffer: Optional[OutputBuffer]
 ) -> torch.Tensor:
     def get_scalar_type_size(scalar_type: ScalarType) -> Tuple[torch.dtype, int]:
         """
@@ -202,14 +303,18 @@ def _parse_tensor_value(
     if tensor.offset is None:
         raise ValueError("Tensor offset cannot be None")
 
-    return torch.frombuffer(
-        output_buffer[tensor.offset : tensor.offset + tensor_bytes_size],
-        dtype=torch_dtype,
-    ).view(tensor.sizes)
+    if tensor.offset + tensor_bytes_size > len(output_buffer):
+        raise ValueError(
+            f"Tensor data at offset {tensor.offset} with size {tensor_bytes_size} is out of bounds of the output buffer of size {len(output_buffer)}"
+        )
+
+    if isinstance(output_buffer, DebugBuffer):
+        return output_buffer.tensor(tensor, torch_dtype)
+    return _copy_from_buffer(output_buffer, tensor, torch_dtype)
 
 
 def inflate_runtime_output(
-    value: Value, output_buffer: Optional[bytes]
+    value: Value, output_buffer: Optional[OutputBuffer]
 ) -> InferenceOutput:
     """
     Parse the given ETDump Value object into an InferenceOutput object
@@ -241,6 +346,38 @@ def inflate_runtime_output(
         ]
 
 
+class LazyProgramOutput(Sequence):
+    """
+    A ProgramOutput that inflates the ETDump Values of its InferenceOutputs when they
+    are accessed, instead of holding all of them in memory. A DebugBuffer caches the
+    recently accessed tensors, so that accessing them again does not copy them again.
+    """
+
+    def __init__(self, values: List[Value], output_buffer: Optional[OutputBuffer]):
+        self._values = values
+        self._output_buffer = output_buffer
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return inflate_runtime_output(self._values[index], self._output_buffer)
+
+    def __iter__(self) -> Iterator[InferenceOutput]:
+        for value in self._values:
+            yield inflate_runtime_output(value, self._output_buffer)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence) or len(self) != len(other):
+            return False
+        return all(is_inference_output_equal(a, b) for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
 def find_populated_event(event: flatcc.Event) -> Union[ProfileEvent, DebugEvent]:
     """
     Given a ETDump Event object, find the populated event
@@ -352,10 +489,9 @@ def create_debug_handle_to_op_node_mapping(
     return debug_handle_to_op_node_map
 
 
-def gen_etdump_object(
+def _read_etdump_data(
     etdump_path: Optional[str] = None, etdump_data: Optional[bytes] = None
-) -> ETDumpFlatCC:
-    # Gen event blocks from etdump
+) -> bytes:
     if etdump_data is None and etdump_path is not None:
         with open(etdump_path, "rb") as buff:
             etdump_data = buff.read()
@@ -364,8 +500,29 @@ def gen_etdump_object(
         raise ValueError(
             "Unable to get ETDump data. One and only one of etdump_path and etdump_data must be specified."
         )
+    return etdump_data
 
-    return deserialize_from_etdump_flatcc(etdump_data)
+
+def gen_etdump_object(
+    etdump_path: Optional[str] = None, etdump_data: Optional[bytes] = None
+) -> ETDumpFlatCC:
+    # Gen event blocks from etdump
+    return deserialize_from_etdump_flatcc(_read_etdump_data(etdump_path, etdump_data))
+
+
+def gen_etdump_profile_events(
+    etdump_path: Optional[str] = None, etdump_data: Optional[bytes] = None
+) -> Optional[ETDumpProfileEvents]:
+    """
+    Reads the profile events of the ETDump into columns, or returns None if the
+    ETDump also has other events, which need gen_etdump_object()
+    """
+    profile_events = deserialize_profile_events_from_etdump_flatcc(
+        _read_etdump_data(etdump_path, etdump_data)
+    )
+    if profile_events.has_other_events:
+        return None
+    return profile_events
 
 
 def display_or_print_df(df: pd.DataFrame, file: IO[str] = sys.stdout):
@@ -936,6 +1093,165 @@ def compare_intermediate_outputs(a: Any, b: Any, comparator) -> List[float]:
         )
 
 
+# Maximum number of same-shape outputs stacked into a single batch
+_COMPARE_BATCH_SIZE = 64
+
+
+def compare_intermediate_outputs_batched(
+    output_pairs: Sequence[Tuple[Any, Any]], comparator, max_workers: int = 1
+) -> List[List[float]]:
+    """
+    Compare each pair of intermediate outputs like compare_intermediate_outputs, but
+    stack the tensors of the same shape across pairs, and compare them together with
+    comparator.compare_batch.
+    Parameters:
+    output_pairs: The pairs of intermediate outputs to compare.
+    comparator: A comparator object with `compare` and `compare_batch` methods.
+    max_workers: Number of batches compared at once, on separate threads.
+    Returns:
+    List[List[float]]: The comparison results of each pair.
+    Raises:
+    ValueError: Under the same conditions as compare_intermediate_outputs.
+    """
+    results: List[List[Optional[float]]] = []
+    # Elements of the outputs that can be compared in batches, keyed by shape
+    groups: Dict[Tuple[int, ...], List[Tuple[int, int, torch.Tensor, torch.Tensor]]] = (
+        {}
+    )
+    for i, (a, b) in enumerate(output_pairs):
+        is_a_sequence = isinstance(a, Sequence)
+        is_b_sequence = isinstance(b, Sequence)
+        if is_a_sequence and is_b_sequence:
+            if len(a) != len(b):
+                raise ValueError(
+                    f"Sequences 'a' ({a}) and 'b' ({b}) must have the same length for comparison."
+                )
+            elements = list(zip(a, b))
+        elif not is_a_sequence and not is_b_sequence:
+            elements = [(a, b)]
+        else:
+            raise ValueError(
+                f"Both inputs 'a' ({a}) and 'b' ({b}) must be sequences or both must be non-sequences."
+            )
+
+        results.append([None] * len(elements))
+        for j, (x, y) in enumerate(elements):
+            if (
+                isinstance(x, torch.Tensor)
+                and isinstance(y, torch.Tensor)
+                and x.shape == y.shape
+                and x.numel() > 0
+            ):
+                groups.setdefault(tuple(x.shape), []).append((i, j, x, y))
+            else:
+                # Left to the comparator, e.g. to broadcast or to raise an error
+                results[i][j] = comparator.compare(x, y)
+
+    batches = [
+        group[start : start + _COMPARE_BATCH_SIZE]
+        for group in groups.values()
+        for start in range(0, len(group), _COMPARE_BATCH_SIZE)
+    ]
+
+    def compare_batch(
+        batch: List[Tuple[int, int, torch.Tensor, torch.Tensor]]
+    ) -> List[float]:
+        return comparator.compare_batch(
+            torch.stack([convert_to_float_tensor(x) for _, _, x, _ in batch]),
+            torch.stack([convert_to_float_tensor(y) for _, _, _, y in batch]),
+        )
+
+    for batch, batch_results in zip(
+        batches, parallel_map(compare_batch, batches, max_workers)
+    ):
+        for (i, j, _, _), result in zip(batch, batch_results):
+            results[i][j] = result
+    return results
+
+
+def _update_with_value(h: "hashlib._Hash", value: Any) -> None:
+    """
+    Hash the structure of value, and the data of the tensors in it
+    """
+    leaves, spec = pytree.tree_flatten(value)
+    h.update(str(spec).encode())
+    for leaf in leaves:
+        if isinstance(leaf, torch.Tensor):
+            tensor = leaf.detach().cpu().contiguous()
+            h.update(f"{tensor.dtype}{list(tensor.shape)}".encode())
+            if tensor.numel() > 0:
+                # Hashed through a view, without copying the data
+                h.update(memoryview(tensor.reshape(-1).view(torch.uint8).numpy()))
+        else:
+            h.update(repr(leaf).encode())
+
+
+def get_aot_intermediate_outputs_fingerprint(
+    etrecord: ETRecord, etrecord_path: Optional[str] = None
+) -> str:
+    """
+    Returns a fingerprint of the inputs to capturing the AOT intermediate outputs of
+    the ETRecord: the edge dialect graph with its debug handles and constants, and the
+    representative inputs.
+
+    If the ETRecord was parsed from etrecord_path, the file is hashed instead, which
+    is cheaper than hashing the deserialized graph and tensors.
+    """
+    h = hashlib.sha256()
+    h.update(torch.__version__.encode())
+    if etrecord_path is not None:
+        h.update(b"file")
+        with open(etrecord_path, "rb") as f:
+            while chunk := f.read(1 << 20):
+                h.update(chunk)
+        return h.hexdigest()
+
+    exported_program = etrecord.edge_dialect_program
+    assert exported_program is not None
+    h.update(exported_program.graph_module.code.encode())
+    for node in exported_program.graph.nodes:
+        h.update(repr((node.name, node.meta.get(DEBUG_HANDLE_KEY))).encode())
+    _update_with_value(h, dict(exported_program.state_dict))
+    _update_with_value(h, dict(exported_program.constants))
+    _update_with_value(h, etrecord._representative_inputs)
+    return h.hexdigest()
+
+
+def load_aot_intermediate_outputs(
+    cache_dir: str, fingerprint: str
+) -> Optional[Dict[DebugHandle, Any]]:
+    """
+    Load AOT intermediate outputs saved by save_aot_intermediate_outputs, or return None
+    if there are none for this fingerprint
+    """
+    path = os.path.join(cache_dir, f"{fingerprint}.pt")
+    if not os.path.exists(path):
+        return None
+    try:
+        return torch.load(path, weights_only=True)
+    except Exception as e:
+        log.warning(f"Ignoring invalid AOT intermediate outputs {path}: {e}")
+        return None
+
+
+def save_aot_intermediate_outputs(
+    cache_dir: str, fingerprint: str, outputs: Dict[DebugHandle, Any]
+) -> None:
+    """
+    Save AOT intermediate outputs to cache_dir, keyed by their fingerprint
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    # Written to a temporary file first, so that concurrent analyses never see partial files
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            torch.save(outputs, f)
+        os.replace(tmp_path, os.path.join(cache_dir, f"{fingerprint}.pt"))
+    except Exception as e:
+        log.warning(f"Unable to save AOT intermediate outputs to {cache_dir}: {e}")
+        os.remove(tmp_path)
+
+
 def propagate_back_debug_handle(
     exported_program: ExportedProgram,
     exported_program_graph_id: int,
@@ -4,7 +4,7 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
-from typing import Any
+from typing import Any, List
 
 import torch
 from executorch.devtools.inspector._inspector_utils import convert_to_float_tensor
@@ -25,3 +25,6 @@ class L1Comparator(NumericalComparatorBase):
         except Exception as e:
             raise ValueError(f"Error computing L1 difference between tensors: {str(e)}")
         return res
+
+    def compare_batch(self, a: torch.Tensor, b: torch.Tensor) -> List[float]:
+        return torch.abs(a - b).reshape(len(a), -1).sum(dim=1).tolist()
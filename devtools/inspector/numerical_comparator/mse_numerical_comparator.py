@@ -4,7 +4,7 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
-from typing import Any
+from typing import Any, List
 
 import torch
 from executorch.devtools.inspector._inspector_utils import convert_to_float_tensor
@@ -27,3 +27,6 @@ class MSEComparator(NumericalComparatorBase):
                 f"Error computing MSE difference between tensors: {str(e)}"
             )
         return res
+
+    def compare_batch(self, a: torch.Tensor, b: torch.Tensor) -> List[float]:
+        return torch.square(a - b).reshape(len(a), -1).mean(dim=1).tolist()
@@ -6,7 +6,9 @@
 
 
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, List
+
+import torch
 
 
 class NumericalComparatorBase(ABC):
@@ -24,3 +26,18 @@ class NumericalComparatorBase(ABC):
             A numerical result indicating the comparison outcome.
         """
         pass
+
+    def compare_batch(self, a: torch.Tensor, b: torch.Tensor) -> List[float]:
+        """Compare batches of intermediate outputs of the same shape.
+
+        Subclasses can override this method with a vectorized implementation; by
+        default, the outputs are compared one by one with `compare`.
+
+        Args:
+            a: The first intermediate outputs, stacked along the first dimension.
+            b: The second intermediate outputs, stacked along the first dimension.
+
+        Returns:
+            The result of comparing a[i] with b[i], for each i.
+        """
+        return [self.compare(x, y) for x, y in zip(a, b)]
@@ -5,7 +5,7 @@
 # LICENSE file in the root directory of this source tree.
 
 
-from typing import Any
+from typing import Any, List
 
 import torch
 from executorch.devtools.inspector._inspector_utils import convert_to_float_tensor
@@ -37,3 +37,8 @@ class SNRComparator(NumericalComparatorBase):
         # Calculate SNR
         snr = 10 * torch.log10(original_power / error_power)
         return snr.item()
+
+    def compare_batch(self, a: torch.Tensor, b: torch.Tensor) -> List[float]:
+        original_power = torch.pow(a, 2).reshape(len(a), -1).mean(dim=1)
+        error_power = torch.pow(a - b, 2).reshape(len(a), -1).mean(dim=1)
+        return (10 * torch.log10(original_power / error_power)).tolist()
@@ -5,11 +5,18 @@
 # LICENSE file in the root directory of this source tree.
 
 # pyre-strict
+import dataclasses
 import unittest
 from typing import List, Optional, Tuple, Union
 
 import executorch.devtools.etdump.schema_flatcc as flatcc
+import pandas as pd
 from executorch.devtools.etdump.schema_flatcc import ETDumpFlatCC, ProfileEvent
+from executorch.devtools.etdump.serialize import (
+    deserialize_from_etdump_flatcc,
+    deserialize_profile_events_from_etdump_flatcc,
+    serialize_to_etdump_flatcc,
+)
 from executorch.devtools.inspector import Event, EventBlock, PerfData
 from executorch.devtools.inspector._inspector import (
     DelegateMetadata,
@@ -337,6 +344,71 @@ class TestEventBlock(unittest.TestCase):
 
         return ETDumpFlatCC(version=0, run_data=[run_data_1])
 
+    @staticmethod
+    def _get_sample_etdump_flatcc_profiling_only() -> flatcc.ETDumpFlatCC:
+        """
+        Helper for getting a sample ETDumpFlatCC object with only profile events,
+        covering the cases that _gen_from_etdump() groups:
+        - run_data_1 and run_data_2 have the same signature
+        - an instruction profiled twice with different chain indices, and a
+          profile event repeated within an instruction
+        - delegated events with int and str ids and metadata
+        - a run without events
+        """
+
+        def _run_data(name: str, offset: int, chain_index: int = 0) -> flatcc.RunData:
+            profile_events = [
+                TestEventBlock._gen_sample_profile_event(
+                    "op_1", 1, (offset, offset + 3)
+                ),
+                TestEventBlock._gen_sample_profile_event(
+                    "op_2", 2, (offset + 3, offset + 7), 100, b"metadata"
+                ),
+                TestEventBlock._gen_sample_profile_event(
+                    "op_2", 2, (offset + 7, offset + 8), "delegate_op"
+                ),
+                TestEventBlock._gen_sample_profile_event(
+                    "op_3", 3, (offset + 8, offset + 10)
+                ),
+                dataclasses.replace(
+                    TestEventBlock._gen_sample_profile_event(
+                        "op_1", 1, (offset + 10, offset + 15)
+                    ),
+                    chain_index=chain_index,
+                ),
+                TestEventBlock._gen_sample_profile_event(
+                    "op_3", 3, (offset + 15, offset + 21)
+                ),
+            ]
+            return flatcc.RunData(
+                name=name,
+                bundled_input_index=-1,
+                allocators=[],
+                events=[
+                    flatcc.Event(
+                        allocation_event=None,
+                        debug_event=None,
+                        profile_event=profile_event,
+                    )
+                    for profile_event in profile_events
+                ],
+            )
+
+        return ETDumpFlatCC(
+            version=0,
+            run_data=[
+                _run_data("signature_a", 0),
+                _run_data("signature_a", 100, chain_index=1),
+                flatcc.RunData(
+                    name="signature_b",
+                    bundled_input_index=-1,
+                    allocators=[],
+                    events=None,
+                ),
+                _run_data("signature_c", 1000),
+            ],
+        )
+
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~ Tests ~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
     def test_gen_from_etdump(self) -> None:
@@ -432,6 +504,43 @@ class TestEventBlock(unittest.TestCase):
         # Non delegated event uses event_name as event name
         self.assertEqual(event_blocks[0].events[1].name, event_name)
 
+    def test_gen_from_etdump_profile_events(self) -> None:
+        """
+        Test that the EventBlocks generated from the profile event columns of an
+        ETDump match the ones generated from the deserialized ETDump
+        """
+        etdump_data = serialize_to_etdump_flatcc(
+            TestEventBlock._get_sample_etdump_flatcc_profiling_only()
+        )
+        etdump = deserialize_from_etdump_flatcc(etdump_data, size_prefixed=False)
+        profile_events = deserialize_profile_events_from_etdump_flatcc(
+            etdump_data, size_prefixed=False
+        )
+        self.assertFalse(profile_events.has_other_events)
+
+        for delegate_time_scale_converter in (None, lambda name, time: time / 10):
+            expected = EventBlock._gen_from_etdump(
+                etdump,
+                delegate_time_scale_converter=delegate_time_scale_converter,
+            )
+            blocks = EventBlock._gen_from_etdump_profile_events(
+                profile_events,
+                delegate_time_scale_converter=delegate_time_scale_converter,
+            )
+
+            self.assertEqual(
+                [block.name for block in blocks], ["signature_a", "signature_c"]
+            )
+            self.assertEqual(blocks, expected)
+            for block, expected_block in zip(blocks, expected):
+                self.assertEqual(
+                    [event.perf_data.raw for event in block.events],
+                    [event.perf_data.raw for event in expected_block.events],
+                )
+                pd.testing.assert_frame_equal(
+                    block.to_dataframe(), expected_block.to_dataframe()
+                )
+
     def test_inspector_event_generation(self) -> None:
         """
         Test Inspector.Event derivation from various ProfileEvent cases
@@ -9,6 +9,7 @@
 import copy
 import random
 import statistics
+import struct
 import tempfile
 import unittest
 from contextlib import redirect_stdout
@@ -25,6 +26,7 @@ import torch.fx
 from executorch.devtools import generate_etrecord, parse_etrecord
 from executorch.devtools.debug_format.et_schema import OperatorNode
 from executorch.devtools.etdump.schema_flatcc import ProfileEvent
+from executorch.devtools.etdump.serialize import serialize_to_etdump_flatcc
 from executorch.devtools.etrecord._etrecord import ETRecord
 from executorch.devtools.etrecord.tests.etrecord_test import TestETRecord
 
@@ -84,11 +86,26 @@ class TestInspector(unittest.TestCase):
         self.assertEqual(len(df["raw"].values[0]), RAW_DATA_SIZE)
         self.assertEqual(df["op_types"].values[0][0], OP_TYPE)
 
+    def test_calculate_elapsed_times(self) -> None:
+        start_times = [10, 2**32 - 10, 5]
+        end_times = [20, 5, 5]
+        self.assertEqual(
+            Event._calculate_elapsed_times(start_times, end_times).tolist(),
+            [
+                Event._calculate_elapsed_time(start_time, end_time)
+                for start_time, end_time in zip(start_times, end_times)
+            ],
+        )
+        with self.assertRaises(ValueError):
+            Event._calculate_elapsed_times([2**33], [1])
+
     def test_inspector_constructor(self):
         # Create a context manager to patch functions called by Inspector.__init__
         with patch.object(
             _inspector, "parse_etrecord", return_value=None
         ) as mock_parse_etrecord, patch.object(
+            _inspector, "gen_etdump_profile_events", return_value=None
+        ), patch.object(
             _inspector, "gen_etdump_object", return_value=None
         ) as mock_gen_etdump, patch.object(
             EventBlock, "_gen_from_etdump"
@@ -110,10 +127,72 @@ class TestInspector(unittest.TestCase):
             # Because we mocked parse_etrecord() to return None, this method shouldn't be called
             mock_gen_graphs_from_etrecord.assert_not_called()
 
+    def test_inspector_reads_profiling_only_etdump_into_columns(self):
+        profile_events = [
+            flatcc.ProfileEvent(
+                name=f"op_{i}",
+                chain_index=0,
+                instruction_id=i,
+                delegate_debug_id_int=-1,
+                delegate_debug_id_str="",
+                delegate_debug_metadata=None,
+                start_time=1000 * i,
+                end_time=1000 * i + 500,
+            )
+            for i in range(EVENTS_SIZE)
+        ]
+        etdump = flatcc.ETDumpFlatCC(
+            version=0,
+            run_data=[
+                flatcc.RunData(
+                    name=EVENT_BLOCK_NAME,
+                    bundled_input_index=-1,
+                    allocators=[],
+                    events=[
+                        flatcc.Event(
+                            profile_event=profile_event,
+                            allocation_event=None,
+                            debug_event=None,
+                        )
+                        for profile_event in profile_events
+                    ],
+                )
+            ]
+            * RAW_DATA_SIZE,
+        )
+        etdump_data = serialize_to_etdump_flatcc(etdump)
+        etdump_data = struct.pack("<I", len(etdump_data)) + etdump_data
+
+        with patch.object(
+            _inspector, "gen_etdump_object", wraps=_inspector.gen_etdump_object
+        ) as mock_gen_etdump:
+            inspector_instance = Inspector(etdump_data=etdump_data)
+        # The ETDump has no debug events, so it is not deserialized into objects
+        mock_gen_etdump.assert_not_called()
+
+        self.assertEqual(
+            inspector_instance.event_blocks,
+            EventBlock._gen_from_etdump(
+                etdump,
+                delegate_time_scale_converter=inspector_instance.event_blocks[0]
+                .events[0]
+                ._delegate_time_scale_converter,
+            ),
+        )
+        df = inspector_instance.event_blocks[0].to_dataframe()
+        self.assertEqual(len(df), EVENTS_SIZE)
+        self.assertEqual(
+            df["event_name"].tolist(), [f"op_{i}" for i in range(EVENTS_SIZE)]
+        )
+        self.assertEqual(df["raw"].tolist(), [[0.0005] * RAW_DATA_SIZE] * EVENTS_SIZE)
+        self.assertEqual(df["p50"].tolist(), [0.0005] * EVENTS_SIZE)
+
     def test_default_delegate_time_scale_converter(self):
         # Create a context manager to patch functions called by Inspector.__init__
         with patch.object(
             _inspector, "parse_etrecord", return_value=None
+        ), patch.object(
+            _inspector, "gen_etdump_profile_events", return_value=None
         ), patch.object(
             _inspector, "gen_etdump_object", return_value=None
         ), patch.object(
@@ -141,6 +220,8 @@ class TestInspector(unittest.TestCase):
         # Create a context manager to patch functions called by Inspector.__init__
         with patch.object(
             _inspector, "parse_etrecord", return_value=None
+        ), patch.object(
+            _inspector, "gen_etdump_profile_events", return_value=None
         ), patch.object(
             _inspector, "gen_etdump_object", return_value=None
         ), patch.object(
@@ -305,6 +386,8 @@ class TestInspector(unittest.TestCase):
         # Create a context manager to patch functions called by Inspector.__init__
         with patch.object(
             _inspector, "parse_etrecord", return_value=None
+        ), patch.object(
+            _inspector, "gen_etdump_profile_events", return_value=None
         ), patch.object(
             _inspector, "gen_etdump_object", return_value=None
         ), patch.object(
@@ -501,6 +584,8 @@ class TestInspector(unittest.TestCase):
             )
             with patch.object(
                 Inspector, "_consume_etrecord", return_value=None
+            ), patch.object(
+                _inspector, "gen_etdump_profile_events", return_value=None
             ), patch.object(
                 _inspector, "gen_etdump_object", return_value=None
             ), patch.object(
@@ -538,10 +623,62 @@ class TestInspector(unittest.TestCase):
                     )
                 )
 
+    def test_aot_intermediate_outputs_cache(self):
+        mod = model_registry["ConvLinearModel"]()
+        input_tensor = torch.tensor([[[[1.0, 2.0], [3.0, 4.0]]]])
+        edge_program_manager = to_edge(export(mod, (input_tensor,), strict=True))
+        etrecord = ETRecord(
+            edge_dialect_program=edge_program_manager.exported_program(),
+            _representative_inputs=(input_tensor,),
+        )
+        with tempfile.TemporaryDirectory() as cache_dir, patch.object(
+            Inspector, "_consume_etrecord", return_value=None
+        ), patch.object(
+            _inspector, "gen_etdump_profile_events", return_value=None
+        ), patch.object(
+            _inspector, "gen_etdump_object", return_value=None
+        ), patch.object(
+            EventBlock, "_gen_from_etdump"
+        ), patch.object(
+            _inspector, "gen_graphs_from_etrecord"
+        ), patch.object(
+            _inspector.IntermediateOutputCapturer,
+            "run_and_capture",
+            autospec=True,
+            side_effect=_inspector.IntermediateOutputCapturer.run_and_capture,
+        ) as run_and_capture:
+            outputs = []
+            for _ in range(2):
+                inspector_instance = Inspector(
+                    etdump_path=ETDUMP_PATH,
+                    etrecord=etrecord,
+                    aot_intermediate_outputs_cache_dir=cache_dir,
+                )
+                # Captured once per Inspector at most
+                for _ in range(2):
+                    aot_intermediate_outputs, _ = (
+                        inspector_instance._get_aot_intermediate_outputs_and_op_names()
+                    )
+                    outputs.append(aot_intermediate_outputs)
+
+            # The second Inspector loads the outputs saved by the first one
+            self.assertEqual(run_and_capture.call_count, 1)
+            self.assertIs(outputs[0], outputs[1])
+            self.assertIs(outputs[2], outputs[3])
+            self.assertEqual(outputs[0].keys(), outputs[2].keys())
+            for debug_handle, output in outputs[0].items():
+                self.assertTrue(
+                    _inspector.is_inference_output_equal(
+                        output, outputs[2][debug_handle]
+                    )
+                )
+
     def test_get_runtime_intermediate_outputs_and_op_names(self):
         # Create a context manager to patch functions called by Inspector.__init__
         with patch.object(
             _inspector, "parse_etrecord", return_value=None
+        ), patch.object(
+            _inspector, "gen_etdump_profile_events", return_value=None
         ), patch.object(
             _inspector, "gen_etdump_object", return_value=None
         ), patch.object(
@@ -599,6 +736,8 @@ class TestInspector(unittest.TestCase):
         # Create a context manager to patch functions called by Inspector.__init__
         with patch.object(
             _inspector, "parse_etrecord", return_value=None
+        ), patch.object(
+            _inspector, "gen_etdump_profile_events", return_value=None
         ), patch.object(
             _inspector, "gen_etdump_object", return_value=None
         ), patch.object(
@@ -6,6 +6,8 @@
 
 # pyre-unsafe
 
+import math
+import os
 import tempfile
 import unittest
 from typing import Dict, Tuple
@@ -23,6 +25,7 @@ from executorch.devtools.debug_format.base_schema import (
 
 from executorch.devtools.debug_format.et_schema import FXOperatorGraph
 from executorch.devtools.etdump import schema_flatcc as flatcc
+from executorch.devtools.etrecord import ETRecord
 
 from executorch.devtools.etrecord.tests.etrecord_test import TestETRecord
 from executorch.devtools.inspector._inspector_utils import (
@@ -31,21 +34,32 @@ from executorch.devtools.inspector._inspector_utils import (
     calculate_snr,
     calculate_time_scale_factor,
     compare_intermediate_outputs,
+    compare_intermediate_outputs_batched,
     convert_to_float_tensor,
     create_debug_handle_to_op_node_mapping,
+    DebugBuffer,
     EDGE_DIALECT_GRAPH_KEY,
     find_op_names,
     find_populated_event,
     gen_graphs_from_etrecord,
     get_aot_debug_handle_to_op_name_mapping,
+    get_aot_intermediate_outputs_fingerprint,
+    inflate_runtime_output,
     is_inference_output_equal,
+    LazyProgramOutput,
+    load_aot_intermediate_outputs,
     map_runtime_aot_intermediate_outputs,
     merge_runtime_overlapping_debug_handles,
     NodeFilter,
     propagate_back_debug_handle,
+    save_aot_intermediate_outputs,
     TimeScale,
 )
-from executorch.devtools.inspector.numerical_comparator import L1Comparator
+from executorch.devtools.inspector.numerical_comparator import (
+    L1Comparator,
+    MSEComparator,
+    SNRComparator,
+)
 from executorch.exir import to_edge
 from executorch.exir.debug_handle_utils import DEBUG_HANDLE_KEY, UNSET_DEBUG_HANDLE
 from torch.export import export
@@ -191,6 +205,71 @@ class TestInspectorUtils(unittest.TestCase):
             )
         )
 
+    def _gen_tensor_value(self, offset: int, size: int) -> flatcc.Value:
+        return flatcc.Value(
+            val=flatcc.ValueType.TENSOR.value,
+            tensor=flatcc.Tensor(
+                scalar_type=flatcc.ScalarType.FLOAT,
+                sizes=[size],
+                strides=[1],
+                offset=offset,
+            ),
+            tensor_list=None,
+            int_value=None,
+            float_value=None,
+            double_value=None,
+            bool_value=None,
+            output=None,
+        )
+
+    def test_debug_buffer_from_file(self):
+        data = torch.arange(6, dtype=torch.float).numpy().tobytes()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "debug_buffer.bin")
+            with open(path, "wb") as f:
+                f.write(data)
+            debug_buffer = DebugBuffer.from_file(path)
+
+            first = inflate_runtime_output(self._gen_tensor_value(0, 2), debug_buffer)
+            self.assertTrue(torch.equal(first, torch.tensor([0.0, 1.0])))
+            second = inflate_runtime_output(self._gen_tensor_value(8, 4), debug_buffer)
+            self.assertTrue(torch.equal(second, torch.tensor([2.0, 3.0, 4.0, 5.0])))
+            with self.assertRaises(ValueError):
+                inflate_runtime_output(self._gen_tensor_value(16, 4), debug_buffer)
+
+            # The tensors are copies, so writing to one does not change the file
+            first.add_(1)
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), data)
+
+    def test_debug_buffer_caches_recent_tensors(self):
+        data = torch.arange(6, dtype=torch.float).numpy().tobytes()
+        debug_buffer = DebugBuffer(data, max_cached_tensors=2)
+        values = [self._gen_tensor_value(offset, 1) for offset in (0, 4, 8)]
+
+        first = inflate_runtime_output(values[0], debug_buffer)
+        self.assertIs(inflate_runtime_output(values[0], debug_buffer), first)
+        inflate_runtime_output(values[1], debug_buffer)
+        # Accessing the first tensor again keeps it cached over the second one
+        inflate_runtime_output(values[0], debug_buffer)
+        inflate_runtime_output(values[2], debug_buffer)
+        self.assertIs(inflate_runtime_output(values[0], debug_buffer), first)
+        self.assertEqual(len(debug_buffer._tensors), 2)
+        self.assertNotIn((4, flatcc.ScalarType.FLOAT, (1,)), debug_buffer._tensors)
+
+    def test_lazy_program_output(self):
+        data = torch.arange(4, dtype=torch.float).numpy().tobytes()
+        program_output = LazyProgramOutput(
+            [self._gen_tensor_value(0, 2), self._gen_tensor_value(8, 2)],
+            DebugBuffer(data),
+        )
+        self.assertEqual(len(program_output), 2)
+        self.assertTrue(torch.equal(program_output[1], torch.tensor([2.0, 3.0])))
+        self.assertEqual(
+            program_output, [torch.tensor([0.0, 1.0]), torch.tensor([2.0, 3.0])]
+        )
+        self.assertNotEqual(program_output, [torch.tensor([0.0, 1.0])])
+
     def test_calculate_time_scale_factor_second_based(self):
         self.assertEqual(
             calculate_time_scale_factor(TimeScale.NS, TimeScale.MS), 1000000
@@ -610,6 +689,97 @@ class TestInspectorUtils(unittest.TestCase):
         with self.assertRaises(ValueError):
             compare_intermediate_outputs(a, b, L1Comparator())
 
+    def test_compare_intermediate_outputs_batched(self):
+        torch.manual_seed(0)
+        output_pairs = [
+            (torch.randn(2, 3), torch.randn(2, 3)),
+            ([torch.randn(2, 3), torch.randn(4)], [torch.randn(2, 3), torch.randn(4)]),
+            (torch.randn(2, 3), torch.randn(2, 3)),
+            # Compared one at a time: broadcast, empty and non-tensor outputs
+            (torch.randn(3), torch.randn(1)),
+            (torch.randn(0), torch.randn(0)),
+            ([1.0, 2.0], [1.0, 2.5]),
+        ]
+        for comparator in [L1Comparator(), MSEComparator(), SNRComparator()]:
+            expected = [
+                compare_intermediate_outputs(a, b, comparator) for a, b in output_pairs
+            ]
+            for max_workers in [1, 4]:
+                result = compare_intermediate_outputs_batched(
+                    output_pairs, comparator, max_workers
+                )
+                self.assertEqual(len(result), len(expected))
+                for result_gaps, expected_gaps in zip(result, expected):
+                    self.assertEqual(len(result_gaps), len(expected_gaps))
+                    for result_gap, expected_gap in zip(result_gaps, expected_gaps):
+                        if math.isnan(expected_gap):
+                            self.assertTrue(math.isnan(result_gap))
+                        else:
+                            self.assertAlmostEqual(result_gap, expected_gap, places=5)
+
+    def test_compare_intermediate_outputs_batched_diff_len_sequences(self):
+        with self.assertRaises(ValueError):
+            compare_intermediate_outputs_batched(
+                [(torch.randn(2), torch.randn(2)), ([1.0, 2.0], [1.0, 2.0, 3.0])],
+                L1Comparator(),
+            )
+        with self.assertRaises(ValueError):
+            compare_intermediate_outputs_batched([([1.0, 2.0], 1.0)], L1Comparator())
+
+    def test_aot_intermediate_outputs_cache(self):
+        model = models.FeedForwardBlock(5, 10)
+        inputs = (torch.rand(5, 5),)
+        edge_dialect_program = to_edge(export(model, inputs)).exported_program()
+        etrecord = ETRecord(
+            edge_dialect_program=edge_dialect_program, _representative_inputs=inputs
+        )
+        fingerprint = get_aot_intermediate_outputs_fingerprint(etrecord)
+        self.assertEqual(
+            get_aot_intermediate_outputs_fingerprint(
+                ETRecord(
+                    edge_dialect_program=edge_dialect_program,
+                    _representative_inputs=(inputs[0].clone(),),
+                )
+            ),
+            fingerprint,
+        )
+        etrecord._representative_inputs = (torch.rand(5, 5),)
+        self.assertNotEqual(
+            get_aot_intermediate_outputs_fingerprint(etrecord), fingerprint
+        )
+
+        # ETRecords parsed from a file are keyed on the file contents
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "etrecord.bin")
+            with open(path, "wb") as f:
+                f.write(b"etrecord")
+            file_fingerprint = get_aot_intermediate_outputs_fingerprint(etrecord, path)
+            self.assertNotEqual(file_fingerprint, fingerprint)
+            self.assertEqual(
+                get_aot_intermediate_outputs_fingerprint(ETRecord(), path),
+                file_fingerprint,
+            )
+            with open(path, "ab") as f:
+                f.write(b"changed")
+            self.assertNotEqual(
+                get_aot_intermediate_outputs_fingerprint(etrecord, path),
+                file_fingerprint,
+            )
+
+        outputs = {(1,): torch.randn(2, 3), (2, 3): [torch.randn(4), torch.randn(1)]}
+        with tempfile.TemporaryDirectory() as cache_dir:
+            self.assertIsNone(load_aot_intermediate_outputs(cache_dir, fingerprint))
+            save_aot_intermediate_outputs(cache_dir, fingerprint, outputs)
+            self.assertEqual(os.listdir(cache_dir), [f"{fingerprint}.pt"])
+            loaded = load_aot_intermediate_outputs(cache_dir, fingerprint)
+            self.assertEqual(loaded.keys(), outputs.keys())
+            self.assertTrue(torch.equal(loaded[(1,)], outputs[(1,)]))
+            self.assertTrue(is_inference_output_equal(loaded[(2, 3)], outputs[(2, 3)]))
+
+            with open(os.path.join(cache_dir, f"{fingerprint}.pt"), "r+b") as f:
+                f.truncate(16)
+            self.assertIsNone(load_aot_intermediate_outputs(cache_dir, fingerprint))
+
     def test_equip_debug_handle_to_export_program_success(self):
         """Test that propagate_back_debug_handle returns True and properly equips debug handles."""
         # Create a test model
@@ -270,6 +270,12 @@ def build_args_parser() -> argparse.ArgumentParser:
         default="Once upon a time",
         help="Calibration prompts from users",
     )
+    parser.add_argument(
+        "--quantize_workers",
+        type=int,
+        default=1,
+        help="Number of layers quantized at once by --quantization_mode int8 and --embedding_quantize",
+    )
     parser.add_argument(
         "-t",
         "--tokenizer_path",
@@ -714,6 +720,7 @@ def _prepare_for_llama_export(llm_config: LlmConfig) -> LLMEdgeManager:
             calibration_tasks=llm_config.quantization.calibration_tasks,
             calibration_limit=llm_config.quantization.calibration_limit,
             calibration_seq_length=llm_config.quantization.calibration_seq_length,
+            quantize_workers=llm_config.quantization.quantize_workers,
             expand_rope_table=llm_config.model.expand_rope_table,
             use_custom_sdpa_with_attention_mask=getattr(
                 llm_config.model, "use_custom_sdpa_with_attention_mask", False
@@ -1254,6 +1261,7 @@ def _get_source_transforms(  # noqa
     calibration_tasks: Optional[List[str]] = None,
     calibration_limit: Optional[int] = None,
     calibration_seq_length: Optional[int] = None,
+    quantize_workers: int = 1,
     expand_rope_table: bool = False,
     use_custom_sdpa_with_attention_mask: bool = False,
     use_sdpa_with_kv_cache: bool = False,
@@ -1287,6 +1295,7 @@ def _get_source_transforms(  # noqa
         use_spin_quant: Type of spin quant to use ("cuda" or "native").
         embedding_quantize: Type of embedding quantization.
         quantization_mode: Type of quantization mode.
+        quantize_workers: Number of layers quantized at once.
         expand_rope_table: Whether to expand rope table.
         use_custom_sdpa_with_attention_mask: Whether to use custom SDPA with attention mask.
         use_sdpa_with_kv_cache: Whether to use SDPA with KV cache.
@@ -1341,7 +1350,10 @@ def _get_source_transforms(  # noqa
         """
         transforms.append(
             get_quant_embedding_transform(
-                embedding_quantize, use_shared_embedding, checkpoint_dtype
+                embedding_quantize,
+                use_shared_embedding,
+                checkpoint_dtype,
+                max_workers=quantize_workers,
             )
         )
 
@@ -1372,6 +1384,7 @@ def _get_source_transforms(  # noqa
                 calibration_tasks=calibration_tasks,
                 calibration_limit=calibration_limit,
                 calibration_seq_length=calibration_seq_length,
+                max_workers=quantize_workers,
             )
         )
 
@@ -8,12 +8,13 @@ import logging
 import re
 from functools import partial
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
 
+from executorch.exir._parallel import parallel_map
 from executorch.extension.llm.export.builder import DType
 
 
@@ -49,6 +50,7 @@ def quantize(  # noqa C901
     blocksize: int = 128,
     tokenizer_path: Optional[Path] = None,
     verbose: bool = False,
+    max_workers: int = 1,
 ) -> torch.nn.Module:
     """
     Quantizes a model by converting all weights to int8.
@@ -60,6 +62,7 @@ def quantize(  # noqa C901
             Also the dtype of the rest of the non-quantized compoents of the model.
         checkpoint_dtype: The dtype of the checkpoint, this arg exists since it is more accurate to
             quantize the weight in its original dtype.
+        max_workers: Number of layers quantized at once, for int8.
 
     Returns:
         A quantized model.
@@ -77,7 +80,7 @@ def quantize(  # noqa C901
     if qmode == "int8":
         # Add quantization mode options here: group size, bit width, etc.
         return WeightOnlyInt8QuantHandler(
-            model, precision=checkpoint_torch_dtype
+            model, precision=checkpoint_torch_dtype, max_workers=max_workers
         ).quantized_model()
     elif qmode.startswith("torchao:fpa"):
         pattern = r"torchao:fpa(\d+)w"
@@ -268,6 +271,31 @@ def dynamically_quantize_per_channel(
 ###                QuantHandler API definition                        ###
 
 
+def replace_modules_streaming(
+    model: nn.Module,
+    fqns: List[str],
+    quantize_fn: Callable[[str, nn.Module], nn.Module],
+    max_workers: int = 1,
+) -> nn.Module:
+    """
+    Replaces the submodules of model at fqns with quantize_fn(fqn, submodule),
+    on up to max_workers threads.
+
+    Unlike quantizing a copy of the state dict and loading it into the model, each
+    float submodule is released as soon as its quantized replacement is in place,
+    so peak memory stays close to the size of the model instead of about three times
+    it. Checkpoints loaded with mmap=True are then only read one layer at a time.
+    """
+
+    def _replace(fqn: str) -> None:
+        parent_fqn, _, name = fqn.rpartition(".")
+        parent = model.get_submodule(parent_fqn)
+        setattr(parent, name, quantize_fn(fqn, getattr(parent, name)))
+
+    parallel_map(_replace, fqns, max_workers)
+    return model
+
+
 class QuantHandler:
     def __init__(self, mod):
         self.mod = mod
@@ -289,25 +317,38 @@ class QuantHandler:
 ###             Weight-only int8 per-channel quantized code           ###
 
 
-def replace_linear_weight_only_int8_per_channel(module, node_type):
+def _linear_fqns_weight_only_int8_per_channel(
+    module: nn.Module, node_type: str, prefix: str = ""
+) -> List[str]:
+    """
+    Returns the FQNs of the nn.Linear submodules of module that
+    replace_linear_weight_only_int8_per_channel() replaces, in the same order.
+    """
+    fqns = []
     for name, child in module.named_children():
-        # print(f"name: {name}")
+        fqn = f"{prefix}{name}"
         if isinstance(child, nn.Linear):
             if (
                 (node_type == "*")
                 or (node_type == "output" and name == "output")
                 or (node_type == "!output" and name != "output")
             ):
-                # print(f"{name, child}")
-                # print(f"in_features: {child.in_features}")
-                # print(f"out_features: {child.out_features}")
-                setattr(
-                    module,
-                    name,
-                    WeightOnlyInt8Linear("cpu", child.in_features, child.out_features),
-                )
+                fqns.append(fqn)
         else:
-            replace_linear_weight_only_int8_per_channel(child, node_type)
+            fqns.extend(
+                _linear_fqns_weight_only_int8_per_channel(child, node_type, f"{fqn}.")
+            )
+    return fqns
+
+
+def replace_linear_weight_only_int8_per_channel(module, node_type):
+    return replace_modules_streaming(
+        module,
+        _linear_fqns_weight_only_int8_per_channel(module, node_type),
+        lambda fqn, child: WeightOnlyInt8Linear(
+            "cpu", child.in_features, child.out_features
+        ),
+    )
 
 
 class WeightOnlyInt8QuantHandler(QuantHandler):
@@ -320,6 +361,7 @@ class WeightOnlyInt8QuantHandler(QuantHandler):
         bitwidth: Optional[int] = None,
         group_size: Optional[int] = None,
         precision: torch.dtype = torch.float32,
+        max_workers: int = 1,
     ):
         self.mod = mod
         self.group_size = group_size
@@ -329,20 +371,11 @@ class WeightOnlyInt8QuantHandler(QuantHandler):
         else:
             self.bitwidth = bitwidth
         self.precision = precision
+        # Number of linear layers quantized at once by quantized_model()
+        self.max_workers = max_workers
 
-    @torch.no_grad()
-    def create_quantized_state_dict(self) -> Dict:
-        cur_state_dict = self.mod.state_dict()
-
-        if self.bitwidth == 4:
-            range_min = -8
-            range_max = 7
-        elif self.bitwidth == 8:
-            range_min = -128
-            range_max = 127
-        else:
-            raise ValueError(f"Unsupported bitwidth {self.bitwidth}")
-
+    def _fqns_to_quantize(self) -> List[str]:
+        fqns = []
         for fqn, mod in self.mod.named_modules():
             # print(f"maybe? quantize {fqn}...{type(mod)}")
             if isinstance(mod, torch.nn.Linear) or isinstance(mod, fsLinear):
@@ -355,26 +388,47 @@ class WeightOnlyInt8QuantHandler(QuantHandler):
                         and fqn not in ["output", "final_proj"]
                     )
                 ):
-                    print(
-                        f"quantize {self.node_type} {fqn, mod} with group_size {self.group_size}, bitwidth {self.bitwidth}"
-                    )
+                    fqns.append(fqn)
+        return fqns
 
-                    # print(f"initial weight shape {mod.weight.shape}")
-                    input_weight = mod.weight.float()
-
-                    # print(f"expanded weight shape {input_weight.shape}")
-                    weight, scales, _ = dynamically_quantize_per_channel(
-                        input_weight.to(dtype=self.precision),
-                        range_min,
-                        range_max,
-                        torch.int8,
-                        self.group_size,
-                        scales_dtype=mod.weight.dtype,
-                    )
+    @torch.no_grad()
+    def _quantize_linear(self, fqn, mod) -> Tuple[torch.Tensor, torch.Tensor]:
+        if self.bitwidth == 4:
+            range_min = -8
+            range_max = 7
+        elif self.bitwidth == 8:
+            range_min = -128
+            range_max = 127
+        else:
+            raise ValueError(f"Unsupported bitwidth {self.bitwidth}")
+
+        print(
+            f"quantize {self.node_type} {fqn, mod} with group_size {self.group_size}, bitwidth {self.bitwidth}"
+        )
+
+        # print(f"initial weight shape {mod.weight.shape}")
+        input_weight = mod.weight.float()
+
+        # print(f"expanded weight shape {input_weight.shape}")
+        weight, scales, _ = dynamically_quantize_per_channel(
+            input_weight.to(dtype=self.precision),
+            range_min,
+            range_max,
+            torch.int8,
+            self.group_size,
+            scales_dtype=mod.weight.dtype,
+        )
+        # squeeze makes group_size=rowsize unidimensional
+        return weight, scales.squeeze(dim=-1)
+
+    @torch.no_grad()
+    def create_quantized_state_dict(self) -> Dict:
+        cur_state_dict = self.mod.state_dict()
 
-                    cur_state_dict[f"{fqn}.weight"] = weight
-                    # squeeze makes group_size=rowsize unidimensional
-                    cur_state_dict[f"{fqn}.scales"] = scales.squeeze(dim=-1)
+        for fqn in self._fqns_to_quantize():
+            weight, scales = self._quantize_linear(fqn, self.mod.get_submodule(fqn))
+            cur_state_dict[f"{fqn}.weight"] = weight
+            cur_state_dict[f"{fqn}.scales"] = scales
 
         return cur_state_dict
 
@@ -383,10 +437,25 @@ class WeightOnlyInt8QuantHandler(QuantHandler):
         return self.mod
 
     def quantized_model(self) -> nn.Module:
-        model_updated_state_dict = self.create_quantized_state_dict()
-        self.convert_for_runtime()
-        self.mod.load_state_dict(model_updated_state_dict)
-        return self.mod
+        def _quantize(fqn: str, mod: nn.Module) -> nn.Module:
+            if getattr(mod, "bias", None) is not None:
+                raise ValueError(
+                    f"WeightOnlyInt8Linear does not support the bias of {fqn}"
+                )
+            weight, scales = self._quantize_linear(fqn, mod)
+            quantized_mod = WeightOnlyInt8Linear(
+                "cpu", mod.in_features, mod.out_features
+            )
+            quantized_mod.load_state_dict({"weight": weight, "scales": scales})
+            return quantized_mod
+
+        # Replace the same modules as convert_for_runtime()
+        return replace_modules_streaming(
+            self.mod,
+            _linear_fqns_weight_only_int8_per_channel(self.mod, self.node_type),
+            _quantize,
+            self.max_workers,
+        )
 
 
 class WeightOnlyInt8Linear(torch.nn.Module):
@@ -550,6 +619,7 @@ class EmbeddingQuantHandler(QuantHandler):
         group_size: Optional[int] = None,
         packed=False,
         precision: Optional[torch.dtype] = None,
+        max_workers: int = 1,
     ):
         if isinstance(packed, str):
             packed = packed == "True"
@@ -560,13 +630,15 @@ class EmbeddingQuantHandler(QuantHandler):
         self.packed = packed
         # Dtype of the weights right before quantization.
         self.precision = precision
+        # Number of embeddings quantized at once by quantized_model()
+        self.max_workers = max_workers
         if (bitwidth not in [2, 4]) and packed:
             raise RuntimeError("pack only works with bitsize 2, 4")
 
     @torch.no_grad()
-    def create_quantized_state_dict(self, packed=False) -> Dict:
-        cur_state_dict = self.mod.state_dict()
-
+    def _quantize_embedding(
+        self, fqn, mod, packed=False
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
         if self.bitwidth == 2:
             range_min = -2
             range_max = 1
@@ -579,61 +651,64 @@ class EmbeddingQuantHandler(QuantHandler):
         else:
             raise ValueError(f"Unsupported bitwidth {self.bitwidth}")
 
-        for fqn, mod in self.mod.named_modules():
-            if isinstance(mod, nn.Embedding):
-                # print("****")
-                # print(f"Embedding identified: {fqn, mod}")
-                # print(f"weights size: {mod.weight.size()}")
-                # print(f"quantize {fqn}...")
+        # print("****")
+        # print(f"Embedding identified: {fqn, mod}")
+        # print(f"weights size: {mod.weight.size()}")
+        # print(f"quantize {fqn}...")
+
+        print(
+            f"quantize {fqn, mod} with group_size {self.group_size}, bitwidth {self.bitwidth}"
+        )
+        weight, scales, _ = dynamically_quantize_per_channel(
+            (mod.weight.to(dtype=self.precision) if self.precision else mod.weight),
+            range_min,
+            range_max,
+            torch.int8,
+            self.group_size,
+            scales_dtype=mod.weight.dtype,
+        )
 
-                print(
-                    f"quantize {fqn, mod} with group_size {self.group_size}, bitwidth {self.bitwidth}"
+        if packed:
+            if self.bitwidth == 2:
+                if weight.shape[-1] % 4 != 0:
+                    raise RuntimeError("automatic padding not implemented yet")
+                weight_range_shifted = weight.add(2).view(torch.uint8)
+                weight_view = weight_range_shifted.view(
+                    weight.shape[0], weight.shape[1] // 4, 4
                 )
-                weight, scales, _ = dynamically_quantize_per_channel(
-                    (
-                        mod.weight.to(dtype=self.precision)
-                        if self.precision
-                        else mod.weight
-                    ),
-                    range_min,
-                    range_max,
-                    torch.int8,
-                    self.group_size,
-                    scales_dtype=mod.weight.dtype,
+                weight_0 = weight_view[:, :, 0]
+                weight_1 = weight_view[:, :, 1] << 2
+                weight_2 = weight_view[:, :, 2] << 4
+                weight_3 = weight_view[:, :, 3] << 6
+                weight_packed = weight_0 + weight_1 + weight_2 + weight_3
+                weight = weight_packed
+            elif self.bitwidth == 4:
+                if weight.shape[-1] % 2 != 0:
+                    raise RuntimeError("automatic padding not implemented yet")
+                weight_range_shifted = weight.add(8).view(torch.uint8)
+                weight_view = weight_range_shifted.view(
+                    weight.shape[0], weight.shape[1] // 2, 2
                 )
+                weight_even = weight_view[:, :, 0] * 16  # left shift 4
+                weight_odd = weight_view[:, :, 1]
+                weight_packed = weight_even + weight_odd
+                weight = weight_packed
+
+        weight = weight.to(device=self.device)
+        scales = scales.to(device=self.device)
+        # squeeze makes group_size=rowsize unidimensional
+        return weight, scales.squeeze(dim=-1)
+
+    @torch.no_grad()
+    def create_quantized_state_dict(self, packed=False) -> Dict:
+        cur_state_dict = self.mod.state_dict()
 
-                if packed:
-                    if self.bitwidth == 2:
-                        if weight.shape[-1] % 4 != 0:
-                            raise RuntimeError("automatic padding not implemented yet")
-                        weight_range_shifted = weight.add(2).view(torch.uint8)
-                        weight_view = weight_range_shifted.view(
-                            weight.shape[0], weight.shape[1] // 4, 4
-                        )
-                        weight_0 = weight_view[:, :, 0]
-                        weight_1 = weight_view[:, :, 1] << 2
-                        weight_2 = weight_view[:, :, 2] << 4
-                        weight_3 = weight_view[:, :, 3] << 6
-                        weight_packed = weight_0 + weight_1 + weight_2 + weight_3
-                        weight = weight_packed
-                    elif self.bitwidth == 4:
-                        if weight.shape[-1] % 2 != 0:
-                            raise RuntimeError("automatic padding not implemented yet")
-                        weight_range_shifted = weight.add(8).view(torch.uint8)
-                        weight_view = weight_range_shifted.view(
-                            weight.shape[0], weight.shape[1] // 2, 2
-                        )
-                        weight_even = weight_view[:, :, 0] * 16  # left shift 4
-                        weight_odd = weight_view[:, :, 1]
-                        weight_packed = weight_even + weight_odd
-                        weight = weight_packed
-
-                weight = weight.to(device=self.device)
-                scales = scales.to(device=self.device)
+        for fqn, mod in self.mod.named_modules():
+            if isinstance(mod, nn.Embedding):
+                weight, scales = self._quantize_embedding(fqn, mod, packed)
                 # Update state dict
                 cur_state_dict[f"{fqn}.weight"] = weight
-                # squeeze makes group_size=rowsize unidimensional
-                cur_state_dict[f"{fqn}.scales"] = scales.squeeze(dim=-1)
+                cur_state_dict[f"{fqn}.scales"] = scales
 
         return cur_state_dict
 
@@ -644,10 +719,29 @@ class EmbeddingQuantHandler(QuantHandler):
         return self.mod
 
     def quantized_model(self) -> nn.Module:
-        model_updated_state_dict = self.create_quantized_state_dict(self.packed)
-        self.convert_for_runtime()
-        self.mod.load_state_dict(model_updated_state_dict, assign=True)
-        return self.mod
+        def _quantize(fqn: str, mod: nn.Module) -> nn.Module:
+            weight, scales = self._quantize_embedding(fqn, mod, self.packed)
+            # The buffers are assigned below: do not allocate them
+            quantized_mod = QuantizedGroupEmbedding(
+                device="meta",
+                vocab_size=mod.weight.shape[0],
+                embedding_dim=mod.weight.shape[1],
+                group_size=self.group_size,
+                dtype=mod.weight.dtype,
+                packed=self.packed,
+                bitwidth=self.bitwidth,
+            )
+            quantized_mod.load_state_dict(
+                {"weight": weight, "scales": scales}, assign=True
+            )
+            return quantized_mod
+
+        fqns = [
+            fqn
+            for fqn, mod in self.mod.named_modules()
+            if isinstance(mod, nn.Embedding)
+        ]
+        return replace_modules_streaming(self.mod, fqns, _quantize, self.max_workers)
 
 
 class QuantizedGroupEmbedding(torch.nn.Module):
@@ -734,6 +828,7 @@ def get_quant_embedding_transform(
     embedding_quantize: str,
     use_shared_embedding: bool = False,
     dtype_override: Optional[DType] = None,
+    max_workers: int = 1,
 ):
     if embedding_quantize.startswith("torchao:"):
         from torchao.experimental.quant_api import (
@@ -794,6 +889,7 @@ def get_quant_embedding_transform(
         group_size=group_size,
         packed=(bitwidth in [2, 4]),
         precision=torch_dtype,
+        max_workers=max_workers,
     ).quantized_model()
 
 
@@ -807,6 +903,7 @@ def get_quant_weight_transform(
     calibration_tasks: Optional[list] = None,
     calibration_limit: Optional[int] = None,
     calibration_seq_length: Optional[int] = None,
+    max_workers: int = 1,
 ):
     return partial(
         quantize,
@@ -819,6 +916,7 @@ def get_quant_weight_transform(
         calibration_limit=calibration_limit,
         calibration_seq_length=calibration_seq_length,
         tokenizer_path=(Path(path) if (path := tokenizer_path) is not None else None),
+        max_workers=max_workers,
     )
 
 
@@ -0,0 +1,130 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import copy
+import unittest
+
+import torch
+from executorch.examples.models.llama.source_transformation.quantize import (
+    EmbeddingQuantHandler,
+    get_quant_embedding_transform,
+    get_quant_weight_transform,
+    QuantizedGroupEmbedding,
+    WeightOnlyInt8Linear,
+    WeightOnlyInt8QuantHandler,
+)
+
+
+class Model(torch.nn.Module):
+    def __init__(self) -> None:
+        super().__init__()
+        self.tok_embeddings = torch.nn.Embedding(50, 64)
+        self.layers = torch.nn.ModuleList(
+            [
+                torch.nn.ModuleDict(
+                    {
+                        "wq": torch.nn.Linear(64, 64, bias=False),
+                        "wk": torch.nn.Linear(64, 32, bias=False),
+                    }
+                )
+                for _ in range(3)
+            ]
+        )
+        self.output = torch.nn.Linear(64, 50, bias=False)
+
+
+class QuantizeTests(unittest.TestCase):
+    def setUp(self) -> None:
+        torch.manual_seed(0)
+        self.model = Model()
+
+    def _assert_state_dict_equal(self, model, expected_state_dict) -> None:
+        state_dict = model.state_dict()
+        self.assertEqual(state_dict.keys(), expected_state_dict.keys())
+        for key, expected in expected_state_dict.items():
+            self.assertEqual(state_dict[key].dtype, expected.dtype, key)
+            self.assertTrue(torch.equal(state_dict[key], expected), key)
+
+    def test_weight_only_int8_quantized_model(self) -> None:
+        handler = WeightOnlyInt8QuantHandler(
+            copy.deepcopy(self.model), node_type="!output"
+        )
+        expected_model = handler.convert_for_runtime()
+        expected_model.load_state_dict(
+            WeightOnlyInt8QuantHandler(
+                self.model, node_type="!output"
+            ).create_quantized_state_dict()
+        )
+
+        for max_workers in [1, 4]:
+            model = WeightOnlyInt8QuantHandler(
+                copy.deepcopy(self.model), node_type="!output", max_workers=max_workers
+            ).quantized_model()
+            self.assertIsInstance(model.layers[2].wk, WeightOnlyInt8Linear)
+            self.assertIsInstance(model.output, torch.nn.Linear)
+            self._assert_state_dict_equal(model, expected_model.state_dict())
+
+    def test_weight_only_int8_quantized_model_matches_by_child_name(self) -> None:
+        # Like convert_for_runtime(), node_type "output" matches any nn.Linear
+        # child named output, not only the top-level one.
+        self.model.layers[0]["output"] = torch.nn.Linear(64, 64, bias=False)
+        expected_model = WeightOnlyInt8QuantHandler(
+            copy.deepcopy(self.model), node_type="output"
+        ).convert_for_runtime()
+
+        model = WeightOnlyInt8QuantHandler(
+            self.model, node_type="output", max_workers=4
+        ).quantized_model()
+        self.assertEqual(
+            [type(mod) for mod in model.modules()],
+            [type(mod) for mod in expected_model.modules()],
+        )
+        self.assertIsInstance(model.layers[0]["output"], WeightOnlyInt8Linear)
+        self.assertIsInstance(model.layers[0].wq, torch.nn.Linear)
+
+    def test_quant_transforms_pass_max_workers(self) -> None:
+        expected_state_dict = (
+            get_quant_weight_transform("int8")(copy.deepcopy(self.model))
+        ).state_dict()
+        model = get_quant_embedding_transform("4,32", max_workers=4)(self.model)
+        model = get_quant_weight_transform("int8", max_workers=4)(model)
+        self.assertIsInstance(model.tok_embeddings, QuantizedGroupEmbedding)
+        self.assertIsInstance(model.output, WeightOnlyInt8Linear)
+        for key, expected in expected_state_dict.items():
+            if not key.startswith("tok_embeddings."):
+                self.assertTrue(torch.equal(model.state_dict()[key], expected), key)
+
+    def test_embedding_quantized_model(self) -> None:
+        expected_state_dict = EmbeddingQuantHandler(
+            self.model, bitwidth=4, group_size=32, packed=True
+        ).create_quantized_state_dict(packed=True)
+        expected_state_dict = {
+            key: value
+            for key, value in expected_state_dict.items()
+            if key.startswith("tok_embeddings.")
+        }
+
+        for max_workers in [1, 4]:
+            model = EmbeddingQuantHandler(
+                copy.deepcopy(self.model),
+                bitwidth=4,
+                group_size=32,
+                packed=True,
+                max_workers=max_workers,
+            ).quantized_model()
+            self.assertIsInstance(model.tok_embeddings, QuantizedGroupEmbedding)
+            self._assert_state_dict_equal(
+                model.tok_embeddings,
+                {
+                    key.removeprefix("tok_embeddings."): value
+                    for key, value in expected_state_dict.items()
+                },
+            )
+
+    def test_bias_is_not_supported(self) -> None:
+        self.model.output = torch.nn.Linear(64, 50)
+        with self.assertRaisesRegex(ValueError, "bias of output"):
+            WeightOnlyInt8QuantHandler(self.model).quantized_model()
@@ -0,0 +1,37 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+"""Helpers to run independent pieces of lowering work concurrently."""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Sequence, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def parallel_map(
+    fn: Callable[[T], R], items: Sequence[T], max_workers: int = 1
+) -> List[R]:
+    """
+    Returns [fn(item) for item in items], calling fn on up to `max_workers`
+    threads at once.
+
+    Results are in the order of `items` regardless of the order in which the
+    calls finish, so callers produce the same output for any `max_workers`. If
+    calls fail, the exception of the first failing item is raised once all calls
+    are done.
+
+    Threads share the GIL: this helps when `fn` spends its time in code that
+    releases it, like backend compilers, subprocesses and large tensor copies.
+    """
+    if max_workers <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        futures = [executor.submit(fn, item) for item in items]
+    return [future.result() for future in futures]
@@ -8,11 +8,13 @@
 
 from executorch.exir._serialize._program import (
     deserialize_pte_binary as _deserialize_pte_binary,
+    ProgramView as _ProgramView,
     serialize_pte_binary as _serialize_pte_binary,
 )
 
 # Internal APIs that should not be used outside of exir.
 __all__ = [
     "_deserialize_pte_binary",
+    "_ProgramView",
     "_serialize_pte_binary",
 ]
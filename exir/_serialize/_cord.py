@@ -4,8 +4,19 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
-import io
-from typing import List, Optional, Union
+import errno
+import socket
+from typing import List, Optional, Protocol, Union
+
+
+class SupportsWrite(Protocol):
+    """A binary file-like object, such as an open file or a raw stream."""
+
+    def write(self, data: memoryview, /) -> Optional[int]: ...
+
+
+# Where a Cord can be written to.
+WriteTarget = Union[SupportsWrite, socket.socket]
 
 
 class Cord:
@@ -13,12 +24,13 @@ class Cord:
 
     Users can use a Cord to assemble large files and data blobs using references
     to and slices of other data, instead of copying and appending that data to a
-    `bytes` or `bytearray` object.
+    `bytes` or `bytearray` object. Slices can be appended as `memoryview`s to
+    avoid copying them out of the original data.
     """
 
-    def __init__(self, data: Optional[Union[bytes, "Cord"]] = None) -> None:
+    def __init__(self, data: Optional[Union[bytes, memoryview, "Cord"]] = None) -> None:
         """Initialize Cord data structure."""
-        self._buffers: List[bytes] = []
+        self._buffers: List[Union[bytes, memoryview]] = []
         self._byte_size: int = 0
 
         if data is not None:
@@ -32,18 +44,45 @@ class Cord:
         """Return the contents of the Cord as a single `bytes` object."""
         return b"".join(self._buffers)
 
-    def append(self, data: Union[bytes, "Cord"]) -> None:
-        """Append a bytes or Cord to the current Cord."""
+    def append(self, data: Union[bytes, memoryview, "Cord"]) -> None:
+        """Append a bytes, memoryview or Cord to the current Cord."""
         if isinstance(data, bytes):
             self._buffers.append(data)
             self._byte_size += len(data)
+        elif isinstance(data, memoryview):
+            # Count bytes rather than elements; references the same memory.
+            data = data.cast("B")
+            self._buffers.append(data)
+            self._byte_size += len(data)
         elif isinstance(data, Cord):
             self._buffers.extend(data._buffers)
             self._byte_size += len(data)
         else:
-            raise TypeError(f"Can only append bytes or Cords, received {type(data)}")
+            raise TypeError(
+                f"Can only append bytes, memoryviews or Cords, received {type(data)}"
+            )
+
+    def write_to_file(self, outfile: WriteTarget) -> None:
+        """Write the Cord to a file or a connected socket.
 
-    def write_to_file(self, outfile: io.BufferedIOBase) -> None:
-        """Write the Cord to a file."""
+        Each buffer is written straight from the memory it refers to, so the
+        Cord is never copied into a single contiguous block. Raises a
+        `BlockingIOError` if a non-blocking stream can't accept more data.
+        """
+        if isinstance(outfile, socket.socket):
+            for item in self._buffers:
+                outfile.sendall(item)
+            return
         for item in self._buffers:
-            outfile.write(item)
+            view = memoryview(item)
+            while len(view) > 0:
+                written = outfile.write(view)
+                if written is None:
+                    # Non-blocking raw streams return None when they would
+                    # block; the remaining data must not be dropped.
+                    raise BlockingIOError(
+                        errno.EAGAIN,
+                        "Stream would block before the Cord was fully written",
+                    )
+                # Unbuffered files may write fewer bytes than requested.
+                view = view[written:]
@@ -6,6 +6,7 @@
 
 # pyre-strict
 
+import functools
 import importlib.resources
 import os
 import re
@@ -15,12 +16,27 @@ import subprocess
 import tempfile
 
 from dataclasses import dataclass
-from typing import Callable, Dict, List, Optional, Sequence
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from executorch.exir._serialize._flatbuffer_builder import (
+    _dataclass_to_flatbuffer,
+    _FbsSchema,
+    _parse_schema,
+)
 
 # If this environment variable is set to true, save the flatc input files when
 # serialization fails.
 _SAVE_FLATC_ENV: str = "ET_EXIR_SAVE_FLATC_INPUTS_ON_FAILURE"
 
+# If this environment variable is set to true, serialize programs by converting
+# them to JSON and running flatc, instead of using the in-process builder.
+_SERIALIZE_WITH_FLATC_ENV: str = "ET_EXIR_SERIALIZE_WITH_FLATC"
+
+
+def _serialize_with_flatc() -> bool:
+    """Returns True if the environment asks to serialize through flatc."""
+    return os.getenv(_SERIALIZE_WITH_FLATC_ENV, "").strip() not in {"", "0"}
+
 
 def _is_valid_alignment(alignment: int) -> bool:
     """Returns True if the alignment is valid, or is None."""
@@ -104,6 +120,10 @@ class _ResourceFiles:
         for name in resource_names:
             self._files[name] = importlib.resources.read_binary(__package__, name)
 
+    def names(self) -> List[str]:
+        """Returns the names of all files."""
+        return list(self._files.keys())
+
     def patch_files(self, patch_fn: Callable[[bytes], bytes]) -> None:
         """Uses the provided patching function to update the contents of all
         files. `patch_fn` takes the current contents of a file as input and
@@ -112,6 +132,10 @@ class _ResourceFiles:
         for name in self._files.keys():
             self._files[name] = patch_fn(self._files[name])
 
+    def get(self, name: str) -> bytes:
+        """Returns the current contents of the named file."""
+        return self._files[name]
+
     def write_to(self, out_dir: str) -> None:
         """Writes the files to the specified directory. File names are based on
         the original resource names.
@@ -132,20 +156,24 @@ class _SchemaInfo:
     max_alignment: int
 
 
-def _prepare_schema(
-    out_dir: str,
+# Name of the root program schema resource.
+_PROGRAM_SCHEMA: str = "program.fbs"
+
+
+def _load_schema_files(
     constant_tensor_alignment: Optional[int] = None,
     delegate_alignment: Optional[int] = None,
-) -> _SchemaInfo:
-    """Returns the path to the program schema file after copying it and its deps
-    into out_dir. May patch the schema contents depending on the parameters to
-    this function.
+) -> Tuple[_ResourceFiles, int]:
+    """Loads the program schema and its deps, patching their alignments.
+
+    Returns:
+        The patched schema files, and an alignment value that can satisfy all
+        "force_align" entries found in them.
     """
-    program_schema = "program.fbs"
     # Included by the root program schema; must also be present.
     deps = ["scalar_type.fbs"]
 
-    schemas = _ResourceFiles([program_schema] + deps)
+    schemas = _ResourceFiles([_PROGRAM_SCHEMA] + deps)
 
     # Update annotated alignments in the schema files.
     schemas.patch_files(
@@ -158,16 +186,46 @@ def _prepare_schema(
     # Find the largest alignment used in the patched schema files.
     get_alignments = _SchemaMaxAlignmentGetter()
     schemas.patch_files(get_alignments)
+    return schemas, get_alignments.max_alignment
+
+
+def _prepare_schema(
+    out_dir: str,
+    constant_tensor_alignment: Optional[int] = None,
+    delegate_alignment: Optional[int] = None,
+) -> _SchemaInfo:
+    """Returns the path to the program schema file after copying it and its deps
+    into out_dir. May patch the schema contents depending on the parameters to
+    this function.
+    """
+    schemas, max_alignment = _load_schema_files(
+        constant_tensor_alignment=constant_tensor_alignment,
+        delegate_alignment=delegate_alignment,
+    )
 
     # Write the patched schema files to the filesystem.
     schemas.write_to(out_dir)
 
     return _SchemaInfo(
-        root_path=os.path.join(out_dir, program_schema),
-        max_alignment=get_alignments.max_alignment,
+        root_path=os.path.join(out_dir, _PROGRAM_SCHEMA),
+        max_alignment=max_alignment,
     )
 
 
+@functools.lru_cache(maxsize=8)
+def _load_parsed_program_schema(
+    constant_tensor_alignment: Optional[int] = None,
+    delegate_alignment: Optional[int] = None,
+) -> Tuple[_FbsSchema, int]:
+    """Returns the parsed, patched program schema and its max alignment."""
+    schemas, max_alignment = _load_schema_files(
+        constant_tensor_alignment=constant_tensor_alignment,
+        delegate_alignment=delegate_alignment,
+    )
+    files = {name: schemas.get(name) for name in schemas.names()}
+    return _parse_schema(files, _PROGRAM_SCHEMA), max_alignment
+
+
 @dataclass
 class _FlatbufferResult:
     # Serialized flatbuffer data.
@@ -319,6 +377,39 @@ def _program_json_to_flatbuffer(
             )
 
 
+def _program_to_flatbuffer(
+    program: Any,  # pyre-ignore[2]: Program dataclass; avoids a schema dep.
+    *,
+    constant_tensor_alignment: Optional[int] = None,
+    delegate_alignment: Optional[int] = None,
+) -> _FlatbufferResult:
+    """Converts a Program dataclass into binary flatbuffer data in-process.
+
+    Produces the same bytes as passing `_program_to_json(program)` to
+    `_program_json_to_flatbuffer()`, but without the JSON round trip, temp
+    files or the `flatc` subprocess. Large byte blobs like constant and
+    delegate data are only copied once, into the final output.
+
+    Args:
+        program: The Program to convert.
+        constant_tensor_alignment: If provided, the alignment to use for tensor
+            data embedded in the output flatbuffer data. If not provided, uses
+            the alignment in the schema.
+        delegate_alignment: If provided, the alignment to use for delegate
+            data embedded in the output flatbuffer data. If not provided, uses
+            the alignment in the schema.
+
+    Returns: The flatbuffer data and associated metadata.
+    """
+    schema, max_alignment = _load_parsed_program_schema(
+        constant_tensor_alignment=constant_tensor_alignment,
+        delegate_alignment=delegate_alignment,
+    )
+    return _FlatbufferResult(
+        data=_dataclass_to_flatbuffer(program, schema), max_alignment=max_alignment
+    )
+
+
 def _replace_infinity_in_json_file(content: bytes) -> bytes:
     """Replace -inf and inf with "inf" and "-inf" in the JSON file. program.fbs
     is used to convert from flatbuffer to JSON. +-inf float values are not
@@ -0,0 +1,731 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+"""In-process flatbuffer serialization of schema dataclasses.
+
+Serializing through `flatc` requires dumping the dataclasses to JSON, writing
+the JSON to disk and launching a subprocess, which is slow and memory hungry
+for large programs. This module parses the `.fbs` schema files directly and
+writes the dataclasses into a flatbuffer using the same algorithm that the
+`flatc` JSON parser uses, so the output is byte-identical to the flatc path.
+"""
+
+import enum
+import re
+import struct
+
+from dataclasses import dataclass, field, fields, is_dataclass
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+
+# Little-endian struct formats for each flatbuffer scalar type.
+_SCALAR_FORMATS: Dict[str, str] = {
+    "bool": "B",
+    "byte": "b",
+    "ubyte": "B",
+    "int8": "b",
+    "uint8": "B",
+    "short": "h",
+    "ushort": "H",
+    "int16": "h",
+    "uint16": "H",
+    "int": "i",
+    "uint": "I",
+    "int32": "i",
+    "uint32": "I",
+    "long": "q",
+    "ulong": "Q",
+    "int64": "q",
+    "uint64": "Q",
+    "float": "f",
+    "double": "d",
+    "float32": "f",
+    "float64": "d",
+}
+
+# Size in bytes of offsets to strings, vectors and tables (uoffset_t).
+_UOFFSET_SIZE: int = 4
+
+# Size in bytes of the file identifier that follows the root offset.
+_FILE_IDENTIFIER_LENGTH: int = 4
+
+
+class _UnsupportedSchemaError(ValueError):
+    """Raised when a schema uses a feature that the in-process serializer does
+    not support. Callers fall back to `flatc`, which supports the full IDL.
+    """
+
+
+@dataclass
+class _FbsType:
+    """The type of a field, or of the elements of a vector field.
+
+    Attributes:
+        name: The schema name of the type, e.g. "uint", "string" or "Tensor".
+        kind: One of "scalar", "enum", "string", "table", "union" or "vector".
+        element: For vectors, the type of the elements.
+        scalar: For scalars and enums, the underlying scalar type name.
+    """
+
+    name: str
+    kind: str
+    element: Optional["_FbsType"] = None
+    scalar: Optional[str] = None
+
+    @property
+    def inline_size(self) -> int:
+        """Size in bytes that a value of this type takes inside a table."""
+        if self.scalar is not None:
+            return struct.calcsize("<" + _SCALAR_FORMATS[self.scalar])
+        return _UOFFSET_SIZE
+
+    @property
+    def format(self) -> str:
+        """The struct format of a scalar or enum type."""
+        assert self.scalar is not None, f"{self.name} is not a scalar type"
+        return "<" + _SCALAR_FORMATS[self.scalar]
+
+
+@dataclass
+class _FbsField:
+    name: str
+    # Index of the field in the vtable. Union fields occupy two ids: the
+    # implicit "<name>_type" field, followed by the value itself.
+    id: int
+    type: _FbsType
+    # Default value of scalar fields; omitted from the output when equal.
+    default: Union[int, float] = 0
+    # The "force_align" attribute of vector fields, if present.
+    force_align: Optional[int] = None
+    deprecated: bool = False
+
+    @property
+    def voffset(self) -> int:
+        """Offset of this field's entry in the vtable."""
+        return (self.id + 2) * 2
+
+
+@dataclass
+class _FbsTable:
+    name: str
+    fields: Dict[str, _FbsField] = field(default_factory=dict)
+
+
+@dataclass
+class _FbsUnion:
+    name: str
+    # Maps union member names (aliases, if present) to their type index and
+    # table type name. Index 0 is reserved for NONE.
+    members: Dict[str, Tuple[int, str]] = field(default_factory=dict)
+
+
+@dataclass
+class _FbsSchema:
+    """The subset of a flatbuffer schema needed to serialize dataclasses."""
+
+    tables: Dict[str, _FbsTable]
+    unions: Dict[str, _FbsUnion]
+    enums: Dict[str, Tuple[str, Dict[str, int]]]
+    root_type: Optional[str]
+    file_identifier: Optional[str]
+
+
+class _FbsParser:
+    """Parses the subset of the flatbuffer IDL used by ExecuTorch schemas.
+
+    Supports includes, namespaces, enums, unions (including aliased members),
+    tables, field defaults and field attributes. Structs are rejected with an
+    `_UnsupportedSchemaError`.
+    """
+
+    _TOKEN_REGEX: "re.Pattern[str]" = re.compile(
+        r'\s*(?:(//[^\n]*)|("(?:[^"\\]|\\.)*")|([A-Za-z_][A-Za-z0-9_.]*)'
+        r"|([-+]?[0-9][0-9a-zA-Z_.+-]*)|(.))",
+        re.DOTALL,
+    )
+
+    def __init__(self, files: Mapping[str, bytes]) -> None:
+        self._files = files
+        self._parsed: set[str] = set()
+        self._tokens: List[str] = []
+        self._pos: int = 0
+        # Raw declarations, resolved once every file has been read.
+        self._table_decls: Dict[str, List[Tuple[str, Any, Optional[str], Dict]]] = {}
+        self._union_decls: Dict[str, List[Tuple[str, str, Optional[int]]]] = {}
+        self._enums: Dict[str, Tuple[str, Dict[str, int]]] = {}
+        self._root_type: Optional[str] = None
+        self._file_identifier: Optional[str] = None
+
+    def parse(self, root_file: str) -> _FbsSchema:
+        self._parse_file(root_file)
+        tables = {
+            name: self._resolve_table(name, decls)
+            for name, decls in self._table_decls.items()
+        }
+        unions: Dict[str, _FbsUnion] = {}
+        for name, members in self._union_decls.items():
+            union = _FbsUnion(name=name)
+            next_value = 1
+            for member_name, type_name, value in members:
+                if value is not None:
+                    next_value = value
+                union.members[member_name] = (next_value, type_name)
+                next_value += 1
+            unions[name] = union
+        return _FbsSchema(
+            tables=tables,
+            unions=unions,
+            enums=self._enums,
+            root_type=self._root_type,
+            file_identifier=self._file_identifier,
+        )
+
+    def _tokenize(self, text: str) -> List[str]:
+        tokens = []
+        for match in self._TOKEN_REGEX.finditer(text):
+            comment, string, ident, number, punct = match.groups()
+            if comment is not None:
+                continue
+            token = next(
+                (t for t in (string, ident, number, punct) if t is not None), None
+            )
+            if token is not None and token.strip():
+                tokens.append(token)
+        return tokens
+
+    def _parse_file(self, name: str) -> None:
+        if name in self._parsed:
+            return
+        self._parsed.add(name)
+        if name not in self._files:
+            raise ValueError(f"Schema file {name} not found")
+        saved = (self._tokens, self._pos)
+        self._tokens = self._tokenize(self._files[name].decode("utf-8"))
+        self._pos = 0
+        while self._pos < len(self._tokens):
+            self._parse_declaration()
+        self._tokens, self._pos = saved
+
+    def _peek(self) -> str:
+        if self._pos >= len(self._tokens):
+            raise ValueError("Unexpected end of schema")
+        return self._tokens[self._pos]
+
+    def _next(self) -> str:
+        token = self._peek()
+        self._pos += 1
+        return token
+
+    def _expect(self, expected: str) -> None:
+        token = self._next()
+        if token != expected:
+            raise ValueError(f"Expected {repr(expected)} in schema, saw {repr(token)}")
+
+    def _parse_attributes(self) -> Dict[str, Optional[str]]:
+        attributes: Dict[str, Optional[str]] = {}
+        if self._peek() != "(":
+            return attributes
+        self._next()
+        while self._peek() != ")":
+            key = self._next()
+            value = None
+            if self._peek() == ":":
+                self._next()
+                value = self._next()
+            attributes[key] = value
+            if self._peek() == ",":
+                self._next()
+        self._next()
+        return attributes
+
+    def _parse_declaration(self) -> None:
+        keyword = self._next()
+        if keyword == "include":
+            path = self._next().strip('"')
+            self._expect(";")
+            self._parse_file(path.rsplit("/", 1)[-1])
+        elif keyword in ("namespace", "root_type", "file_identifier"):
+            value = self._next()
+            self._expect(";")
+            if keyword == "root_type":
+                self._root_type = value
+            elif keyword == "file_identifier":
+                self._file_identifier = value.strip('"')
+        elif keyword in ("file_extension", "attribute"):
+            self._next()
+            self._expect(";")
+        elif keyword == "enum":
+            self._parse_enum()
+        elif keyword == "union":
+            self._parse_union()
+        elif keyword == "table":
+            self._parse_table()
+        elif keyword == "struct":
+            raise _UnsupportedSchemaError(
+                f"Struct {self._peek()} is not supported by the in-process "
+                + "flatbuffer serializer; use flatc for this schema"
+            )
+        elif keyword != ";":
+            raise ValueError(f"Unexpected token {repr(keyword)} in schema")
+
+    def _parse_enum(self) -> None:
+        name = self._next()
+        self._expect(":")
+        underlying = self._next()
+        self._parse_attributes()
+        self._expect("{")
+        values: Dict[str, int] = {}
+        next_value = 0
+        while self._peek() != "}":
+            value_name = self._next()
+            if self._peek() == "=":
+                self._next()
+                next_value = int(self._next(), 0)
+            values[value_name] = next_value
+            next_value += 1
+            if self._peek() == ",":
+                self._next()
+        self._next()
+        self._enums[name] = (underlying, values)
+
+    def _parse_union(self) -> None:
+        name = self._next()
+        self._parse_attributes()
+        self._expect("{")
+        members: List[Tuple[str, str, Optional[int]]] = []
+        while self._peek() != "}":
+            member_name = self._next()
+            type_name = member_name
+            value = None
+            if self._peek() == ":":
+                self._next()
+                type_name = self._next()
+            if self._peek() == "=":
+                self._next()
+                value = int(self._next(), 0)
+            members.append((member_name, type_name, value))
+            if self._peek() == ",":
+                self._next()
+        self._next()
+        self._union_decls[name] = members
+
+    def _parse_table(self) -> None:
+        name = self._next()
+        self._parse_attributes()
+        self._expect("{")
+        decls = []
+        while self._peek() != "}":
+            field_name = self._next()
+            self._expect(":")
+            if self._peek() == "[":
+                self._next()
+                field_type: Any = ("vector", self._next())
+                self._expect("]")
+            else:
+                field_type = self._next()
+            default = None
+            if self._peek() == "=":
+                self._next()
+                default = self._next()
+            attributes = self._parse_attributes()
+            self._expect(";")
+            decls.append((field_name, field_type, default, attributes))
+        self._next()
+        self._table_decls[name] = decls
+
+    def _resolve_type(self, type_name: str) -> _FbsType:
+        # Types are looked up by their unqualified names, e.g. for
+        # "executorch_flatbuffer.ScalarType" from an included file.
+        type_name = type_name.rsplit(".", 1)[-1]
+        if type_name in _SCALAR_FORMATS:
+            return _FbsType(name=type_name, kind="scalar", scalar=type_name)
+        if type_name == "string":
+            return _FbsType(name=type_name, kind="string")
+        if type_name in self._enums:
+            return _FbsType(
+                name=type_name, kind="enum", scalar=self._enums[type_name][0]
+            )
+        if type_name in self._union_decls:
+            return _FbsType(name=type_name, kind="union")
+        if type_name in self._table_decls:
+            return _FbsType(name=type_name, kind="table")
+        raise ValueError(f"Unknown schema type {repr(type_name)}")
+
+    def _resolve_default(
+        self, field_type: _FbsType, default: Optional[str]
+    ) -> Union[int, float]:
+        if default is None or field_type.scalar is None:
+            return 0
+        if default in ("true", "false"):
+            return int(default == "true")
+        if field_type.kind == "enum" and default in self._enums[field_type.name][1]:
+            return self._enums[field_type.name][1][default]
+        if field_type.scalar in ("float", "double", "float32", "float64"):
+            return float(default)
+        return int(default, 0)
+
+    def _resolve_table(
+        self, name: str, decls: List[Tuple[str, Any, Optional[str], Dict]]
+    ) -> _FbsTable:
+        table = _FbsTable(name=name)
+        next_id = 0
+        for field_name, type_decl, default, attributes in decls:
+            if isinstance(type_decl, tuple):
+                element = self._resolve_type(type_decl[1])
+                field_type = _FbsType(
+                    name=f"[{element.name}]", kind="vector", element=element
+                )
+            else:
+                field_type = self._resolve_type(type_decl)
+            deprecated = "deprecated" in attributes
+            if field_type.kind == "union":
+                # Unions are represented by an implicit type field followed by
+                # the value field.
+                table.fields[field_name + "_type"] = _FbsField(
+                    name=field_name + "_type",
+                    id=next_id,
+                    type=_FbsType(name="ubyte", kind="scalar", scalar="ubyte"),
+                    deprecated=deprecated,
+                )
+                next_id += 1
+            force_align = attributes.get("force_align")
+            table.fields[field_name] = _FbsField(
+                name=field_name,
+                id=next_id,
+                type=field_type,
+                default=self._resolve_default(field_type, default),
+                force_align=int(force_align) if force_align is not None else None,
+                deprecated=deprecated,
+            )
+            next_id += 1
+        return table
+
+
+def _parse_schema(files: Mapping[str, bytes], root_file: str) -> _FbsSchema:
+    """Parses the schema in `root_file` and any schema files it includes.
+
+    Args:
+        files: Map of schema file names to their contents. Included files are
+            looked up by their base name.
+        root_file: Name of the schema file containing the root type.
+
+    Returns:
+        The parsed schema.
+    """
+    return _FbsParser(files).parse(root_file)
+
+
+def _padding_bytes(size: int, alignment: int) -> int:
+    """Returns the padding needed to align `size` to `alignment`."""
+    return (-size) & (alignment - 1)
+
+
+class _FlatBufferBuilder:
+    """A minimal port of the C++ `flatbuffers::FlatBufferBuilder`.
+
+    Like the C++ builder, data is written back to front: offsets are measured
+    from the end of the buffer, and every value must be fully serialized before
+    the objects that refer to it. Data is kept as a list of chunks rather than
+    a contiguous buffer so that large byte vectors are referenced, not copied,
+    until `finish()` joins them.
+    """
+
+    def __init__(self) -> None:
+        # Chunks of output data, in reverse order.
+        self._chunks: List[Union[bytes, memoryview]] = []
+        self._size: int = 0
+        self._minalign: int = 1
+        # (offset, voffset) pairs of the fields of the table being built.
+        self._field_locs: List[Tuple[int, int]] = []
+        self._max_voffset: int = 0
+        # Maps the contents of every vtable written so far to its offset.
+        self._vtables: Dict[bytes, int] = {}
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def _push(self, data: Union[bytes, memoryview]) -> None:
+        if len(data) > 0:
+            self._chunks.append(data)
+            self._size += len(data)
+
+    def _fill(self, num_bytes: int) -> None:
+        self._push(b"\x00" * num_bytes)
+
+    def _track_min_align(self, alignment: int) -> None:
+        self._minalign = max(self._minalign, alignment)
+
+    def _align(self, elem_size: int) -> None:
+        self._track_min_align(elem_size)
+        self._fill(_padding_bytes(self._size, elem_size))
+
+    def _pre_align(self, length: int, alignment: int) -> None:
+        """Aligns such that the buffer is aligned after writing `length` bytes."""
+        if length == 0:
+            return
+        self._track_min_align(alignment)
+        self._fill(_padding_bytes(self._size + length, alignment))
+
+    def _refer_to(self, offset: int) -> int:
+        """Returns the relative offset from the next uoffset_t to `offset`."""
+        self._align(_UOFFSET_SIZE)
+        return self._size - offset + _UOFFSET_SIZE
+
+    def push_scalar(self, fmt: str, value: Union[int, float]) -> int:
+        """Writes a single aligned scalar and returns its offset."""
+        data = struct.pack(fmt, value)
+        self._align(len(data))
+        self._push(data)
+        return self._size
+
+    def push_offset(self, offset: int) -> int:
+        """Writes a uoffset_t that refers to `offset`."""
+        return self.push_scalar("<I", self._refer_to(offset))
+
+    def push_bytes(self, data: Union[bytes, memoryview]) -> None:
+        """Writes raw data without any alignment."""
+        self._push(data)
+
+    def start_table(self) -> int:
+        return self._size
+
+    def add_scalar(
+        self,
+        voffset: int,
+        fmt: str,
+        value: Union[int, float],
+        default: Union[int, float],
+    ) -> None:
+        """Adds a scalar field to the current table unless it equals `default`."""
+        if value == default:
+            return
+        offset = self.push_scalar(fmt, value)
+        self._field_locs.append((offset, voffset))
+        self._max_voffset = max(self._max_voffset, voffset)
+
+    def add_offset(self, voffset: int, offset: int) -> None:
+        """Adds a field that refers to a string, vector or table."""
+        self.add_scalar(voffset, "<I", self._refer_to(offset), 0)
+
+    def end_table(self, start: int) -> int:
+        """Writes the vtable of the current table and returns the table offset."""
+        # The table begins with an soffset_t to its vtable.
+        self._align(4)
+        table_offset = self._size + 4
+        vtable_size = max(self._max_voffset + 2, 4)
+        table_object_size = table_offset - start
+        if table_object_size >= 0x10000:
+            raise ValueError(f"Table size {table_object_size} exceeds 64KiB")
+        vtable = bytearray(vtable_size)
+        struct.pack_into("<HH", vtable, 0, vtable_size, table_object_size)
+        for offset, voffset in self._field_locs:
+            struct.pack_into("<H", vtable, voffset, table_offset - offset)
+        self._field_locs = []
+        self._max_voffset = 0
+
+        # Reuse an identical vtable if one was written before.
+        key = bytes(vtable)
+        vtable_offset = self._vtables.get(key)
+        if vtable_offset is None:
+            vtable_offset = table_offset + vtable_size
+            self._vtables[key] = vtable_offset
+            self._push(struct.pack("<i", vtable_offset - table_offset))
+            self._push(key)
+        else:
+            self._push(struct.pack("<i", vtable_offset - table_offset))
+        return table_offset
+
+    def create_string(self, data: bytes) -> int:
+        """Writes a null-terminated string and returns its offset."""
+        self._pre_align(len(data) + 1, _UOFFSET_SIZE)
+        self._fill(1)
+        self._push(data)
+        return self.push_scalar("<I", len(data))
+
+    def start_vector(
+        self, count: int, elem_size: int, force_align: Optional[int] = None
+    ) -> None:
+        """Prepares to write `count` elements of `elem_size` bytes each."""
+        if force_align is not None and force_align > 1 and count > 0:
+            self._pre_align(count * elem_size, force_align)
+        self._pre_align(count * elem_size, _UOFFSET_SIZE)
+        self._pre_align(count * elem_size, elem_size)
+
+    def end_vector(self, count: int) -> int:
+        """Writes the vector length and returns the vector offset."""
+        return self.push_scalar("<I", count)
+
+    def finish(self, root: int, file_identifier: Optional[str] = None) -> bytes:
+        """Writes the root offset and returns the finished flatbuffer data."""
+        identifier = file_identifier.encode("ascii") if file_identifier else b""
+        if identifier and len(identifier) != _FILE_IDENTIFIER_LENGTH:
+            raise ValueError(f"Invalid file identifier {repr(file_identifier)}")
+        self._pre_align(_UOFFSET_SIZE + len(identifier), self._minalign)
+        self._push(identifier)
+        self.push_offset(root)
+        data = b"".join(reversed(self._chunks))
+        self._chunks = []
+        return data
+
+
+def _to_scalar(fbs_type: _FbsType, value: Any) -> Union[int, float]:
+    """Converts a dataclass field value into a number for a scalar field."""
+    if isinstance(value, str):
+        # Infinite doubles are stored as strings; see schema.Double.
+        return float(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    if fbs_type.scalar in ("float", "double", "float32", "float64"):
+        return float(value)
+    return int(value)
+
+
+class _DataclassSerializer:
+    """Serializes dataclasses into a flatbuffer described by a schema.
+
+    Dataclass fields map to schema fields by name. A field holding a union
+    value maps to the schema union, and its type is the union member whose name
+    matches the class name of the value. Fields set to None are omitted.
+
+    The order in which objects are written mirrors the `flatc` JSON parser
+    when given the output of `_DataclassEncoder`: children are serialized in
+    dataclass field order (with union type fields following their values), and
+    table fields are then added largest-first, in reverse order within each
+    size.
+    """
+
+    def __init__(self, schema: _FbsSchema) -> None:
+        self._schema = schema
+        self._builder = _FlatBufferBuilder()
+
+    def serialize(self, root: Any, root_type: Optional[str] = None) -> bytes:
+        root_type = root_type or self._schema.root_type
+        if root_type is None:
+            raise ValueError("Schema does not declare a root_type")
+        offset = self._serialize_table(root, self._schema.tables[root_type])
+        return self._builder.finish(offset, self._schema.file_identifier)
+
+    def _serialize_table(self, obj: Any, table: _FbsTable) -> int:
+        if not is_dataclass(obj):
+            raise TypeError(f"Expected a dataclass for table {table.name}, saw {obj}")
+        stack: List[Tuple[_FbsField, Union[int, float]]] = []
+        for dataclass_field in fields(obj):
+            value = getattr(obj, dataclass_field.name)
+            if value is None:
+                continue
+            schema_field = table.fields.get(dataclass_field.name)
+            if schema_field is None:
+                raise ValueError(
+                    f"Field {dataclass_field.name} of {type(obj).__name__} "
+                    + f"is not in schema table {table.name}"
+                )
+            if schema_field.deprecated:
+                continue
+            field_type = schema_field.type
+            if field_type.kind == "union":
+                union = self._schema.unions[field_type.name]
+                member_name = type(value).__name__
+                if member_name not in union.members:
+                    raise ValueError(
+                        f"{member_name} is not a member of union {union.name}"
+                    )
+                type_index, type_name = union.members[member_name]
+                offset = self._serialize_table(value, self._schema.tables[type_name])
+                stack.append((schema_field, offset))
+                stack.append((table.fields[dataclass_field.name + "_type"], type_index))
+            else:
+                stack.append(
+                    (
+                        schema_field,
+                        self._serialize_value(schema_field, field_type, value),
+                    )
+                )
+
+        builder = self._builder
+        start = builder.start_table()
+        for size in (8, 4, 2, 1):
+            for schema_field, value in reversed(stack):
+                field_type = schema_field.type
+                if field_type.inline_size != size:
+                    continue
+                if field_type.scalar is None:
+                    builder.add_offset(schema_field.voffset, int(value))
+                else:
+                    builder.add_scalar(
+                        schema_field.voffset,
+                        field_type.format,
+                        value,
+                        schema_field.default,
+                    )
+        return builder.end_table(start)
+
+    def _serialize_value(
+        self, schema_field: _FbsField, field_type: _FbsType, value: Any
+    ) -> Union[int, float]:
+        """Serializes any children of a value, and returns what to store in the
+        table: either a scalar, or the offset of the serialized child.
+        """
+        if field_type.scalar is not None:
+            return _to_scalar(field_type, value)
+        if field_type.kind == "string":
+            return self._builder.create_string(value.encode("utf-8"))
+        if field_type.kind == "table":
+            return self._serialize_table(value, self._schema.tables[field_type.name])
+        if field_type.kind == "vector":
+            return self._serialize_vector(schema_field, field_type, value)
+        raise ValueError(f"Cannot serialize {field_type.name} in {schema_field.name}")
+
+    def _serialize_vector(
+        self, schema_field: _FbsField, field_type: _FbsType, items: Any
+    ) -> int:
+        element = field_type.element
+        assert element is not None
+        builder = self._builder
+        if element.scalar is not None:
+            fmt = element.format
+            elem_size = element.inline_size
+            if fmt == "<B" and isinstance(items, (bytes, bytearray, memoryview)):
+                # Byte blobs such as tensor data are referenced, not copied.
+                data = memoryview(items).cast("B")
+                count = len(data)
+            else:
+                count = len(items)
+                data = struct.pack(
+                    f"<{count}{fmt[1:]}", *(_to_scalar(element, i) for i in items)
+                )
+            builder.start_vector(count, elem_size, schema_field.force_align)
+            builder.push_bytes(data)
+            return builder.end_vector(count)
+
+        if element.kind not in ("string", "table"):
+            raise ValueError(f"Vectors of {element.name} are not supported")
+        offsets = [
+            int(self._serialize_value(schema_field, element, item)) for item in items
+        ]
+        builder.start_vector(len(offsets), _UOFFSET_SIZE, schema_field.force_align)
+        for offset in reversed(offsets):
+            builder.push_offset(offset)
+        return builder.end_vector(len(offsets))
+
+
+def _dataclass_to_flatbuffer(
+    root: Any, schema: _FbsSchema, root_type: Optional[str] = None
+) -> bytes:
+    """Serializes a tree of dataclasses into binary flatbuffer data.
+
+    Args:
+        root: The dataclass instance to serialize as the root table.
+        schema: The parsed schema describing the binary layout.
+        root_type: The schema table of `root`. Defaults to the schema's
+            root_type.
+
+    Returns:
+        The flatbuffer data, identical to what `flatc --binary` produces for
+        the JSON encoding of `root`.
+    """
+    return _DataclassSerializer(schema).serialize(root, root_type)
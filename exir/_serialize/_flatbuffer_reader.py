@@ -0,0 +1,318 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+"""Lazy, read-only access to binary flatbuffer data.
+
+The views in this module decode fields only when they are accessed, directly
+from the underlying buffer. Nothing is copied up front, so inspecting a few
+fields of a multi-GB file is cheap, and byte vectors are returned as
+`memoryview`s into the original data.
+"""
+
+import enum
+import struct
+from dataclasses import fields
+from typing import (
+    Any,
+    Dict,
+    get_args,
+    get_origin,
+    get_type_hints,
+    Iterator,
+    List,
+    Optional,
+    overload,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from executorch.exir._serialize._dataclass import _is_optional
+from executorch.exir._serialize._flatbuffer_builder import (
+    _FbsField,
+    _FbsSchema,
+    _FbsTable,
+    _FbsType,
+)
+
+# pyre-ignore[5]: Either a bytes-like object, or a memoryview into one.
+_Buffer = Union[bytes, bytearray, memoryview]
+
+
+def _read_uoffset(buf: memoryview, pos: int) -> int:
+    """Returns the absolute position referred to by the uoffset_t at `pos`."""
+    return pos + struct.unpack_from("<I", buf, pos)[0]
+
+
+def _read_value(
+    buf: memoryview, schema: _FbsSchema, fbs_type: _FbsType, pos: int
+) -> Any:  # pyre-ignore[3]
+    """Decodes the value of type `fbs_type` stored at `pos`."""
+    if fbs_type.scalar is not None:
+        value = struct.unpack_from(fbs_type.format, buf, pos)[0]
+        return bool(value) if fbs_type.scalar == "bool" else value
+    target = _read_uoffset(buf, pos)
+    if fbs_type.kind == "string":
+        length = struct.unpack_from("<I", buf, target)[0]
+        return str(buf[target + 4 : target + 4 + length], "utf-8")
+    if fbs_type.kind == "table":
+        return _FlatbufferTable(buf, schema, schema.tables[fbs_type.name], target)
+    if fbs_type.kind == "vector":
+        element = fbs_type.element
+        assert element is not None
+        length = struct.unpack_from("<I", buf, target)[0]
+        if element.scalar in ("ubyte", "uint8"):
+            # Blobs like tensor and delegate data; don't copy them.
+            return buf[target + 4 : target + 4 + length]
+        return _FlatbufferVector(buf, schema, element, target + 4, length)
+    raise ValueError(f"Cannot read values of type {fbs_type.name}")
+
+
+class _FlatbufferVector(Sequence[Any]):
+    """A lazily-decoded, read-only flatbuffer vector."""
+
+    def __init__(
+        self,
+        buf: memoryview,
+        schema: _FbsSchema,
+        element: _FbsType,
+        start: int,
+        length: int,
+    ) -> None:
+        self._buf = buf
+        self._schema = schema
+        self._element = element
+        self._start = start
+        self._length = length
+
+    def __len__(self) -> int:
+        return self._length
+
+    @overload
+    def __getitem__(self, index: int) -> Any: ...  # pyre-ignore[3]
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[Any]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:  # pyre-ignore[3]
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(f"Index {index} out of range for length {self._length}")
+        pos = self._start + index * self._element.inline_size
+        return _read_value(self._buf, self._schema, self._element, pos)
+
+    def __iter__(self) -> Iterator[Any]:
+        for i in range(self._length):
+            yield self[i]
+
+    def __repr__(self) -> str:
+        return f"[{', '.join(repr(v) for v in self)}]"
+
+
+class _FlatbufferTable:
+    """A lazily-decoded, read-only flatbuffer table.
+
+    Fields are accessed as attributes, using the names from the schema.
+    Missing scalar fields return their default value, and missing non-scalar
+    fields return None. Union fields return a view of the member table, whose
+    `type_name` is the name of the union member; the `<field>_type` attribute
+    returns the numeric union type.
+    """
+
+    def __init__(
+        self,
+        buf: memoryview,
+        schema: _FbsSchema,
+        table: _FbsTable,
+        pos: int,
+        type_name: Optional[str] = None,
+    ) -> None:
+        self._buf = buf
+        self._schema = schema
+        self._table = table
+        self._pos = pos
+        self._vtable: int = pos - struct.unpack_from("<i", buf, pos)[0]
+        self._vtable_size: int = struct.unpack_from("<H", buf, self._vtable)[0]
+        self.type_name: str = type_name or table.name
+
+    def _field_position(self, field: _FbsField) -> Optional[int]:
+        """Returns the absolute position of the field, or None if not present."""
+        if field.voffset >= self._vtable_size:
+            return None
+        offset = struct.unpack_from("<H", self._buf, self._vtable + field.voffset)[0]
+        return self._pos + offset if offset else None
+
+    def has_field(self, name: str) -> bool:
+        """Returns True if the field is present in the serialized data."""
+        return self._field_position(self._get_schema_field(name)) is not None
+
+    def field_names(self) -> Sequence[str]:
+        """Returns the names of all fields of this table in the schema."""
+        return list(self._table.fields.keys())
+
+    def _get_schema_field(self, name: str) -> _FbsField:
+        field = self._table.fields.get(name)
+        if field is None:
+            raise AttributeError(f"Table {self._table.name} has no field {name}")
+        return field
+
+    def __getattr__(self, name: str) -> Any:  # pyre-ignore[3]
+        if name.startswith("_"):
+            raise AttributeError(name)
+        field = self._get_schema_field(name)
+        pos = self._field_position(field)
+        if pos is None:
+            return field.default if field.type.scalar is not None else None
+        if field.type.kind == "union":
+            type_index = getattr(self, name + "_type")
+            union = self._schema.unions[field.type.name]
+            for member_name, (index, table_name) in union.members.items():
+                if index == type_index:
+                    return _FlatbufferTable(
+                        self._buf,
+                        self._schema,
+                        self._schema.tables[table_name],
+                        _read_uoffset(self._buf, pos),
+                        type_name=member_name,
+                    )
+            raise ValueError(f"Unknown type {type_index} for union {union.name}")
+        return _read_value(self._buf, self._schema, field.type, pos)
+
+    def __repr__(self) -> str:
+        values = []
+        for name in self._table.fields:
+            union_field = self._table.fields.get(name[: -len("_type")])
+            if (
+                name.endswith("_type")
+                and union_field is not None
+                and union_field.type.kind == "union"
+            ):
+                # Implied by the type name of the union value.
+                continue
+            value = getattr(self, name)
+            if isinstance(value, memoryview):
+                value = f"<{len(value)} bytes>"
+            values.append(f"{name}={value!r}")
+        return f"{self.type_name}({', '.join(values)})"
+
+
+def _flatbuffer_root(
+    data: _Buffer, schema: _FbsSchema, root_type: Optional[str] = None
+) -> _FlatbufferTable:
+    """Returns a lazy view of the root table of the flatbuffer data.
+
+    Args:
+        data: The flatbuffer data. Not copied; must outlive the returned view.
+        schema: The parsed schema that `data` was serialized with.
+        root_type: The schema table of the root. Defaults to the schema's
+            root_type.
+    """
+    root_type = root_type or schema.root_type
+    if root_type is None:
+        raise ValueError("Schema does not declare a root_type")
+    buf = memoryview(data).cast("B")
+    if len(buf) < 8:
+        raise ValueError(f"Flatbuffer data length {len(buf)} < 8")
+    return _FlatbufferTable(
+        buf, schema, schema.tables[root_type], _read_uoffset(buf, 0)
+    )
+
+
+class _DataclassDeserializer:
+    """Converts flatbuffer tables into the dataclasses they were serialized
+    from; the counterpart of `_DataclassSerializer`.
+
+    The result matches `_json_to_dataclass()` on the output of
+    `flatc --json --defaults-json`: missing strings, tables and vectors are
+    None, missing scalars take their default value, enum values become members
+    of the dataclass field type (or their names, for fields typed as `str`),
+    and byte vectors become `bytes`.
+    """
+
+    def __init__(self, schema: _FbsSchema) -> None:
+        self._schema = schema
+        # The fields to read for each (schema table, dataclass) pair.
+        self._plans: Dict[Tuple[str, type], List[Tuple[str, _FbsField, Any, bool]]] = {}
+        self._enum_names: Dict[str, Dict[int, str]] = {}
+
+    def _plan(
+        self, table: _FbsTable, cls: type
+    ) -> List[Tuple[str, _FbsField, Any, bool]]:
+        plan = self._plans.get((table.name, cls))
+        if plan is None:
+            type_hints = get_type_hints(cls)
+            plan = []
+            for dataclass_field in fields(cls):
+                name = dataclass_field.name
+                schema_field = table.fields.get(name)
+                if schema_field is None:
+                    raise ValueError(
+                        f"Field {name} of {cls.__name__} is not in schema table {table.name}"
+                    )
+                field_type = type_hints[name]
+                optional = _is_optional(field_type)
+                if optional and schema_field.type.kind != "union":
+                    field_type = get_args(field_type)[0]
+                plan.append((name, schema_field, field_type, optional))
+            self._plans[(table.name, cls)] = plan
+        return plan
+
+    def deserialize(self, table: _FlatbufferTable, cls: Any) -> Any:  # pyre-ignore
+        data = {}
+        for name, schema_field, field_type, optional in self._plan(table._table, cls):
+            value = getattr(table, name)
+            if value is None:
+                if not optional:
+                    raise TypeError(
+                        f"Invalid Buffer. Received no value for field: {name}, but {name} : {field_type} is not an Optional type."
+                    )
+                data[name] = None
+            else:
+                data[name] = self._convert(value, schema_field.type, field_type)
+        return cls(**data)
+
+    def _convert(self, value: Any, fbs_type: _FbsType, cls: Any) -> Any:  # pyre-ignore
+        if fbs_type.kind == "vector":
+            if isinstance(value, memoryview):
+                return bytes(value) if cls is bytes else list(value)
+            element = fbs_type.element
+            assert element is not None
+            element_cls = get_args(cls)[0] if get_origin(cls) is list else Any
+            return [self._convert(v, element, element_cls) for v in value]
+        if fbs_type.kind == "union":
+            # Matched by name, as the union member names match the classes.
+            member_cls = next(c for c in get_args(cls) if c.__name__ == value.type_name)
+            return self.deserialize(value, member_cls)
+        if fbs_type.kind == "table":
+            return self.deserialize(value, cls)
+        if fbs_type.kind == "enum":
+            enum_names = self._enum_names.get(fbs_type.name)
+            if enum_names is None:
+                enum_values = self._schema.enums[fbs_type.name][1]
+                enum_names = {v: k for k, v in reversed(enum_values.items())}
+                self._enum_names[fbs_type.name] = enum_names
+            if value in enum_names:
+                value = enum_names[value]
+                return cls[value] if isinstance(cls, enum.EnumMeta) else value
+        if cls is Any or get_origin(cls) is Union:
+            return value
+        return cls(value)
+
+
+def _flatbuffer_to_dataclass(table: _FlatbufferTable, cls: Any) -> Any:  # pyre-ignore
+    """Converts a flatbuffer table, and everything it refers to, into an
+    instance of the dataclass `cls`.
+
+    Unlike going through `flatc --json` and `_json_to_dataclass()`, this reads
+    the binary data in-process. See `_DataclassDeserializer` for how values are
+    converted.
+    """
+    return _DataclassDeserializer(table._schema).deserialize(table, cls)
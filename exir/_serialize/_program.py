@@ -9,17 +9,27 @@
 import copy
 import json
 import math
+import mmap
+import os
 import re
 
 from dataclasses import dataclass
-from typing import ClassVar, Dict, List, Literal, Optional, Tuple
+from typing import Any, ClassVar, Dict, List, Literal, Optional, Tuple, Union
 
 from executorch.exir._serialize._cord import Cord
 from executorch.exir._serialize._dataclass import _DataclassEncoder, _json_to_dataclass
 from executorch.exir._serialize._flatbuffer import (
     _FlatbufferResult,
+    _load_parsed_program_schema,
     _program_flatbuffer_to_json,
     _program_json_to_flatbuffer,
+    _program_to_flatbuffer,
+    _serialize_with_flatc,
+)
+from executorch.exir._serialize._flatbuffer_builder import _UnsupportedSchemaError
+from executorch.exir._serialize._flatbuffer_reader import (
+    _flatbuffer_root,
+    _FlatbufferTable,
 )
 from executorch.exir._serialize._named_data_store import (
     BufferEntry,
@@ -76,11 +86,14 @@ def _json_to_program(program_json: bytes) -> Program:
     return _json_to_dataclass(json.loads(program_json), cls=Program)
 
 
-def _insert_flatbuffer_header(
+def _insert_flatbuffer_header_cord(
     flatbuffer_data: bytes, magic_regex: str, header_data: bytes
-) -> bytes:
+) -> Cord:
     """Inserts a header just after the magic string of the provided flatbuffer data.
 
+    Unlike _insert_flatbuffer_header(), the returned Cord refers to
+    flatbuffer_data instead of copying it.
+
     Args:
         flatbuffer_data: The input data to modify.
         magic_regex: A regex pattern that must match the magic file_identifier
@@ -110,23 +123,41 @@ def _insert_flatbuffer_header(
             + f"does not match pattern /{magic_regex}/"
         )
 
-    # Avoid a potentially big allocation/copy if there's nothing to do.
+    # Nothing to insert.
     if len(header_data) == 0:
-        return flatbuffer_data
+        return Cord(flatbuffer_data)
 
     # We will need to adjust the root object offset after inserting the header.
     root_offset = int.from_bytes(flatbuffer_data[0:4], byteorder=_HEADER_BYTEORDER)
 
-    return (
+    data = Cord(
         # New root offset.
         (root_offset + len(header_data)).to_bytes(4, byteorder=_HEADER_BYTEORDER)
         # Existing magic bytes.
         + flatbuffer_data[4:8]
         # Provided header + padding.
         + header_data
-        # Remainder of the file. Note that this can be O(10MB to 100MB), so it
-        # can trigger a large allocation + copy.
-        + flatbuffer_data[8:]
+    )
+    # Remainder of the file. Note that this can be O(10MB to 100MB), so refer
+    # to it instead of copying it.
+    data.append(memoryview(flatbuffer_data)[8:])
+    return data
+
+
+def _insert_flatbuffer_header(
+    flatbuffer_data: bytes, magic_regex: str, header_data: bytes
+) -> bytes:
+    """Inserts a header just after the magic string of the provided flatbuffer data.
+
+    See _insert_flatbuffer_header_cord() for details. Returns contiguous data,
+    which requires a copy of flatbuffer_data if header_data is not empty.
+    """
+    if len(header_data) == 0:
+        # Validate, but avoid a potentially big allocation/copy.
+        _insert_flatbuffer_header_cord(flatbuffer_data, magic_regex, header_data)
+        return flatbuffer_data
+    return bytes(
+        _insert_flatbuffer_header_cord(flatbuffer_data, magic_regex, header_data)
     )
 
 
@@ -378,6 +409,49 @@ def _extract_named_data(
     program.named_data = named_data
 
 
+def _copy_for_serialization(program: Program) -> Program:
+    """Returns a copy of the program that serialize_pte_binary() may modify.
+
+    Only the objects that serialization rewrites in place are copied: the
+    Program, its list of segments, its execution plans and their delegates.
+    Every other field is reassigned rather than modified, so it is shared with
+    the original program, including all constant and delegate data.
+    """
+    program = copy.copy(program)
+    program.segments = list(program.segments)
+    program.execution_plan = [copy.copy(plan) for plan in program.execution_plan]
+    for plan in program.execution_plan:
+        plan.delegates = [copy.copy(delegate) for delegate in plan.delegates]
+        for delegate in plan.delegates:
+            delegate.processed = copy.copy(delegate.processed)
+    return program
+
+
+def _program_to_flatbuffer_result(
+    program: Program,
+    constant_tensor_alignment: Optional[int],
+    delegate_alignment: Optional[int],
+) -> _FlatbufferResult:
+    """Converts the Program to a flatbuffer in-process, or with flatc if the
+    environment asks for it or the schema needs it.
+    """
+    if not _serialize_with_flatc():
+        try:
+            return _program_to_flatbuffer(
+                program,
+                constant_tensor_alignment=constant_tensor_alignment,
+                delegate_alignment=delegate_alignment,
+            )
+        except _UnsupportedSchemaError:
+            # flatc supports the whole schema language.
+            pass
+    return _program_json_to_flatbuffer(
+        _program_to_json(program),
+        constant_tensor_alignment=constant_tensor_alignment,
+        delegate_alignment=delegate_alignment,
+    )
+
+
 def serialize_pte_binary(
     program: Program,
     *,
@@ -415,10 +489,9 @@ def serialize_pte_binary(
     if constant_tensor_alignment is None:
         constant_tensor_alignment = ALIGNMENT
 
-    # Don't modify the original program.
-    # TODO(T144120904): Could avoid yet more huge copies with a more shallow
-    # copy, reusing the actual data blobs.
-    program = copy.deepcopy(program)
+    # Don't modify the original program. Only copy the parts of it that are
+    # rewritten below; the data blobs are shared with the original.
+    program = _copy_for_serialization(program)
 
     # Store extracted segment data, with any buffer-specific alignment.
     # This may be constant data, delegate data or named data.
@@ -485,10 +558,8 @@ def serialize_pte_binary(
         segments_data.append(segment.data)
 
     # Convert to a standard flatbuffer binary.
-    result: _FlatbufferResult = _program_json_to_flatbuffer(
-        _program_to_json(program),
-        constant_tensor_alignment=constant_tensor_alignment,
-        delegate_alignment=delegate_alignment,
+    result = _program_to_flatbuffer_result(
+        program, constant_tensor_alignment, delegate_alignment
     )
 
     # If there are no segments present, do not insert the extended header.
@@ -517,19 +588,16 @@ def serialize_pte_binary(
     header_data = pad_to(header_data, padded_header_length)
 
     # Insert the header into the flatbuffer data.
-    program_data: bytes = _insert_flatbuffer_header(
+    program_data: Cord = _insert_flatbuffer_header_cord(
         flatbuffer_data=result.data,
         magic_regex=r"ET[0-9a-zA-Z][0-9a-zA-Z]",
         header_data=header_data,
     )
     assert len(program_data) == program_size
 
-    # Potentially large. Try to free it as soon as we can.
-    del result.data
-
     # Double-check that the extended header is in the right place and has the
     # right contents.
-    eh = _get_extended_header(program_data)
+    eh = _get_extended_header(result.data[:8] + header_data)
     assert eh is not None
     assert eh.program_size == program_size
     assert eh.segment_base_offset == segment_base_offset
@@ -643,3 +711,112 @@ def deserialize_pte_binary(program_data: bytes) -> Program:
         )
 
     return program
+
+
+class ProgramView:
+    """A read-only view of a serialized PTE file that decodes lazily.
+
+    Unlike `deserialize_pte_binary()`, this does not convert the flatbuffer
+    data to JSON or build any `Program` dataclasses up front. Fields of the
+    Program table (e.g. `execution_plan`, `segments`) are accessed as
+    attributes of the view and are decoded from the underlying data on
+    demand, with the same names as the fields of `Program`. Union values like
+    `EValue.val` are views whose `type_name` is the name of the union member,
+    e.g. "Tensor".
+
+    Segment, constant and delegate payloads are returned as `memoryview`s into
+    the underlying data, without copying.
+    """
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview, mmap.mmap]) -> None:
+        """Creates a view of the PTE file contents in `data`.
+
+        Args:
+            data: The contents of a PTE file. Not copied; must not be modified
+                while this view or any values read from it are alive.
+        """
+        self._data: memoryview = memoryview(data).cast("B")
+        self._extended_header: Optional[_ExtendedHeader] = _get_extended_header(
+            self._data[: 8 + _ExtendedHeader.EXPECTED_LENGTH]
+        )
+        program_size = len(self._data)
+        if self._extended_header is not None:
+            program_size = self._extended_header.program_size
+        schema, _ = _load_parsed_program_schema()
+        # The extended header is inserted after the root offset, which is
+        # adjusted accordingly, so the program can be read in place.
+        self._program: _FlatbufferTable = _flatbuffer_root(
+            self._data[:program_size], schema
+        )
+
+    @staticmethod
+    def from_file(path: str) -> "ProgramView":
+        """Returns a view of the PTE file at `path`, which is memory-mapped."""
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError(f"PTE file {path} is empty")
+            # The mapping stays valid after the file is closed.
+            return ProgramView(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @property
+    def extended_header(self) -> Optional[_ExtendedHeader]:
+        """The extended header of the file, if present."""
+        return self._extended_header
+
+    @property
+    def program(self) -> _FlatbufferTable:
+        """The root Program table."""
+        return self._program
+
+    def __getattr__(self, name: str) -> Any:  # pyre-ignore[3]
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._program, name)
+
+    def segment_data(self, index: int) -> memoryview:
+        """Returns the contents of `Program.segments[index]`."""
+        segments = self._program.segments
+        if segments is None or not 0 <= index < len(segments):
+            raise IndexError(f"Segment index {index} out of range")
+        if self._extended_header is None:
+            raise ValueError("Program has segments but no extended header")
+        segment = segments[index]
+        start = self._extended_header.segment_base_offset + segment.offset
+        if start + segment.size > len(self._data):
+            raise ValueError(f"Segment {index} overflows data length {len(self._data)}")
+        return self._data[start : start + segment.size]
+
+    def constant_data(self, buffer_index: int) -> memoryview:
+        """Returns the data of the constant tensor with the given
+        `Tensor.data_buffer_idx`, including any trailing padding.
+        """
+        constant_buffer = self._program.constant_buffer
+        if constant_buffer is not None and len(constant_buffer) > 0:
+            # Legacy programs store constants inline.
+            return constant_buffer[buffer_index].storage
+        constant_segment = self._program.constant_segment
+        offsets = constant_segment.offsets if constant_segment is not None else None
+        if offsets is None or not 0 <= buffer_index < len(offsets):
+            raise IndexError(f"Constant buffer index {buffer_index} out of range")
+        segment = self.segment_data(constant_segment.segment_index)
+        end = (
+            offsets[buffer_index + 1]
+            if buffer_index < len(offsets) - 1
+            else len(segment)
+        )
+        return segment[offsets[buffer_index] : end]
+
+    def delegate_data(self, plan_index: int, delegate_index: int) -> memoryview:
+        """Returns the processed blob of a delegate, wherever it is stored."""
+        delegate = self._program.execution_plan[plan_index].delegates[delegate_index]
+        processed = delegate.processed
+        if processed.location == DataLocation.SEGMENT:
+            return self.segment_data(processed.index)
+        return self._program.backend_delegate_data[processed.index].data
+
+    def named_data(self, key: str) -> memoryview:
+        """Returns the data of the `Program.named_data` entry with `key`."""
+        for entry in self._program.named_data or []:
+            if entry.key == key:
+                return self.segment_data(entry.segment_index)
+        raise KeyError(f"No named data with key {repr(key)}")
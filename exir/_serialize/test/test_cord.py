@@ -6,7 +6,9 @@
 
 
 import io
+import socket
 import unittest
+from typing import Optional
 
 from executorch.exir._serialize._cord import Cord
 
@@ -53,6 +55,20 @@ class TestCord(unittest.TestCase):
         self.assertEqual(id(cord2._buffers[1]), id(cord._buffers[0]))
         self.assertEqual(id(cord2._buffers[2]), id(cord._buffers[1]))
 
+    def test_cord_append_memoryview(self) -> None:
+        data = b"HelloWorld"
+        cord = Cord(memoryview(data)[5:])
+        cord.append(memoryview(data)[:5])
+        self.assertEqual(10, len(cord))
+        self.assertEqual(b"WorldHello", bytes(cord))
+
+        # Lengths are in bytes, not elements.
+        cord.append(memoryview(b"\x00" * 8).cast("q"))
+        self.assertEqual(18, len(cord))
+
+        # Confirm that no copies were made.
+        self.assertIs(cord._buffers[0].obj, data)
+
     def test_cord_write_to_file(self) -> None:
         cord = Cord()
         cord.append(b"Hello")
@@ -61,3 +77,57 @@ class TestCord(unittest.TestCase):
         outfile = io.BytesIO()
         cord.write_to_file(outfile)
         self.assertEqual(b"HelloWorld", outfile.getvalue())
+
+    def test_cord_write_to_file_partial_writes(self) -> None:
+        class ShortWriter(io.RawIOBase):
+            def __init__(self) -> None:
+                self.data = bytearray()
+
+            def writable(self) -> bool:
+                return True
+
+            def write(self, b) -> int:
+                # Accept at most 3 bytes per call, like an unbuffered file may.
+                self.data += bytes(b[:3])
+                return min(len(b), 3)
+
+        data = b"HelloWorld"
+        cord = Cord(b"Prefix")
+        cord.append(memoryview(data)[5:])
+
+        outfile = ShortWriter()
+        cord.write_to_file(outfile)
+        self.assertEqual(b"PrefixWorld", bytes(outfile.data))
+
+    def test_cord_write_to_non_blocking_stream(self) -> None:
+        class BlockingWriter(io.RawIOBase):
+            def __init__(self) -> None:
+                self.data = bytearray()
+
+            def writable(self) -> bool:
+                return True
+
+            def write(self, b) -> Optional[int]:
+                # Accept 4 bytes, then behave like a full non-blocking pipe.
+                if len(self.data) >= 4:
+                    return None
+                self.data += bytes(b[:4])
+                return min(len(b), 4)
+
+        outfile = BlockingWriter()
+        with self.assertRaises(BlockingIOError):
+            Cord(b"HelloWorld").write_to_file(outfile)
+        self.assertEqual(b"Hell", bytes(outfile.data))
+
+    def test_cord_write_to_socket(self) -> None:
+        cord = Cord(b"Hello")
+        cord.append(memoryview(b"World" * 100))
+
+        sender, receiver = socket.socketpair()
+        with sender, receiver:
+            cord.write_to_file(sender)
+            sender.shutdown(socket.SHUT_WR)
+            received = bytearray()
+            while chunk := receiver.recv(4096):
+                received += chunk
+        self.assertEqual(bytes(cord), bytes(received))
@@ -0,0 +1,262 @@
+#!/usr/bin/env fbpython
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import copy
+import unittest
+from dataclasses import dataclass
+from typing import List, Optional
+from unittest import mock
+
+from executorch.exir._serialize._flatbuffer import (
+    _program_json_to_flatbuffer,
+    _program_to_flatbuffer,
+)
+from executorch.exir._serialize._flatbuffer_builder import (
+    _dataclass_to_flatbuffer,
+    _parse_schema,
+    _UnsupportedSchemaError,
+)
+from executorch.exir._serialize._program import _program_to_json, serialize_pte_binary
+from executorch.exir.schema import (
+    BackendDelegateInlineData,
+    Bool,
+    BoolList,
+    Buffer,
+    DataSegment,
+    Double,
+    DoubleList,
+    EValue,
+    Frame,
+    FrameList,
+    IntList,
+    NamedData,
+    OptionalTensorList,
+    Program,
+    SubsegmentOffsets,
+)
+from executorch.exir.tests.common import get_test_program
+
+# A small schema exercising unions, defaults, enums and forced alignment.
+TEST_SCHEMA: bytes = b"""
+// Comment.
+namespace test;
+file_identifier "TS01";
+
+enum Color : short { RED = 1, GREEN, BLUE = 8 }
+
+table Leaf {
+  value: int = 7;
+}
+
+union Node { Leaf, Alias: Leaf }
+
+table Root {
+  name: string;
+  color: Color = GREEN;
+  node: Node;
+  data: [ubyte] (force_align: 32);
+  leaves: [Leaf];
+  old: uint (deprecated);
+  ratio: double;
+}
+
+root_type Root;
+"""
+
+
+@dataclass
+class Leaf:
+    value: int
+
+
+@dataclass
+class Alias:
+    value: int
+
+
+@dataclass
+class Root:
+    name: Optional[str]
+    color: int
+    node: object
+    data: bytes
+    leaves: List[Leaf]
+    ratio: float
+
+
+class TestParseSchema(unittest.TestCase):
+    def test_field_ids_and_defaults(self) -> None:
+        schema = _parse_schema({"test.fbs": TEST_SCHEMA}, "test.fbs")
+        self.assertEqual(schema.root_type, "Root")
+        self.assertEqual(schema.file_identifier, "TS01")
+        self.assertEqual(
+            schema.enums["Color"], ("short", {"RED": 1, "GREEN": 2, "BLUE": 8})
+        )
+        self.assertEqual(
+            schema.unions["Node"].members, {"Leaf": (1, "Leaf"), "Alias": (2, "Leaf")}
+        )
+
+        root = schema.tables["Root"]
+        # Unions take two ids: the implicit type field, then the value.
+        self.assertEqual(
+            [(f.name, f.id) for f in root.fields.values()],
+            [
+                ("name", 0),
+                ("color", 1),
+                ("node_type", 2),
+                ("node", 3),
+                ("data", 4),
+                ("leaves", 5),
+                ("old", 6),
+                ("ratio", 7),
+            ],
+        )
+        self.assertEqual(root.fields["color"].default, 2)
+        self.assertEqual(root.fields["data"].force_align, 32)
+        self.assertTrue(root.fields["old"].deprecated)
+        self.assertEqual(schema.tables["Leaf"].fields["value"].default, 7)
+
+    def test_includes(self) -> None:
+        files = {
+            "root.fbs": b'include "dir/other.fbs";\ntable R { o: Other; }\nroot_type R;',
+            "other.fbs": b"table Other { x: long; }",
+        }
+        schema = _parse_schema(files, "root.fbs")
+        self.assertEqual(set(schema.tables.keys()), {"R", "Other"})
+
+    def test_unknown_type_fails(self) -> None:
+        with self.assertRaises(ValueError):
+            _parse_schema({"bad.fbs": b"table T { x: Missing; }"}, "bad.fbs")
+
+    def test_structs_are_rejected(self) -> None:
+        files = {
+            "struct.fbs": b"struct Vec { x: float; y: float; }\ntable T { v: Vec; }"
+        }
+        with self.assertRaisesRegex(_UnsupportedSchemaError, "Struct Vec"):
+            _parse_schema(files, "struct.fbs")
+
+
+class TestDataclassToFlatbuffer(unittest.TestCase):
+    def test_layout(self) -> None:
+        schema = _parse_schema({"test.fbs": TEST_SCHEMA}, "test.fbs")
+        data = _dataclass_to_flatbuffer(
+            Root(
+                name="x",
+                color=2,
+                node=Alias(value=3),
+                data=b"\x01\x02\x03",
+                leaves=[Leaf(value=7), Leaf(value=1)],
+                ratio=0.0,
+            ),
+            schema,
+        )
+        self.assertEqual(data[4:8], b"TS01")
+        # The forced alignment of `data` applies to the whole buffer.
+        self.assertEqual(len(data) % 32, 0)
+        index = data.index(b"\x01\x02\x03")
+        self.assertEqual(index % 32, 0)
+        self.assertEqual(int.from_bytes(data[index - 4 : index], "little"), 3)
+
+    def test_unknown_field_fails(self) -> None:
+        @dataclass
+        class Bad:
+            missing: int
+
+        schema = _parse_schema({"test.fbs": TEST_SCHEMA}, "test.fbs")
+        with self.assertRaises(ValueError):
+            _dataclass_to_flatbuffer(Bad(missing=1), schema, root_type="Leaf")
+
+    def test_union_member_must_exist(self) -> None:
+        schema = _parse_schema({"test.fbs": TEST_SCHEMA}, "test.fbs")
+        inner = Root(name=None, color=1, node=None, data=b"", leaves=[], ratio=1.0)
+        root = Root(name=None, color=1, node=inner, data=b"", leaves=[], ratio=1.0)
+        with self.assertRaises(ValueError):
+            _dataclass_to_flatbuffer(root, schema)
+
+
+def get_complex_program() -> Program:
+    """Returns a program that exercises most of the Program schema."""
+    program = get_test_program()
+    plan = program.execution_plan[0]
+    plan.values.extend(
+        [
+            EValue(Bool(True)),
+            EValue(Double(2.5)),
+            EValue(Double(float("-inf"))),
+            EValue(IntList([1, -2, 3])),
+            EValue(DoubleList([0.5, -1.25])),
+            EValue(BoolList([True, False, True])),
+            EValue(OptionalTensorList([-1, 4])),
+        ]
+    )
+    plan.chains[0].stacktrace = [
+        FrameList(items=[Frame(filename="f.py", lineno=3, name="fn", context="x")])
+    ]
+    second_plan = copy.deepcopy(plan)
+    second_plan.name = "other"
+    program.execution_plan.append(second_plan)
+    program.constant_buffer = [Buffer(storage=b""), Buffer(storage=b"\x01" * 33)]
+    program.backend_delegate_data = [BackendDelegateInlineData(data=b"\x02" * 7)]
+    program.segments = [DataSegment(offset=0, size=2**40)]
+    program.constant_segment = SubsegmentOffsets(segment_index=0, offsets=[0, 64])
+    program.mutable_data_segments = [SubsegmentOffsets(segment_index=1, offsets=[])]
+    program.named_data = [NamedData(key="weight", segment_index=0)]
+    return program
+
+
+class TestProgramToFlatbuffer(unittest.TestCase):
+    def assert_same_as_flatc(
+        self,
+        program: Program,
+        constant_tensor_alignment: Optional[int] = None,
+        delegate_alignment: Optional[int] = None,
+    ) -> None:
+        expected = _program_json_to_flatbuffer(
+            _program_to_json(program),
+            constant_tensor_alignment=constant_tensor_alignment,
+            delegate_alignment=delegate_alignment,
+        )
+        actual = _program_to_flatbuffer(
+            program,
+            constant_tensor_alignment=constant_tensor_alignment,
+            delegate_alignment=delegate_alignment,
+        )
+        self.assertEqual(actual.max_alignment, expected.max_alignment)
+        self.assertEqual(actual.data, expected.data)
+
+    def test_test_program_matches_flatc(self) -> None:
+        self.assert_same_as_flatc(get_test_program())
+
+    def test_complex_program_matches_flatc(self) -> None:
+        self.assert_same_as_flatc(get_complex_program())
+
+    def test_patched_alignment_matches_flatc(self) -> None:
+        for tensor_alignment, delegate_alignment in ((32, None), (None, 8), (4, 2)):
+            with self.subTest(
+                tensor_alignment=tensor_alignment,
+                delegate_alignment=delegate_alignment,
+            ):
+                self.assert_same_as_flatc(
+                    get_complex_program(),
+                    constant_tensor_alignment=tensor_alignment,
+                    delegate_alignment=delegate_alignment,
+                )
+
+    def test_unsupported_schema_falls_back_to_flatc(self) -> None:
+        program = get_complex_program()
+        expected = serialize_pte_binary(program)
+        with mock.patch(
+            "executorch.exir._serialize._program._program_to_flatbuffer",
+            side_effect=_UnsupportedSchemaError("Struct"),
+        ) as program_to_flatbuffer:
+            actual = serialize_pte_binary(program)
+        program_to_flatbuffer.assert_called_once()
+        self.assertEqual(bytes(actual), bytes(expected))
+
+    def test_bad_alignment_fails(self) -> None:
+        with self.assertRaises(ValueError):
+            _program_to_flatbuffer(get_test_program(), constant_tensor_alignment=5)
@@ -11,11 +11,14 @@ import copy
 import difflib
 import json
 import math
+import os
+import tempfile
 import unittest
 
 from typing import List, Sequence
 
 from executorch.exir._serialize._flatbuffer import _program_flatbuffer_to_json
+from executorch.exir._serialize._flatbuffer_reader import _flatbuffer_to_dataclass
 from executorch.exir._serialize._named_data_store import (
     BufferEntry,
     NamedDataStoreOutput,
@@ -26,6 +29,7 @@ from executorch.exir._serialize._program import (
     _json_to_program,
     _program_to_json,
     deserialize_pte_binary,
+    ProgramView,
     serialize_pte_binary,
 )
 from executorch.exir._serialize.padding import aligned_size
@@ -595,6 +599,31 @@ class TestProgram(unittest.TestCase):
         program2 = deserialize_pte_binary(pte_data)
         self.assert_programs_equal(program, program2)
 
+    def test_serialization_does_not_copy_data(self) -> None:
+        program = get_test_program()
+        constant = self.gen_blob_data(SEGMENT_ALIGNMENT + 3, b"\x10\x11\x01")
+        program.constant_buffer = [Buffer(storage=b""), Buffer(storage=constant)]
+        blob = self.gen_blob_data(SEGMENT_ALIGNMENT * 2, b"\x20\x22\x02")
+        add_delegate_data(program, program.execution_plan[0], (blob,))
+        original = copy.deepcopy(program)
+
+        pte_data = serialize_pte_binary(
+            program,
+            extract_delegate_segments=True,
+            segment_alignment=SEGMENT_ALIGNMENT,
+        )
+
+        # The input Program should not have been modified.
+        self.assertEqual(program, original)
+
+        # The output should refer to the original data blobs, not copies.
+        buffers = [b.obj if isinstance(b, memoryview) else b for b in pte_data._buffers]
+        self.assertTrue(any(b is constant for b in buffers))
+        self.assertTrue(any(b is blob for b in buffers))
+
+        program2 = deserialize_pte_binary(bytes(pte_data))
+        self.assert_programs_equal(program, program2)
+
     def test_no_constants(self) -> None:
         program = get_test_program()
         # Insert placeholder for non-const tensors.
@@ -981,6 +1010,109 @@ class TestProgram(unittest.TestCase):
         )
 
 
+class TestProgramView(unittest.TestCase):
+    def serialize_with_segments(self, program: Program) -> bytes:
+        add_constant_data(program, [b"\x01" * 5, b"\x02" * 20])
+        add_delegate_data(
+            program, program.execution_plan[0], [b"\x03" * 7, b"\x04" * 300]
+        )
+        named_data = NamedDataStoreOutput(
+            buffers=[BufferEntry(buffer=b"\x05" * 9, alignment=64)],
+            pte_data={"key0": 0},
+            external_data={},
+        )
+        return bytes(
+            serialize_pte_binary(
+                program,
+                extract_delegate_segments=True,
+                segment_alignment=SEGMENT_ALIGNMENT,
+                constant_tensor_alignment=CONSTANT_TENSOR_ALIGNMENT,
+                named_data=named_data,
+            )
+        )
+
+    def test_fields_match_deserialized_program(self) -> None:
+        pte_data = self.serialize_with_segments(get_test_program())
+        view = ProgramView(pte_data)
+        program = _json_to_program(_program_flatbuffer_to_json(pte_data))
+
+        self.assertIsNotNone(view.extended_header)
+        self.assertEqual(view.version, program.version)
+        self.assertEqual(len(view.execution_plan), len(program.execution_plan))
+        plan_view = view.execution_plan[0]
+        plan = program.execution_plan[0]
+        self.assertEqual(plan_view.name, plan.name)
+        self.assertEqual(list(plan_view.inputs), plan.inputs)
+        self.assertEqual(
+            [(op.name, op.overload) for op in plan_view.operators],
+            [(op.name, op.overload) for op in plan.operators],
+        )
+        self.assertEqual(
+            [value.val.type_name for value in plan_view.values],
+            [type(value.val).__name__ for value in plan.values],
+        )
+        tensor = plan.values[4].val
+        tensor_view = plan_view.values[4].val
+        self.assertEqual(tensor_view.scalar_type, tensor.scalar_type)
+        self.assertEqual(list(tensor_view.sizes), tensor.sizes)
+        self.assertEqual(
+            tensor_view.allocation_info.memory_offset_low,
+            tensor.allocation_info.memory_offset_low,
+        )
+        # Missing optional fields read as None.
+        self.assertIsNone(tensor_view.extra_tensor_info)
+        self.assertEqual(
+            plan_view.chains[0].instructions[0].instr_args.type_name, "KernelCall"
+        )
+        self.assertEqual(
+            [(s.offset, s.size) for s in view.segments],
+            [(s.offset, s.size) for s in program.segments],
+        )
+
+    def test_to_dataclass_matches_deserialized_program(self) -> None:
+        pte_data = self.serialize_with_segments(get_test_program())
+        view = ProgramView(pte_data)
+        self.assertEqual(
+            _flatbuffer_to_dataclass(view.program, Program),
+            _json_to_program(_program_flatbuffer_to_json(pte_data)),
+        )
+
+    def test_payloads(self) -> None:
+        pte_data = self.serialize_with_segments(get_test_program())
+        view = ProgramView(pte_data)
+
+        constant = view.constant_data(0)
+        self.assertIsInstance(constant, memoryview)
+        self.assertEqual(
+            bytes(constant), b"\x01" * 5 + b"\x00" * (CONSTANT_TENSOR_ALIGNMENT - 5)
+        )
+        self.assertEqual(bytes(view.constant_data(1)), b"\x02" * 20)
+        self.assertEqual(bytes(view.delegate_data(0, 0)), b"\x03" * 7)
+        self.assertEqual(bytes(view.delegate_data(0, 1)), b"\x04" * 300)
+        self.assertEqual(bytes(view.named_data("key0")), b"\x05" * 9)
+        with self.assertRaises(KeyError):
+            view.named_data("missing")
+        with self.assertRaises(IndexError):
+            view.segment_data(len(view.segments))
+
+    def test_inline_data_without_segments(self) -> None:
+        program = get_test_program()
+        add_delegate_data(program, program.execution_plan[0], [b"\x06" * 3])
+        view = ProgramView(bytes(serialize_pte_binary(program)))
+        self.assertIsNone(view.extended_header)
+        self.assertEqual(bytes(view.delegate_data(0, 0)), b"\x06" * 3)
+
+    def test_from_file(self) -> None:
+        pte_data = self.serialize_with_segments(get_test_program())
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "model.pte")
+            with open(path, "wb") as f:
+                f.write(pte_data)
+            view = ProgramView.from_file(path)
+            self.assertEqual(view.execution_plan[0].name, "forward")
+            self.assertEqual(bytes(view.delegate_data(0, 1)), b"\x04" * 300)
+
+
 # Common data for extended header tests. The two example values should produce
 # the example data.
 EXAMPLE_PROGRAM_SIZE: int = 0x1122112233443344
@@ -0,0 +1,375 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+"""On-disk cache of backend preprocess results."""
+
+import functools
+import hashlib
+import importlib.metadata
+import inspect
+import json
+import logging
+import os
+import struct
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+import torch
+from executorch.exir._serialize._named_data_store import (
+    BufferEntry,
+    NamedDataStoreOutput,
+)
+from executorch.exir.backend.backend_details import BackendDetails, PreprocessResult
+from executorch.exir.backend.compile_spec_schema import CompileSpec
+from torch._subclasses.fake_tensor import FakeTensor
+from torch.export.exported_program import ExportedProgram
+
+# Cache entries start with the length of their JSON header, followed by the
+# header and the blobs it points to.
+_HEADER_LENGTH = struct.Struct("<Q")
+
+
+class _NotCacheable(Exception):
+    pass
+
+
+def _tensor_buffer(tensor: torch.Tensor) -> memoryview:
+    """Returns a view of the data of tensor, to hash it without a copy."""
+    if isinstance(tensor, FakeTensor) or tensor.is_quantized:
+        raise _NotCacheable(f"Cannot hash the data of {type(tensor).__name__}")
+    tensor = tensor.detach().cpu().contiguous()
+    if tensor.numel() == 0:
+        return memoryview(b"")
+    # The view keeps the tensor alive.
+    return memoryview(tensor.reshape(-1).view(torch.uint8).numpy())
+
+
+# Extensions of the files that make up a backend, and the directories of a
+# backend that are not.
+_BACKEND_SOURCE_EXTENSIONS = (".py", ".fbs", ".yaml")
+_BACKEND_SKIPPED_DIRS = ("test", "tests", "__pycache__")
+
+
+@functools.lru_cache(maxsize=None)
+def _backend_sources_digest(backend_dir: str) -> bytes:
+    """
+    Returns a hash of the sources of the backend in backend_dir: its passes,
+    operator visitors and serialization schema all affect what preprocess()
+    returns, not only the file the BackendDetails is defined in.
+    """
+    h = hashlib.sha256()
+    for root, dirs, files in os.walk(backend_dir):
+        dirs[:] = sorted(d for d in dirs if d not in _BACKEND_SKIPPED_DIRS)
+        for name in sorted(files):
+            if not name.endswith(_BACKEND_SOURCE_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            h.update(os.path.relpath(path, backend_dir).encode())
+            with open(path, "rb") as f:
+                h.update(hashlib.sha256(f.read()).digest())
+    return h.digest()
+
+
+def _executorch_version() -> Optional[str]:
+    try:
+        return importlib.metadata.version("executorch")
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def _val_fingerprint(val: Any) -> Any:
+    if isinstance(val, torch.Tensor):
+        return (str(val.dtype), [str(d) for d in val.shape], str(val.stride()))
+    if isinstance(val, (torch.SymInt, torch.SymFloat, torch.SymBool)):
+        return str(val)
+    return val
+
+
+def _update_with_graph(
+    h: "hashlib._Hash",
+    graph_module: torch.fx.GraphModule,
+    debug_handles: List[Optional[int]],
+) -> None:
+    """
+    Hashes the nodes of graph_module by their position in the graph instead of
+    their names, so that graphs which only differ in node names hash the same.
+    The debug handles of the call_function nodes are not hashed but appended to
+    debug_handles, so that repeated blocks of a model hash the same.
+    """
+    node_ids = {node: f"%{i}" for i, node in enumerate(graph_module.graph.nodes)}
+
+    def _arg(arg: Any) -> Any:
+        return node_ids[arg] if isinstance(arg, torch.fx.Node) else arg
+
+    for node in graph_module.graph.nodes:
+        target = "" if node.op == "placeholder" else str(node.target)
+        if node.op == "get_attr":
+            attr = getattr(graph_module, node.target)
+            if isinstance(attr, torch.fx.GraphModule):
+                _update_with_graph(h, attr, debug_handles)
+                target = ""
+            elif isinstance(attr, torch.Tensor):
+                h.update(_tensor_buffer(attr))
+        args = torch.fx.node.map_aggregate((node.args, node.kwargs), _arg)
+        val = torch.fx.node.map_aggregate(node.meta.get("val"), _val_fingerprint)
+        h.update(repr((node.op, target, args, val)).encode())
+        # Only the nodes a backend lowers have debug handles of their own, the
+        # others carry the handle of the node that produced them, if any.
+        if node.op != "call_function":
+            continue
+        debug_handle = node.meta.get("debug_handle")
+        if debug_handle is not None and not isinstance(debug_handle, int):
+            raise _NotCacheable(f"Cannot remap debug handle {debug_handle}")
+        debug_handles.append(debug_handle)
+
+
+def _debug_handle_mapping(
+    old_debug_handles: List[Optional[int]], new_debug_handles: List[Optional[int]]
+) -> Optional[Dict[int, int]]:
+    """
+    Maps the debug handles of the nodes of a graph to those of the nodes at the
+    same position in another graph, or returns None if that is not a function.
+    """
+    if len(old_debug_handles) != len(new_debug_handles):
+        return None
+    mapping: Dict[int, int] = {}
+    for old, new in zip(old_debug_handles, new_debug_handles):
+        if old is None or new is None:
+            if old is not new:
+                return None
+        elif mapping.setdefault(old, new) != new:
+            return None
+    return mapping
+
+
+class PreprocessCache:
+    """
+    Stores the PreprocessResults of backends in `cache_dir`, and returns them
+    for edge programs with the same fingerprint instead of running preprocess()
+    again.
+
+    The fingerprint covers the backend and the sources in the directory tree
+    it is defined in, the executorch and torch versions, the graph of the edge
+    program with the tensor metadata of its nodes, its graph signature and
+    constant data, and the compile specs. Backends that call external compilers
+    do not see new compiler versions in the fingerprint: clear the cache
+    directory when upgrading them.
+
+    Debug handles are not part of the fingerprint, so that the repeated blocks
+    of a model can share a result. Results stored for other debug handles are
+    passed through BackendDetails.remap_debug_handles(), and preprocessed again
+    if the backend cannot remap them. No in-tree backend implements it yet, so
+    for them only partitions with the same debug handles share results, such
+    as the same model exported again.
+
+    Edge programs whose constants cannot be hashed, like fake tensors and
+    script objects, are always preprocessed.
+    """
+
+    # Bump when the format of the cache entries or the fingerprint changes.
+    VERSION: int = 3
+
+    def __init__(self, cache_dir: str) -> None:
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        # Partitions may be preprocessed on several threads at once.
+        self._lock = threading.Lock()
+
+    def _fingerprint(
+        self,
+        backend: Type[BackendDetails],
+        edge_program: ExportedProgram,
+        compile_specs: List[CompileSpec],
+    ) -> Optional[Tuple[str, List[Optional[int]]]]:
+        """
+        Returns the fingerprint of the arguments of preprocess(), and the debug
+        handles of the nodes of the edge program.
+        """
+        h = hashlib.sha256()
+        try:
+            backend_source = inspect.getsourcefile(backend)
+        except TypeError:
+            backend_source = None
+        if backend_source is not None and os.path.isfile(backend_source):
+            h.update(_backend_sources_digest(os.path.dirname(backend_source)))
+        h.update(
+            json.dumps(
+                {
+                    "version": self.VERSION,
+                    "backend": f"{backend.__module__}.{backend.__qualname__}",
+                    "executorch": _executorch_version(),
+                    "torch": torch.__version__,
+                    "compile_specs": [
+                        [spec.key, bytes(spec.value).hex()] for spec in compile_specs
+                    ],
+                    "input_specs": [
+                        [spec.kind.name, spec.persistent]
+                        for spec in edge_program.graph_signature.input_specs
+                    ],
+                    "output_specs": [
+                        spec.kind.name
+                        for spec in edge_program.graph_signature.output_specs
+                    ],
+                },
+                sort_keys=True,
+            ).encode()
+        )
+        debug_handles: List[Optional[int]] = []
+        try:
+            for spec in edge_program.graph_signature.input_specs:
+                if spec.target is None:
+                    continue
+                if spec.target in edge_program.state_dict:
+                    constant = edge_program.state_dict[spec.target]
+                else:
+                    constant = edge_program.constants.get(spec.target)
+                if constant is None:
+                    continue
+                if not isinstance(constant, torch.Tensor):
+                    raise _NotCacheable(f"Cannot hash constant {spec.target}")
+                h.update(repr(_val_fingerprint(constant)).encode())
+                h.update(_tensor_buffer(constant))
+            _update_with_graph(h, edge_program.graph_module, debug_handles)
+        except _NotCacheable as e:
+            logging.debug(f"Not caching the preprocess result: {e}")
+            return None
+        return h.hexdigest(), debug_handles
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.bin")
+
+    def _load(self, key: str) -> Optional[Tuple[PreprocessResult, List[Optional[int]]]]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            (header_length,) = _HEADER_LENGTH.unpack_from(data, 0)
+            blobs_start = _HEADER_LENGTH.size + header_length
+            header = json.loads(data[_HEADER_LENGTH.size : blobs_start])
+
+            def _blob(offset: int, length: int) -> bytes:
+                if blobs_start + offset + length > len(data):
+                    raise ValueError("Truncated cache entry")
+                return data[blobs_start + offset : blobs_start + offset + length]
+
+            debug_handle_map = None
+            if header["debug_handle_map"] is not None:
+                debug_handle_map = {
+                    key: tuple(handles) for key, handles in header["debug_handle_map"]
+                }
+            data_store_output = None
+            if header["data_store_output"] is not None:
+                data_store_output = NamedDataStoreOutput(
+                    buffers=[
+                        BufferEntry(_blob(offset, length), alignment)
+                        for offset, length, alignment in header["data_store_output"][
+                            "buffers"
+                        ]
+                    ],
+                    pte_data=header["data_store_output"]["pte_data"],
+                    external_data=header["data_store_output"]["external_data"],
+                )
+            result = PreprocessResult(
+                processed_bytes=_blob(*header["processed_bytes"]),
+                debug_handle_map=debug_handle_map,
+                data_store_output=data_store_output,
+            )
+            return result, header["debug_handles"]
+        except (struct.error, ValueError, KeyError, TypeError) as e:
+            logging.warning(f"Ignoring invalid preprocess cache entry {path}: {e}")
+            return None
+
+    def _store(
+        self,
+        key: str,
+        result: PreprocessResult,
+        debug_handles: List[Optional[int]],
+    ) -> None:
+        blobs: List[bytes] = []
+        offset = 0
+
+        def _add_blob(blob: bytes) -> List[int]:
+            nonlocal offset
+            blobs.append(blob)
+            offset += len(blob)
+            return [offset - len(blob), len(blob)]
+
+        header: Dict[str, Any] = {
+            "processed_bytes": _add_blob(bytes(result.processed_bytes)),
+            "debug_handle_map": (
+                [
+                    [key, list(handles)]
+                    for key, handles in result.debug_handle_map.items()
+                ]
+                if result.debug_handle_map is not None
+                else None
+            ),
+            "data_store_output": None,
+            "debug_handles": debug_handles,
+        }
+        if result.data_store_output is not None:
+            header["data_store_output"] = {
+                "buffers": [
+                    _add_blob(bytes(entry.buffer)) + [entry.alignment]
+                    for entry in result.data_store_output.buffers
+                ],
+                "pte_data": result.data_store_output.pte_data,
+                "external_data": result.data_store_output.external_data,
+            }
+        encoded_header = json.dumps(header).encode()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Write to a temporary file first, so that concurrent exports never see
+        # partial entries.
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER_LENGTH.pack(len(encoded_header)))
+            f.write(encoded_header)
+            for blob in blobs:
+                f.write(blob)
+        os.replace(tmp_path, self._path(key))
+
+    def preprocess(
+        self,
+        backend: Type[BackendDetails],
+        edge_program: ExportedProgram,
+        compile_specs: List[CompileSpec],
+    ) -> PreprocessResult:
+        """
+        Returns backend.preprocess(edge_program, compile_specs), from the cache
+        if possible.
+        """
+        # Fingerprint the program before preprocess() gets to modify it.
+        fingerprint = self._fingerprint(backend, edge_program, compile_specs)
+        if fingerprint is not None:
+            key, debug_handles = fingerprint
+            cached = self._load(key)
+            if cached is not None:
+                result, cached_debug_handles = cached
+                if cached_debug_handles != debug_handles:
+                    mapping = _debug_handle_mapping(cached_debug_handles, debug_handles)
+                    result = (
+                        backend.remap_debug_handles(result, mapping)
+                        if mapping is not None
+                        else None
+                    )
+                if result is not None:
+                    with self._lock:
+                        self.hits += 1
+                    return result
+        with self._lock:
+            self.misses += 1
+        result = backend.preprocess(edge_program, compile_specs)
+        if fingerprint is not None:
+            self._store(key, result, debug_handles)
+        return result
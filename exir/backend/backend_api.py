@@ -7,22 +7,30 @@
 
 import copy
 import logging
+import time
 from contextlib import contextmanager, nullcontext
 from dataclasses import dataclass
 from functools import singledispatch
-from typing import Dict, Generator, List, Mapping
+from typing import Dict, Generator, List, Mapping, Optional, Type
 
 import torch
+from executorch.exir._parallel import parallel_map
+from executorch.exir.backend._preprocess_cache import PreprocessCache
 
 from executorch.exir.backend.backend_details import BackendDetails, PreprocessResult
 from executorch.exir.backend.compile_spec_schema import CompileSpec
 
-from executorch.exir.backend.partitioner import Partitioner, PartitionResult
+from executorch.exir.backend.partitioner import (
+    DelegationSpec,
+    Partitioner,
+    PartitionResult,
+)
 from executorch.exir.backend.utils import (
     _maybe_duplicate_constant_nodes,
     is_identical_graph,
 )
 
+from executorch.exir.compile_profiler import record_event
 from executorch.exir.delegate import executorch_call_delegate, get_lowered_module_name
 
 from executorch.exir.graph_module import get_control_flow_submodules
@@ -99,7 +107,8 @@ def _(
         LoweredBackendModule: A Module that has been lowered to the target backend.
         Internally, the lowered Module contains these special attributes:
         backend_id (str: backend id), __processed_module__ (str: a compiled module)
-        compile_spec, original_module (original exported program)
+        compile_spec, original_module (original exported program). The time
+        preprocess took, in seconds, is in meta["preprocess_seconds"].
 
     Raises:
         NotImplementedError: The backend is not implemented (e.g. it was not found).
@@ -112,10 +121,13 @@ def _(
     for cls in BackendDetails.__subclasses__():
         if backend_id == cls.__name__:
             copied_edge_program = copy.deepcopy(edge_program)
-            preprocess_result: PreprocessResult = cls.preprocess(
+            start = time.perf_counter()
+            preprocess_result: PreprocessResult = _preprocess(
+                cls,
                 copied_edge_program,
                 compile_specs,
             )
+            preprocess_seconds = time.perf_counter() - start
             lowered_module = LoweredBackendModule(
                 edge_program=edge_program,
                 backend_id=backend_id,
@@ -124,13 +136,15 @@ def _(
                 named_data_store_output=preprocess_result.data_store_output,
             )
             lowered_module.meta = {
-                "debug_handle_map": preprocess_result.debug_handle_map
+                "debug_handle_map": preprocess_result.debug_handle_map,
+                "preprocess_seconds": preprocess_seconds,
             }
             return lowered_module
     raise NotImplementedError(f"Backend {backend_id} was not found.")
 
 
 _ENABLE_VALIDATION: bool = True
+_PREPROCESS_CACHE: Optional[PreprocessCache] = None
 
 
 def disable_validation() -> None:
@@ -156,6 +170,40 @@ def validation_disabled() -> Generator[None, None, None]:
         _ENABLE_VALIDATION = existing_setting
 
 
+@contextmanager
+def preprocess_cache(cache_dir: str) -> Generator[PreprocessCache, None, None]:
+    """
+    Stores the results of backend preprocess() in cache_dir, and reuses them for
+    partitions with the same graph, constants, compile specs and backend,
+    instead of preprocessing them again. Partitions that only differ in debug
+    handles share results if the backend implements
+    BackendDetails.remap_debug_handles(), which no in-tree backend does yet.
+    Methods lowered together to a backend
+    that overrides preprocess_multimethod() are not cached. The yielded
+    PreprocessCache counts the hits and misses.
+    """
+    global _PREPROCESS_CACHE
+    existing_cache = _PREPROCESS_CACHE
+    _PREPROCESS_CACHE = PreprocessCache(cache_dir)
+    try:
+        yield _PREPROCESS_CACHE
+    finally:
+        _PREPROCESS_CACHE = existing_cache
+
+
+def _preprocess(
+    backend: Type[BackendDetails],
+    edge_program: ExportedProgram,
+    compile_specs: List[CompileSpec],
+) -> PreprocessResult:
+    with record_event(
+        f"{backend.__name__}.preprocess", "preprocess", edge_program.graph_module
+    ):
+        if _PREPROCESS_CACHE is None:
+            return backend.preprocess(edge_program, compile_specs)
+        return _PREPROCESS_CACHE.preprocess(backend, edge_program, compile_specs)
+
+
 def _get_node_list_with_same_tag(
     tagged_graph_module: torch.fx.GraphModule,
     tag: str,
@@ -255,15 +303,64 @@ def _insert_lowered_submodule(
         )
 
 
+def _preprocess_max_workers(backend_ids: List[str], max_workers: int) -> int:
+    """
+    Returns max_workers if every given backend has opted in to concurrent
+    preprocessing with BackendDetails.thread_safe_preprocess, and 1 otherwise.
+    """
+    if max_workers <= 1:
+        return max_workers
+    # All backend implementation are final, so we don't need to consider nested subclasses.
+    thread_safe_backends = {
+        cls.__name__
+        for cls in BackendDetails.__subclasses__()
+        if cls.thread_safe_preprocess
+    }
+    unsafe_backend_ids = sorted(set(backend_ids) - thread_safe_backends)
+    if len(unsafe_backend_ids) > 0:
+        logging.warning(
+            f"Ignoring max_workers={max_workers} and preprocessing one at a time, "
+            f"as the preprocess() of {', '.join(unsafe_backend_ids)} is not "
+            "marked as thread-safe with BackendDetails.thread_safe_preprocess"
+        )
+        return 1
+    return max_workers
+
+
+@dataclass
+class _Partition:
+    """
+    A partition of a graph module that has been split out into a submodule,
+    waiting to be preprocessed and inserted back as a lowered module.
+    """
+
+    tag: str
+    delegation_spec: DelegationSpec
+    submodule_program: ExportedProgram
+    # Creating later partitions might replace the call_module node, so we keep
+    # track of its target and search for it once all partitions are created
+    submodule_name: str
+    submodule_output_node: torch.fx.Node
+    toplevel_input_specs_to_delete: Dict[str, InputSpec]
+    toplevel_output_specs_to_delete: Dict[str, OutputSpec]
+
+
 def _partition_and_lower_one_graph_module(
     tagged_graph_module: torch.fx.GraphModule,
     partition_result: PartitionResult,
     owning_program: ExportedProgram,
     is_submodule: bool,
+    max_workers: int = 1,
 ) -> torch.fx.GraphModule:
     """
     Partitioned and lowered the graph module based on the partition tag, this is to handle one graph module.
+
+    All partitions are created first, then preprocessed on up to max_workers
+    threads at once if all their backends have thread-safe preprocess(), then
+    inserted into the graph module in the order of the partition tags, so the
+    result does not depend on max_workers.
     """
+    partitions: List[_Partition] = []
     for tag, delegation_spec in partition_result.partition_tags.items():
         # Create partition with nodes containing this tag. There should only be
         # one contained submodule per tag
@@ -308,24 +405,57 @@ def _partition_and_lower_one_graph_module(
             call_module_node,
             is_submodule,
         )
-
-        lowered_submodule = to_backend(
-            delegation_spec.backend_id,
-            submodule_program,
-            delegation_spec.compile_specs,
+        partitions.append(
+            _Partition(
+                tag,
+                delegation_spec,
+                submodule_program,
+                call_module_node.target,
+                submodule_output_node,
+                toplevel_input_specs_to_delete,
+                toplevel_output_specs_to_delete,
+            )
         )
 
+    if len(partitions) == 0:
+        return tagged_graph_module
+
+    lowered_submodules = parallel_map(
+        lambda partition: to_backend(
+            partition.delegation_spec.backend_id,
+            partition.submodule_program,
+            partition.delegation_spec.compile_specs,
+        ),
+        partitions,
+        _preprocess_max_workers(
+            [partition.delegation_spec.backend_id for partition in partitions],
+            max_workers,
+        ),
+    )
+
+    call_module_nodes = {
+        node.target: node
+        for node in tagged_graph_module.graph.nodes
+        if node.op == "call_module"
+    }
+    for partition, lowered_submodule in zip(partitions, lowered_submodules):
+        logging.info(
+            f"Preprocessed partition {partition.tag} with "
+            f"{partition.delegation_spec.backend_id} in "
+            f"{lowered_submodule.meta['preprocess_seconds']:.3f}s"
+        )
         _insert_lowered_submodule(
-            submodule_program,
+            partition.submodule_program,
             owning_program,
-            call_module_node,
-            submodule_output_node,
+            call_module_nodes[partition.submodule_name],
+            partition.submodule_output_node,
             lowered_submodule,
             is_submodule,
-            toplevel_input_specs_to_delete,
-            toplevel_output_specs_to_delete,
+            partition.toplevel_input_specs_to_delete,
+            partition.toplevel_output_specs_to_delete,
         )
-        owning_program._validate()
+    # The program is only valid once every call_module node has been replaced
+    owning_program._validate()
 
     return tagged_graph_module
 
@@ -335,19 +465,28 @@ def _partition_and_lower(
     partition_result: PartitionResult,
     owning_program: ExportedProgram,
     is_submodule: bool = False,
+    max_workers: int = 1,
 ) -> torch.fx.GraphModule:
     """
     Partitions the graph module into submodules based on tags, and then lowered the nodes with the same tag as one lowered module, including the submodule from control flow
     """
 
     partitioned_module = _partition_and_lower_one_graph_module(
-        tagged_graph_module, partition_result, owning_program, is_submodule
+        tagged_graph_module,
+        partition_result,
+        owning_program,
+        is_submodule,
+        max_workers,
     )
 
     # Recursively partition and lower for submodules
     for name, submod, _node in get_control_flow_submodules(partitioned_module):
         partitioned_submodule = _partition_and_lower(
-            submod, partition_result, owning_program, is_submodule=True
+            submod,
+            partition_result,
+            owning_program,
+            is_submodule=True,
+            max_workers=max_workers,
         )
         tagged_graph_module.add_module(name, partitioned_submodule)
 
@@ -358,6 +497,7 @@ def _partition_and_lower(
 def _(
     edge_program: ExportedProgram,
     partitioner_instance: Partitioner,
+    max_workers: int = 1,
 ) -> ExportedProgram:
     """
     Add overloaded implementations for to_backend:
@@ -367,6 +507,7 @@ def _(
      def to_backend(
          edge_program: ExportedProgram,
          partitioner: Partitioner,
+         max_workers: int = 1,
      ) -> ExportedProgram:
 
     Returns a semantically-equivalent program to the one given as input (represented
@@ -381,9 +522,19 @@ def _(
         including both tagged exported program and partitioner_tag: Dict[str, DelegationSpec], where each key is a tag name and
         the nodes with same tag will be fused a one subgraph and delegated to backend specififed in delegation spec.
 
+        max_workers: Number of threads used to preprocess the partitions
+        concurrently. The output is the same for any value. It is ignored
+        unless the backends of all partitions set
+        BackendDetails.thread_safe_preprocess, as preprocess() must then not
+        run ExportPasses: torch.fx tracks the node metadata to preserve in
+        global state. No in-tree backend sets it yet, so partitions of the
+        in-tree backends are always preprocessed one at a time.
+
 
     Returns:
         ExportedProgram: The input program, with some portions targeted for delegation.
+        The time each partition took to preprocess is logged, and stored in
+        meta["preprocess_seconds"] of its lowered module.
     """
     edge_program._validate()
 
@@ -396,7 +547,8 @@ def _(
             f"Error in get_fake_program for graph {edge_program.graph_module}, fallback to deepcopy: {e}"
         )
         fake_edge_program = copy.deepcopy(edge_program)
-    partitioner_result = partitioner_instance(fake_edge_program)
+    with record_event(type(partitioner_instance).__name__, "partition"):
+        partitioner_result = partitioner_instance(fake_edge_program)
     tagged_exported_program = partitioner_result.tagged_exported_program
 
     # Check that the partitioner did not modify the original graph
@@ -421,6 +573,7 @@ def _(
         tagged_exported_program.graph_module,
         partitioner_result,
         tagged_exported_program,
+        max_workers=max_workers,
     )
 
     # Partitioner added delegation tags to the graph module nodes,
@@ -558,9 +711,14 @@ def lower_all_submodules_to_backend(
     backend_id: str,
     method_to_submodules_nodes: Dict[str, List[torch.fx.Node]],
     method_to_tagged_edge_program: Dict[str, ExportedProgram],
+    max_workers: int = 1,
 ) -> None:
     """
     Lower all submodules nodes given in the method_to_submodule_nodes map to backend_id.
+
+    If the backend does not override preprocess_multimethod() and sets
+    BackendDetails.thread_safe_preprocess, the methods are preprocessed on up to
+    max_workers threads at once. No in-tree backend sets it yet.
     """
     # The created exported program for the submodules are in the call_module node's meta data
     # We just map the method_to_submodule_nodes directly to the method_to_partitioned_exported_programs
@@ -583,11 +741,37 @@ def lower_all_submodules_to_backend(
     if backend_id not in backend_name_to_subclass:
         raise NotImplementedError(f"Backend {backend_id} was not found.")
 
-    method_to_preprocess_result: dict[str, List[PreprocessResult]] = (
-        backend_name_to_subclass[backend_id].preprocess_multimethod(
-            method_to_partitioned_program, method_to_compile_specs
+    backend = backend_name_to_subclass[backend_id]
+    method_to_preprocess_result: dict[str, List[PreprocessResult]]
+    if (
+        getattr(backend.preprocess_multimethod, "__func__", None)
+        is BackendDetails.preprocess_multimethod.__func__
+    ):
+        # The default preprocess_multimethod() runs preprocess() on each
+        # partition on its own, so the methods can be preprocessed concurrently
+        # and the partitions can be cached.
+        method_names = list(method_to_partitioned_program.keys())
+        method_to_preprocess_result = dict(
+            zip(
+                method_names,
+                parallel_map(
+                    lambda method_name: [
+                        _preprocess(backend, program, compile_specs)
+                        for program, compile_specs in zip(
+                            method_to_partitioned_program[method_name],
+                            method_to_compile_specs[method_name],
+                        )
+                    ],
+                    method_names,
+                    _preprocess_max_workers([backend_id], max_workers),
+                ),
+            )
         )
-    )
+    else:
+        with record_event(f"{backend.__name__}.preprocess_multimethod", "preprocess"):
+            method_to_preprocess_result = backend.preprocess_multimethod(
+                method_to_partitioned_program, method_to_compile_specs
+            )
 
     for method_name in method_to_preprocess_result.keys():
         owning_program = method_to_tagged_edge_program[method_name]
@@ -655,6 +839,9 @@ class MethodProgramsPartitionerSpec:
 
     method_to_edge_program: Mapping[str, ExportedProgram]
     method_to_partitioner: Mapping[str, Partitioner]
+    # Number of threads used to preprocess the methods concurrently, see
+    # lower_all_submodules_to_backend().
+    max_workers: int = 1
 
 
 @to_backend.register
@@ -709,7 +896,8 @@ def _(
                 f"Error in get_fake_program for graph {edge_program.graph_module}, fallback to deepcopy: {e}"
             )
             fake_edge_program = copy.deepcopy(edge_program)
-        partitioner_result = partitioner_instance(fake_edge_program)
+        with record_event(type(partitioner_instance).__name__, "partition"):
+            partitioner_result = partitioner_instance(fake_edge_program)
         tagged_exported_program = partitioner_result.tagged_exported_program
         method_to_tagged_exported_program[method_name] = tagged_exported_program
 
@@ -754,6 +942,7 @@ def _(
             backend_id,
             method_to_submodule_nodes,
             method_to_tagged_exported_program,
+            max_workers=method_edge_program_partitioners.max_workers,
         )
 
     for method_name in method_to_edge_program.keys():
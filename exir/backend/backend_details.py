@@ -52,6 +52,14 @@ class BackendDetails(ABC):
 
     """
 
+    # Whether preprocess() can run on several threads at once, so that
+    # to_backend() preprocesses partitions and methods concurrently when asked
+    # to. Backends should only set it if preprocess() does not run ExportPasses
+    # or otherwise touch global torch.fx state, such as the node metadata to
+    # preserve, and spends its time in code that releases the GIL. None of the
+    # in-tree backends set it yet.
+    thread_safe_preprocess: bool = False
+
     @staticmethod
     # all backends need to implement this method
     @enforcedmethod
@@ -80,6 +88,30 @@ class BackendDetails(ABC):
         # program in the backend.
         pass
 
+    @classmethod
+    def remap_debug_handles(
+        cls,
+        preprocess_result: PreprocessResult,
+        debug_handles: Dict[int, int],
+    ) -> Optional[PreprocessResult]:
+        """
+        Returns the result of preprocess() for an edge program, updated for an
+        identical edge program whose nodes have other debug handles. This lets
+        the preprocess cache reuse results between the repeated blocks of a
+        model. No in-tree backend implements it yet: XNNPACK, for instance,
+        serializes the debug handles into its processed bytes.
+
+        Args:
+            preprocess_result: The result of preprocess() for the first program.
+            debug_handles: Maps the debug handles of the nodes of the first
+                program to those of the nodes of the second one.
+
+        Returns:
+            The PreprocessResult for the second program, or None if the backend
+            cannot update its processed bytes, which is the default.
+        """
+        return None
+
     @classmethod
     def preprocess_multimethod(
         cls,
@@ -5,9 +5,12 @@ import logging
 from collections.abc import Sequence
 from typing import List, Optional
 
+from executorch.exir.backend.canonical_partitioners.reachability import (
+    ReachabilityPartitioner,
+)
 from torch.fx.graph_module import GraphModule
 from torch.fx.node import _get_qualified_name, Node
-from torch.fx.passes.infra.partitioner import CapabilityBasedPartitioner, Partition
+from torch.fx.passes.infra.partitioner import Partition
 from torch.fx.passes.operator_support import OperatorSupportBase
 
 
@@ -15,32 +18,10 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.WARNING)
 
 
-class _DependencyViewer:
-    def __init__(self, graph_module: GraphModule):
-        self.downstreams = collections.defaultdict(set)
-        self.upstreams = collections.defaultdict(set)
-
-        for node in reversed(graph_module.graph.nodes):
-            for output_node in node.users:
-                # add output_node and output_node's downstream dependency
-                self.downstreams[node].add(output_node)
-                self.downstreams[node].update(self.downstreams[output_node])
-
-        for node in graph_module.graph.nodes:
-            for input_node in node.all_input_nodes:
-                self.upstreams[node].add(input_node)
-                self.upstreams[node].update(self.upstreams[input_node])
-
-    def downstreams_of(self, node: Node) -> set[Node]:
-        return self.downstreams[node]
-
-    def upstreams_of(self, node: Node) -> set[Node]:
-        return self.upstreams[node]
-
-
-class GroupBasedPartitioner(CapabilityBasedPartitioner):
+class GroupBasedPartitioner(ReachabilityPartitioner):
     """
-    A specialized partitioner that extends the CapabilityBasedPartitioner from PyTorch FX.
+    A specialized partitioner that extends the CapabilityBasedPartitioner from PyTorch FX,
+    through ReachabilityPartitioner.
 
     GroupBasedPartitioner allows for explicit grouping of nodes into partitions based on
     predefined node groups, while also supporting automatic partitioning for nodes not
@@ -74,13 +55,12 @@ class GroupBasedPartitioner(CapabilityBasedPartitioner):
         node_groups: List[List[Node]] = None,
     ) -> None:
         super().__init__(
-            graph_module=graph_module,
-            operator_support=operator_support,
+            graph_module,
+            operator_support,
             allows_single_node_partition=allows_single_node_partition,
             non_compute_ops=non_compute_ops,
             allowed_single_node_partition_ops=allowed_single_node_partition_ops,
         )
-        self.dependency_viewer = _DependencyViewer(graph_module)
         self.node_groups = (
             [set(node_group) for node_group in node_groups] if node_groups else None
         )
@@ -115,13 +95,8 @@ class GroupBasedPartitioner(CapabilityBasedPartitioner):
                 if user not in combined_nodes:
                     user_nodes.append(user)
 
-        for external_node in user_nodes:
-            # Check if any external downstream nodes have downstream nodes in the combined partition
-            downstream_nodes = self.dependency_viewer.downstreams_of(external_node)
-            if any(n in combined_nodes for n in downstream_nodes):
-                return False
-
-        return True
+        # Check if any external downstream nodes have downstream nodes in the combined partition
+        return not self.dependency_viewer.reaches_any(user_nodes, combined_nodes)
 
     def _process_all_nodes(
         self,
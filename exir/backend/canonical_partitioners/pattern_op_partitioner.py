@@ -12,9 +12,12 @@ import torch
 from executorch.exir.backend.canonical_partitioners.group_partitioner import (
     GroupBasedPartitioner,
 )
-from torch.fx.passes.infra.partitioner import CapabilityBasedPartitioner, Partition
+from executorch.exir.backend.canonical_partitioners.reachability import (
+    ReachabilityPartitioner,
+)
+from executorch.exir.multi_pattern_matcher import MultiPatternMatcher
+from torch.fx.passes.infra.partitioner import Partition
 from torch.fx.passes.operator_support import any_chain, OperatorSupportBase
-from torch.fx.passes.utils.matcher_utils import SubgraphMatcher
 
 
 def generate_partitions_from_list_of_nodes(
@@ -46,7 +49,7 @@ def generate_partitions_from_list_of_nodes(
 
     # Run the CapabilityBasedPartitioner to return the largest possible
     # subgraphs containing the nodes with the tags
-    capability_partitioner = CapabilityBasedPartitioner(
+    capability_partitioner = ReachabilityPartitioner(
         graph_module,
         final_op_support,
         allows_single_node_partition=True,
@@ -136,10 +139,12 @@ def generate_pattern_op_partitions(
     if patterns is not None:
         # Find all patterns in the graph (even if they're invalid)
         matches = []
-        for pattern in patterns:
-            logging.debug(f"Finding matches for pattern: {pattern}")
-            subgraph_matcher = SubgraphMatcher(pattern, ignore_literals=ignore_literals)
-            matches.extend(subgraph_matcher.match(graph_module.graph))
+        pattern_matcher = MultiPatternMatcher(patterns, ignore_literals=ignore_literals)
+        for i, pattern_matches in pattern_matcher.iter_matches(graph_module.graph):
+            logging.debug(
+                f"Found {len(pattern_matches)} matches for pattern: {patterns[i]}"
+            )
+            matches.extend(pattern_matches)
 
         # Tag all the nodes in these patterns
         for match in matches:
@@ -171,7 +176,7 @@ def generate_pattern_op_partitions(
 
     # Run the CapabilityBasedPartitioner to return the largest possible
     # subgraphs containing the nodes with the tags
-    capability_partitioner = CapabilityBasedPartitioner(
+    capability_partitioner = ReachabilityPartitioner(
         graph_module,
         final_op_support,
         allows_single_node_partition=True,
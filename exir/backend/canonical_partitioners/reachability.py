@@ -0,0 +1,203 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import bisect
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from torch.fx.graph_module import GraphModule
+from torch.fx.node import Node
+from torch.fx.passes.infra.partitioner import CapabilityBasedPartitioner
+from torch.fx.passes.operator_support import OperatorSupportBase
+
+# The highest low number, the lowest post-order number and the sorted post-order
+# numbers of a set of nodes, in one traversal
+_TargetBounds = Tuple[int, int, List[int]]
+
+
+class ReachabilityIndex:
+    """
+    Answers whether a node of a graph is downstream of another, in linear space.
+
+    Storing the transitive closure of every node takes quadratic time and memory,
+    which does not scale to graphs with 100k nodes. Instead, every node gets its
+    position in the graph, which is topologically sorted, and the post-order
+    intervals of two depth first traversals of the graph:
+
+    - If a node reaches another, the interval of the first node contains the
+      interval of the second one in every traversal, and it comes first in the
+      topological order. Nodes failing either check are never searched.
+    - The nodes of the depth first tree of a node are downstream of it.
+
+    Queries only search the graph between the two checks, which usually rules
+    out most nodes right away.
+
+    ReachabilityIndex has the downstreams_of() and upstreams_of() methods of the
+    dependency viewers of CapabilityBasedPartitioner, so it can replace them.
+    """
+
+    # Number of depth first traversals labelling the nodes
+    NUM_TRAVERSALS: int = 2
+
+    def __init__(self, graph_module: GraphModule) -> None:
+        self._nodes: List[Node] = list(graph_module.graph.nodes)
+        self._order: Dict[Node, int] = {node: i for i, node in enumerate(self._nodes)}
+        self._users: List[List[int]] = [
+            [self._order[user] for user in node.users] for node in self._nodes
+        ]
+        # For each traversal: the post-order number of each node, the lowest
+        # post-order number of the nodes it reaches, and the lowest post-order
+        # number of its depth first tree
+        self._labels: List[Tuple[List[int], List[int], List[int]]] = [
+            self._label(reverse_users=i % 2 == 1) for i in range(self.NUM_TRAVERSALS)
+        ]
+
+    def _label(self, reverse_users: bool) -> Tuple[List[int], List[int], List[int]]:
+        num_nodes = len(self._nodes)
+        post = [-1] * num_nodes
+        low = [0] * num_nodes
+        tree_low = [0] * num_nodes
+        visited = [False] * num_nodes
+        counter = 0
+        for root in range(num_nodes):
+            if visited[root]:
+                continue
+            visited[root] = True
+            tree_low[root] = counter
+            stack = [(root, iter(self._users_of(root, reverse_users)))]
+            while stack:
+                i, users = stack[-1]
+                for user in users:
+                    if not visited[user]:
+                        visited[user] = True
+                        tree_low[user] = counter
+                        stack.append((user, iter(self._users_of(user, reverse_users))))
+                        break
+                else:
+                    stack.pop()
+                    # The users were all numbered before, as the graph is acyclic
+                    post[i] = counter
+                    low[i] = min([counter] + [low[user] for user in self._users[i]])
+                    counter += 1
+        return post, low, tree_low
+
+    def _users_of(self, i: int, reverse_users: bool) -> List[int]:
+        return self._users[i][::-1] if reverse_users else self._users[i]
+
+    def reaches(self, source: Node, target: Node) -> bool:
+        """Returns whether target is a direct or transitive user of source."""
+        return self.reaches_any([source], [target])
+
+    def reaches_any(self, sources: Iterable[Node], targets: Iterable[Node]) -> bool:
+        """
+        Returns whether any of targets is a direct or transitive user of any of
+        sources. Merging nodes into a partition creates a cycle if a user of the
+        partition outside of it reaches any node in it.
+        """
+        target_ids = {self._order[node] for node in targets}
+        if not target_ids:
+            return False
+        last_target = max(target_ids)
+        bounds = self._target_bounds(target_ids)
+
+        stack: List[int] = []
+        visited: Set[int] = set()
+
+        def visit(i: int) -> bool:
+            """Returns whether i is known to reach a target, or queues it."""
+            if i in visited or not self._may_reach(i, last_target, bounds):
+                return False
+            if self._tree_reaches(i, bounds):
+                return True
+            visited.add(i)
+            stack.append(i)
+            return False
+
+        if any(visit(self._order[node]) for node in sources):
+            return True
+        while stack:
+            for user in self._users[stack.pop()]:
+                if user in target_ids or visit(user):
+                    return True
+        return False
+
+    def _target_bounds(self, target_ids: Set[int]) -> List[_TargetBounds]:
+        """
+        For each traversal: the highest low number and the lowest post-order
+        number of the targets, and their sorted post-order numbers
+        """
+        return [
+            (
+                max(low[t] for t in target_ids),
+                min(post[t] for t in target_ids),
+                sorted(post[t] for t in target_ids),
+            )
+            for post, low, _ in self._labels
+        ]
+
+    def _may_reach(self, i: int, last_target: int, bounds: List[_TargetBounds]) -> bool:
+        """Returns False if node i cannot reach any of the targets."""
+        if i >= last_target:
+            return False
+        for (post, low, _), (max_low, min_post, _) in zip(self._labels, bounds):
+            if low[i] > max_low or post[i] < min_post:
+                return False
+        return True
+
+    def _tree_reaches(self, i: int, bounds: List[_TargetBounds]) -> bool:
+        """Returns whether a target is in the depth first tree of node i."""
+        for (post, _, tree_low), (_, _, target_posts) in zip(self._labels, bounds):
+            j = bisect.bisect_left(target_posts, tree_low[i])
+            if j < len(target_posts) and target_posts[j] < post[i]:
+                return True
+        return False
+
+    def downstreams_of(self, node: Node) -> Iterator[Node]:
+        """Yields the direct and transitive users of node."""
+        return self._traverse(node, lambda n: n.users)
+
+    def upstreams_of(self, node: Node) -> Iterator[Node]:
+        """Yields the direct and transitive inputs of node."""
+        return self._traverse(node, lambda n: n.all_input_nodes)
+
+    def _traverse(self, node: Node, neighbors) -> Iterator[Node]:
+        visited = {node}
+        stack = [node]
+        while stack:
+            for neighbor in neighbors(stack.pop()):
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    stack.append(neighbor)
+                    yield neighbor
+
+
+class ReachabilityPartitioner(CapabilityBasedPartitioner):
+    """
+    A CapabilityBasedPartitioner that checks for cycles with a ReachabilityIndex.
+
+    CapabilityBasedPartitioner.__init__ stores the downstream nodes of every
+    node, which takes quadratic time and memory in the graph size, so it is not
+    called. All the attributes it sets are set here instead, with a
+    ReachabilityIndex as the dependency_viewer.
+    """
+
+    def __init__(
+        self,
+        graph_module: GraphModule,
+        operator_support: OperatorSupportBase,
+        allows_single_node_partition: bool = False,
+        non_compute_ops: Optional[Sequence[str]] = None,
+        allowed_single_node_partition_ops: Optional[Sequence[str]] = None,
+    ) -> None:
+        self.graph_module = graph_module
+        self.operator_support = operator_support
+        self.allows_single_node_partition = allows_single_node_partition
+        self.non_compute_ops = non_compute_ops if non_compute_ops is not None else []
+        self.allowed_single_node_partition_ops = (
+            allowed_single_node_partition_ops
+            if allowed_single_node_partition_ops is not None
+            else []
+        )
+        self.dependency_viewer = ReachabilityIndex(graph_module)
@@ -4,7 +4,8 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
-from typing import final, List, NamedTuple
+import re
+from typing import Dict, final, List, NamedTuple, Optional
 
 import torch
 
@@ -75,6 +76,9 @@ class BackendWithCompilerDemo(BackendDetails):
         RuntimeError: The module cannot be processed by the backend.
     """
 
+    # preprocess() only reads the graph.
+    thread_safe_preprocess = True
+
     @staticmethod
     def preprocess(
         edge_program: ExportedProgram,
@@ -139,3 +143,27 @@ class BackendWithCompilerDemo(BackendDetails):
             ),
             debug_handle_map=debug_handle_map,
         )
+
+    @classmethod
+    def remap_debug_handles(
+        cls,
+        preprocess_result: PreprocessResult,
+        debug_handles: Dict[int, int],
+    ) -> Optional[PreprocessResult]:
+        def _remap(match: re.Match) -> bytes:
+            debug_handle = int(match.group(1))
+            return b"<debug_handle>%d#" % debug_handles.get(debug_handle, debug_handle)
+
+        assert preprocess_result.debug_handle_map is not None
+        return PreprocessResult(
+            processed_bytes=re.sub(
+                rb"<debug_handle>(-?[0-9]+)#",
+                _remap,
+                preprocess_result.processed_bytes,
+            ),
+            # The instructions are identified by the debug handle of their node.
+            debug_handle_map={
+                debug_handles[key]: (debug_handles[key],)
+                for key in preprocess_result.debug_handle_map
+            },
+        )
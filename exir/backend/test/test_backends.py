@@ -7,10 +7,12 @@
 import operator
 import unittest
 from typing import Dict, List
+from unittest.mock import patch
 
 import executorch.exir as exir
 import torch
 from executorch.exir import to_edge
+from executorch.exir._parallel import parallel_map
 from executorch.exir.backend.backend_api import LoweredBackendModule, to_backend
 from executorch.exir.backend.canonical_partitioners.all_node_partitioner import (
     AllNodePartitioner,
@@ -885,6 +887,58 @@ class TestBackends(unittest.TestCase):
             torch.allclose(model_output[0], ref_output, atol=1e-03, rtol=1e-03),
         )
 
+    def test_add_mul_partitioner_concurrent_preprocess(self):
+        class Model(torch.nn.Module):
+            def forward(self, a, x, b):
+                y = torch.mm(a, x)
+                z = y + b
+                a = z - a
+                y = torch.mm(a, x)
+                z = y + b
+                return z
+
+        inputs = (torch.randn(2, 2), torch.randn(2, 2), torch.randn(2, 2))
+
+        def lower(max_workers: int) -> exir.ExecutorchProgram:
+            ep = exir.capture(Model(), inputs, exir.CaptureConfig()).to_edge()
+            ep.exported_program = to_backend(
+                ep.exported_program, AddMulPartitionerDemo(), max_workers=max_workers
+            )
+            for node in ep.exported_program.graph.nodes:
+                if node.op == "get_attr":
+                    lowered_module = getattr(
+                        ep.exported_program.graph_module, node.target
+                    )
+                    self.assertGreaterEqual(
+                        lowered_module.meta["preprocess_seconds"], 0
+                    )
+            return ep.to_executorch()
+
+        # The partitions are inserted in the same order for any number of workers
+        self.assertEqual(lower(max_workers=1).buffer, lower(max_workers=4).buffer)
+
+    def test_preprocess_not_concurrent_unless_thread_safe(self):
+        class Model(torch.nn.Module):
+            def forward(self, a, x, b):
+                y = torch.mm(a, x)
+                z = y + b
+                a = z - a
+                y = torch.mm(a, x)
+                return y + b
+
+        inputs = (torch.randn(2, 2), torch.randn(2, 2), torch.randn(2, 2))
+        ep = exir.capture(Model(), inputs, exir.CaptureConfig()).to_edge()
+        with patch.object(
+            BackendWithCompilerDemo, "thread_safe_preprocess", False
+        ), patch(
+            "executorch.exir.backend.backend_api.parallel_map", wraps=parallel_map
+        ) as mock_parallel_map, self.assertLogs(
+            level="WARNING"
+        ) as logs:
+            to_backend(ep.exported_program, AddMulPartitionerDemo(), max_workers=4)
+        self.assertEqual(mock_parallel_map.call_args.args[2], 1)
+        self.assertIn("BackendWithCompilerDemo", "".join(logs.output))
+
     @vary_segments
     def test_partitioner_with_attributes(self, extract_delegate_segments: bool):
         """
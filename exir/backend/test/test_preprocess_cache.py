@@ -0,0 +1,150 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import torch
+from executorch.exir import EdgeProgramManager, to_edge
+from executorch.exir.backend._preprocess_cache import _backend_sources_digest
+from executorch.exir.backend.backend_api import preprocess_cache, to_backend
+from executorch.exir.backend.backend_details import BackendDetails
+from executorch.exir.backend.compile_spec_schema import CompileSpec
+from executorch.exir.backend.partitioner import DelegationSpec
+from executorch.exir.backend.test.backend_with_compiler_demo import (
+    BackendWithCompilerDemo,
+)
+from executorch.exir.backend.test.op_partitioner_demo import (
+    AddAttributePartitionerDemo,
+    AddMulPartitionerDemo,
+)
+
+
+class Model(torch.nn.Module):
+    def forward(self, a, x, b):
+        y = torch.mm(a, x)
+        z = y + b
+        a = z - a
+        y = torch.mm(a, x)
+        z = y + b
+        return z
+
+
+class TestPreprocessCache(unittest.TestCase):
+    def setUp(self) -> None:
+        torch.manual_seed(0)
+        self.model = Model()
+        self.inputs = (torch.randn(2, 2), torch.randn(2, 2), torch.randn(2, 2))
+
+    def _lower(self, partitioner: AddMulPartitionerDemo) -> EdgeProgramManager:
+        return to_edge(torch.export.export(self.model, self.inputs)).to_backend(
+            partitioner
+        )
+
+    def test_cache_hits_on_reexport(self) -> None:
+        expected = self._lower(AddMulPartitionerDemo()).to_executorch().buffer
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with preprocess_cache(cache_dir) as cache:
+                first = self._lower(AddMulPartitionerDemo()).to_executorch().buffer
+            # Both partitions are mm + add, with different debug handles.
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+            with preprocess_cache(cache_dir) as cache:
+                second = self._lower(AddMulPartitionerDemo()).to_executorch().buffer
+            self.assertEqual((cache.hits, cache.misses), (2, 0))
+        self.assertEqual(first, expected)
+        self.assertEqual(second, expected)
+
+    def test_cache_misses_on_new_compile_specs(self) -> None:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with preprocess_cache(cache_dir) as cache:
+                self._lower(AddMulPartitionerDemo())
+                partitioner = AddMulPartitionerDemo()
+                partitioner.delegation_spec = DelegationSpec(
+                    BackendWithCompilerDemo.__name__,
+                    [CompileSpec("max_value", bytes([5]))],
+                )
+                self._lower(partitioner)
+            self.assertEqual((cache.hits, cache.misses), (2, 2))
+
+    def test_cache_misses_on_new_constants(self) -> None:
+        class AddBias(torch.nn.Module):
+            def __init__(self) -> None:
+                super().__init__()
+                self.bias = torch.nn.Parameter(torch.randn(2, 2))
+
+            def forward(self, x):
+                return x + self.bias
+
+        model = AddBias()
+        inputs = (torch.randn(2, 2),)
+
+        def lower() -> None:
+            # The partitions own the parameter they use
+            to_edge(torch.export.export(model, inputs)).to_backend(
+                AddAttributePartitionerDemo()
+            )
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with preprocess_cache(cache_dir) as cache:
+                lower()
+                lower()
+                with torch.no_grad():
+                    model.bias.add_(1)
+                lower()
+            self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_invalid_entries_are_ignored(self) -> None:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with preprocess_cache(cache_dir):
+                expected = self._lower(AddMulPartitionerDemo()).to_executorch().buffer
+            for name in os.listdir(cache_dir):
+                with open(os.path.join(cache_dir, name), "r+b") as f:
+                    f.truncate(16)
+
+            with preprocess_cache(cache_dir) as cache:
+                edge = to_edge(torch.export.export(self.model, self.inputs))
+                edge_program = to_backend(
+                    edge.exported_program(), AddMulPartitionerDemo()
+                )
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(
+            EdgeProgramManager({"forward": edge_program}).to_executorch().buffer,
+            expected,
+        )
+
+    def test_cache_misses_if_backend_cannot_remap_debug_handles(self) -> None:
+        expected = self._lower(AddMulPartitionerDemo()).to_executorch().buffer
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with preprocess_cache(cache_dir) as cache, patch.object(
+                BackendWithCompilerDemo,
+                "remap_debug_handles",
+                classmethod(BackendDetails.remap_debug_handles.__func__),
+            ):
+                actual = self._lower(AddMulPartitionerDemo()).to_executorch().buffer
+            self.assertEqual((cache.hits, cache.misses), (0, 2))
+        self.assertEqual(actual, expected)
+
+    def test_fingerprint_covers_backend_sources(self) -> None:
+        with tempfile.TemporaryDirectory() as backend_dir:
+
+            def write(path: str, content: str) -> bytes:
+                path = os.path.join(backend_dir, path)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w") as f:
+                    f.write(content)
+                _backend_sources_digest.cache_clear()
+                return _backend_sources_digest(backend_dir)
+
+            write("backend.py", "class Backend: ...")
+            digest = write("operators/op_add.py", "ADD = 1")
+            # Files the backend is made of change the fingerprint, its tests don't.
+            self.assertNotEqual(write("operators/op_add.py", "ADD = 2"), digest)
+            digest = write("schema.fbs", "table Graph {}")
+            self.assertEqual(write("test/test_backend.py", "assert True"), digest)
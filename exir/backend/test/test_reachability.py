@@ -0,0 +1,119 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import random
+import unittest
+from typing import Dict, Set
+from unittest.mock import patch
+
+import torch
+import torch.fx.passes.infra.partitioner as partitioner_module
+from executorch.exir.backend.canonical_partitioners.reachability import (
+    ReachabilityIndex,
+    ReachabilityPartitioner,
+)
+from torch.fx.passes.infra.partitioner import CapabilityBasedPartitioner
+from torch.fx.passes.operator_support import OperatorSupportBase
+
+
+class TestReachabilityIndex(unittest.TestCase):
+    def _random_graph_module(self, num_nodes: int, seed: int) -> torch.fx.GraphModule:
+        rng = random.Random(seed)
+        graph = torch.fx.Graph()
+        nodes = [graph.placeholder("x"), graph.placeholder("y")]
+        for _ in range(num_nodes):
+            num_inputs = rng.randint(1, 3)
+            inputs = rng.sample(nodes[-20:], min(num_inputs, len(nodes[-20:])))
+            nodes.append(graph.call_function(torch.add, (inputs[0], inputs[-1])))
+        graph.output(nodes[-1])
+        return torch.fx.GraphModule(torch.nn.Module(), graph)
+
+    def _downstreams(
+        self, graph_module: torch.fx.GraphModule
+    ) -> Dict[torch.fx.Node, Set[torch.fx.Node]]:
+        downstreams = {}
+        for node in reversed(graph_module.graph.nodes):
+            downstreams[node] = set(node.users)
+            for user in node.users:
+                downstreams[node].update(downstreams[user])
+        return downstreams
+
+    def test_reaches(self) -> None:
+        for seed in range(4):
+            graph_module = self._random_graph_module(num_nodes=60, seed=seed)
+            index = ReachabilityIndex(graph_module)
+            downstreams = self._downstreams(graph_module)
+            nodes = list(graph_module.graph.nodes)
+            for source in nodes:
+                for target in nodes:
+                    self.assertEqual(
+                        index.reaches(source, target),
+                        target in downstreams[source],
+                        f"{source} -> {target}",
+                    )
+                self.assertEqual(set(index.downstreams_of(source)), downstreams[source])
+
+    def test_reaches_any(self) -> None:
+        rng = random.Random(0)
+        graph_module = self._random_graph_module(num_nodes=200, seed=0)
+        index = ReachabilityIndex(graph_module)
+        downstreams = self._downstreams(graph_module)
+        nodes = list(graph_module.graph.nodes)
+        for _ in range(500):
+            sources = rng.sample(nodes, rng.randint(1, 4))
+            targets = rng.sample(nodes, rng.randint(0, 8))
+            self.assertEqual(
+                index.reaches_any(sources, targets),
+                any(
+                    target in downstreams[source]
+                    for source in sources
+                    for target in targets
+                ),
+            )
+
+    def test_upstreams_of(self) -> None:
+        graph_module = self._random_graph_module(num_nodes=30, seed=1)
+        index = ReachabilityIndex(graph_module)
+        downstreams = self._downstreams(graph_module)
+        for node in graph_module.graph.nodes:
+            self.assertEqual(
+                set(index.upstreams_of(node)),
+                {other for other in downstreams if node in downstreams[other]},
+            )
+
+    def test_partitioner_matches_capability_based_partitioner(self) -> None:
+        class RandomSupport(OperatorSupportBase):
+            def __init__(self, graph_module: torch.fx.GraphModule, seed: int) -> None:
+                rng = random.Random(seed)
+                self.supported = {
+                    node
+                    for node in graph_module.graph.nodes
+                    if node.op == "call_function" and rng.random() < 0.7
+                }
+
+            def is_node_supported(self, submodules, node: torch.fx.Node) -> bool:
+                return node in self.supported
+
+        for seed in range(4):
+            graph_module = self._random_graph_module(num_nodes=100, seed=seed)
+            expected = CapabilityBasedPartitioner(
+                graph_module,
+                RandomSupport(graph_module, seed),
+                allows_single_node_partition=True,
+            ).propose_partitions()
+            with patch.object(
+                partitioner_module, "_DependencyViewer"
+            ) as dependency_viewer:
+                partitions = ReachabilityPartitioner(
+                    graph_module,
+                    RandomSupport(graph_module, seed),
+                    allows_single_node_partition=True,
+                ).propose_partitions()
+            dependency_viewer.assert_not_called()
+            self.assertEqual(
+                sorted(sorted(n.name for n in p.nodes) for p in partitions),
+                sorted(sorted(n.name for n in p.nodes) for p in expected),
+            )
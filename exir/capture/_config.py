@@ -50,6 +50,13 @@ class EdgeCompileConfig:
     # Allow ops to be preserved in the graph, i.e., prevent them from being decomposed.
     # These may be core or non-core ATen ops; custom ops should not be here.
     preserve_ops: List[torch.torch._ops.OpOverload] = field(default_factory=list)
+    # Number of threads used to run backend preprocess() on the methods of a
+    # multi-method program concurrently, for backends that do not override
+    # preprocess_multimethod() and set BackendDetails.thread_safe_preprocess.
+    # 1 preprocesses them one after another. The output is the same either way.
+    # No backend in this tree sets thread_safe_preprocess yet, so for now the
+    # methods of in-tree backends are always preprocessed one after another.
+    max_method_workers: int = 1
 
 
 @compatibility(is_backward_compatible=False)
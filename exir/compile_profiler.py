@@ -0,0 +1,310 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+"""
+Records where time and memory go while a program is lowered to ExecuTorch.
+
+Profiling is enabled with the profile_compile() context manager, or for the
+whole process by setting the EXECUTORCH_COMPILE_PROFILE environment variable to
+the path the Chrome trace is written to at exit. While it is enabled, the
+export stages, the passes run by PassManager and to_executorch(), memory
+planning, partitioners, backend preprocess calls, emission and serialization are recorded
+with their wall time, peak RSS growth and node counts::
+
+    with profile_compile() as profiler:
+        et_program = to_edge(exported_program).to_backend(partitioner).to_executorch()
+    print(profiler.table())
+    profiler.save_chrome_trace("compile_trace.json")
+"""
+
+import atexit
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Generator, List, Optional, Tuple, TypeVar
+
+import torch
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+ENV_VAR: str = "EXECUTORCH_COMPILE_PROFILE"
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def _num_nodes(graph_module: Optional[torch.fx.GraphModule]) -> Optional[int]:
+    if not isinstance(graph_module, torch.fx.GraphModule):
+        return None
+    return sum(
+        len(submodule.graph.nodes)
+        for submodule in graph_module.modules()
+        if isinstance(submodule, torch.fx.GraphModule)
+    )
+
+
+@dataclass
+class ProfileEvent:
+    """
+    A step of the lowering, like a pass or a backend preprocess call.
+
+    Attributes:
+        name: Name of the step, like the class name of a pass.
+        category: Kind of step, one of "stage", "pass", "partition",
+            "preprocess", "memory_planning", "emit" and "serialize".
+        start_us: Start time in microseconds, relative to the profiler start.
+        duration_us: Wall time in microseconds.
+        peak_rss_delta: Growth of the peak resident set size of the process in
+            bytes during the step, or None if it cannot be measured.
+        nodes_before: Number of nodes in the graph module before the step.
+        nodes_after: Number of nodes in the graph module after the step.
+        thread_id: Thread the step ran on.
+    """
+
+    name: str
+    category: str
+    start_us: float
+    duration_us: float = 0.0
+    peak_rss_delta: Optional[int] = None
+    nodes_before: Optional[int] = None
+    nodes_after: Optional[int] = None
+    thread_id: int = 0
+
+
+class CompileProfiler:
+    """Collects ProfileEvents and exports them as a Chrome trace or a table."""
+
+    def __init__(self) -> None:
+        self.events: List[ProfileEvent] = []
+        self._start = time.perf_counter()
+        # Backends may preprocess partitions on several threads at once.
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def record(
+        self,
+        name: str,
+        category: str,
+        graph_module: Optional[torch.fx.GraphModule] = None,
+    ) -> Generator[ProfileEvent, None, None]:
+        """
+        Records the code run in the context as an event. The number of nodes
+        of graph_module is counted before and after; set nodes_after on the
+        yielded event if the step returns a new graph module.
+        """
+        peak_rss = _peak_rss_bytes()
+        start = time.perf_counter()
+        event = ProfileEvent(
+            name,
+            category,
+            start_us=(start - self._start) * 1e6,
+            nodes_before=_num_nodes(graph_module),
+            thread_id=threading.get_ident(),
+        )
+        try:
+            yield event
+        finally:
+            event.duration_us = (time.perf_counter() - start) * 1e6
+            if peak_rss is not None:
+                event.peak_rss_delta = _peak_rss_bytes() - peak_rss  # pyre-ignore
+            if event.nodes_after is None:
+                event.nodes_after = _num_nodes(graph_module)
+            with self._lock:
+                self.events.append(event)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Returns the events in the Chrome trace event format."""
+        pid = os.getpid()
+        return {
+            "traceEvents": [
+                {
+                    "name": event.name,
+                    "cat": event.category,
+                    "ph": "X",
+                    "ts": event.start_us,
+                    "dur": event.duration_us,
+                    "pid": pid,
+                    "tid": event.thread_id,
+                    "args": {
+                        "peak_rss_delta": event.peak_rss_delta,
+                        "nodes_before": event.nodes_before,
+                        "nodes_after": event.nodes_after,
+                    },
+                }
+                for event in sorted(self.events, key=lambda event: event.start_us)
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def save_chrome_trace(self, path: str) -> None:
+        """
+        Writes the events to path as a Chrome trace, to be opened in Perfetto
+        or chrome://tracing.
+        """
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+    def table(self, limit: Optional[int] = None) -> str:
+        """
+        Returns a table with one row per step, ordered by total time. Steps
+        that ran several times, like a pass run on every method, are summed.
+        """
+        rows: Dict[Tuple[str, str], List[Any]] = {}
+        for event in self.events:
+            row = rows.setdefault(
+                (event.category, event.name),
+                [event.category, event.name, 0, 0.0, 0.0, None, None],
+            )
+            row[2] += 1
+            row[3] += event.duration_us / 1e3
+            row[4] = max(row[4], event.duration_us / 1e3)
+            if event.peak_rss_delta is not None:
+                row[5] = max(row[5] or 0, event.peak_rss_delta)
+            if event.nodes_before is not None and event.nodes_after is not None:
+                row[6] = (row[6] or 0) + event.nodes_after - event.nodes_before
+        sorted_rows = sorted(rows.values(), key=lambda row: row[3], reverse=True)
+        if limit is not None:
+            sorted_rows = sorted_rows[:limit]
+
+        header = [
+            "Category",
+            "Name",
+            "Calls",
+            "Total (ms)",
+            "Max (ms)",
+            "Peak RSS +MB",
+            "Nodes +/-",
+        ]
+        lines = [
+            [
+                category,
+                name,
+                str(calls),
+                f"{total_ms:.1f}",
+                f"{max_ms:.1f}",
+                "-" if rss_delta is None else f"{rss_delta / 2**20:.1f}",
+                "-" if nodes_delta is None else f"{nodes_delta:+d}",
+            ]
+            for category, name, calls, total_ms, max_ms, rss_delta, nodes_delta in sorted_rows
+        ]
+        widths = [
+            max(len(line[i]) for line in [header] + lines) for i in range(len(header))
+        ]
+        return "\n".join(
+            "  ".join(
+                cell.ljust(width) if i < 2 else cell.rjust(width)
+                for i, (cell, width) in enumerate(zip(line, widths))
+            )
+            for line in [header] + lines
+        )
+
+
+_ACTIVE_PROFILER: Optional[CompileProfiler] = None
+
+
+@contextmanager
+def profile_compile() -> Generator[CompileProfiler, None, None]:
+    """Records the lowering steps run in the context in the yielded profiler."""
+    global _ACTIVE_PROFILER
+    existing_profiler = _ACTIVE_PROFILER
+    _ACTIVE_PROFILER = CompileProfiler()
+    try:
+        yield _ACTIVE_PROFILER
+    finally:
+        _ACTIVE_PROFILER = existing_profiler
+
+
+@contextmanager
+def record_event(
+    name: str,
+    category: str,
+    graph_module: Optional[torch.fx.GraphModule] = None,
+) -> Generator[Optional[ProfileEvent], None, None]:
+    """
+    Records the code run in the context with the active profiler, see
+    CompileProfiler.record(). Yields None if profiling is disabled.
+    """
+    profiler = _ACTIVE_PROFILER
+    if profiler is None:
+        yield None
+        return
+    with profiler.record(name, category, graph_module) as event:
+        yield event
+
+
+def _pass_name(pass_: Callable[..., Any]) -> str:
+    if inspect.isfunction(pass_) or inspect.ismethod(pass_):
+        return pass_.__name__
+    return type(pass_).__name__
+
+
+def run_pass(
+    pass_: Callable[[torch.fx.GraphModule], Any], graph_module: torch.fx.GraphModule
+) -> Any:
+    """Returns pass_(graph_module), recorded as a "pass" event."""
+    with record_event(_pass_name(pass_), "pass", graph_module) as event:
+        result = pass_(graph_module)
+        if event is not None and result is not None:
+            event.nodes_after = _num_nodes(getattr(result, "graph_module", None))
+    return result
+
+
+def profiled_pass(pass_: F) -> F:
+    """
+    Wraps pass_ to record its calls as "pass" events. The wrapper is named
+    after the pass, so that pass managers report it under the same name.
+    """
+
+    def wrapper(graph_module: torch.fx.GraphModule) -> Any:
+        return run_pass(pass_, graph_module)
+
+    wrapper.__name__ = _pass_name(pass_)
+    return wrapper  # pyre-ignore
+
+
+def profiled_stage(name: str) -> Callable[[F], F]:
+    """Decorates a function to record its calls as "stage" events."""
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with record_event(name, "stage"):
+                return func(*args, **kwargs)
+
+        return wrapper  # pyre-ignore
+
+    return decorator
+
+
+def _save_profile_at_exit(profiler: CompileProfiler, path: str) -> None:
+    profiler.save_chrome_trace(path)
+    print(
+        f"ExecuTorch compile profile written to {path}\n{profiler.table(limit=50)}",
+        file=sys.stderr,
+    )
+
+
+if os.environ.get(ENV_VAR):
+    _ACTIVE_PROFILER = CompileProfiler()
+    atexit.register(_save_profile_at_exit, _ACTIVE_PROFILER, os.environ[ENV_VAR])
@@ -49,7 +49,7 @@ class EmitterOutput:
 
     # Constants are optionally stored in external files.
     # Aggregate unique external constants into one buffer.
-    external_constant_buffer: List[bytes]
+    external_constant_buffer: List[Union[bytes, memoryview]]
     # Each constant_tag groups a set of constants together.
     # {constant_tag: {fqn: index into external_constant_buffer}}
     external_constant_map: Optional[Dict[str, Dict[str, int]]]
@@ -28,11 +28,11 @@ their instructions.
 # presence of aot autograd param lifting.
 
 # pyre-strict
-import ctypes
 import hashlib
 import operator
 import typing
 import warnings
+import weakref
 from dataclasses import dataclass, field
 from typing import Any, Callable, cast, Dict, List, Mapping, Optional, Tuple, Union
 
@@ -99,6 +99,17 @@ from torch.utils import _pytree as pytree
 from typing_extensions import TypeAlias
 
 
+def _storage_to_memoryview(storage: torch.UntypedStorage) -> memoryview:
+    """Returns a read-only view of the bytes of a CPU storage, without copying them.
+
+    The view keeps the storage alive, and aliases it: later in-place changes to the tensor are
+    visible through it. Callers that keep the view must not modify the tensor in place while
+    the view is in use.
+    """
+    byte_tensor = torch.empty(0, dtype=torch.uint8).set_(storage)
+    return memoryview(byte_tensor.numpy()).toreadonly()
+
+
 @dataclass
 class _ProgramState:
     """State shared between all methods of a program and the graph module it represents.
@@ -115,6 +126,12 @@ class _ProgramState:
     # from O(N) to O(1)
     cached_spec_hash_values: Dict[str, int] = field(default_factory=dict)
     cached_spec_mutable_hash_values: Dict[str, int] = field(default_factory=dict)
+    # Content hashes of the storages seen so far. Lets constants that share a storage skip
+    # hashing. Keyed by the storage objects themselves, which are not kept alive, so that a
+    # new storage reusing a freed allocation is never mistaken for an old one.
+    cached_storage_hash_values: (
+        "weakref.WeakKeyDictionary[torch.UntypedStorage, str]"
+    ) = field(default_factory=weakref.WeakKeyDictionary)
     # The 0 index is reserved to be pointed to by non-constant tensors, so add an empty placeholder.
     constant_buffer: List[Buffer] = field(default_factory=lambda: [Buffer(storage=b"")])
     # The 0 index is reserved to be pointed to by non-constant tensors, so add an empty placeholder.
@@ -127,7 +144,9 @@ class _ProgramState:
 
     # Constants are optionally stored in external files.
     # Aggregate unique external constants into one buffer.
-    external_constant_buffer: List[bytes] = field(default_factory=list)
+    external_constant_buffer: List[Union[bytes, memoryview]] = field(
+        default_factory=list
+    )
     external_constant_hash: Dict[str, int] = field(default_factory=dict)
     # Each constant_tag groups a set of constants together.
     # {constant_tag: {fqn: index into external_constant_buffer}}
@@ -375,7 +394,7 @@ class _Emitter(torch.fx.Interpreter):
     def _save_new_const_tensor(
         self,
         spec: TensorSpec,
-        buffer_data: bytes,
+        buffer_data: Union[bytes, memoryview],
         hashed: str,
         allocation_info: Optional[AllocationDetails] = None,
         constant_tag: Optional[str] = None,
@@ -386,6 +405,7 @@ class _Emitter(torch.fx.Interpreter):
         # +1 because the first buffer location is reserved.
 
         # Update buffer_idx to point to the end of the list where we are adding the new buffer.
+        # pyre-ignore[6]: A memoryview is as good as bytes for serialization, and avoids a copy.
         buffer = Buffer(storage=buffer_data)
 
         # Tensor is stored outside of the PTE file.
@@ -440,22 +460,19 @@ class _Emitter(torch.fx.Interpreter):
         if spec.const:
             # Tensor with a blob we need to serialize. May not actually be constant at runtime
             # if it's a weight with an associated gradient.
-            spec_array_type = (
-                ctypes.c_char * typing.cast(torch.UntypedStorage, spec.storage).nbytes()
-            )
-
-            buffer_data = (
-                bytes(
-                    ctypes.cast(
-                        typing.cast(torch.UntypedStorage, spec.storage).data_ptr(),
-                        ctypes.POINTER(spec_array_type),
-                    ).contents
-                )
-                if spec.allocated_memory != 0
-                else b""
+            storage = typing.cast(torch.UntypedStorage, spec.storage)
+            # The constant is hashed and serialized from a read-only view of its storage,
+            # without copying it. The emitted program therefore aliases the weights until
+            # it is written out, so they must not be modified in place in the meantime.
+            storage_view = (
+                _storage_to_memoryview(storage) if spec.allocated_memory != 0 else b""
             )
 
-            hashed = hashlib.sha256(buffer_data).hexdigest()
+            # Weights are often shared between methods; only hash each storage once.
+            hashed = self.program_state.cached_storage_hash_values.get(storage)
+            if hashed is None:
+                hashed = hashlib.sha256(storage_view).hexdigest()
+                self.program_state.cached_storage_hash_values[storage] = hashed
 
             if allocation_info and spec.extra_tensor_info is None:
                 buffer_idx = self.program_state.cached_spec_mutable_hash_values.get(
@@ -472,14 +489,14 @@ class _Emitter(torch.fx.Interpreter):
             # Haven't seen this constant before.
             if buffer_idx == -1:
                 buffer_idx = self._save_new_const_tensor(
-                    spec, buffer_data, hashed, allocation_info, constant_tag
+                    spec, storage_view, hashed, allocation_info, constant_tag
                 )
 
-            if spec.const and spec.nbytes() != len(buffer_data):
+            if spec.const and spec.nbytes() != len(storage_view):
                 raise InternalError(
                     self._emit_node_specific_error(
                         self.node,
-                        f"Tensor spec has buffer of size {len(buffer_data)}, but expected nbytes of {spec.nbytes()}",
+                        f"Tensor spec has buffer of size {len(storage_view)}, but expected nbytes of {spec.nbytes()}",
                     )
                 )
 
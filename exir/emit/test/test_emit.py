@@ -16,6 +16,7 @@ import executorch.exir as exir
 
 import executorch.exir.schema as schema
 import executorch.exir.tests.models as models
+import numpy as np
 import pytest
 import torch
 from executorch.exir import (
@@ -1517,6 +1518,36 @@ class TestEmit(unittest.TestCase):
         self.assertEqual(len(program.constant_buffer[1].storage), 4)
         self.assertEqual(len(program.constant_buffer[2].storage), 4)
 
+    def test_emit_constants_without_copies(self) -> None:
+        class SharedWeight(nn.Module):
+            def __init__(self, weight: torch.nn.Parameter) -> None:
+                super().__init__()
+                self.W = weight
+
+            def forward(self, x):
+                return self.W + x
+
+        weight = torch.nn.Parameter(torch.randn(4))
+        inputs = (torch.ones(4),)
+        program = to_edge(
+            {
+                "forward": export(SharedWeight(weight), inputs, strict=True),
+                "other": export(SharedWeight(weight), inputs, strict=True),
+            }
+        ).to_executorch()
+
+        emitted = program._emitter_output.program
+        # The weight is shared between methods, so it is only emitted once.
+        self.assertEqual(len(emitted.constant_buffer), 2)
+        # The emitted buffer is a read-only view of the weight's storage instead of a copy.
+        storage = emitted.constant_buffer[1].storage
+        self.assertIsInstance(storage, memoryview)
+        self.assertTrue(storage.readonly)
+        self.assertEqual(
+            np.frombuffer(storage, dtype=np.uint8).ctypes.data, weight.data_ptr()
+        )
+        self.assertIn(weight.detach().numpy().tobytes(), program.buffer)
+
     def test_non_persistent_buffer(self) -> None:
         class NonPersistentBuffer(nn.Module):
             def __init__(self):
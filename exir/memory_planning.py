@@ -6,12 +6,18 @@
 
 # pyre-strict
 
+import bisect
 import functools
+import heapq
 import itertools
+import json
 import logging
+import math
 import operator
+import random
+import time
 from collections import defaultdict
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from typing import (
     Any,
     Callable,
@@ -25,6 +31,7 @@ from typing import (
     Union,
 )
 
+import numpy as np
 import torch
 from executorch.exir import memory
 from executorch.exir.control_flow import while_loop as exir_while
@@ -145,6 +152,180 @@ class Verifier:
         message += f"rhs: mem_id {rhs_spec.mem_id} storage: {rhs_spec.mem_offset}, {rhs_spec.allocated_memory}"
         return message
 
+    @classmethod
+    def _storage_intervals(
+        cls, specs: Iterable[TensorSpec]
+    ) -> List[List[Tuple[int, int, TensorSpec]]]:
+        """
+        Groups the specs by mem_id, and returns the inclusive storage interval
+        [start, end] of each spec in groups of at least two specs. Specs that
+        occupy no memory are left out since their storage overlaps nothing.
+        """
+        specs_by_mem_id: Dict[Optional[int], List[TensorSpec]] = defaultdict(list)
+        for spec in specs:
+            specs_by_mem_id[spec.mem_id].append(spec)
+
+        groups = []
+        for mem_specs in specs_by_mem_id.values():
+            if len(mem_specs) < 2:
+                continue
+            intervals = []
+            for spec in mem_specs:
+                internal_assert(
+                    spec.allocated_memory >= 0,
+                    f"{spec} should have non-zero allocated memory",
+                )
+                internal_assert(
+                    isinstance(spec.mem_offset, int) and spec.mem_offset >= 0,
+                    f"{spec} should have specified memory offset",
+                )
+                if spec.allocated_memory > 0:
+                    intervals.append(
+                        (
+                            spec.mem_offset,
+                            spec.mem_offset + spec.allocated_memory - 1,
+                            spec,
+                        )
+                    )
+            groups.append(intervals)
+        return groups
+
+    @classmethod
+    def num_storage_overlaps(cls, specs: Iterable[TensorSpec]) -> int:
+        """
+        Returns the number of pairs of specs with overlapping storage, without
+        visiting the pairs.
+        """
+        num_pairs = 0
+        for intervals in cls._storage_intervals(specs):
+            starts = np.sort(np.array([ivl[0] for ivl in intervals], dtype=np.int64))
+            ends = np.array([ivl[1] for ivl in intervals], dtype=np.int64)
+            # Two intervals are disjoint iff one starts after the other ends, so
+            # each disjoint pair is counted once here.
+            num_disjoint = int(
+                (len(starts) - np.searchsorted(starts, ends, side="right")).sum()
+            )
+            num_pairs += len(intervals) * (len(intervals) - 1) // 2 - num_disjoint
+        return num_pairs
+
+    @classmethod
+    def _mem_obj_id_mismatches(
+        cls, intervals: List[Tuple[int, int, TensorSpec]]
+    ) -> List[Tuple[TensorSpec, TensorSpec]]:
+        """
+        Sweeps over the storage intervals of one mem_id in the order of their
+        start, and returns the pairs that overlap but have different mem_obj_ids.
+        """
+        intervals = sorted(intervals, key=lambda ivl: ivl[0])
+        # The (max end, mem_obj_id) of the two mem_obj_ids with the largest
+        # storage end seen so far. Another mem_obj_id can only overlap the
+        # current interval if one of them does.
+        top_ends: List[Tuple[int, Optional[int]]] = []
+        mismatches = []
+        for i, (start, end, spec) in enumerate(intervals):
+            if any(
+                obj_id != spec.mem_obj_id and obj_end >= start
+                for obj_end, obj_id in top_ends
+            ):
+                mismatches.extend(
+                    (other, spec)
+                    for _, other_end, other in intervals[:i]
+                    if other_end >= start and not cls.mem_obj_id_match(other, spec)
+                )
+            obj_end = max(
+                [end] + [e for e, obj_id in top_ends if obj_id == spec.mem_obj_id]
+            )
+            top_ends = [ivl for ivl in top_ends if ivl[1] != spec.mem_obj_id]
+            top_ends.append((obj_end, spec.mem_obj_id))
+            top_ends = sorted(top_ends, key=lambda ivl: ivl[0], reverse=True)[:2]
+        return mismatches
+
+    @classmethod
+    def _lifetime_and_storage_overlaps(
+        cls, intervals: List[Tuple[int, int, TensorSpec]]
+    ) -> List[Tuple[TensorSpec, TensorSpec]]:
+        """
+        Sweeps over the lifetimes of the specs of one mem_id, and returns the pairs
+        that overlap in both lifetime and storage.
+        """
+        for _, _, spec in intervals:
+            internal_assert(
+                spec.lifetime[0] is not None and spec.lifetime[1] is not None,
+                f"{spec} should have valid start and end",
+            )
+        order = sorted(
+            (
+                i
+                for i, (_, _, spec) in enumerate(intervals)
+                if spec.lifetime[0] <= spec.lifetime[1]
+            ),
+            key=lambda i: intervals[i][2].lifetime[0],
+        )
+        # Live specs whose storage overlaps no other entry, sorted by storage start;
+        # as they are disjoint, their storage ends are sorted too.
+        disjoint: List[Tuple[int, int]] = []
+        # Live specs whose storage overlapped another live spec when added.
+        overlapping: List[int] = []
+        # (lifetime end, index) of the live specs.
+        expiring: List[Tuple[int, int]] = []
+        overlaps = []
+        for i in order:
+            start, end, spec = intervals[i]
+            while expiring and expiring[0][0] < spec.lifetime[0]:
+                _, j = heapq.heappop(expiring)
+                if j in overlapping:
+                    overlapping.remove(j)
+                else:
+                    del disjoint[bisect.bisect_left(disjoint, (intervals[j][0], j))]
+
+            found = []
+            k = bisect.bisect_right(disjoint, (end, len(intervals))) - 1
+            while k >= 0 and intervals[disjoint[k][1]][1] >= start:
+                found.append(disjoint[k][1])
+                k -= 1
+            found.extend(
+                j
+                for j in overlapping
+                if intervals[j][0] <= end and intervals[j][1] >= start
+            )
+            overlaps.extend((intervals[j][2], spec) for j in found)
+
+            if found:
+                overlapping.append(i)
+            else:
+                bisect.insort(disjoint, (start, i))
+            heapq.heappush(expiring, (spec.lifetime[1], i))
+        return overlaps
+
+    @classmethod
+    def find_storage_conflicts(
+        cls,
+        specs: Iterable[TensorSpec],
+        allow_lifetime_and_storage_overlap: bool = False,
+    ) -> List[Tuple[str, TensorSpec, TensorSpec]]:
+        """
+        Returns every pair of specs that breaks the invariants of a memory plan, as
+        (reason, lhs, rhs) tuples:
+        - specs with overlapping storage must not have overlapping lifetimes,
+          unless `allow_lifetime_and_storage_overlap` is set;
+        - specs with overlapping storage must have the same mem_obj_id.
+
+        Runs in O(n log n) plus the number of conflicts for n specs, instead of
+        checking each pair of specs.
+        """
+        conflicts = []
+        for intervals in cls._storage_intervals(specs):
+            if not allow_lifetime_and_storage_overlap:
+                conflicts.extend(
+                    ("Unexpected storage overlap", lhs, rhs)
+                    for lhs, rhs in cls._lifetime_and_storage_overlaps(intervals)
+                )
+            conflicts.extend(
+                ("Unexpected mem_obj_id mismatch", lhs, rhs)
+                for lhs, rhs in cls._mem_obj_id_mismatches(intervals)
+            )
+        return conflicts
+
     def verify_storage_reuse(
         self, allow_lifetime_and_storage_overlap: bool = False
     ) -> int:
@@ -152,11 +333,12 @@ class Verifier:
         'allow_lifetime_and_storage_overlap' allows tensors to overlap in both
         lifetime and storage. If is it False, and two tensors have both overlapping
         lifetime and storage, throw an exception.
+
+        The exception lists every conflicting pair of tensors, with the names of
+        the nodes they belong to.
         Returns:
             Number of pairs of tenors that have overlapping storage.
         """
-        num_reuse_pairs = 0
-
         # unique tensors specs
         all_specs = list(
             collect_specs_from_nodes(
@@ -172,35 +354,26 @@ class Verifier:
             )
         )
 
-        for lhs_spec_idx, lhs_spec in enumerate(all_specs):
-            for rhs_spec in all_specs[lhs_spec_idx + 1 :]:
-                # Check that both specs are consistent about whether mem_obj_id is defined
-                if (lhs_spec.mem_obj_id is None) != (rhs_spec.mem_obj_id is None):
-                    raise InternalError(
-                        "Specs do not agree on whether mem_obj_id is defined."
-                    )
-
-                has_storage_overlap = Verifier.storage_overlap(lhs_spec, rhs_spec)
-                if not has_storage_overlap:
-                    continue
-
-                if not allow_lifetime_and_storage_overlap and self.lifetime_overlap(
-                    lhs_spec, rhs_spec
-                ):
-                    raise InternalError(
-                        f"Unexpected storage overlap: {Verifier._debug_message_from_specs(lhs_spec, rhs_spec)}"
-                    )
-
-                # Check that each mem_obj_id is consistent with whether the tensors have
-                # storage overlap
-                if not Verifier.mem_obj_id_match(lhs_spec, rhs_spec):
-                    raise InternalError(
-                        f"Unexpected mem_obj_id mismatch: lhs {lhs_spec}, rhs {rhs_spec}"
-                    )
+        # Check that all specs are consistent about whether mem_obj_id is defined
+        if len({spec.mem_obj_id is None for spec in all_specs}) > 1:
+            raise InternalError("Specs do not agree on whether mem_obj_id is defined.")
 
-                num_reuse_pairs += 1
+        conflicts = Verifier.find_storage_conflicts(
+            all_specs, allow_lifetime_and_storage_overlap
+        )
+        if conflicts:
+            names = _spec_node_names(self.graph_module)
+            messages = [
+                f"{reason} between {names[lhs]} and {names[rhs]}: "
+                f"{Verifier._debug_message_from_specs(lhs, rhs)}"
+                for reason, lhs, rhs in conflicts
+            ]
+            raise InternalError(
+                f"Found {len(conflicts)} invalid pairs of tensors in the memory plan:\n"
+                + "\n".join(messages)
+            )
 
-        return num_reuse_pairs
+        return Verifier.num_storage_overlaps(all_specs)
 
     def verify_graph_input_output(self) -> None:
         r"""
@@ -282,6 +455,16 @@ class Verifier:
             ), f"Misallocate graph output {graph_output_allocated} v.s. {self.alloc_graph_output}"
 
 
+def _spec_node_names(graph_module: torch.fx.GraphModule) -> Dict[TensorSpec, List[str]]:
+    """Returns the names of the nodes that each spec of the graph belongs to."""
+    names: Dict[TensorSpec, List[str]] = defaultdict(list)
+    for node in graph_module.graph.nodes:
+        for spec in get_node_tensor_specs(node):
+            if node.name not in names[spec]:
+                names[spec].append(node.name)
+    return names
+
+
 def _is_out_var_node(node: torch.fx.Node) -> bool:
     return (
         node.op == "call_function"
@@ -585,6 +768,8 @@ class MemoryAlgoResult:
 
     spec_dict: Dict[TensorSpec, SpecAllocResult]
     bufsizes: List[int]
+    # A lower bound on each of the bufsizes, for the algorithms that compute one.
+    lower_bounds: Optional[List[int]] = None
 
 
 def materialize_buffer(
@@ -768,30 +953,138 @@ def _contains_xnnpack_delegate(graph_module: torch.fx.GraphModule) -> bool:
     return False
 
 
-def greedy(
-    alignment: int,
-    specs: Set[TensorSpec],
-    graph_module: torch.fx.GraphModule,
-    graph_signature: ExportGraphSignature,
-    extra_padding: int = 0,
-    *,
+class _LifetimeMaxTree:
+    r"""
+    Sparse segment tree over node indices, used to find the allocations of a
+    shared object whose lifetimes overlap with a tensor's lifetime.
+
+    Each allocation raises every index of its lifetime to `offset + size + 1`.
+    Querying a lifetime then returns 0 if no allocation overlaps with it, or one
+    more than the end of the highest overlapping allocation otherwise. Both
+    operations take O(log n) time, and only the nodes that are touched by an
+    update are created.
+    """
+
+    def __init__(self, num_indices: int) -> None:
+        self.num_indices = num_indices
+        # Node 0 is the root; a child index of 0 means that the child is absent.
+        # max_value is the max over the node's range, and tag a value that
+        # applies to the node's whole range.
+        self.max_value: List[int] = [0]
+        self.tag: List[int] = [0]
+        self.left: List[int] = [0]
+        self.right: List[int] = [0]
+
+    def _child(self, node: int, is_left: bool) -> int:
+        children = self.left if is_left else self.right
+        if children[node] == 0:
+            children[node] = len(self.max_value)
+            self.max_value.append(0)
+            self.tag.append(0)
+            self.left.append(0)
+            self.right.append(0)
+        return children[node]
+
+    def update(self, first: int, last: int, value: int) -> None:
+        """Raises every index in [first, last] to at least `value`."""
+        stack = [(0, 0, self.num_indices - 1)]
+        while stack:
+            node, lo, hi = stack.pop()
+            self.max_value[node] = max(self.max_value[node], value)
+            if first <= lo and hi <= last:
+                self.tag[node] = max(self.tag[node], value)
+                continue
+            mid = (lo + hi) // 2
+            if first <= mid:
+                stack.append((self._child(node, True), lo, mid))
+            if last > mid:
+                stack.append((self._child(node, False), mid + 1, hi))
+
+    def query(self, first: int, last: int) -> int:
+        """Returns the max value over the indices in [first, last]."""
+        result = 0
+        stack = [(0, 0, self.num_indices - 1)]
+        while stack:
+            node, lo, hi = stack.pop()
+            if first <= lo and hi <= last:
+                result = max(result, self.max_value[node])
+                continue
+            # The tag applies to the part of [first, last] in this node too.
+            result = max(result, self.tag[node])
+            mid = (lo + hi) // 2
+            if first <= mid and self.left[node] != 0:
+                stack.append((self.left[node], lo, mid))
+            if last > mid and self.right[node] != 0:
+                stack.append((self.right[node], mid + 1, hi))
+        return result
+
+
+def _pick_shared_obj_with_trees(
+    shared_objects: List[SharedObject],
+    trees: List[_LifetimeMaxTree],
+    num_indices: int,
+    spec: TensorSpec,
     allow_overlapping_allocations: bool = True,
-) -> MemoryAlgoResult:
-    r"""Greedy algorithm to allocate memory for tensors in the graph.
+) -> SharedObject:
+    r"""
+    Same as pick_shared_obj(), but uses a _LifetimeMaxTree per shared object
+    instead of scanning all of its allocations. `trees` parallels
+    `shared_objects`, and is updated along with it.
+    """
+    first, last = spec.lifetime[0], spec.lifetime[1]
+    picked = None
+    offset = 0
+    # The shared objects that overlap with the spec, and the end of their
+    # highest overlapping allocation.
+    overlapping: List[Tuple[SharedObject, int]] = []
+    for sobj, tree in zip(shared_objects, trees):
+        if last < sobj.first_used_index or first > sobj.last_used_index:
+            top = 0
+        else:
+            top = tree.query(first, last)
+        if top == 0:
+            assert sobj.size >= spec.allocated_memory, "Allocation specs are not sorted"
+            picked = sobj
+            break
+        overlapping.append((sobj, top - 1))
 
-    Args:
-        alignment: Memory alignment requirement
-        specs: Set of TensorSpec objects with updated lifetimes
-        graph_module: Graph module
-        graph_signature: Graph signature
-        extra_padding: Additional padding to add to each memory buffer (in bytes)
-        allow_overlapping_allocations: If set to true, allows for allocations that overlap
-            in their lifetime but are at different offsets in the storage. By default true.
-            This flag is added to allow for Vulkan to use MemoryPlanningPass with overlapping
-            allocations disabled
+    if picked is None and allow_overlapping_allocations:
+        for sobj, max_offset in overlapping:
+            if max_offset > 0 and max_offset + spec.allocated_memory <= sobj.size:
+                picked = sobj
+                offset = max_offset
+                break
 
-    Returns:
-        MemoryAlgoResult containing the allocation decisions
+    if picked is None:
+        picked = SharedObject(
+            len(shared_objects),
+            -1,
+            spec.allocated_memory,
+            first,
+            last,
+        )
+        shared_objects.append(picked)
+        trees.append(_LifetimeMaxTree(num_indices))
+
+    picked.first_used_index = min(picked.first_used_index, first)
+    picked.last_used_index = max(picked.last_used_index, last)
+    picked.allocations.append(AllocationSpec(offset, spec))
+    trees[picked.idx].update(first, last, offset + spec.allocated_memory + 1)
+    return picked
+
+
+def _greedy(
+    alignment: int,
+    specs: Iterable[TensorSpec],
+    graph_module: torch.fx.GraphModule,
+    extra_padding: int,
+    pick: Callable[[int, List[SharedObject], TensorSpec], SharedObject],
+    algo_name: str,
+) -> MemoryAlgoResult:
+    r"""
+    Shared implementation of the greedy algorithms, which only differ in how
+    `pick` finds the shared object for a spec, given its mem_id and the list of
+    shared objects allocated so far for that mem_id.
     """
     greedy_result = MemoryAlgoResult({}, [])
     spec2obj = {}
@@ -799,13 +1092,8 @@ def greedy(
 
     # For each tensor, pick the available shared object with closest size to
     # the tensor. If there are no available shared object left, create a new
-    # one.
-    import bisect
-
-    sorted_specs = []
-    for spec in specs:
-        bisect.insort(sorted_specs, spec, key=lambda x: x.allocated_memory)
-
+    # one. The sort is stable, and handles the largest tensors first.
+    sorted_specs = sorted(specs, key=lambda x: x.allocated_memory)
     sorted_specs.reverse()
 
     for spec in sorted_specs:
@@ -818,10 +1106,10 @@ def greedy(
             spec_alloc_result.mem_id = spec.mem_id
         greedy_result.spec_dict[spec] = spec_alloc_result
         spec.realign(alignment)
-        spec2obj[spec] = pick_shared_obj(
+        spec2obj[spec] = pick(
+            spec_alloc_result.mem_id,
             shared_objects[spec_alloc_result.mem_id],
             spec,
-            allow_overlapping_allocations,
         )
 
     if len(shared_objects) == 0:
@@ -859,11 +1147,100 @@ def greedy(
             len(spec2obj) == num_specs_processed
         ), f"All specs should be processed but there were {len(spec2obj)} specs and processed {num_specs_processed} specs"
 
-    logging.debug(f"greedy algorithm returns bufsizes: {total_sizes}")
+    logging.debug(f"{algo_name} algorithm returns bufsizes: {total_sizes}")
     greedy_result.bufsizes = total_sizes
     return greedy_result
 
 
+def greedy(
+    alignment: int,
+    specs: Set[TensorSpec],
+    graph_module: torch.fx.GraphModule,
+    graph_signature: ExportGraphSignature,
+    extra_padding: int = 0,
+    *,
+    allow_overlapping_allocations: bool = True,
+) -> MemoryAlgoResult:
+    r"""Greedy algorithm to allocate memory for tensors in the graph.
+
+    Args:
+        alignment: Memory alignment requirement
+        specs: Set of TensorSpec objects with updated lifetimes
+        graph_module: Graph module
+        graph_signature: Graph signature
+        extra_padding: Additional padding to add to each memory buffer (in bytes)
+        allow_overlapping_allocations: If set to true, allows for allocations that overlap
+            in their lifetime but are at different offsets in the storage. By default true.
+            This flag is added to allow for Vulkan to use MemoryPlanningPass with overlapping
+            allocations disabled
+
+    Returns:
+        MemoryAlgoResult containing the allocation decisions
+    """
+    return _greedy(
+        alignment,
+        specs,
+        graph_module,
+        extra_padding,
+        lambda mem_id, shared_objects, spec: pick_shared_obj(
+            shared_objects, spec, allow_overlapping_allocations
+        ),
+        "greedy",
+    )
+
+
+def greedy_interval_tree(
+    alignment: int,
+    specs: Set[TensorSpec],
+    graph_module: torch.fx.GraphModule,
+    graph_signature: ExportGraphSignature,
+    extra_padding: int = 0,
+    *,
+    allow_overlapping_allocations: bool = True,
+) -> MemoryAlgoResult:
+    r"""Same algorithm as `greedy`, for graphs with many tensors.
+
+    Produces exactly the same allocations as `greedy`. Instead of checking a
+    spec against every allocation of every shared object, each shared object
+    keeps a segment tree over the lifetimes of its allocations, so checking a
+    shared object takes O(log(num_nodes)) time however many allocations it
+    holds. Picking a shared object still checks the shared objects in order,
+    which takes O(num_shared_objects * log(num_nodes)) time per tensor: the
+    worst case, where most tensors get their own shared object, remains
+    O(n^2 log(num_nodes)) for n tensors. Graphs whose shared objects are each
+    reused by many tensors benefit the most.
+
+    Args:
+        alignment: Memory alignment requirement
+        specs: Set of TensorSpec objects with updated lifetimes
+        graph_module: Graph module
+        graph_signature: Graph signature
+        extra_padding: Additional padding to add to each memory buffer (in bytes)
+        allow_overlapping_allocations: See `greedy`.
+
+    Returns:
+        MemoryAlgoResult containing the allocation decisions
+    """
+    # `specs` may be a one-shot iterable, and is needed twice.
+    spec_list = list(specs)
+    num_indices = max((spec.lifetime[1] + 1 for spec in spec_list), default=1)
+    trees: Dict[int, List[_LifetimeMaxTree]] = defaultdict(list)
+    return _greedy(
+        alignment,
+        spec_list,
+        graph_module,
+        extra_padding,
+        lambda mem_id, shared_objects, spec: _pick_shared_obj_with_trees(
+            shared_objects,
+            trees[mem_id],
+            num_indices,
+            spec,
+            allow_overlapping_allocations,
+        ),
+        "greedy_interval_tree",
+    )
+
+
 class MemoryPlanningAlgorithmSuite:
     def __init__(
         self,
@@ -900,6 +1277,8 @@ class MemoryPlanningAlgorithmSuite:
             List of buffer sizes for each memory hierarchy
         """
 
+        # `specs` may be a generator; every algorithm needs to see all of them.
+        specs = list(specs)
         mem_algo_results = {}
         for algo in self.algo_list:
             if isinstance(algo, functools.partial):
@@ -932,6 +1311,11 @@ class MemoryPlanningAlgorithmSuite:
         )
         logging.debug(f"Best memory planning algo for this model is {best_algo}")
         bufsizes = mem_algo_results[best_algo].bufsizes
+        # Kept for build_memory_planning_report().
+        graph_module.meta["memory_planning_algo_bufsizes"] = {
+            name: result.bufsizes for name, result in mem_algo_results.items()
+        }
+        graph_module.meta["memory_planning_best_algo"] = best_algo
 
         # Update the mem_id and mem_offset for each spec in the graph module based on the
         # values provided by the best memory planning algorithm.
@@ -979,7 +1363,8 @@ def naive(
     bufsizes = getattr(graph_module, "input_mem_buffer_sizes", None)
     if bufsizes is None:
         bufsizes = [0, 0]
-    bufsizes = cast(List[int], bufsizes)
+    # Copy, so that the other algorithms of the suite see the original sizes.
+    bufsizes = list(cast(List[int], bufsizes))
 
     for spec in specs:
         spec_alloc_result = naive_result.spec_dict.get(spec, SpecAllocResult(0, 0, 0))
@@ -1002,6 +1387,322 @@ def naive(
     return naive_result
 
 
+def _live_bytes_lower_bound(
+    starts: np.ndarray, ends: np.ndarray, sizes: np.ndarray
+) -> int:
+    r"""
+    Returns the max over all node indices of the total size of the tensors that
+    are live at that index. No plan can use less memory than that.
+    """
+    if len(sizes) == 0:
+        return 0
+    return int(_live_bytes_timeline(starts, ends, sizes).max())
+
+
+def _live_bytes_timeline(
+    starts: np.ndarray, ends: np.ndarray, sizes: np.ndarray, num_indices: int = 0
+) -> np.ndarray:
+    r"""
+    Returns the total size of the tensors that are live at each node index, for
+    at least `num_indices` indices.
+    """
+    num_indices = max(num_indices, int(ends.max()) + 1 if len(ends) else 0)
+    deltas = np.zeros(num_indices + 1, dtype=np.int64)
+    np.add.at(deltas, starts, sizes)
+    np.add.at(deltas, ends + 1, -sizes)
+    return np.cumsum(deltas)[:num_indices]
+
+
+def _place_best_fit(
+    order: List[int],
+    starts: np.ndarray,
+    ends: np.ndarray,
+    sizes: np.ndarray,
+    base_offset: int,
+    *,
+    kept: int = 0,
+    kept_offsets: Optional[np.ndarray] = None,
+    max_peak: Optional[int] = None,
+    deadline: Optional[float] = None,
+) -> Optional[Tuple[np.ndarray, int]]:
+    r"""
+    Places the tensors in the given order. Each one goes into the smallest gap
+    between the tensors placed before it with an overlapping lifetime, or on top
+    of them if no gap is large enough.
+
+    The first `kept` tensors of the order keep their offsets in `kept_offsets`,
+    so that a placement which only differs after them is not computed again.
+
+    Returns the offset of each tensor and the end of the highest one, or None
+    as soon as a tensor ends above `max_peak` or the deadline passes.
+    """
+    offsets = np.zeros(len(sizes), dtype=np.int64)
+    placed = np.zeros(len(sizes), dtype=bool)
+    peak = base_offset
+    if kept > 0:
+        assert kept_offsets is not None
+        prefix = np.asarray(order[:kept])
+        offsets[prefix] = kept_offsets[prefix]
+        placed[prefix] = True
+        peak = max(peak, int((offsets[prefix] + sizes[prefix]).max()))
+    for n, i in enumerate(order[kept:]):
+        # Checking the time for every tensor would slow down small placements.
+        if deadline is not None and n % 64 == 0 and time.monotonic() >= deadline:
+            return None
+        size = sizes[i]
+        overlapping = np.nonzero(placed & (starts <= ends[i]) & (ends >= starts[i]))[0]
+        offset = base_offset
+        if len(overlapping) > 0:
+            by_offset = overlapping[np.argsort(offsets[overlapping], kind="stable")]
+            lo = offsets[by_offset]
+            # The end of the highest tensor below each gap, and above the last one.
+            tops = np.maximum.accumulate(
+                np.concatenate(([base_offset], lo + sizes[by_offset]))
+            )
+            gaps = lo - tops[:-1]
+            fits = np.nonzero(gaps >= size)[0]
+            if len(fits) > 0:
+                offset = int(tops[fits[np.argmin(gaps[fits])]])
+            else:
+                offset = int(tops[-1])
+        offsets[i] = offset
+        placed[i] = True
+        peak = max(peak, offset + int(size))
+        if max_peak is not None and peak > max_peak:
+            return None
+    return offsets, peak
+
+
+def _best_fit_initial_placement(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    sizes: np.ndarray,
+    base_offset: int,
+    deadline: float,
+) -> Tuple[List[int], np.ndarray, int]:
+    r"""
+    Places the tensors in a few orders (by size, by size * lifetime, ...) and
+    returns the order, offsets and peak of the best placement. The first order
+    is always placed, as a plan is needed; the others only within the deadline.
+    """
+    durations = ends - starts + 1
+    keys = [
+        lambda i: (-sizes[i], -durations[i], starts[i]),
+        lambda i: (-sizes[i] * durations[i], -sizes[i], starts[i]),
+        lambda i: (-durations[i], -sizes[i], starts[i]),
+        lambda i: (starts[i], -sizes[i]),
+    ]
+    best_order = sorted(range(len(sizes)), key=keys[0])
+    placement = _place_best_fit(best_order, starts, ends, sizes, base_offset)
+    assert placement is not None
+    best_offsets, best_peak = placement
+    for key in keys[1:]:
+        if time.monotonic() >= deadline:
+            break
+        order = sorted(range(len(sizes)), key=key)
+        placement = _place_best_fit(
+            order,
+            starts,
+            ends,
+            sizes,
+            base_offset,
+            max_peak=best_peak - 1,
+            deadline=deadline,
+        )
+        if placement is not None:
+            best_order = order
+            best_offsets, best_peak = placement
+    return best_order, best_offsets, best_peak
+
+
+def _best_fit_local_search(
+    order: List[int],
+    offsets: np.ndarray,
+    peak: int,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    sizes: np.ndarray,
+    base_offset: int,
+    lower_bound: int,
+    deadline: float,
+    max_iterations: Optional[int],
+    rng: random.Random,
+) -> Tuple[np.ndarray, int, int]:
+    r"""
+    Improves a placement by moving one of the tensors that define the peak, or
+    a random tensor, earlier in the order. Sideways moves help to leave
+    plateaus. Only the tensors from the new position of the moved one on are
+    placed again, and a placement stops once it ends above the current peak.
+
+    Returns the best offsets, their peak and the number of steps taken.
+    """
+    best_offsets, best_peak = offsets, peak
+    iteration = 0
+    while (
+        best_peak > lower_bound
+        and len(order) > 1
+        and time.monotonic() < deadline
+        and (max_iterations is None or iteration < max_iterations)
+    ):
+        iteration += 1
+        candidate = list(order)
+        if rng.random() < 0.7:
+            at_peak = np.nonzero(offsets + sizes == peak)[0]
+            pos = candidate.index(int(at_peak[rng.randrange(len(at_peak))]))
+        else:
+            pos = rng.randrange(len(candidate))
+        if pos == 0:
+            pos = rng.randrange(1, len(candidate))
+        new_pos = rng.randrange(pos)
+        candidate.insert(new_pos, candidate.pop(pos))
+        # The tensors before new_pos are placed as before.
+        placement = _place_best_fit(
+            candidate,
+            starts,
+            ends,
+            sizes,
+            base_offset,
+            kept=new_pos,
+            kept_offsets=offsets,
+            max_peak=peak,
+            deadline=deadline,
+        )
+        if placement is not None:
+            order = candidate
+            offsets, peak = placement
+            if peak < best_peak:
+                best_offsets, best_peak = offsets, peak
+    return best_offsets, best_peak, iteration
+
+
+def _shared_object_ids(offsets: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+    r"""
+    Groups tensors whose storage overlaps, so that they share a mem_obj_id.
+    """
+    ids = np.zeros(len(sizes), dtype=np.int64)
+    next_id, top = -1, -1
+    for i in np.argsort(offsets, kind="stable"):
+        if sizes[i] == 0:
+            continue
+        if offsets[i] >= top:
+            next_id += 1
+        ids[i] = next_id
+        top = max(top, offsets[i] + sizes[i])
+    # Empty tensors don't overlap with anything.
+    for i in np.nonzero(sizes == 0)[0]:
+        next_id += 1
+        ids[i] = next_id
+    return ids
+
+
+def best_fit_with_local_search(
+    alignment: int,
+    specs: Set[TensorSpec],
+    graph_module: torch.fx.GraphModule,
+    graph_signature: ExportGraphSignature,
+    extra_padding: int = 0,
+    *,
+    max_iterations: Optional[int] = 100,
+    time_budget_s: Optional[float] = None,
+    seed: int = 0,
+) -> MemoryAlgoResult:
+    r"""Best-fit-decreasing placement, improved by local search.
+
+    Each tensor is placed at an explicit offset instead of into a shared object,
+    so tensors of different sizes can pack tightly around each other. The
+    placement is computed for a few orderings (by size, by size * lifetime, ...),
+    and the best one is then improved by repeatedly moving a tensor at the top
+    of the arena earlier in the order. The search stops early when it reaches
+    the live-bytes lower bound, which is returned in the result's lower_bounds.
+
+    Args:
+        alignment: Memory alignment requirement
+        specs: Set of TensorSpec objects with updated lifetimes
+        graph_module: Graph module
+        graph_signature: Graph signature
+        extra_padding: Additional padding to add to each memory buffer (in bytes)
+        max_iterations: If set, the max number of local search steps per memory
+            id.
+        time_budget_s: If set, the wall-clock time in seconds to spend on the
+            search, shared between all memory ids. The plan then depends on the
+            speed of the machine, so the same model can be planned differently
+            on different hosts. By default only max_iterations bounds the search.
+        seed: Seed for the local search.
+
+    Returns:
+        MemoryAlgoResult containing the allocation decisions
+    """
+    result = MemoryAlgoResult({}, [])
+    specs_by_mem_id: Dict[int, List[TensorSpec]] = defaultdict(list)
+    for spec in specs:
+        mem_id = 1 if spec.mem_id is None else spec.mem_id
+        result.spec_dict[spec] = SpecAllocResult(mem_id, 0, 0)
+        spec.realign(alignment)
+        specs_by_mem_id[mem_id].append(spec)
+
+    if len(specs_by_mem_id) == 0:
+        # Return [0, 0] to be consistent with default behavior of naive.
+        result.bufsizes = [0, 0]
+        return result
+
+    rng = random.Random(seed)
+    input_bufsizes = getattr(graph_module, "input_mem_buffer_sizes", None) or []
+    result.bufsizes = [0] * (max(specs_by_mem_id.keys()) + 1)
+    result.lower_bounds = [0] * len(result.bufsizes)
+    if max_iterations is None and time_budget_s is None:
+        raise ValueError("One of max_iterations and time_budget_s must be set.")
+    start_time = time.monotonic()
+    for group_idx, (mem_id, mem_specs) in enumerate(sorted(specs_by_mem_id.items())):
+        base_offset = input_bufsizes[mem_id] if len(input_bufsizes) > mem_id else 0
+        starts = np.array([spec.lifetime[0] for spec in mem_specs], dtype=np.int64)
+        ends = np.array([spec.lifetime[1] for spec in mem_specs], dtype=np.int64)
+        sizes = np.array([spec.allocated_memory for spec in mem_specs], dtype=np.int64)
+        lower_bound = base_offset + _live_bytes_lower_bound(starts, ends, sizes)
+        deadline = math.inf
+        if time_budget_s is not None:
+            # Give the remaining memory ids an equal share of the remaining budget.
+            deadline = start_time + time_budget_s * (group_idx + 1) / len(
+                specs_by_mem_id
+            )
+
+        order, offsets, peak = _best_fit_initial_placement(
+            starts, ends, sizes, base_offset, deadline
+        )
+        best_offsets, best_peak, iteration = _best_fit_local_search(
+            order,
+            offsets,
+            peak,
+            starts,
+            ends,
+            sizes,
+            base_offset,
+            lower_bound,
+            deadline,
+            max_iterations,
+            rng,
+        )
+
+        mem_obj_ids = _shared_object_ids(best_offsets, sizes)
+        for spec, offset, mem_obj_id in zip(mem_specs, best_offsets, mem_obj_ids):
+            spec_alloc_result = result.spec_dict[spec]
+            spec_alloc_result.mem_offset = int(offset)
+            spec_alloc_result.mem_obj_id = int(mem_obj_id)
+        result.bufsizes[mem_id] = best_peak + extra_padding
+        result.lower_bounds[mem_id] = lower_bound + extra_padding
+
+        gap = (best_peak - lower_bound) / lower_bound if lower_bound > 0 else 0.0
+        logging.info(
+            f"best_fit_with_local_search: mem_id {mem_id} uses {best_peak} bytes, "
+            f"{gap:.1%} above the live-bytes lower bound of {lower_bound} bytes "
+            f"after {iteration} local search steps"
+        )
+
+    logging.debug(
+        f"best_fit_with_local_search algorithm returns bufsizes: {result.bufsizes}"
+    )
+    return result
+
+
 def get_cond_nodes(graph_module: torch.fx.GraphModule) -> Iterable[Node]:
     for nd in graph_module.graph.nodes:
         if nd.target is torch.ops.higher_order.cond:
@@ -1236,3 +1937,147 @@ def apply_algo(
 
     graph_module.meta.update({"non_const_buffer_sizes": bufsizes})
     return bufsizes
+
+
+@dataclass
+class PeakTensorInfo:
+    """A tensor that is live when the planned memory of its mem_id peaks."""
+
+    node_names: List[str]
+    size: int
+    mem_offset: int
+    lifetime: List[int]
+
+
+@dataclass
+class MemIdReport:
+    """How the buffer of one mem_id is used over the nodes of the graph."""
+
+    mem_id: int
+    # Size of the buffer, as planned.
+    planned_size: int
+    # Bytes at the start of the buffer that are set aside for the submodules of
+    # control flow ops.
+    reserved_size: int
+    # Total size of the tensors that are live at each node index.
+    live_bytes: List[int]
+    # Index and name of the first node with the most live bytes.
+    peak_index: int
+    peak_node: str
+    # No plan can use less memory than that, given the lifetimes of the tensors.
+    lower_bound: int
+    # planned_size - lower_bound.
+    fragmentation: int
+    # The largest tensors that are live at peak_index, largest first.
+    peak_tensors: List[PeakTensorInfo]
+
+
+@dataclass
+class MemoryPlanningReport:
+    """
+    Describes the planned memory of a graph module, per mem_id. Created by
+    MemoryPlanningPass(generate_report=True), or by build_memory_planning_report().
+    """
+
+    mem_ids: List[MemIdReport]
+    # The bufsizes of each algorithm of the MemoryPlanningAlgorithmSuite, by name.
+    # Empty if another algorithm was used, or if the plan came from a cache.
+    algo_bufsizes: Dict[str, List[int]]
+    best_algo: Optional[str]
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), indent=2)
+
+
+def build_memory_planning_report(
+    graph_module: torch.fx.GraphModule,
+    graph_signature: Optional[ExportGraphSignature] = None,
+    alloc_graph_input: bool = True,
+    alloc_graph_output: bool = True,
+    alloc_mutable_buffers: bool = True,
+    num_peak_tensors: int = 10,
+) -> MemoryPlanningReport:
+    """
+    Builds a MemoryPlanningReport for a graph module that went through memory
+    planning. The alloc_* arguments should match the ones used for planning.
+    Submodules of control flow ops are not described, except for the space that
+    is reserved for them.
+    """
+    bufsizes = graph_module.meta.get("non_const_buffer_sizes")
+    internal_assert(
+        bufsizes is not None, "The graph module has not been memory planned"
+    )
+    reserved_sizes = getattr(graph_module, "input_mem_buffer_sizes", None) or []
+    num_indices = len(graph_module.graph.nodes)
+    node_names = [node.name for node in graph_module.graph.nodes]
+    spec_names = _spec_node_names(graph_module)
+
+    specs_by_mem_id: Dict[int, List[TensorSpec]] = defaultdict(list)
+    for spec in collect_specs_from_nodes(
+        graph_module.graph.nodes,
+        graph_signature,
+        ignore_const=True,
+        ignore_graph_input=not alloc_graph_input,
+        ignore_graph_output=not alloc_graph_output,
+        ignore_mutable_buffers=not alloc_mutable_buffers,
+        do_assertion=False,
+        ignore_out_var_node=False,
+        dedup=True,
+    ):
+        if (
+            spec.mem_id is not None
+            and spec.mem_offset is not None
+            and spec.lifetime[0] is not None
+            and spec.lifetime[1] is not None
+        ):
+            specs_by_mem_id[spec.mem_id].append(spec)
+
+    mem_id_reports = []
+    for mem_id, planned_size in enumerate(bufsizes):
+        specs = specs_by_mem_id.get(mem_id, [])
+        if planned_size == 0 and not specs:
+            continue
+        starts = np.array([spec.lifetime[0] for spec in specs], dtype=np.int64)
+        ends = np.array([spec.lifetime[1] for spec in specs], dtype=np.int64)
+        sizes = np.array([spec.allocated_memory for spec in specs], dtype=np.int64)
+        live_bytes = _live_bytes_timeline(starts, ends, sizes, num_indices)
+        peak_index = int(live_bytes.argmax()) if len(live_bytes) else 0
+        reserved_size = reserved_sizes[mem_id] if mem_id < len(reserved_sizes) else 0
+        lower_bound = reserved_size + (int(live_bytes.max()) if len(live_bytes) else 0)
+
+        peak_specs = sorted(
+            (
+                spec
+                for spec in specs
+                if spec.lifetime[0] <= peak_index <= spec.lifetime[1]
+            ),
+            key=lambda spec: spec.allocated_memory,
+            reverse=True,
+        )
+        mem_id_reports.append(
+            MemIdReport(
+                mem_id=mem_id,
+                planned_size=planned_size,
+                reserved_size=reserved_size,
+                live_bytes=live_bytes.tolist(),
+                peak_index=peak_index,
+                peak_node=node_names[peak_index] if node_names else "",
+                lower_bound=lower_bound,
+                fragmentation=planned_size - lower_bound,
+                peak_tensors=[
+                    PeakTensorInfo(
+                        node_names=spec_names[spec],
+                        size=spec.allocated_memory,
+                        mem_offset=spec.mem_offset,
+                        lifetime=list(spec.lifetime),
+                    )
+                    for spec in peak_specs[:num_peak_tensors]
+                ],
+            )
+        )
+
+    return MemoryPlanningReport(
+        mem_ids=mem_id_reports,
+        algo_bufsizes=dict(graph_module.meta.get("memory_planning_algo_bufsizes", {})),
+        best_algo=graph_module.meta.get("memory_planning_best_algo"),
+    )
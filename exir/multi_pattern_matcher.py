@@ -0,0 +1,175 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+"""
+Matches many subgraph patterns against a graph at once.
+
+SubgraphMatcher looks for the candidates of the anchors of its pattern, the
+nodes the pattern returns, in the whole graph. Matching a list of patterns
+with one SubgraphMatcher each then takes time proportional to the size of the
+graph times the number of patterns. MultiPatternMatcher indexes the nodes of
+the graph by operator in a single pass, and only gives each pattern the nodes
+with the operators of its anchors.
+"""
+
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import torch
+from torch.fx import Graph, GraphModule, Node, subgraph_rewriter
+from torch.fx.passes.utils.matcher_utils import InternalMatch, SubgraphMatcher
+
+MatchFilter = Callable[[InternalMatch, Graph, Graph], bool]
+
+
+class _CandidateGraph(Graph):
+    """
+    A view of the nodes of a graph that can match the anchors of a pattern.
+
+    SubgraphMatcher.match() takes the candidates for the anchors from the nodes
+    of the graph it is given, and follows the inputs and users of the nodes it
+    matches from there, which are the nodes of the full graph. Matching the view
+    then finds the same matches as matching the full graph.
+    """
+
+    def __init__(self, candidates: List[Node]) -> None:
+        super().__init__()
+        self._candidates = candidates
+
+    @property
+    def nodes(self) -> List[Node]:
+        return self._candidates
+
+
+def _node_key(node: Node) -> Tuple[str, Any]:
+    return (node.op, node.target)
+
+
+class MultiPatternMatcher:
+    """
+    Finds the matches of each of patterns in a graph, like a SubgraphMatcher
+    created with the same arguments for each pattern would.
+    """
+
+    def __init__(
+        self,
+        patterns: Sequence[Graph],
+        match_output: bool = False,
+        match_placeholder: bool = False,
+        remove_overlapping_matches: bool = True,
+        ignore_literals: bool = False,
+    ) -> None:
+        self.patterns: List[Graph] = list(patterns)
+        self._matchers: List[SubgraphMatcher] = [
+            SubgraphMatcher(
+                pattern,
+                match_output=match_output,
+                match_placeholder=match_placeholder,
+                remove_overlapping_matches=remove_overlapping_matches,
+                ignore_literals=ignore_literals,
+            )
+            for pattern in self.patterns
+        ]
+        # Operators of the anchors of each pattern, or None if the anchors can
+        # match nodes with other operators
+        self._anchor_keys: List[Optional[List[Tuple[str, Any]]]] = []
+        for matcher in self._matchers:
+            anchors = matcher.pattern_anchors
+            if all(anchor.op in ("call_function", "call_method") for anchor in anchors):
+                self._anchor_keys.append(
+                    list(dict.fromkeys(_node_key(anchor) for anchor in anchors))
+                )
+            else:
+                self._anchor_keys.append(None)
+
+    def iter_matches(
+        self, graph: Graph, start: int = 0
+    ) -> Iterator[Tuple[int, List[InternalMatch]]]:
+        """
+        Yields the index of each pattern from start on, with its matches in
+        graph. The graph must not be modified while iterating.
+        """
+        nodes_by_key: Dict[Tuple[str, Any], List[Node]] = defaultdict(list)
+        positions: Dict[Node, int] = {}
+        for i, node in enumerate(graph.nodes):
+            nodes_by_key[_node_key(node)].append(node)
+            positions[node] = i
+
+        for i in range(start, len(self._matchers)):
+            keys = self._anchor_keys[i]
+            if keys is None:
+                yield i, self._matchers[i].match(graph)
+                continue
+            if any(key not in nodes_by_key for key in keys):
+                # Every anchor needs a candidate
+                yield i, []
+                continue
+            candidates = [node for key in keys for node in nodes_by_key[key]]
+            if len(keys) > 1:
+                candidates.sort(key=positions.__getitem__)
+            yield i, self._matchers[i].match(_CandidateGraph(candidates))
+
+    def match(self, graph: Graph) -> List[List[InternalMatch]]:
+        """Returns the matches of each pattern in graph."""
+        return [matches for _, matches in self.iter_matches(graph)]
+
+
+def _to_graph(pattern: Union[Callable[..., Any], Graph, GraphModule]) -> Graph:
+    if isinstance(pattern, GraphModule):
+        return pattern.graph
+    if isinstance(pattern, Graph):
+        return pattern
+    return torch.fx.symbolic_trace(pattern).graph
+
+
+def replace_patterns_with_filters(
+    graph_module: GraphModule,
+    patterns_and_replacements: Sequence[
+        Tuple[
+            Union[Callable[..., Any], Graph, GraphModule],
+            Union[Callable[..., Any], Graph, GraphModule],
+            Optional[List[MatchFilter]],
+        ]
+    ],
+    ignore_literals: bool = False,
+) -> List[subgraph_rewriter.ReplacedPatterns]:
+    """
+    Calls subgraph_rewriter.replace_pattern_with_filters() with each pattern,
+    replacement and match filters in order, but only for the patterns that
+    match the graph: the graph is scanned once, plus once after each pattern
+    that is replaced.
+    """
+    patterns = [_to_graph(pattern) for pattern, _, _ in patterns_and_replacements]
+    matcher = MultiPatternMatcher(patterns, ignore_literals=ignore_literals)
+    replaced_patterns = []
+    start = 0
+    while start < len(patterns):
+        for i, matches in matcher.iter_matches(graph_module.graph, start):
+            match_filters = patterns_and_replacements[i][2] or []
+            if any(
+                all(
+                    match_filter(match, graph_module.graph, patterns[i])
+                    for match_filter in match_filters
+                )
+                for match in matches
+            ):
+                break
+        else:
+            break
+        # Replacing the matches changes the graph: index it again afterwards
+        replaced_patterns.extend(
+            subgraph_rewriter.replace_pattern_with_filters(
+                graph_module,
+                patterns[i],
+                patterns_and_replacements[i][1],
+                match_filters,
+                ignore_literals,
+            )
+        )
+        start = i + 1
+    return replaced_patterns
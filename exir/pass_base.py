@@ -72,6 +72,45 @@ PROTECTED_KEYS: Set[str] = {
 }
 
 
+# Callbacks that incremental ExportPasses must leave to the base class, as they
+# only rerun call_operator() and friends on the nodes they rewrite.
+_INCREMENTAL_UNSUPPORTED_CALLBACKS: Tuple[str, ...] = (
+    "inputs",
+    "on_attr",
+    "placeholder",
+    "output",
+    "call_cond",
+    "call_while",
+    "call_map",
+    "call_submodule",
+)
+
+
+def _same_meta_val(lhs: Argument, rhs: Argument) -> bool:
+    """
+    Returns whether two meta["val"] describe the same values: the same tensor
+    metadata and equal non-tensor values.
+    """
+    lhs_leaves, lhs_spec = pytree.tree_flatten(lhs)
+    rhs_leaves, rhs_spec = pytree.tree_flatten(rhs)
+    if lhs_spec != rhs_spec:
+        return False
+    for lhs_leaf, rhs_leaf in zip(lhs_leaves, rhs_leaves):
+        if isinstance(lhs_leaf, torch.Tensor) and isinstance(rhs_leaf, torch.Tensor):
+            # Compare symbolic sizes by their expressions to avoid adding guards
+            if (
+                lhs_leaf.dtype != rhs_leaf.dtype
+                or lhs_leaf.device != rhs_leaf.device
+                or [str(d) for d in lhs_leaf.shape] != [str(d) for d in rhs_leaf.shape]
+                or [str(d) for d in lhs_leaf.stride()]
+                != [str(d) for d in rhs_leaf.stride()]
+            ):
+                return False
+        elif type(lhs_leaf) is not type(rhs_leaf) or str(lhs_leaf) != str(rhs_leaf):
+            return False
+    return True
+
+
 def _unstack_pytree(xs) -> List[PyTree]:  # pyre-ignore
     flat_xs, inspec = pytree.tree_flatten(xs)
     if not all(isinstance(xs, torch.Tensor) for xs in flat_xs):
@@ -162,6 +201,15 @@ class _ExportPassBase(PassBase):
     transformations.
     """
 
+    # The operators whose nodes call_operator() may rewrite. Passes that only
+    # override call_operator() and friends, and pass every other operator
+    # through to the base class, can set this to run incrementally: call() then
+    # only reruns the nodes calling these operators, and the users of nodes
+    # whose meta["val"] changes, inserting the new nodes into the graph module
+    # in place instead of retracing all of it. Graph modules with control flow,
+    # or nodes without fake tensor metadata, are retraced as usual.
+    rewritten_ops: Optional[Set[Any]] = None  # pyre-ignore
+
     @staticmethod
     def _create_dummy_node_metadata() -> NodeMetadata:
         return NodeMetadata({"stack_trace": "".join(traceback.format_stack(limit=1))})
@@ -577,12 +625,179 @@ class _ExportPassBase(PassBase):
             True,
         )
 
+    def _incremental_fake_tensor_mode(
+        self, graph_module: fx.GraphModule
+    ) -> Optional[FakeTensorMode]:
+        """
+        Returns the fake tensor mode of graph_module if it can be rewritten
+        incrementally, or None if it needs a full retrace.
+        """
+        base = ExportPass if isinstance(self, ExportPass) else _ExportPassBase
+        for callback in _INCREMENTAL_UNSUPPORTED_CALLBACKS:
+            if getattr(type(self), callback) is not getattr(base, callback):
+                return None
+
+        fake_tensor_mode = None
+        for node in graph_module.graph.nodes:
+            if node.op not in ("placeholder", "call_function"):
+                continue
+            if (
+                isinstance(node.target, torch._ops.HigherOrderOperator)
+                and node.target is not executorch_call_delegate
+            ):
+                return None
+            if "val" not in node.meta:
+                return None
+            for val in pytree.tree_leaves(node.meta["val"]):
+                if not isinstance(val, FakeTensor):
+                    continue
+                if fake_tensor_mode is None:
+                    fake_tensor_mode = val.fake_mode
+                elif fake_tensor_mode is not val.fake_mode:
+                    return None
+        return fake_tensor_mode
+
+    def _incremental_tracer(
+        self, graph_module: fx.GraphModule, fake_tensor_mode: FakeTensorMode
+    ) -> "_ExportPassBase.ExportTracer":
+        """
+        Returns a tracer which creates its nodes in graph_module, reusing its
+        attributes.
+        """
+        graph = graph_module.graph
+        tracer = self.ExportTracer(self, graph._codegen)
+        tracer.root = graph_module
+        tracer.graph = graph
+        tracer.fake_tensor_mode = fake_tensor_mode
+        tracer.submodules = {
+            module: name for name, module in graph_module.named_children()
+        }
+        for node in graph.nodes:
+            if node.op == "get_attr":
+                attr = getattr(graph_module, node.target)
+                if isinstance(attr, torch.Tensor):
+                    tracer.tensor_attrs[attr] = node.target
+        return tracer
+
+    def _incremental_value(
+        self, interpreter: "_ExportPassBase.ExportInterpreter", node: torch.fx.Node
+    ) -> Argument:
+        """Returns the value of a node that is not rerun."""
+        if node.op == "get_attr":
+            return interpreter.fetch_attr(node.target)
+        return node.meta["val"]
+
+    def _rerun_node(
+        self,
+        interpreter: "_ExportPassBase.ExportInterpreter",
+        node: torch.fx.Node,
+        changed_nodes: Set[torch.fx.Node],
+    ) -> bool:
+        """
+        Runs the callbacks on node, and replaces it with the nodes they create.
+        Adds the users of node to changed_nodes if its meta["val"] changes.
+        Returns whether the graph was modified.
+        """
+        graph = node.graph
+        for input_node in node.all_input_nodes:
+            if input_node not in interpreter.env:
+                value = self._incremental_value(interpreter, input_node)
+                interpreter.env[input_node] = (
+                    value
+                    if input_node.op == "get_attr"
+                    else ProxyValue(value, torch.fx.Proxy(input_node, self.tracer))
+                )
+        with graph.inserting_before(node):
+            result = interpreter.run_node(node)
+        if not isinstance(result, ProxyValue):
+            raise ExportPassBaseError(
+                f"Expected a ProxyValue for {node.format_node()}, got {result}"
+            )
+        new_node = result.node
+        same_val = _same_meta_val(node.meta["val"], new_node.meta.get("val"))
+        if (
+            same_val
+            and len(new_node.users) == 0
+            and (new_node.op, new_node.target, new_node.args, new_node.kwargs)
+            == (node.op, node.target, node.args, node.kwargs)
+        ):
+            # The node was passed through unchanged
+            graph.erase_node(new_node)
+            return False
+        interpreter.env[new_node] = result
+        if not same_val:
+            changed_nodes.update(node.users)
+        node.replace_all_uses_with(new_node)
+        graph.erase_node(node)
+        return True
+
+    def _call_incremental(
+        self, graph_module: fx.GraphModule, fake_tensor_mode: FakeTensorMode
+    ) -> PassResult:
+        """
+        Reruns the nodes calling `rewritten_ops`, and the users of nodes whose
+        meta["val"] changes, and replaces them with the nodes the callbacks
+        create in graph_module. The meta["val"] of the output node is updated
+        if one of the outputs changes.
+        """
+        graph = graph_module.graph
+        assert self.rewritten_ops is not None
+        rewritten_ops = self.rewritten_ops
+
+        prev_tracer = self.tracer
+        self.tracer = self._incremental_tracer(graph_module, fake_tensor_mode)
+        self.fake_tensor_mode = fake_tensor_mode
+        fake_tensor_mode.allow_non_fake_inputs = True
+        interpreter = self.ExportInterpreter(self, graph_module)
+
+        modified = False
+        changed_nodes: Set[torch.fx.Node] = set()
+        used_attrs: Set[torch.fx.Node] = set()
+        try:
+            with fake_tensor_mode, enable_python_dispatcher(), fx_traceback.preserve_node_meta():  # type: ignore[union-attr]
+                for node in list(graph.nodes):
+                    if node.op != "call_function" or (
+                        node.target not in rewritten_ops and node not in changed_nodes
+                    ):
+                        continue
+                    for input_node in node.all_input_nodes:
+                        if input_node.op == "get_attr":
+                            used_attrs.add(input_node)
+                    modified |= self._rerun_node(interpreter, node, changed_nodes)
+
+                output_node = graph.output_node()
+                if output_node in changed_nodes:
+                    # Like output() does when retracing.
+                    self.tracer.set_metadata(
+                        output_node,
+                        pytree.tree_map_only(
+                            torch.fx.Node,
+                            lambda n: self._incremental_value(interpreter, n),
+                            output_node.args[0],
+                        ),
+                    )
+        finally:
+            self.tracer = prev_tracer
+
+        for node in used_attrs:
+            if len(node.users) == 0:
+                graph.erase_node(node)
+        if modified:
+            graph.lint()
+            graph_module.recompile()
+        return PassResult(graph_module, modified)
+
     def call(self, graph_module: fx.GraphModule) -> PassResult:
         if not getattr(self, "_initialized", False):
             raise ExportPassBaseError(
                 "ExportPass is not initialized with __init__().",
             )
 
+        if self.rewritten_ops is not None:
+            fake_tensor_mode = self._incremental_fake_tensor_mode(graph_module)
+            if fake_tensor_mode is not None:
+                return self._call_incremental(graph_module, fake_tensor_mode)
+
         inputs = self.inputs(graph_module)
 
         fake_tensor_mode = None
@@ -11,6 +11,7 @@ from typing import Callable, List, Optional, Union
 import torch
 import torch.fx.passes.infra.pass_manager as fx
 import torch.utils._pytree as pytree
+from executorch.exir.compile_profiler import profiled_pass
 from executorch.exir.error import ExportError, ExportErrorType
 from torch.fx.passes.infra.pass_base import PassResult
 from typing_extensions import TypeAlias
@@ -45,7 +46,8 @@ class PassManager(fx.PassManager):
         # Flatten the passes to a list of callables
         passes = passes if passes else []
         flattened_passes = [
-            fx.pass_result_wrapper(fn) for fn in pytree.tree_flatten(passes)[0]
+            fx.pass_result_wrapper(profiled_pass(fn))
+            for fn in pytree.tree_flatten(passes)[0]
         ]
 
         super().__init__(
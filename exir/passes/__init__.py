@@ -32,7 +32,7 @@ from executorch.exir.operator.convert import (
 )
 
 from executorch.exir.pass_base import ExportPass
-from executorch.exir.pass_manager import PassManager, PassType
+from executorch.exir.pass_manager import PassType
 from executorch.exir.passes.const_prop_pass import ConstPropPass
 from executorch.exir.passes.debug_handle_generator_pass import DebugHandleGeneratorPass
 
@@ -63,6 +63,7 @@ from executorch.exir.passes.weights_to_outputs_pass import weights_to_outputs_pa
 from torch import fx
 from torch._subclasses import FakeTensor
 from torch.fx.passes.infra.pass_base import PassBase, PassResult
+from torch.fx.passes.infra.pass_manager import pass_result_wrapper
 from torch.fx.passes.shape_prop import TensorMetadata
 from torchgen.model import SchemaKind
 
@@ -482,8 +483,11 @@ def dead_code_elimination_pass(graph_module: torch.fx.GraphModule) -> PassResult
 
 # Passes to convert a graph module from ATen to Edge IR
 
-base_pre_op_replace_passes: List[Callable[[torch.nn.Module], PassResult]] = PassManager(
-    passes=[
+# The passes are wrapped here, but not profiled: their calls are recorded where
+# they are run, by run_pass() or a PassManager.
+base_pre_op_replace_passes: List[Callable[[torch.nn.Module], PassResult]] = [
+    pass_result_wrapper(p)
+    for p in [
         # ReplaceSymSizeOpPass need to be run before other passes which inherits
         # from ExportPass. ExportPass can not handle OpOverloadPacket in its
         # call_function method. The ReplaceSymSizeOpPass pass converts sym size
@@ -497,16 +501,15 @@ base_pre_op_replace_passes: List[Callable[[torch.nn.Module], PassResult]] = Pass
         PruneEmptyTensorsPass(),
         RemoveToCopyPass(),
     ]
-).passes
-
-base_post_op_replace_passes: List[Callable[[torch.nn.Module], PassResult]] = (
-    PassManager(
-        passes=[
-            dead_code_elimination_pass,
-            DebugHandleGeneratorPass(),
-        ]
-    ).passes
-)
+]
+
+base_post_op_replace_passes: List[Callable[[torch.nn.Module], PassResult]] = [
+    pass_result_wrapper(p)
+    for p in [
+        dead_code_elimination_pass,
+        DebugHandleGeneratorPass(),
+    ]
+]
 
 
 def propagate_dynamic_shape(
@@ -31,6 +31,8 @@ class MemoryFormatOpsPass(ExportPass):
     the aten op and the new edge dialect dim_order op.
     """
 
+    rewritten_ops = set(DimOrderOpsMap)
+
     def call_operator(self, op, args, kwargs, meta):
         if not (isinstance(op, EdgeOpOverload) and op in DimOrderOpsMap):
             return super().call_operator(
@@ -79,6 +81,8 @@ class DimOrderOpsRevertPass(ExportPass):
     This pass is to revert the dim_order ops back to the memory format ops.
     """
 
+    rewritten_ops = set(MemoryFormatOpsMap)
+
     def call_operator(self, op, args, kwargs, meta):
         if not (isinstance(op, EdgeOpOverload) and op in MemoryFormatOpsMap):
             return super().call_operator(
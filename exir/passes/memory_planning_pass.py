@@ -4,10 +4,14 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
+import hashlib
+import json
 import logging
+import os
+import tempfile
 import warnings
 from functools import partial
-from typing import Any, Callable, List, Optional
+from typing import Any, Callable, Iterable, List, Optional, Tuple
 
 import torch
 from executorch.exir._warnings import deprecated
@@ -16,13 +20,14 @@ from executorch.exir.memory import alloc
 from executorch.exir.memory_planning import (
     _is_out_var_node,
     apply_algo,
+    build_memory_planning_report,
     get_node_tensor_specs,
     MemoryPlanningAlgorithmSuite,
     Verifier,
 )
 from executorch.exir.operator.convert import get_out_args_from_opoverload
 from executorch.exir.pass_base import PassBase, PassResult
-from executorch.exir.tensor import ALIGNMENT
+from executorch.exir.tensor import ALIGNMENT, TensorSpec
 from torch.export.exported_program import ExportGraphSignature
 
 
@@ -37,6 +42,215 @@ def _callable_name(any_callable: Callable[..., Any]) -> str:
         return str(any_callable)
 
 
+def _verifies_storage_reuse(algo: Callable[..., Any]) -> bool:
+    """
+    Returns True if the plans of `algo` are expected to pass
+    Verifier.verify_storage_reuse().
+    """
+    if isinstance(algo, MemoryPlanningAlgorithmSuite):
+        return all(_verifies_storage_reuse(a) for a in algo.algo_list)
+    return callable(algo) and _callable_name(algo) in (
+        "greedy",
+        "greedy_interval_tree",
+        "best_fit_with_local_search",
+    )
+
+
+def _algo_fingerprint(algo: Callable[..., Any]) -> Any:
+    """Returns a JSON-serializable description of a memory planning algorithm."""
+    if isinstance(algo, MemoryPlanningAlgorithmSuite):
+        return [_algo_fingerprint(a) for a in algo.algo_list]
+    if isinstance(algo, partial):
+        return [
+            _algo_fingerprint(algo.func),
+            repr(algo.args),
+            repr(sorted(algo.keywords.items())),
+        ]
+    return f"{getattr(algo, '__module__', '')}.{_callable_name(algo)}"
+
+
+class _CachedMemoryPlanningAlgo:
+    """
+    Wraps a memory planning algorithm to store its results in `cache_dir`, and to
+    replay them for graphs with the same fingerprint instead of running it again.
+
+    The fingerprint covers the nodes of the graph, the dtypes, shapes and
+    lifetimes of the specs to plan, and the arguments of the algorithm. Replayed
+    plans are checked like the Verifier does before they are used; if the check
+    fails, the algorithm runs as if there was no cache entry.
+    """
+
+    # Bump when the format of the cache entries or the fingerprint changes.
+    VERSION: int = 1
+
+    def __init__(
+        self,
+        algo: Callable[..., List[int]],
+        cache_dir: str,
+        allow_lifetime_and_storage_overlap: bool = False,
+    ) -> None:
+        self.algo = algo
+        self.cache_dir = cache_dir
+        self.allow_lifetime_and_storage_overlap = allow_lifetime_and_storage_overlap
+        self.hits = 0
+        self.misses = 0
+
+    def _fingerprint(
+        self,
+        alignment: int,
+        specs: List[TensorSpec],
+        graph_module: torch.fx.GraphModule,
+        extra_padding: int,
+    ) -> str:
+        spec_ids = {id(spec): i for i, spec in enumerate(specs)}
+
+        def _arg(arg: Any) -> Any:
+            if isinstance(arg, torch.fx.Node):
+                return arg.name
+            if isinstance(arg, TensorSpec):
+                return f"spec{spec_ids.get(id(arg), -1)}"
+            return arg
+
+        h = hashlib.sha256()
+        for node in graph_module.graph.nodes:
+            args = torch.fx.node.map_aggregate((node.args, node.kwargs), _arg)
+            h.update(repr((node.name, node.op, str(node.target), args)).encode())
+        h.update(
+            json.dumps(
+                {
+                    "version": self.VERSION,
+                    "algo": _algo_fingerprint(self.algo),
+                    "alignment": alignment,
+                    "extra_padding": extra_padding,
+                    "input_mem_buffer_sizes": getattr(
+                        graph_module, "input_mem_buffer_sizes", None
+                    ),
+                    "specs": [
+                        [
+                            str(spec.dtype),
+                            list(spec.shape),
+                            list(spec.lifetime),
+                            spec.mem_id,
+                            str(spec.shape_dynamism),
+                        ]
+                        for spec in specs
+                    ],
+                },
+                sort_keys=True,
+            ).encode()
+        )
+        return h.hexdigest()
+
+    def _is_valid_plan(self, specs: List[TensorSpec]) -> bool:
+        """Checks the same invariants as Verifier.verify_storage_reuse()."""
+        if any(spec.mem_offset is None or spec.mem_offset < 0 for spec in specs):
+            return False
+        return not Verifier.find_storage_conflicts(
+            specs, self.allow_lifetime_and_storage_overlap
+        )
+
+    @staticmethod
+    def _parse_entry(
+        entry: Any, num_specs: int
+    ) -> Optional[Tuple[List[int], List[Tuple[int, int, int]]]]:
+        """Returns the bufsizes and spec placements of a well formed entry."""
+        if not isinstance(entry, dict):
+            return None
+        bufsizes, placements = entry.get("bufsizes"), entry.get("specs")
+        if not isinstance(bufsizes, list) or not isinstance(placements, list):
+            return None
+        if len(placements) != num_specs:
+            return None
+
+        def _is_int(value: Any) -> bool:
+            return isinstance(value, int) and not isinstance(value, bool)
+
+        if not all(_is_int(size) and size >= 0 for size in bufsizes):
+            return None
+        for placement in placements:
+            if not isinstance(placement, list) or len(placement) != 3:
+                return None
+            mem_id, mem_offset, mem_obj_id = placement
+            if not _is_int(mem_id) or not 0 <= mem_id < len(bufsizes):
+                return None
+            if not _is_int(mem_offset) or mem_offset < 0:
+                return None
+            if mem_obj_id is not None and not _is_int(mem_obj_id):
+                return None
+        return bufsizes, [tuple(placement) for placement in placements]
+
+    def _load(
+        self, key: str, alignment: int, specs: List[TensorSpec]
+    ) -> Optional[List[int]]:
+        path = os.path.join(self.cache_dir, f"{key}.json")
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        parsed = self._parse_entry(entry, len(specs))
+        if parsed is None:
+            logging.warning(f"Ignoring malformed memory plan cache entry {path}")
+            return None
+        bufsizes, placements = parsed
+
+        originals = [(spec.mem_id, spec.mem_offset, spec.mem_obj_id) for spec in specs]
+        for spec, (mem_id, mem_offset, mem_obj_id) in zip(specs, placements):
+            spec.realign(alignment)
+            spec.mem_id = mem_id
+            spec.mem_offset = mem_offset
+            spec.mem_obj_id = mem_obj_id
+        # Each buffer has to hold all of the tensors placed in it.
+        fits = all(
+            spec.mem_offset + spec.allocated_memory <= bufsizes[spec.mem_id]
+            for spec in specs
+        )
+        if not fits or not self._is_valid_plan(specs):
+            for spec, (mem_id, mem_offset, mem_obj_id) in zip(specs, originals):
+                spec.mem_id = mem_id
+                spec.mem_offset = mem_offset
+                spec.mem_obj_id = mem_obj_id
+            logging.warning(f"Ignoring invalid memory plan cache entry {path}")
+            return None
+        return bufsizes
+
+    def _store(self, key: str, specs: List[TensorSpec], bufsizes: List[int]) -> None:
+        entry = {
+            "bufsizes": list(bufsizes),
+            "specs": [
+                [spec.mem_id, spec.mem_offset, spec.mem_obj_id] for spec in specs
+            ],
+        }
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Write to a temporary file first, so that concurrent exports never see
+        # partial entries.
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, os.path.join(self.cache_dir, f"{key}.json"))
+
+    def __call__(
+        self,
+        alignment: int,
+        specs: Iterable[TensorSpec],
+        graph_module: torch.fx.GraphModule,
+        graph_signature: Optional[ExportGraphSignature],
+        extra_padding: int,
+    ) -> List[int]:
+        spec_list = list(specs)
+        key = self._fingerprint(alignment, spec_list, graph_module, extra_padding)
+        bufsizes = self._load(key, alignment, spec_list)
+        if bufsizes is not None:
+            self.hits += 1
+            return bufsizes
+        self.misses += 1
+        bufsizes = self.algo(
+            alignment, spec_list, graph_module, graph_signature, extra_padding
+        )
+        self._store(key, spec_list, bufsizes)
+        return bufsizes
+
+
 class MemoryPlanningPass(PassBase):
     def __init__(
         self,
@@ -46,12 +260,25 @@ class MemoryPlanningPass(PassBase):
         alloc_graph_output: bool = True,
         alloc_mutable_buffers: bool = True,
         alignment: int = ALIGNMENT,
+        plan_cache_dir: Optional[str] = None,
+        generate_report: bool = False,
     ) -> None:
         r"""
         alloc_graph_input/alloc_graph_output will have 4 different combinations
         to control if the memory planning algorithm need allocate memory for
         the graph input/output. The default behavior is the algorithm will allocate
         memory for both graph input and output.
+
+        If plan_cache_dir is set, memory plans are stored in that directory and
+        reused for graphs with the same nodes, tensor specs and lifetimes, and
+        planning arguments, instead of running memory_planning_algo again.
+
+        If generate_report is set, a MemoryPlanningReport of the planned graph
+        module is stored in graph_module.meta["memory_planning_report"]. It
+        describes the live bytes over the nodes, the peak and the largest tensors
+        at peak, and the fragmentation of each mem_id.
+        ExecutorchProgramManager.save() writes the reports of all methods next
+        to the PTE file.
         """
         if memory_planning_algo is None:
             memory_planning_algo = MemoryPlanningAlgorithmSuite()
@@ -61,6 +288,8 @@ class MemoryPlanningPass(PassBase):
         self.alloc_graph_output = alloc_graph_output
         self.alloc_mutable_buffers = alloc_mutable_buffers
         self.alignment = alignment
+        self.plan_cache_dir = plan_cache_dir
+        self.generate_report = generate_report
 
     def _set_alloc_node_spec(self, graph_module: torch.fx.GraphModule) -> None:
         """
@@ -127,8 +356,14 @@ class MemoryPlanningPass(PassBase):
         # passes/stages is quite natural and avoid yet another 'context' data structure
         # to do the job.
 
+        algo = self.memory_planning_algo
+        if self.plan_cache_dir is not None:
+            algo = _CachedMemoryPlanningAlgo(
+                algo, self.plan_cache_dir, self.allow_lifetime_and_storage_overlap
+            )
+
         _ = apply_algo(
-            self.memory_planning_algo,
+            algo,
             graph_module,
             self.alignment,
             graph_signature,
@@ -137,6 +372,11 @@ class MemoryPlanningPass(PassBase):
             self.alloc_mutable_buffers,
         )
 
+        if isinstance(algo, _CachedMemoryPlanningAlgo):
+            logging.info(
+                f"Memory plan cache {self.plan_cache_dir}: {algo.hits} hits, {algo.misses} misses"
+            )
+
         # TODO: make the verifier do the work recursively to handle
         # control flow
         verifier = Verifier(
@@ -155,12 +395,19 @@ class MemoryPlanningPass(PassBase):
                 f"The {getattr(self.memory_planning_algo, '__name__', repr(self.memory_planning_algo))} algorithm reuses storage for {num_reuse_pairs} pair of tensors"
             )
         verifier.verify_graph_input_output()
-        if (
-            callable(self.memory_planning_algo)
-            and _callable_name(self.memory_planning_algo) == "greedy"
-        ):
-            # Only verify storage reuse for greedy algorithm
+        if _verifies_storage_reuse(self.memory_planning_algo):
+            # Only verify storage reuse for the algorithms in memory_planning.py,
+            # including the default suite.
             # At the moment cadence backends memory planning fails this
             # I dont know if that is a valid thing but if it is we should adjust verify_storage_reuse function
             verifier.verify_storage_reuse()
+
+        if self.generate_report:
+            graph_module.meta["memory_planning_report"] = build_memory_planning_report(
+                graph_module,
+                graph_signature,
+                self.alloc_graph_input,
+                self.alloc_graph_output,
+                self.alloc_mutable_buffers,
+            )
         return PassResult(graph_module, True)
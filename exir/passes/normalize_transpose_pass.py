@@ -16,6 +16,8 @@ class NormalizeTransposePass(ExportPass):
     Check test_normalize_transpose_op in test_passes.py for more details
     """
 
+    rewritten_ops = {torch.ops.aten.t.default}
+
     def call_operator(self, op, args, kwargs, meta):
         if op == torch.ops.aten.t.default:
             return super().call_operator(
@@ -6,10 +6,11 @@
 
 import torch
 from executorch.exir.dialects._ops import ops as exir_ops
+from executorch.exir.multi_pattern_matcher import replace_patterns_with_filters
 from executorch.exir.pass_base import ExportPass
 from executorch.exir.passes.constant_prop_pass import constant_prop_pass
 from torch.export import ExportedProgram
-from torch.fx import GraphModule, subgraph_rewriter
+from torch.fx import GraphModule
 from torch.fx.passes.infra.pass_base import PassResult
 from torch.utils import _pytree as pytree
 
@@ -120,14 +121,9 @@ class QuantFusionPass(ExportPass):
         # dynamic_linear
         # add
         # batchnorm2d, relu, adaptive_avg_pool2d, reshape, squeeze, permute
-        for (
-            pattern,
-            replacement,
-            match_filters,
-        ) in get_quant_patterns_and_replacements():
-            subgraph_rewriter.replace_pattern_with_filters(
-                graph_module, pattern, replacement, match_filters
-            )
+        replace_patterns_with_filters(
+            graph_module, get_quant_patterns_and_replacements()
+        )
 
         _fuse_quantized_cat(graph_module)
         if self._fix_node_meta_val:
@@ -8,14 +8,14 @@
 # pyre-unsafe
 
 import copy
-import io
+import json
 import logging
 import os
 from typing import Any, Dict, List, Optional, Sequence, Set, TextIO, Type, Union
 
 import torch
 import torch._export
-from executorch.exir._serialize._cord import Cord
+from executorch.exir._serialize._cord import Cord, WriteTarget
 from executorch.exir._serialize._named_data_store import (
     NamedDataStore,
     NamedDataStoreOutput,
@@ -28,11 +28,18 @@ from executorch.exir.backend.backend_api import (
 )
 from executorch.exir.backend.partitioner import Partitioner
 from executorch.exir.capture._config import EdgeCompileConfig, ExecutorchBackendConfig
+from executorch.exir.compile_profiler import (
+    profiled_pass,
+    profiled_stage,
+    record_event,
+    run_pass,
+)
 from executorch.exir.delegate import executorch_call_delegate, is_lowered_module
 from executorch.exir.emit import emit_program, EmitterOutput
 from executorch.exir.emit._emitter import _DelegateDebugIdentifierMap
 from executorch.exir.error import ExportError
 from executorch.exir.graph_module import get_control_flow_submodules
+from executorch.exir.memory_planning import MemoryPlanningReport
 from executorch.exir.operator.convert import _pybind_schema_to_native_schema
 from executorch.exir.operator.util import _QUANT_PRIMITIVES
 from executorch.exir.pass_base import PassBase
@@ -240,7 +247,8 @@ def _transform(
         isinstance(p, (list, Verifier)) for p in passes
     ), f"Expected all passes to be of PassType, not list or Verifier. Use override_verifiers kwarg instead. Got: {list(passes)}"
 
-    pm = PassManager(list(passes))
+    # This is torch's PassManager, which does not profile the passes it runs.
+    pm = PassManager([profiled_pass(p) for p in passes])
     res = pm(self.graph_module)
     transformed_gm = res.graph_module if res is not None else self.graph_module
     assert transformed_gm is not None
@@ -493,7 +501,7 @@ class ExirExportedProgram:
         config = config or ExecutorchBackendConfig()
         new_gm = self.exported_program.graph_module
         for p in edge_to_executorch_passes(config):
-            new_gm_res = p(new_gm)
+            new_gm_res = run_pass(p, new_gm)
             assert new_gm_res is not None
             new_gm = new_gm_res.graph_module
 
@@ -625,11 +633,11 @@ class ExecutorchProgram:
     def dump_exported_program(self) -> ExportedProgram:
         return self.exported_program
 
-    def write_to_file(self, open_file: io.BufferedIOBase) -> None:
+    def write_to_file(self, open_file: WriteTarget) -> None:
         """
         Writes the serialized ExecuTorch binary to the file at `open_file`. Prefer to use this over
         `buffer`, as it writes to file without copying into a contiguous block of memory first,
-        reducing the peak memory usage.
+        reducing the peak memory usage. `open_file` may also be a connected socket.
         """
         self._get_pte_data().write_to_file(open_file)
 
@@ -700,16 +708,16 @@ def _to_edge(ep, config: EdgeCompileConfig) -> "ExirExportedProgram":
 
     new_gm = new_ep.exported_program.graph_module
     if config._use_edge_ops:
-        new_gm_res = OpReplacePass()(new_gm)
+        new_gm_res = run_pass(OpReplacePass(), new_gm)
         assert new_gm_res is not None
         new_gm = new_gm_res.graph_module
         if not config._skip_dim_order:
-            new_gm_res = MemoryFormatOpsPass()(new_gm)
+            new_gm_res = run_pass(MemoryFormatOpsPass(), new_gm)
             assert new_gm_res is not None
             new_gm = new_gm_res.graph_module
 
     for p in post_op_replace_passes:
-        new_gm_res = p(new_gm)
+        new_gm_res = run_pass(p, new_gm)
         assert new_gm_res is not None
         new_gm = new_gm_res.graph_module
 
@@ -824,7 +832,7 @@ def _generate_edge_program(
 
     gm = program.graph_module
     for p in passes:
-        gm_res = p(gm)
+        gm_res = run_pass(p, gm)
         assert gm_res is not None
         gm = gm_res.graph_module
 
@@ -1210,6 +1218,7 @@ def collect_named_data_store_from_exported_program(
 
 
 @et_logger("to_edge_transform_and_lower")
+@profiled_stage("to_edge_transform_and_lower")
 def to_edge_transform_and_lower(  # noqa: C901
     programs: Union[ExportedProgram, Dict[str, ExportedProgram]],
     transform_passes: Optional[
@@ -1327,6 +1336,7 @@ def to_edge_transform_and_lower(  # noqa: C901
 
 
 @et_logger("to_edge")
+@profiled_stage("to_edge")
 def to_edge(
     programs: Union[ExportedProgram, Dict[str, ExportedProgram]],
     constant_methods: Optional[Dict[str, Any]] = None,
@@ -1469,6 +1479,7 @@ class EdgeProgramManager:
         return self._edge_programs[method_name]
 
     @et_logger("transform")
+    @profiled_stage("transform")
     def transform(
         self,
         passes: Union[Sequence[PassType], Dict[str, Sequence[PassType]]],
@@ -1517,6 +1528,7 @@ class EdgeProgramManager:
         )
 
     @et_logger("to_backend")
+    @profiled_stage("to_backend")
     def to_backend(
         self,
         partitioner: Union[Partitioner, Dict[str, Partitioner]],
@@ -1554,10 +1566,14 @@ class EdgeProgramManager:
         method_to_programs_and_partitioners = MethodProgramsPartitionerSpec(
             self._edge_programs,
             method_to_partitioner,
+            max_workers=self.compile_config.max_method_workers,
         )
 
         new_edge_programs = to_backend(method_to_programs_and_partitioners)
-        config = EdgeCompileConfig(_check_ir_validity=False)
+        config = EdgeCompileConfig(
+            _check_ir_validity=False,
+            max_method_workers=self.compile_config.max_method_workers,
+        )
         return EdgeProgramManager(
             new_edge_programs,
             copy.deepcopy(self._config_methods),
@@ -1565,6 +1581,7 @@ class EdgeProgramManager:
         )
 
     @et_logger("to_executorch")
+    @profiled_stage("to_executorch")
     def to_executorch(
         self,
         config: Optional[ExecutorchBackendConfig] = None,
@@ -1597,7 +1614,7 @@ class EdgeProgramManager:
             gm, new_signature = insert_write_back_for_buffers_pass(program)
             new_gm = program.graph_module
             for p in edge_to_executorch_passes(config, name):
-                new_gm_res = p(new_gm)
+                new_gm_res = run_pass(p, new_gm)
                 assert new_gm_res is not None
                 new_gm = new_gm_res.graph_module
                 if isinstance(p, SpecPropPass):
@@ -1615,7 +1632,7 @@ class EdgeProgramManager:
 
             # Extract constants if the config says too.
             if config.external_constants:
-                new_gm_res = external_constants_pass(new_gm)
+                new_gm_res = run_pass(external_constants_pass, new_gm)
                 new_gm = new_gm_res.graph_module
             elif config.external_mutable_weights:
                 new_gm_res = external_mutable_weights_pass(new_gm, program)
@@ -1628,12 +1645,15 @@ class EdgeProgramManager:
             else:
                 memory_planning_pass = config.memory_planning_pass
             # TODO(jakeszwe): Follow up with compiler on if the deepcopy is necessary and if so how to make it work
-            if hasattr(memory_planning_pass, "run"):
-                new_gm_res = memory_planning_pass.run(  # pyre-ignore[16]
-                    new_gm, new_signature
-                )
-            else:
-                new_gm_res = memory_planning_pass(new_gm)  # pyre-ignore[29]
+            with record_event(
+                type(memory_planning_pass).__name__, "memory_planning", new_gm
+            ):
+                if hasattr(memory_planning_pass, "run"):
+                    new_gm_res = memory_planning_pass.run(  # pyre-ignore[16]
+                        new_gm, new_signature
+                    )
+                else:
+                    new_gm_res = memory_planning_pass(new_gm)  # pyre-ignore[29]
 
             # WARNING: DO NOT ADD ANY MORE PASSES AFTER MEMORY PLANNING PASS.
             # THERE ARE A LOT OF ASSUMPTIONS IN THE STACK THAT MEMORY PLANNING IS THE LAST PASS BEFORE THE EMITTER.
@@ -1697,21 +1717,23 @@ class ExecutorchProgramManager:
         backend_config = backend_config or ExecutorchBackendConfig()
 
         # Emit methods
-        self._emitter_output: EmitterOutput = emit_program(
-            self._execution_programs,
-            backend_config.emit_stacktrace,
-            self._config_methods,
-            backend_config.emit_mutable_buffer_names,
-        )
+        with record_event("emit_program", "emit"):
+            self._emitter_output: EmitterOutput = emit_program(
+                self._execution_programs,
+                backend_config.emit_stacktrace,
+                self._config_methods,
+                backend_config.emit_mutable_buffer_names,
+            )
 
         # Serialize emitter output, ready to be written to a file.
         self._data_serializer = FlatTensorSerializer()
-        self._pte_data, self._tensor_data = serialize_for_executorch(
-            self._emitter_output,
-            backend_config,
-            self._data_serializer,
-            self._named_data,
-        )
+        with record_event("serialize_for_executorch", "serialize"):
+            self._pte_data, self._tensor_data = serialize_for_executorch(
+                self._emitter_output,
+                backend_config,
+                self._data_serializer,
+                self._named_data,
+            )
         self._buffer: Optional[bytes] = None
 
     @property
@@ -1771,6 +1793,30 @@ class ExecutorchProgramManager:
         """
         return self._emitter_output.program
 
+    @property
+    def memory_planning_reports(self) -> Dict[str, MemoryPlanningReport]:
+        """
+        Returns the MemoryPlanningReport of each method, for the methods that were
+        planned by a MemoryPlanningPass(generate_report=True).
+        """
+        return {
+            method_name: program.graph_module.meta["memory_planning_report"]
+            for method_name, program in self._execution_programs.items()
+            if "memory_planning_report" in program.graph_module.meta
+        }
+
+    def write_memory_planning_reports_to_file(self, path: str) -> None:
+        """
+        Writes the memory planning reports of all methods, keyed by method name,
+        to the JSON file at `path`.
+        """
+        reports = {
+            method_name: json.loads(report.to_json())
+            for method_name, report in self.memory_planning_reports.items()
+        }
+        with open(path, "w") as f:
+            json.dump(reports, f, indent=2)
+
     @property
     def buffer(self) -> bytes:
         """Returns the serialized ExecuTorch binary as a byte string.
@@ -1785,11 +1831,11 @@ class ExecutorchProgramManager:
             self._buffer = bytes(self._pte_data)
         return self._buffer
 
-    def write_to_file(self, open_file: io.BufferedIOBase) -> None:
+    def write_to_file(self, open_file: WriteTarget) -> None:
         """
         Writes the serialized ExecuTorch binary to the file at `open_file`. Prefer to use this over
         `buffer`, as it writes to file without copying into a contiguous block of memory first,
-        reducing the peak memory usage.
+        reducing the peak memory usage. `open_file` may also be a connected socket.
         """
         self._pte_data.write_to_file(open_file)
 
@@ -1805,7 +1851,9 @@ class ExecutorchProgramManager:
 
     def save(self, path: str) -> None:
         """
-        Saves the serialized ExecuTorch binary to the file at `path`.
+        Saves the serialized ExecuTorch binary to the file at `path`. If any
+        method has a memory planning report, the reports are saved next to it,
+        in `<path without .pte>.memory_planning.json`.
         """
         if path[-4:] != ".pte":
             logging.error(f"Path {path} does not end with .pte")
@@ -1814,5 +1862,9 @@ class ExecutorchProgramManager:
             with open(path, "wb") as file:
                 self.write_to_file(file)
                 logging.info(f"Saved exported program to {path}")
+            if self.memory_planning_reports:
+                report_path = f"{path[:-4]}.memory_planning.json"
+                self.write_memory_planning_reports_to_file(report_path)
+                logging.info(f"Saved memory planning reports to {report_path}")
         except Exception as e:
             logging.error(f"Error while saving to {path}: {e}")
@@ -9,9 +9,14 @@
 import copy
 import unittest
 from typing import Any, Dict
+from unittest.mock import patch
 
 import torch
 from executorch.exir import EdgeCompileConfig, ExecutorchBackendConfig
+from executorch.exir._parallel import parallel_map
+from executorch.exir.backend.test.backend_with_compiler_demo import (
+    BackendWithCompilerDemo,
+)
 from executorch.exir.backend.test.op_partitioner_demo import (
     AddMulPartitionerDemo,
     NonDecompTestPartitioner,
@@ -528,6 +533,39 @@ class TestProgramManagers(unittest.TestCase):
             1,
         )
 
+    def test_parallel_preprocess_same_output(self):
+        def lower(max_method_workers: int) -> bytes:
+            return (
+                to_edge_transform_and_lower(
+                    get_exported_programs(),
+                    partitioner=[AddMulPartitionerDemo()],
+                    constant_methods=get_config_methods(),
+                    compile_config=EdgeCompileConfig(
+                        max_method_workers=max_method_workers
+                    ),
+                )
+                .to_executorch()
+                .buffer
+            )
+
+        self.assertEqual(lower(4), lower(1))
+
+    def test_parallel_preprocess_requires_thread_safe_backend(self):
+        with patch.object(
+            BackendWithCompilerDemo, "thread_safe_preprocess", False
+        ), patch(
+            "executorch.exir.backend.backend_api.parallel_map", wraps=parallel_map
+        ) as mock_parallel_map:
+            to_edge_transform_and_lower(
+                get_exported_programs(),
+                partitioner=[AddMulPartitionerDemo()],
+                constant_methods=get_config_methods(),
+                compile_config=EdgeCompileConfig(max_method_workers=4),
+            )
+        self.assertTrue(mock_parallel_map.called)
+        for call in mock_parallel_map.call_args_list:
+            self.assertEqual(call.args[2], 1)
+
     def test_edge_to_backend_selective(self):
         edge_manager: EdgeProgramManager = to_edge(
             get_exported_programs(), get_config_methods()
@@ -0,0 +1,122 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import collections
+import json
+import os
+import tempfile
+import unittest
+
+import torch
+from executorch.exir import to_edge
+from executorch.exir.backend.test.op_partitioner_demo import AddMulPartitionerDemo
+from executorch.exir.compile_profiler import profile_compile, record_event
+from executorch.exir.pass_base import ExportPass
+from executorch.exir.pass_manager import PassManager
+from executorch.exir.passes import (
+    base_post_op_replace_passes,
+    base_pre_op_replace_passes,
+)
+
+
+class Model(torch.nn.Module):
+    def forward(
+        self, a: torch.Tensor, x: torch.Tensor, b: torch.Tensor
+    ) -> torch.Tensor:
+        y = torch.mm(a, x)
+        z = y + b
+        return z.relu()
+
+
+class TestCompileProfiler(unittest.TestCase):
+    def _export(self) -> torch.export.ExportedProgram:
+        inputs = (torch.randn(2, 2), torch.randn(2, 2), torch.randn(2, 2))
+        return torch.export.export(Model(), inputs)
+
+    def test_records_lowering(self) -> None:
+        exported_program = self._export()
+        with profile_compile() as profiler:
+            to_edge(exported_program).to_backend(
+                AddMulPartitionerDemo()
+            ).to_executorch()
+
+        categories = {event.category for event in profiler.events}
+        self.assertEqual(
+            categories,
+            {
+                "stage",
+                "pass",
+                "partition",
+                "preprocess",
+                "memory_planning",
+                "emit",
+                "serialize",
+            },
+        )
+        names = {(event.category, event.name) for event in profiler.events}
+        self.assertIn(("stage", "to_edge"), names)
+        self.assertIn(("stage", "to_executorch"), names)
+        self.assertIn(("partition", "AddMulPartitionerDemo"), names)
+        self.assertIn(("preprocess", "BackendWithCompilerDemo.preprocess"), names)
+        self.assertIn(("pass", "SpecPropPass"), names)
+        self.assertIn(("memory_planning", "MemoryPlanningPass"), names)
+
+        for event in profiler.events:
+            self.assertGreaterEqual(event.duration_us, 0)
+            if event.category == "pass":
+                self.assertIsNotNone(event.nodes_before)
+                self.assertIsNotNone(event.nodes_after)
+
+        table = profiler.table()
+        self.assertIn("SpecPropPass", table)
+        self.assertIn("BackendWithCompilerDemo.preprocess", table)
+        self.assertEqual(len(profiler.table(limit=3).splitlines()), 4)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "trace.json")
+            profiler.save_chrome_trace(path)
+            with open(path) as f:
+                trace = json.load(f)
+        self.assertEqual(len(trace["traceEvents"]), len(profiler.events))
+        self.assertTrue(all(event["ph"] == "X" for event in trace["traceEvents"]))
+
+    def test_pass_manager_node_counts(self) -> None:
+        class RemoveRelu(ExportPass):
+            def call_operator(self, op, args, kwargs, meta):
+                if op == torch.ops.aten.relu.default:
+                    return args[0]
+                return super().call_operator(op, args, kwargs, meta)
+
+        graph_module = self._export().graph_module
+        with profile_compile() as profiler:
+            PassManager([RemoveRelu()])(graph_module)
+
+        (event,) = profiler.events
+        self.assertEqual((event.category, event.name), ("pass", "RemoveRelu"))
+        self.assertEqual(event.nodes_before - event.nodes_after, 1)
+
+    def test_records_each_pass_call_once(self) -> None:
+        exported_program = self._export()
+        with profile_compile() as profiler:
+            to_edge(exported_program)
+
+        counts = collections.Counter(
+            event.name for event in profiler.events if event.category == "pass"
+        )
+        for pass_ in base_pre_op_replace_passes + base_post_op_replace_passes:
+            self.assertEqual(counts[pass_.__name__], 1, pass_.__name__)
+
+    def test_disabled(self) -> None:
+        with record_event("step", "pass") as event:
+            self.assertIsNone(event)
+        with profile_compile() as profiler:
+            with profile_compile() as inner_profiler:
+                with record_event("step", "pass"):
+                    pass
+        self.assertEqual(len(profiler.events), 0)
+        self.assertEqual(len(inner_profiler.events), 1)
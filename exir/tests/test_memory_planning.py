@@ -7,19 +7,29 @@
 # pyre-strict
 
 import itertools
+import json
+import os
+import random
+import tempfile
 import unittest
-from typing import Any, Callable, List, Optional, Tuple, Type
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+from unittest.mock import patch
 
 import executorch.exir as exir
+import numpy as np
 
 import torch
 from executorch.exir import ExecutorchBackendConfig, to_edge
 from executorch.exir.dialects._ops import ops as exir_ops
+from executorch.exir.error import InternalError
 from executorch.exir.memory_planning import (
     _do_user_inputs_exist,
+    _place_best_fit,
+    best_fit_with_local_search,
     filter_nodes,
     get_node_tensor_specs,
     greedy,
+    greedy_interval_tree,
     MemoryAlgoResult,
     MemoryPlanningAlgorithmSuite,
     naive,
@@ -32,6 +42,7 @@ from executorch.exir.passes import (  # noqa
     SpecPropPass,
     ToOutVarPass,
 )
+from executorch.exir.passes.memory_planning_pass import _CachedMemoryPlanningAlgo
 from executorch.exir.passes.sym_shape_eval_pass import ConstraintBasedSymShapeEvalPass
 from executorch.exir.tensor import TensorSpec
 from functorch.experimental.control_flow import map as torch_map
@@ -258,6 +269,8 @@ def maketest(
                 (naive, False),
                 # greedy algorithm should reuse tensor storages in the testing model
                 (greedy, True),
+                (greedy_interval_tree, True),
+                (best_fit_with_local_search, True),
             ]
 
         for algo, expect_reuse in criteria:
@@ -499,6 +512,266 @@ class TestVerifier(unittest.TestCase):
         # non overlap. first on the right side
         self.assertFalse(Verifier.has_overlap([5, 6], [1, 2]))
 
+    def test_find_storage_conflicts_matches_pairwise(self) -> None:
+        for seed, allow_overlap in itertools.product(range(10), [True, False]):
+            with self.subTest(seed=seed, allow_overlap=allow_overlap):
+                rng = random.Random(seed)
+                specs = []
+                for _ in range(150):
+                    spec = TensorSpec(
+                        dtype=torch.uint8, shape=torch.Size([rng.choice([0, 4, 16])])
+                    )
+                    start = rng.randrange(50)
+                    spec.lifetime = [start, start + rng.randrange(-1, 10)]
+                    spec.mem_id = rng.choice([1, 2])
+                    spec.mem_offset = rng.randrange(0, 512, 4)
+                    spec.mem_obj_id = rng.choice([0, 1])
+                    specs.append(spec)
+
+                expected = set()
+                num_overlaps = 0
+                for lhs, rhs in itertools.combinations(specs, 2):
+                    if not Verifier.storage_overlap(lhs, rhs):
+                        continue
+                    num_overlaps += 1
+                    if not allow_overlap and Verifier.lifetime_overlap(lhs, rhs):
+                        expected.add(("storage", frozenset((id(lhs), id(rhs)))))
+                    if not Verifier.mem_obj_id_match(lhs, rhs):
+                        expected.add(("mem_obj_id", frozenset((id(lhs), id(rhs)))))
+
+                actual = set()
+                for reason, lhs, rhs in Verifier.find_storage_conflicts(
+                    specs, allow_overlap
+                ):
+                    kind = "storage" if "storage" in reason else "mem_obj_id"
+                    # Pairs can be reported in either order.
+                    actual.add((kind, frozenset((id(lhs), id(rhs)))))
+                self.assertEqual(actual, expected)
+                self.assertEqual(Verifier.num_storage_overlaps(specs), num_overlaps)
+
+    def test_verify_storage_reuse_reports_node_names(self) -> None:
+        graph = Graph()
+        nodes = [graph.placeholder(name) for name in ("x", "y", "z")]
+        graph.output(tuple(nodes))
+        for i, node in enumerate(nodes):
+            spec = TensorSpec(dtype=torch.float32, shape=torch.Size([4]))
+            spec.lifetime = [0, 1]
+            spec.mem_id = 1
+            spec.mem_obj_id = i
+            # x and z share storage.
+            spec.mem_offset = 0 if i != 1 else 16
+            node.meta["spec"] = spec
+        verifier = Verifier(
+            GraphModule(torch.nn.Module(), graph),
+            alloc_graph_input=True,
+            alloc_graph_output=True,
+            alloc_mutable_buffers=True,
+        )
+        with self.assertRaises(InternalError) as cm:
+            verifier.verify_storage_reuse()
+        # Both conflicts of the pair are reported.
+        self.assertIn(
+            "Unexpected storage overlap between ['x'] and ['z']", str(cm.exception)
+        )
+        self.assertIn(
+            "Unexpected mem_obj_id mismatch between ['x'] and ['z']",
+            str(cm.exception),
+        )
+
+
+class TestGreedyIntervalTree(unittest.TestCase):
+    def make_specs(self, seed: int, num_specs: int) -> List[TensorSpec]:
+        rng = random.Random(seed)
+        specs = []
+        for _ in range(num_specs):
+            spec = TensorSpec(
+                dtype=torch.float32, shape=torch.Size([rng.choice([0, 1, 3, 16, 64])])
+            )
+            start = rng.randrange(100)
+            spec.lifetime = [start, start + rng.randrange(20)]
+            spec.mem_id = rng.choice([None, 1, 2])
+            specs.append(spec)
+        return specs
+
+    def test_same_allocations_as_greedy(self) -> None:
+        graph_module = GraphModule(torch.nn.Module(), Graph())
+        for seed, allow_overlapping_allocations in itertools.product(
+            range(20), [True, False]
+        ):
+            with self.subTest(
+                seed=seed, allow_overlapping_allocations=allow_overlapping_allocations
+            ):
+                specs = self.make_specs(seed, 200)
+                results = [
+                    algo(
+                        16,
+                        # Same iteration order for both, which breaks ties.
+                        dict.fromkeys(specs),  # pyre-ignore[6]
+                        graph_module,
+                        ExportGraphSignature([], []),
+                        allow_overlapping_allocations=allow_overlapping_allocations,
+                    )
+                    for algo in (greedy, greedy_interval_tree)
+                ]
+                self.assertEqual(results[0].bufsizes, results[1].bufsizes)
+                self.assertEqual(results[0].spec_dict, results[1].spec_dict)
+
+
+class TestBestFitWithLocalSearch(unittest.TestCase):
+    def test_valid_and_not_above_greedy(self) -> None:
+        graph_module = GraphModule(torch.nn.Module(), Graph())
+        rng = random.Random(0)
+        specs = []
+        for _ in range(100):
+            spec = TensorSpec(
+                dtype=torch.uint8, shape=torch.Size([rng.randrange(1, 1000)])
+            )
+            start = rng.randrange(30)
+            spec.lifetime = [start, start + rng.randrange(10)]
+            specs.append(spec)
+
+        greedy_result = greedy(
+            16, set(specs), graph_module, ExportGraphSignature([], [])
+        )
+        result = best_fit_with_local_search(
+            16,
+            set(specs),
+            graph_module,
+            ExportGraphSignature([], []),
+            max_iterations=200,
+        )
+        self.assertLessEqual(result.bufsizes[1], greedy_result.bufsizes[1])
+
+        for lhs, rhs in itertools.combinations(specs, 2):
+            lhs_alloc, rhs_alloc = result.spec_dict[lhs], result.spec_dict[rhs]
+            storage_overlap = (
+                lhs_alloc.mem_offset < rhs_alloc.mem_offset + rhs.allocated_memory
+                and rhs_alloc.mem_offset < lhs_alloc.mem_offset + lhs.allocated_memory
+            )
+            if storage_overlap:
+                self.assertFalse(Verifier.has_overlap(lhs.lifetime, rhs.lifetime))
+                self.assertEqual(lhs_alloc.mem_obj_id, rhs_alloc.mem_obj_id)
+            self.assertLessEqual(
+                lhs_alloc.mem_offset + lhs.allocated_memory, result.bufsizes[1]
+            )
+
+    def test_reaches_lower_bound(self) -> None:
+        # Greedy cannot stack both 32 byte tensors on top of the shared objects of
+        # the 48 byte ones, and needs 128 bytes. Packing tensors by offset only
+        # needs the 112 bytes that are live during [2, 3].
+        sizes_and_lifetimes = [(48, [1, 4]), (48, [0, 1]), (32, [2, 3]), (32, [2, 3])]
+        specs = []
+        for size, lifetime in sizes_and_lifetimes:
+            spec = TensorSpec(dtype=torch.uint8, shape=torch.Size([size]))
+            spec.lifetime = lifetime
+            specs.append(spec)
+        result = best_fit_with_local_search(
+            16,
+            dict.fromkeys(specs),  # pyre-ignore[6]
+            GraphModule(torch.nn.Module(), Graph()),
+            ExportGraphSignature([], []),
+        )
+        greedy_result = greedy(
+            16,
+            dict.fromkeys(specs),  # pyre-ignore[6]
+            GraphModule(torch.nn.Module(), Graph()),
+            ExportGraphSignature([], []),
+        )
+        self.assertEqual(greedy_result.bufsizes, [0, 128])
+        self.assertEqual(result.bufsizes, [0, 112])
+        self.assertEqual(result.lower_bounds, [0, 112])
+
+    def test_default_plan_is_deterministic(self) -> None:
+        rng = random.Random(1)
+        specs = []
+        for _ in range(60):
+            spec = TensorSpec(
+                dtype=torch.uint8, shape=torch.Size([rng.randrange(1, 1000)])
+            )
+            start = rng.randrange(30)
+            spec.lifetime = [start, start + rng.randrange(10)]
+            specs.append(spec)
+
+        def plan() -> Dict[int, int]:
+            result = best_fit_with_local_search(
+                16,
+                dict.fromkeys(specs),  # pyre-ignore[6]
+                GraphModule(torch.nn.Module(), Graph()),
+                ExportGraphSignature([], []),
+            )
+            self.assertLessEqual(result.lower_bounds[1], result.bufsizes[1])
+            return {
+                i: result.spec_dict[spec].mem_offset for i, spec in enumerate(specs)
+            }
+
+        # The search is bounded by iterations, not time, so a slow machine plans
+        # the same as a fast one.
+        with patch(
+            "executorch.exir.memory_planning.time.monotonic",
+            side_effect=itertools.count(0, 1000),
+        ):
+            slow_plan = plan()
+        self.assertEqual(plan(), slow_plan)
+
+    def test_budget_checked_before_initial_placements(self) -> None:
+        specs = []
+        for size in range(1, 20):
+            spec = TensorSpec(dtype=torch.uint8, shape=torch.Size([size]))
+            spec.lifetime = [size % 5, size % 5 + 3]
+            specs.append(spec)
+        with patch(
+            "executorch.exir.memory_planning._place_best_fit",
+            wraps=_place_best_fit,
+        ) as place:
+            result = best_fit_with_local_search(
+                16,
+                set(specs),
+                GraphModule(torch.nn.Module(), Graph()),
+                ExportGraphSignature([], []),
+                time_budget_s=0.0,
+            )
+        # Only the first placement runs, as a plan is needed.
+        self.assertEqual(place.call_count, 1)
+        self.assertGreater(result.bufsizes[1], 0)
+
+    def test_placement_reuses_kept_offsets(self) -> None:
+        rng = random.Random(0)
+        starts = np.array([rng.randrange(30) for _ in range(50)], dtype=np.int64)
+        ends = starts + np.array([rng.randrange(10) for _ in range(50)])
+        sizes = np.array([rng.randrange(1, 100) for _ in range(50)], dtype=np.int64)
+        order = list(range(50))
+        rng.shuffle(order)
+        placement = _place_best_fit(order, starts, ends, sizes, 16)
+        assert placement is not None
+        for kept in (0, 1, 25, 49):
+            candidate = list(order)
+            candidate.insert(kept, candidate.pop(rng.randrange(kept, 50)))
+            expected = _place_best_fit(candidate, starts, ends, sizes, 16)
+            actual = _place_best_fit(
+                candidate,
+                starts,
+                ends,
+                sizes,
+                16,
+                kept=kept,
+                kept_offsets=placement[0],
+            )
+            assert expected is not None and actual is not None
+            self.assertEqual(expected[0].tolist(), actual[0].tolist())
+            self.assertEqual(expected[1], actual[1])
+            self.assertIsNone(
+                _place_best_fit(
+                    candidate,
+                    starts,
+                    ends,
+                    sizes,
+                    16,
+                    kept=kept,
+                    kept_offsets=placement[0],
+                    max_peak=expected[1] - 1,
+                )
+            )
+
 
 class TestMisc(unittest.TestCase):
     def test_filter_nodes(self) -> None:
@@ -576,6 +849,11 @@ class TestMisc(unittest.TestCase):
                 [(1, 0), (3, 0), (1, 4), (3, 4), (1, 0)],
                 [0, 8, 0, 8],
             ),
+            (
+                greedy_interval_tree,
+                [(1, 0), (3, 0), (1, 4), (3, 4), (1, 0)],
+                [0, 8, 0, 8],
+            ),
         ]
     )
     def test_multiple_pools(
@@ -631,6 +909,143 @@ class TestMisc(unittest.TestCase):
         self.assertEqual(reference_output, actual_output)
         self.assertEqual(graph_module.meta["non_const_buffer_sizes"], expected_bufsizes)
 
+    def test_plan_cache(self) -> None:
+        calls = []
+
+        def counting_algo(*args: Any) -> List[int]:
+            calls.append(1)
+            return MemoryPlanningAlgorithmSuite(algo_list=[greedy])(*args)
+
+        def plan(cache_dir: str) -> Tuple[List[int], List[Tuple[int, int, int]]]:
+            model = ToyModelForMemPlanning()
+            et = to_edge(
+                export(model, model.get_random_inputs(), strict=True)
+            ).to_executorch(
+                ExecutorchBackendConfig(
+                    memory_planning_pass=MemoryPlanningPass(
+                        memory_planning_algo=counting_algo,
+                        plan_cache_dir=cache_dir,
+                    )
+                )
+            )
+            graph_module = et.exported_program().graph_module
+            specs = [
+                (spec.mem_id, spec.mem_offset, spec.mem_obj_id)
+                for node in graph_module.graph.nodes
+                for spec in get_node_tensor_specs(node)
+                if spec.mem_offset is not None
+            ]
+            return graph_module.meta["non_const_buffer_sizes"], specs
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            expected = plan(cache_dir)
+            self.assertEqual(len(calls), 1)
+            entries = os.listdir(cache_dir)
+            self.assertEqual(len(entries), 1)
+
+            # The second export replays the stored plan.
+            self.assertEqual(plan(cache_dir), expected)
+            self.assertEqual(len(calls), 1)
+
+            # Invalid entries are ignored, and replaced.
+            path = os.path.join(cache_dir, entries[0])
+            with open(path) as f:
+                entry = json.load(f)
+            for spec in entry["specs"]:
+                spec[1] = 0
+            with open(path, "w") as f:
+                json.dump(entry, f)
+            self.assertEqual(plan(cache_dir), expected)
+            self.assertEqual(len(calls), 2)
+
+            def corrupt(edit: Callable[[Any], None]) -> None:
+                with open(path) as f:
+                    entry = json.load(f)
+                edit(entry)
+                with open(path, "w") as f:
+                    json.dump(entry, f)
+
+            # So are malformed entries, and entries whose buffers are too small.
+            corrupt(lambda entry: entry.pop("bufsizes"))
+            self.assertEqual(plan(cache_dir), expected)
+            corrupt(lambda entry: entry["specs"][0].pop())
+            self.assertEqual(plan(cache_dir), expected)
+            corrupt(lambda entry: entry.update(bufsizes=[0] * len(entry["bufsizes"])))
+            self.assertEqual(plan(cache_dir), expected)
+            self.assertEqual(len(calls), 5)
+
+    def test_rejected_plan_cache_entry_keeps_specs(self) -> None:
+        specs = []
+        for lifetime in ([0, 1], [1, 2]):
+            spec = TensorSpec(dtype=torch.float32, shape=torch.Size([4]))
+            spec.lifetime = lifetime
+            spec.mem_id, spec.mem_offset, spec.mem_obj_id = 1, None, None
+            specs.append(spec)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cached_algo = _CachedMemoryPlanningAlgo(greedy, cache_dir)
+            # The tensors overlap in both storage and lifetime.
+            with open(os.path.join(cache_dir, "key.json"), "w") as f:
+                json.dump({"bufsizes": [0, 16], "specs": [[1, 0, 0], [1, 0, 0]]}, f)
+            self.assertIsNone(cached_algo._load("key", 16, specs))
+        for spec in specs:
+            self.assertEqual(
+                (spec.mem_id, spec.mem_offset, spec.mem_obj_id), (1, None, None)
+            )
+
+    def test_memory_planning_report(self) -> None:
+        model = ToyModelForMemPlanning()
+        et = to_edge(
+            export(model, model.get_random_inputs(), strict=True)
+        ).to_executorch(
+            ExecutorchBackendConfig(
+                memory_planning_pass=MemoryPlanningPass(
+                    memory_planning_algo=MemoryPlanningAlgorithmSuite(
+                        algo_list=[greedy, naive]
+                    ),
+                    generate_report=True,
+                )
+            )
+        )
+        graph_module = et.exported_program().graph_module
+        report = graph_module.meta["memory_planning_report"]
+        bufsizes = graph_module.meta["non_const_buffer_sizes"]
+
+        self.assertEqual(report.best_algo, "greedy")
+        self.assertEqual(set(report.algo_bufsizes.keys()), {"greedy", "naive"})
+        self.assertEqual(report.algo_bufsizes["greedy"], bufsizes)
+
+        self.assertEqual([r.mem_id for r in report.mem_ids], [1])
+        mem_report = report.mem_ids[0]
+        self.assertEqual(mem_report.planned_size, bufsizes[1])
+        self.assertEqual(len(mem_report.live_bytes), len(graph_module.graph.nodes))
+        self.assertEqual(mem_report.lower_bound, max(mem_report.live_bytes))
+        self.assertEqual(
+            mem_report.fragmentation, mem_report.planned_size - mem_report.lower_bound
+        )
+        self.assertGreaterEqual(mem_report.fragmentation, 0)
+        self.assertEqual(
+            mem_report.peak_node,
+            list(graph_module.graph.nodes)[mem_report.peak_index].name,
+        )
+        # The peak tensors are live at the peak, and are listed largest first.
+        sizes = [t.size for t in mem_report.peak_tensors]
+        self.assertEqual(sizes, sorted(sizes, reverse=True))
+        for tensor in mem_report.peak_tensors:
+            self.assertTrue(tensor.node_names)
+            self.assertLessEqual(tensor.lifetime[0], mem_report.peak_index)
+            self.assertGreaterEqual(tensor.lifetime[1], mem_report.peak_index)
+        if len(mem_report.peak_tensors) < 10:
+            self.assertEqual(sum(sizes), mem_report.live_bytes[mem_report.peak_index])
+
+        self.assertEqual(json.loads(report.to_json())["mem_ids"][0]["mem_id"], 1)
+
+        self.assertEqual(et.memory_planning_reports, {"forward": report})
+        with tempfile.TemporaryDirectory() as tmpdir:
+            et.save(os.path.join(tmpdir, "model.pte"))
+            with open(os.path.join(tmpdir, "model.memory_planning.json")) as f:
+                saved = json.load(f)
+        self.assertEqual(saved, {"forward": json.loads(report.to_json())})
+
     def test_mutation_not_double_allocated(self) -> None:
         class Simple(torch.nn.Module):
             def __init__(self) -> None:
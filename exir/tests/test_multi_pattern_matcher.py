@@ -0,0 +1,123 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import copy
+import unittest
+
+import torch
+from executorch.exir.multi_pattern_matcher import (
+    MultiPatternMatcher,
+    replace_patterns_with_filters,
+)
+from torch.fx import subgraph_rewriter
+from torch.fx.passes.utils.matcher_utils import SubgraphMatcher
+
+
+class Model(torch.nn.Module):
+    def forward(self, x: torch.Tensor, y: torch.Tensor) -> torch.Tensor:
+        a = torch.relu(torch.add(x, y))
+        b = torch.sigmoid(torch.mul(a, y))
+        c = torch.relu(torch.sub(b, x))
+        d, e = torch.split(torch.add(c, a), 2)
+        return torch.relu(torch.mul(d, e)) + torch.neg(x)
+
+
+def add_relu(x: torch.Tensor, y: torch.Tensor) -> torch.Tensor:
+    return torch.relu(torch.add(x, y))
+
+
+def sub_relu(x: torch.Tensor, y: torch.Tensor) -> torch.Tensor:
+    return torch.relu(torch.sub(x, y))
+
+
+def mul_sigmoid(x: torch.Tensor, y: torch.Tensor) -> torch.Tensor:
+    return torch.sigmoid(torch.mul(x, y))
+
+
+def add_split(x: torch.Tensor, y: torch.Tensor) -> torch.Tensor:
+    a, b = torch.split(torch.add(x, y), 2)
+    return a, b
+
+
+def neg(x: torch.Tensor) -> torch.Tensor:
+    return torch.neg(x)
+
+
+def tanh(x: torch.Tensor) -> torch.Tensor:
+    return torch.tanh(x)
+
+
+class TestMultiPatternMatcher(unittest.TestCase):
+    def setUp(self) -> None:
+        self.graph_module = torch.fx.symbolic_trace(Model())
+        self.patterns = [
+            torch.fx.symbolic_trace(f).graph
+            for f in [add_relu, sub_relu, mul_sigmoid, add_split, neg, tanh]
+        ]
+
+    def _assert_matches_equal(self, matches, expected_matches) -> None:
+        self.assertEqual(len(matches), len(expected_matches))
+        for match, expected_match in zip(matches, expected_matches):
+            self.assertEqual(match.nodes_map, expected_match.nodes_map)
+            self.assertEqual(match.placeholder_nodes, expected_match.placeholder_nodes)
+            self.assertEqual(match.returning_nodes, expected_match.returning_nodes)
+
+    def test_match(self) -> None:
+        for kwargs in [{}, {"match_output": True}, {"match_placeholder": True}]:
+            matches = MultiPatternMatcher(self.patterns, **kwargs).match(
+                self.graph_module.graph
+            )
+            self.assertEqual(len(matches), len(self.patterns))
+            for pattern, pattern_matches in zip(self.patterns, matches):
+                self._assert_matches_equal(
+                    pattern_matches,
+                    SubgraphMatcher(pattern, **kwargs).match(self.graph_module.graph),
+                )
+        matches = MultiPatternMatcher(self.patterns).match(self.graph_module.graph)
+        self.assertEqual(
+            [len(pattern_matches) for pattern_matches in matches],
+            [1, 1, 1, 1, 1, 0],
+        )
+
+    def test_replace_patterns_with_filters(self) -> None:
+        def tanh_replacement(x: torch.Tensor, y: torch.Tensor) -> torch.Tensor:
+            return torch.tanh(torch.add(x, y))
+
+        def sub_replacement(x: torch.Tensor, y: torch.Tensor) -> torch.Tensor:
+            return torch.sub(x, y)
+
+        def neg_replacement(x: torch.Tensor) -> torch.Tensor:
+            return torch.mul(x, -1)
+
+        def abs_replacement(x: torch.Tensor) -> torch.Tensor:
+            return torch.abs(x)
+
+        def is_not_placeholder(match, original_graph, pattern_graph) -> bool:
+            return all(node.op != "placeholder" for node in match.returning_nodes)
+
+        patterns_and_replacements = [
+            (add_relu, tanh_replacement, None),
+            (sub_relu, sub_replacement, [lambda *args: False]),
+            (neg, neg_replacement, [is_not_placeholder]),
+            # Only matches the replacement of add_relu
+            (tanh, abs_replacement, []),
+        ]
+
+        expected = copy.deepcopy(self.graph_module)
+        for pattern, replacement, match_filters in patterns_and_replacements:
+            subgraph_rewriter.replace_pattern_with_filters(
+                expected, pattern, replacement, match_filters
+            )
+        replaced = replace_patterns_with_filters(
+            self.graph_module, patterns_and_replacements
+        )
+
+        self.assertEqual(len(replaced), 3)
+        self.assertEqual(self.graph_module.code, expected.code)
+        self.assertIn("torch.abs", self.graph_module.code)
+        self.assertNotIn("torch.tanh", self.graph_module.code)
@@ -6,11 +6,16 @@
 
 # pyre-strict
 
+import copy
 import unittest
+from typing import Any, List, Tuple
 
 import executorch.exir as exir
 
 import torch
+from executorch.exir import to_edge
+from executorch.exir.dialects._ops import ops as exir_ops
+from executorch.exir.pass_base import ExportPass
 from executorch.exir.pass_manager import PassManager
 from executorch.exir.passes import ScalarToTensorPass
 from executorch.exir.passes.pass_registry import PassRegistry
@@ -177,3 +182,76 @@ class TestPassInfra(unittest.TestCase):
         for node in new_gm.graph.nodes:
             if node.target != "output":
                 self.assertIn("val", node.meta)
+
+    def test_incremental_export_pass(self) -> None:
+        class SumKeepDim(torch.nn.Module):
+            def forward(self, x: torch.Tensor, y: torch.Tensor) -> torch.Tensor:
+                z = torch.relu(x + y)
+                return torch.abs(torch.exp(torch.sum(z, [1]))), z * y
+
+        class KeepDimPass(ExportPass):
+            def call_operator(self, op, args, kwargs, meta):  # pyre-ignore
+                if op == exir_ops.edge.aten.sum.dim_IntList:
+                    args = (args[0], args[1], True)
+                return super().call_operator(op, args, kwargs, meta)
+
+        class IncrementalKeepDimPass(KeepDimPass):
+            rewritten_ops = {exir_ops.edge.aten.sum.dim_IntList}
+
+        inputs = (torch.randn(2, 3), torch.randn(2, 3))
+        gm = (
+            to_edge(torch.export.export(SumKeepDim(), inputs))
+            .exported_program()
+            .graph_module
+        )
+
+        expected = KeepDimPass()(copy.deepcopy(gm)).graph_module
+        incremental_gm = copy.deepcopy(gm)
+        result = IncrementalKeepDimPass()(incremental_gm)
+        # The graph module is edited in place instead of retraced
+        self.assertIs(result.graph_module, incremental_gm)
+        self.assertTrue(result.modified)
+
+        def describe(gm: torch.fx.GraphModule) -> List[Tuple[Any, Tuple[int, ...]]]:
+            return [
+                (node.target, tuple(node.meta["val"].shape))
+                for node in gm.graph.nodes
+                if node.op == "call_function"
+            ]
+
+        # The users of the sum are rerun with its new shape
+        self.assertEqual(describe(incremental_gm), describe(expected))
+        self.assertIn(
+            (exir_ops.edge.aten.abs.default, (2, 1)), describe(incremental_gm)
+        )
+
+        def output_shapes(gm: torch.fx.GraphModule) -> List[Tuple[int, ...]]:
+            return [tuple(val.shape) for val in gm.graph.output_node().meta["val"]]
+
+        # So is the output node, as the shape of the first output changes
+        self.assertEqual(output_shapes(incremental_gm), [(2, 1), (2, 3)])
+        self.assertEqual(output_shapes(incremental_gm), output_shapes(expected))
+
+        # Nothing to rewrite
+        result = IncrementalKeepDimPass()(incremental_gm)
+        self.assertFalse(result.modified)
+
+    def test_incremental_export_pass_falls_back_to_retrace(self) -> None:
+        class Add(torch.nn.Module):
+            def forward(self, x: torch.Tensor) -> torch.Tensor:
+                return x + x
+
+        class IncrementalOutputPass(ExportPass):
+            rewritten_ops = {exir_ops.edge.aten.add.Tensor}
+
+            def output(self, results, meta):  # pyre-ignore
+                return super().output(results, meta)
+
+        gm = (
+            to_edge(torch.export.export(Add(), (torch.randn(2),)))
+            .exported_program()
+            .graph_module
+        )
+        # Overriding output() requires a full retrace
+        result = IncrementalOutputPass()(gm)
+        self.assertIsNot(result.graph_module, gm)
@@ -300,6 +300,8 @@ class QuantizationConfig:
         calibration_limit: Number of samples used for calibration from lm_eval.
         calibration_seq_length: Sequence length for GPTQ calibration from lm_eval.
         calibration_data: Prompts use for calibration.
+        quantize_workers: Number of layers quantized at once by the int8 weight
+            and embedding source transforms.
     """
 
     # Constants.
@@ -319,6 +321,7 @@ class QuantizationConfig:
     calibration_limit: Optional[int] = None
     calibration_seq_length: Optional[int] = None
     calibration_data: str = "Once upon a time"
+    quantize_workers: int = 1
 
     def __post_init__(self):
         if self.qmode:
@@ -555,6 +558,8 @@ class LlmConfig:
             llm_config.quantization.calibration_seq_length = args.calibration_seq_length
         if hasattr(args, "calibration_data"):
             llm_config.quantization.calibration_data = args.calibration_data
+        if hasattr(args, "quantize_workers"):
+            llm_config.quantization.quantize_workers = args.quantize_workers
 
         # BackendConfig - XNNPack
         if hasattr(args, "xnnpack"):
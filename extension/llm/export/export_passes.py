@@ -106,6 +106,8 @@ class ReplaceSDPAWithCustomSDPAPass(ExportPass):
     is_causal to True in custoom_spda.
     """
 
+    rewritten_ops = {torch.ops.aten.scaled_dot_product_attention.default}
+
     def __init__(self, assume_causal_mask=False):
         super().__init__()
         self.assume_causal_mask = assume_causal_mask